@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+
+"""
+benchmark of `h5type_generator.py` on synthetic headers, it runs offline with the local libclang
+
+Each case synthesizes a header of `structs` classes with `fields` members, whose kinds are drawn from
+the weighted `mix` (builtin, c_array, std_array, std_vector, std_string, nested), nested classes up to
+`depth` levels. The stages are timed separately:
++ parse: libclang parses the header into a translation unit
++ walk: visit the AST to find class definitions in the input header
++ classify: resolve all fields of classes into the schema, `clang_util.classify_record()`
++ generate: emit code from the schema, `hdf5_generator.generate()`
++ write_code: format and write the output header
+
+Each case runs in a new process, so that the peak RSS is of this case only.
+
+Usage: `generator_benchmark.py --structs 10 100 --fields 8 32 --depth 3 --repeat 3 --output result.json`
+compare with a previous run: `generator_benchmark.py --compare old.json new.json`
+"""
+
+import sys
+import os.path
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+import multiprocessing
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+code_generator_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code_generator")
+sys.path.insert(0, os.path.abspath(code_generator_dir))
+
+STAGES = ("parse", "walk", "classify", "generate", "write_code")
+FIELD_KINDS = ("builtin", "c_array", "std_array", "std_vector", "std_string", "nested")
+DEFAULT_MIX = "builtin=4,c_array=1,std_array=1,std_vector=1,std_string=1,nested=1"
+
+_builtin_types = ("int", "double", "float", "long", "unsigned int", "short", "char")
+
+
+def parse_mix(text):
+    """ `builtin=4,nested=1` into a dict of weights, missing kinds have zero weight
+    """
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        kind = kind.strip()
+        if kind not in FIELD_KINDS:
+            raise ValueError(f"unknown field kind `{kind}`, must be one of {FIELD_KINDS}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def synthesize_header(structs, fields, mix, depth, seed=0):
+    """ C++ header source of `structs` classes in namespace `Bench`, deterministic for the seed
+    a nested field refers to a class defined before, whose nesting level is less than `depth`
+    """
+    rng = random.Random(seed)
+    kinds = [k for k in FIELD_KINDS if mix.get(k, 0) > 0]
+    weights = [mix[k] for k in kinds]
+    levels = []  # nesting level of each class, 1 if it has no nested field
+    lines = ["#pragma once", "#include <array>", "#include <string>", "#include <vector>", "", "namespace Bench", "{"]
+    for i in range(structs):
+        level = 1
+        members = []
+        for j in range(fields):
+            kind = rng.choices(kinds, weights)[0]
+            el = rng.choice(_builtin_types)
+            nestable = [n for n, l in enumerate(levels) if l < depth]
+            if kind == "nested" and not nestable:
+                kind = "builtin"  # nothing to nest yet
+            if kind == "builtin":
+                members.append(f"{el} f{j};")
+            elif kind == "c_array":
+                members.append(f"{el} f{j}[{rng.randint(2, 8)}];")
+            elif kind == "std_array":
+                members.append(f"std::array<{el}, {rng.randint(2, 8)}> f{j};")
+            elif kind == "std_vector":
+                members.append(f"std::vector<{el}> f{j};")
+            elif kind == "std_string":
+                members.append(f"std::string f{j};")
+            else:
+                n = rng.choice(nestable)
+                level = max(level, levels[n] + 1)
+                members.append(f"S{n} f{j};")
+        levels.append(level)
+        lines.append(f"    struct S{i}")
+        lines.append("    {")
+        lines.extend("        " + m for m in members)
+        lines.append("    };")
+    lines.append("} // namespace Bench")
+    return "\n".join(lines) + "\n"
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB on Linux
+
+
+def run_case(case):
+    """ run all stages of one case `repeat` times, in the current process
+    """
+    import clang_util
+    from clang.cindex import CursorKind
+    from schema import header_schema
+    from h5type_generator import hdf5_generator
+
+    work_dir = case["work_dir"]
+    input_header = os.path.join(work_dir, f"bench_{case['structs']}x{case['fields']}.h")
+    source = synthesize_header(case["structs"], case["fields"], case["mix"], case["depth"], case["seed"])
+    with open(input_header, "w") as f:
+        f.write(source)
+    output_header = input_header.replace(".h", "_hdf5.h")
+    allowed_files = {os.path.realpath(input_header)}
+
+    timings = {s: [] for s in STAGES}
+    tracemalloc.start()
+    for _ in range(case["repeat"]):
+        t0 = time.perf_counter()
+        tu = clang_util.parse_header(input_header, case["clang_args"])
+        t1 = time.perf_counter()
+
+        record_cursors = []
+
+        def walk(node, parent):
+            if not clang_util.is_in_files(node, allowed_files):
+                return
+            if node.kind in clang_util._record_kinds and node.is_definition():
+                record_cursors.append((node, parent))
+                parent = node.type.spelling
+            for c in node.get_children():
+                walk(c, parent)
+
+        walk(tu.cursor, None)
+        t2 = time.perf_counter()
+
+        schema = header_schema(input_header)
+        schema.records = [clang_util.classify_record(node, parent) for node, parent in record_cursors]
+        t3 = time.perf_counter()
+
+        g = hdf5_generator(input_header, output_header, "Bench", schema=schema)
+        g.generate()
+        t4 = time.perf_counter()
+        if os.path.exists(output_header):
+            os.remove(output_header)  # `write_code()` skips writing an unchanged file
+        g.write_code()
+        t5 = time.perf_counter()
+
+        for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            timings[stage].append(dt)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {k: case[k] for k in ("structs", "fields", "depth", "mix", "seed", "repeat")}
+    result["header_bytes"] = len(source)
+    result["output_bytes"] = os.path.getsize(output_header)
+    result["records"] = len(schema.records)
+    result["timings"] = timings
+    result["median"] = {s: statistics.median(v) for s, v in timings.items()}
+    result["python_peak_bytes"] = python_peak
+    result["peak_rss_kb"] = _peak_rss_kb()
+    return result
+
+
+def _run_case_silent(case):
+    # the generator prints every field, which would dominate the timing of write to terminal
+    with open(os.devnull, "w") as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            return run_case(case)
+        finally:
+            sys.stdout = stdout
+
+
+def run_benchmark(args):
+    work_dir = args.keep_corpus or tempfile.mkdtemp(prefix="codegen_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    mix = parse_mix(args.mix)
+    cases = [
+        {
+            "structs": n,
+            "fields": m,
+            "depth": args.depth,
+            "mix": mix,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "clang_args": [f"-I{d}" for d in args.include_dirs],
+            "work_dir": work_dir,
+        }
+        for n in args.structs
+        for m in args.fields
+    ]
+
+    results = []
+    # a new process per case, libclang and the peak RSS are not shared between cases
+    ctx = multiprocessing.get_context("spawn")
+    for case in cases:
+        with ctx.Pool(1) as pool:
+            r = pool.apply(_run_case_silent, (case,))
+        results.append(r)
+        median = ", ".join(f"{s} {r['median'][s] * 1000:.1f}" for s in STAGES)
+        print(f"{r['structs']} structs x {r['fields']} fields: {median} ms, peak RSS {r['peak_rss_kb']} KiB")
+
+    from h5type_generator import GENERATOR_VERSION
+
+    report = {
+        "generator_version": GENERATOR_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stages": STAGES,
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results are saved into {args.output}")
+    return report
+
+
+def compare(old_file, new_file):
+    """ print the ratio new/old of the median time of each stage, for cases in both runs
+    """
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    key = lambda c: (c["structs"], c["fields"], c["depth"], json.dumps(c["mix"], sort_keys=True))
+    old_cases = {key(c): c for c in old["cases"]}
+    print(f"new/old time ratio, {old['generator_version']} -> {new['generator_version']}")
+    print("structs fields " + " ".join(f"{s:>10}" for s in STAGES))
+    for c in new["cases"]:
+        o = old_cases.get(key(c))
+        if not o:
+            continue
+        ratios = [c["median"][s] / o["median"][s] if o["median"][s] else float("nan") for s in STAGES]
+        print(f"{c['structs']:>7} {c['fields']:>6} " + " ".join(f"{r:>10.2f}" for r in ratios))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="benchmark h5type_generator.py on synthetic headers")
+    parser.add_argument("--structs", type=int, nargs="+", default=[10, 100], help="number of classes per header")
+    parser.add_argument("--fields", type=int, nargs="+", default=[8, 32], help="number of fields per class")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weights of field kinds, default: {DEFAULT_MIX}")
+    parser.add_argument("--depth", type=int, default=3, help="max nesting level of classes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the median is reported")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic header")
+    parser.add_argument("-I", dest="include_dirs", action="append", default=[], help="include dir for libclang")
+    parser.add_argument("--keep-corpus", help="dir to keep the synthetic headers, default: a temp dir")
+    parser.add_argument("--output", help="save results as json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result json files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_benchmark(args)
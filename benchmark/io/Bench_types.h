@@ -0,0 +1,41 @@
+#pragma once
+#include <array>
+#include <string>
+#include <vector>
+
+/// representative record types for the IO throughput benchmark, `Bench_types_hdf5.h` is generated
+namespace Bench
+{
+    /// trivially-copyable, written by a single H5Dwrite without conversion
+    struct PodRecord
+    {
+        long long id;
+        double time;
+        double position[3];
+        float velocity[3];
+        int flag;
+    };
+
+    /// vlen string, converted by the generated serializer
+    struct StringRecord
+    {
+        long long id;
+        double value;
+        std::string name;
+    };
+
+    /// vlen vector
+    struct VectorRecord
+    {
+        long long id;
+        std::vector<double> samples;
+    };
+
+    /// nested user type
+    struct NestedRecord
+    {
+        long long id;
+        PodRecord pod;
+        std::array<double, 4> extra;
+    };
+} // namespace Bench
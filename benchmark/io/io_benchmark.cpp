@@ -0,0 +1,296 @@
+/// IO throughput benchmark of `data::IO` in HDF5IO.h with the generated serializers
+/// usage: io_benchmark [--sizes 1000,10000,100000,1000000,10000000] [--types pod,string,vector,nested,matrix]
+///                     [--dir /tmp] [--output result.json]
+/// records/s and MB/s of the in-memory payload are reported for write and read, with the peak RSS of each
+
+#include "HDF5IO.h"
+#include "Bench_types_hdf5.h"
+
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#if defined(__unix__) || defined(__APPLE__)
+#include <sys/resource.h>
+#include <unistd.h>
+#endif
+
+using namespace Bench;
+
+namespace
+{
+    const size_t matrix_cols = 8;
+    const size_t vector_size = 8;
+
+    struct Result
+    {
+        std::string type;
+        size_t records;
+        size_t payload_bytes;
+        size_t file_bytes;
+        double write_seconds;
+        double read_seconds;
+        long write_peak_rss_kb;
+        long read_peak_rss_kb;
+    };
+
+    double now()
+    {
+        return std::chrono::duration<double>(std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+
+    /// reset the peak RSS of the process, Linux only; otherwise the peak is of the process lifetime
+    void reset_peak_rss()
+    {
+        std::ofstream clear_refs("/proc/self/clear_refs");
+        if (clear_refs)
+            clear_refs << "5";
+    }
+
+    long peak_rss_kb()
+    {
+        std::ifstream status("/proc/self/status");
+        std::string line;
+        while (std::getline(status, line))
+        {
+            if (line.compare(0, 6, "VmHWM:") == 0)
+                return std::atol(line.c_str() + 6);
+        }
+#if defined(__unix__) || defined(__APPLE__)
+        struct rusage usage;
+        getrusage(RUSAGE_SELF, &usage);
+#if defined(__APPLE__)
+        return usage.ru_maxrss / 1024;
+#else
+        return usage.ru_maxrss;
+#endif
+#else
+        return -1;
+#endif
+    }
+
+    size_t file_size(const std::string &file_name)
+    {
+        std::ifstream f(file_name, std::ios::binary | std::ios::ate);
+        return f ? static_cast<size_t>(f.tellg()) : 0;
+    }
+
+    PodRecord make_pod(size_t i)
+    {
+        double x = static_cast<double>(i);
+        return PodRecord{static_cast<long long>(i), x * 0.1, {x, x + 1, x + 2}, {1.0f, 2.0f, 3.0f}, int(i % 7)};
+    }
+
+    std::vector<PodRecord> make_records(PodRecord *, size_t n, size_t &bytes)
+    {
+        std::vector<PodRecord> v;
+        v.reserve(n);
+        for (size_t i = 0; i < n; i++)
+            v.push_back(make_pod(i));
+        bytes = n * sizeof(PodRecord);
+        return v;
+    }
+
+    std::vector<StringRecord> make_records(StringRecord *, size_t n, size_t &bytes)
+    {
+        std::vector<StringRecord> v(n);
+        bytes = 0;
+        for (size_t i = 0; i < n; i++)
+        {
+            v[i].id = static_cast<long long>(i);
+            v[i].value = i * 0.5;
+            v[i].name = "record_name_" + std::to_string(i);
+            bytes += sizeof(long long) + sizeof(double) + v[i].name.size();
+        }
+        return v;
+    }
+
+    std::vector<VectorRecord> make_records(VectorRecord *, size_t n, size_t &bytes)
+    {
+        std::vector<VectorRecord> v(n);
+        for (size_t i = 0; i < n; i++)
+        {
+            v[i].id = static_cast<long long>(i);
+            v[i].samples.assign(vector_size, i * 0.25);
+        }
+        bytes = n * (sizeof(long long) + vector_size * sizeof(double));
+        return v;
+    }
+
+    std::vector<NestedRecord> make_records(NestedRecord *, size_t n, size_t &bytes)
+    {
+        std::vector<NestedRecord> v(n);
+        for (size_t i = 0; i < n; i++)
+        {
+            v[i].id = static_cast<long long>(i);
+            v[i].pod = make_pod(i);
+            v[i].extra = {{1.0, 2.0, 3.0, 4.0}};
+        }
+        bytes = n * sizeof(NestedRecord);
+        return v;
+    }
+
+    template <class T>
+    Result bench_records(const std::string &type, size_t n, const std::string &file_name)
+    {
+        Result r = {type, n, 0, 0, 0, 0, 0, 0};
+        auto records = make_records(static_cast<T *>(nullptr), n, r.payload_bytes);
+
+        reset_peak_rss();
+        double start = now();
+        {
+            auto file = std::make_shared<H5::H5File>(file_name, H5F_ACC_TRUNC);
+            data::IO::WriteVector<T>(records, file, "records");
+            file->close();
+        }
+        r.write_seconds = now() - start;
+        r.write_peak_rss_kb = peak_rss_kb();
+        r.file_bytes = file_size(file_name);
+        records.clear();
+        records.shrink_to_fit();
+
+        reset_peak_rss();
+        start = now();
+        {
+            auto file = std::make_shared<H5::H5File>(file_name, H5F_ACC_RDONLY);
+            auto result = data::IO::ReadVector<T>(file, "records");
+            if (result.size() != n)
+                throw std::runtime_error("record count read back does not match for " + type);
+        }
+        r.read_seconds = now() - start;
+        r.read_peak_rss_kb = peak_rss_kb();
+        return r;
+    }
+
+    Result bench_matrix(size_t n, const std::string &file_name)
+    {
+        Result r = {"matrix", n, n * matrix_cols * sizeof(double), 0, 0, 0, 0, 0};
+        data::Matrix<double> mat(n, matrix_cols, 1.5);
+
+        reset_peak_rss();
+        double start = now();
+        {
+            auto file = std::make_shared<H5::H5File>(file_name, H5F_ACC_TRUNC);
+            data::IO::WriteMatrix<double>(mat, file, "matrix");
+            file->close();
+        }
+        r.write_seconds = now() - start;
+        r.write_peak_rss_kb = peak_rss_kb();
+        r.file_bytes = file_size(file_name);
+        mat = data::Matrix<double>();
+
+        reset_peak_rss();
+        start = now();
+        {
+            auto file = std::make_shared<H5::H5File>(file_name, H5F_ACC_RDONLY);
+            auto result = data::IO::ReadFlatMatrix<double>(file, "matrix");
+            if (result.rows() != n)
+                throw std::runtime_error("row count read back does not match for matrix");
+        }
+        r.read_seconds = now() - start;
+        r.read_peak_rss_kb = peak_rss_kb();
+        return r;
+    }
+
+    std::vector<std::string> split(const std::string &s)
+    {
+        std::vector<std::string> items;
+        std::stringstream ss(s);
+        std::string item;
+        while (std::getline(ss, item, ','))
+            if (!item.empty())
+                items.push_back(item);
+        return items;
+    }
+
+    std::string to_json(const std::vector<Result> &results)
+    {
+        std::ostringstream os;
+        os << "{\n  \"benchmark\": \"io_benchmark\",\n  \"hdf5_version\": \"" << H5_VERS_MAJOR << "." << H5_VERS_MINOR
+           << "." << H5_VERS_RELEASE << "\",\n  \"results\": [";
+        for (size_t i = 0; i < results.size(); i++)
+        {
+            const Result &r = results[i];
+            const double mb = r.payload_bytes / 1.0e6;
+            os << (i ? "," : "") << "\n    {\"type\": \"" << r.type << "\", \"records\": " << r.records
+               << ", \"payload_bytes\": " << r.payload_bytes << ", \"file_bytes\": " << r.file_bytes
+               << ", \"write_seconds\": " << r.write_seconds << ", \"read_seconds\": " << r.read_seconds
+               << ", \"write_records_per_second\": " << r.records / r.write_seconds
+               << ", \"read_records_per_second\": " << r.records / r.read_seconds
+               << ", \"write_mb_per_second\": " << mb / r.write_seconds
+               << ", \"read_mb_per_second\": " << mb / r.read_seconds
+               << ", \"write_peak_rss_kb\": " << r.write_peak_rss_kb
+               << ", \"read_peak_rss_kb\": " << r.read_peak_rss_kb << "}";
+        }
+        os << "\n  ]\n}\n";
+        return os.str();
+    }
+} // namespace
+
+int main(int argc, char *argv[])
+{
+    std::string sizes = "1000,10000,100000,1000000,10000000";
+    std::string types = "pod,string,vector,nested,matrix";
+    const char *tmp = std::getenv("TMPDIR");
+    std::string dir = tmp ? tmp : "/tmp";
+    std::string output;
+    for (int i = 1; i + 1 < argc; i += 2)
+    {
+        std::string arg = argv[i];
+        if (arg == "--sizes")
+            sizes = argv[i + 1];
+        else if (arg == "--types")
+            types = argv[i + 1];
+        else if (arg == "--dir")
+            dir = argv[i + 1];
+        else if (arg == "--output")
+            output = argv[i + 1];
+        else
+        {
+            std::cerr << "unknown argument: " << arg << std::endl;
+            return 1;
+        }
+    }
+
+    std::vector<Result> results;
+    for (const auto &size : split(sizes))
+    {
+        const size_t n = std::stoul(size);
+        for (const auto &type : split(types))
+        {
+            const std::string file_name = dir + "/io_benchmark_" + type + ".h5";
+            Result r;
+            if (type == "pod")
+                r = bench_records<PodRecord>(type, n, file_name);
+            else if (type == "string")
+                r = bench_records<StringRecord>(type, n, file_name);
+            else if (type == "vector")
+                r = bench_records<VectorRecord>(type, n, file_name);
+            else if (type == "nested")
+                r = bench_records<NestedRecord>(type, n, file_name);
+            else if (type == "matrix")
+                r = bench_matrix(n, file_name);
+            else
+            {
+                std::cerr << "unknown type: " << type << std::endl;
+                return 1;
+            }
+            std::remove(file_name.c_str());
+            results.push_back(r);
+            std::cerr << type << " " << n << ": write " << r.records / r.write_seconds << " records/s, read "
+                      << r.records / r.read_seconds << " records/s" << std::endl;
+        }
+    }
+
+    const std::string json = to_json(results);
+    if (output.empty())
+        std::cout << json;
+    else
+        std::ofstream(output) << json;
+    return 0;
+}
@@ -2,10 +2,28 @@ import os.path
 import clang.cindex as cx
 from clang.cindex import TypeKind, CursorKind
 
+from schema import *
+
 # install libclang-6, must be version 6 as the time of writing in 2020
 cx.Config.set_library_file("/usr/lib/llvm-6.0/lib/libclang.so.1")
 
 
+# `-x c++` is needed to parse `*.h` as C++ header
+default_clang_args = ["-x", "c++", "-std=c++11"]
+
+# function bodies are not needed to generate code for data classes,
+# incomplete: the input header is not a complete translation unit
+default_parse_options = (
+    cx.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | cx.TranslationUnit.PARSE_INCOMPLETE
+)
+
+
+def parse_header(input_header, clang_args=None, options=default_parse_options):
+    # parse a header file into a translation unit, `clang_args` e.g. `-I` are appended to the default
+    index = cx.Index.create()
+    return index.parse(input_header, default_clang_args + list(clang_args or []), options=options)
+
+
 # Cymbal makes it easy to add functionality missing from libclang Python bindings
 # pybinder for pyocct has  clangext.py for monkey_patch extension the clang.module
 
@@ -18,6 +36,11 @@ def get_code(cursor):
     return "".join(ts)
 
 
+def _decl_code(decl):
+    # predicates accept either a cursor or its already tokenized code string
+    return decl if isinstance(decl, str) else get_code(decl)
+
+
 def get_template_arguments(code):
     # template parameters list extracted from field decl's source code
     start = code.find("<") + 1
@@ -26,6 +49,65 @@ def get_template_arguments(code):
     return [a.strip() for a in all_args]
 
 
+def split_template_arguments(code):
+    # top-level template arguments, nested `<>` are kept, e.g. `xt::xshape<3, 4>`
+    start = code.find("<") + 1
+    end = code.rfind(">")
+    args = []
+    depth = 0
+    arg = ""
+    for c in code[start:end]:
+        if c == "," and depth == 0:
+            args.append(arg.strip())
+            arg = ""
+            continue
+        depth += {"<": 1, ">": -1}.get(c, 0)
+        arg += c
+    args.append(arg.strip())
+    return args
+
+
+def _template_name(code):
+    return code[: code.find("<")].split()[-1] if code.find("<") > 0 else ""
+
+
+def eigen_matrix_info(type_name):
+    """ (element_type, (rows, cols), layout) of `Eigen::Matrix<>` or `Eigen::Array<>`, None if not matched
+    the canonical spelling is expected, e.g. `Eigen::Matrix<double, 3, 3>`, -1 for `Eigen::Dynamic`
+    """
+    if _template_name(type_name) not in ("Eigen::Matrix", "Eigen::Array"):
+        return None
+    args = split_template_arguments(type_name)
+    try:
+        rows, cols = int(args[1]), int(args[2])
+        # the default options of Eigen: row vector is row-major, otherwise column-major
+        options = int(args[3]) if len(args) > 3 else int(rows == 1 and cols != 1)
+    except (IndexError, ValueError):
+        return None
+    layout = LAYOUT_ROW_MAJOR if options & 1 else LAYOUT_COLUMN_MAJOR  # `Eigen::RowMajor == 1`
+    return args[0], (rows, cols), layout
+
+
+def xtensor_info(code):
+    """ (element_type, extents, layout) of `xt::xtensor_fixed<T, xt::xshape<...>>` and `xt::xtensor<T, N>`,
+    or their canonical container types, None if not matched, e.g. `xt::xarray` of runtime rank
+    """
+    name = _template_name(code)
+    args = split_template_arguments(code)
+    layout = LAYOUT_COLUMN_MAJOR if "column_major" in "".join(args[2:3]) else LAYOUT_ROW_MAJOR
+    try:
+        if name in ("xt::xtensor_fixed", "xt::xfixed_container"):
+            extents = tuple(int(e) for e in split_template_arguments(args[1]))
+            return args[0], extents, layout
+        elif name in ("xt::xtensor", "xt::xtensor_container"):
+            # the container of canonical type is `xt::uvector<T, allocator>`
+            el_type = split_template_arguments(args[0])[0] if name.endswith("container") else args[0]
+            return el_type, (-1,) * int(args[1]), layout
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
 def get_field_by_name(cls, field_name):
     for field in cls.get_children():
         if field.kind == CursorKind.FIELD_DECL and field.spelling == field_name:
@@ -38,8 +120,9 @@ registered_smart_pointers = ["shared_ptr", "unique_ptr", "scoped_ptr"]
 
 def is_smart_pointer(field_decl):
     # can be registered to a list
+    code = _decl_code(field_decl)
     for p in registered_smart_pointers:
-        if get_code(field_decl).find(p) >= 0:
+        if code.find(p) >= 0:
             return True
     return False
 
@@ -66,28 +149,28 @@ def is_std_vector(field_decl):
             """Returns the CXType for the indicated template argument."""
             return conf.lib.clang_Cursor_getTemplateArgumentType(self, num)
     '''
-    decl_code = get_code(field_decl)
+    decl_code = _decl_code(field_decl)
     return decl_code.find("std::vector<") >= 0 and len(find_all(decl_code, "vector<")) == 1
 
 
 def is_xtensor_matrix(field_decl):
     """ xt::xtensor<>
     """
-    decl_code = get_code(field_decl)
+    decl_code = _decl_code(field_decl)
     return decl_code.find("xtensor") >= 0
 
 
 def is_eigen_matrix(field_decl):
     """ Eigen::Matrix<>
     """
-    decl_code = get_code(field_decl)
+    decl_code = _decl_code(field_decl)
     return decl_code.find("Eigen::Matrix") >= 0
 
 
 def is_vlen_matrix(field_decl):
     """ std::vector<std::vector<int>>  can be rugged
     """
-    decl_code = get_code(field_decl)
+    decl_code = _decl_code(field_decl)
     return len(find_all(decl_code, "vector<")) == 2
 
 
@@ -95,7 +178,7 @@ def is_cstyle_matrix(field_decl):
     """ 2D array: int** A,  int A[][],  int* A[]
     using some place_holder as row_count, col_count, let user to manually set it
     """
-    decl_code = get_code(field_decl)
+    decl_code = _decl_code(field_decl)
     return (
         len(find_all(decl_code, "[")) == 2
         or len(find_all(decl_code, "*")) == 2
@@ -125,12 +208,12 @@ def is_cstyle_array(field_decl):
 
 
 def is_std_array(field_decl):
-    return get_code(field_decl).find("std::array<") >= 0  # e.g. `std::array<int, 3>`
+    return _decl_code(field_decl).find("std::array<") >= 0  # e.g. `std::array<int, 3>`
 
 
 def is_cstr_string(field_decl):
     # char* cstyle_string, `char[]` is_cstyle_array
-    code = get_code(field_decl)
+    code = _decl_code(field_decl)
     return code.find("*") >= 0 and code.find("char") >= 0
 
 
@@ -140,7 +223,7 @@ def is_template(decl):
 
 def is_std_string(field_decl):
     # std::string
-    return get_code(field_decl).find("std::string") >= 0
+    return _decl_code(field_decl).find("std::string") >= 0
 
 
 def is_builtin_type(field_decl):
@@ -149,6 +232,194 @@ def is_builtin_type(field_decl):
     return v >= TypeKind.BOOL.value and v <= TypeKind.LONGDOUBLE.value
 
 
+## ############### field decl classification ##################
+_access_names = {
+    cx.AccessSpecifier.PUBLIC: "public",
+    cx.AccessSpecifier.PROTECTED: "protected",
+    cx.AccessSpecifier.PRIVATE: "private",
+}
+
+
+def _known_or_none(value, scale=1):
+    # libclang returns negative error code for size and offset if not known, e.g. template
+    return value // scale if value >= 0 else None
+
+
+_array_type_kinds = (TypeKind.CONSTANTARRAY, TypeKind.INCOMPLETEARRAY)
+
+
+def _array_extent(array_type):
+    # `int A[]` has no element count, let user to manually set it
+    return array_type.element_count if array_type.kind == TypeKind.CONSTANTARRAY else 0
+
+
+def classify_field(field_decl):
+    """ resolve FIELD_DECL into `field_info`, the tokens are fetched only once
+    the check sequence decides the kind if more than one predicate matches
+    """
+    code = get_code(field_decl)
+    ftype = field_decl.type
+    type_name = ftype.spelling
+    canonical_type_name = ftype.get_canonical().spelling
+    element_type = ""
+    extents = ()
+    template_args = ()
+    layout = ""
+
+    if is_cstyle_array(field_decl):
+        el_type = ftype.element_type
+        if is_cstyle_matrix(code) and el_type.kind in _array_type_kinds:
+            kind = FIELD_CSTYLE_MATRIX
+            extents = (_array_extent(ftype), _array_extent(el_type))
+            element_type = el_type.element_type.spelling
+        else:
+            kind = FIELD_CSTYLE_ARRAY
+            extents = (_array_extent(ftype),)
+            element_type = el_type.spelling
+    elif is_std_array(code):
+        kind = FIELD_STD_ARRAY
+        template_args = get_template_arguments(code)
+        element_type = template_args[0]
+        extents = (template_args[1],)
+    elif is_std_vector(code):
+        kind = FIELD_STD_VECTOR
+        template_args = get_template_arguments(code)
+        element_type = template_args[0]
+    elif is_vlen_matrix(code):
+        kind = FIELD_VLEN_MATRIX
+        template_args = get_template_arguments(code)
+        element_type = get_template_arguments(template_args[0])[0]
+    elif is_std_string(code):
+        kind = FIELD_STD_STRING
+        element_type = "char"
+    elif is_cstr_string(code):
+        kind = FIELD_CSTR
+        element_type = "char"
+    elif ftype.kind == TypeKind.POINTER:
+        kind = FIELD_POINTER
+        element_type = ftype.get_pointee().spelling
+    elif is_smart_pointer(code):
+        kind = FIELD_SMART_POINTER
+        template_args = get_template_arguments(code)
+        element_type = template_args[0]
+    elif is_eigen_matrix(code) or eigen_matrix_info(canonical_type_name):
+        kind = FIELD_EIGEN_MATRIX
+        template_args = get_template_arguments(code)
+        # typedef such as `Eigen::Matrix3d` is resolved by the canonical type
+        info = eigen_matrix_info(canonical_type_name) or eigen_matrix_info(code[: code.rfind(">") + 1])
+        if info:
+            element_type, extents, layout = info
+    elif is_xtensor_matrix(code):
+        kind = FIELD_XTENSOR_MATRIX
+        template_args = get_template_arguments(code)
+        info = xtensor_info(canonical_type_name) or xtensor_info(code[: code.rfind(">") + 1])
+        if info:
+            element_type, extents, layout = info
+    elif is_builtin_type(field_decl):
+        kind = FIELD_BUILTIN
+    elif field_decl.is_anonymous():
+        kind = FIELD_ANONYMOUS
+    elif field_decl.is_scoped_enum() or ftype.get_canonical().kind == TypeKind.ENUM:
+        kind = FIELD_ENUM
+    elif ftype.get_canonical().kind == TypeKind.RECORD:
+        kind = FIELD_RECORD
+    else:
+        kind = FIELD_UNSUPPORTED
+
+    return field_info(
+        field_decl.spelling,
+        kind,
+        type_name,
+        canonical_type_name=canonical_type_name,
+        element_type=element_type,
+        extents=extents,
+        template_args=template_args,
+        layout=layout,
+        access=_access_names.get(field_decl.access_specifier, "public"),
+        offset=_known_or_none(field_decl.get_field_offsetof(), 8),  # in bits
+        size=_known_or_none(ftype.get_size()),
+        align=_known_or_none(ftype.get_align()),
+        code=code,
+    )
+
+
+def classify_fields(cls):
+    # all FIELD_DECL children of a class/struct cursor, in declaration order
+    return [classify_field(c) for c in cls.get_children() if c.kind == CursorKind.FIELD_DECL]
+
+
+def classify_record(cls, parent=None):
+    return record_info(
+        cls.spelling,
+        cls.type.spelling,
+        classify_fields(cls),
+        is_template=cls.kind == CursorKind.CLASS_TEMPLATE,
+        size=_known_or_none(cls.type.get_size()),
+        align=_known_or_none(cls.type.get_align()),
+        parent=parent,
+    )
+
+
+_record_kinds = (CursorKind.STRUCT_DECL, CursorKind.CLASS_DECL, CursorKind.CLASS_TEMPLATE)
+
+
+def parse_schema(input_header, clang_args=None, project_headers=None):
+    """ parse stage: libclang is used only here, emitters consume the returned `header_schema`
+    only declarations in the input header and the allow-list `project_headers` are visited
+    """
+    tu = parse_header(input_header, clang_args)
+    allowed_files = set(os.path.realpath(f) for f in [input_header] + list(project_headers or []))
+    schema = header_schema(input_header)
+
+    def walk(node, parent):
+        if not is_in_files(node, allowed_files):
+            return  # prune the subtree, e.g. declarations in <vector>
+        if node.kind in _record_kinds and node.is_definition():
+            schema.records.append(classify_record(node, parent))
+            parent = node.type.spelling
+        if node.kind == CursorKind.ENUM_DECL and node.is_definition():
+            schema.enums.append(node.type.spelling)
+        if node.kind == CursorKind.FIELD_DECL:
+            return  # `struct Nested {} nested;` is also a child of the field, already visited in the class
+        for c in node.get_children():
+            walk(c, parent)
+
+    walk(tu.cursor, None)
+
+    files = [os.path.realpath(input_header)]
+    for inc in tu.get_includes():
+        files.append(os.path.realpath(inc.include.name))
+    schema.dependencies = sorted(set(files))
+    schema.target_layout = parse_target_layout(clang_args)
+    return schema
+
+
+# a member of each type after a char, its offset is the alignment of the type in a struct
+_target_layout_code = "".join(
+    f"struct layout_{i} {{ char c; {t} m; }};"
+    for i, t in enumerate(["void *", "__SIZE_TYPE__", "unsigned long long"])
+)
+
+
+def parse_target_layout(clang_args=None):
+    """ (size, align) of the types in `schema.LP64_TARGET_LAYOUT` for the target of `clang_args`,
+    e.g. `--target=i686-linux-gnu`, by parsing a snippet without any include
+    """
+    index = cx.Index.create()
+    tu = index.parse(
+        "target_layout.h",
+        default_clang_args + list(clang_args or []),
+        unsaved_files=[("target_layout.h", _target_layout_code)],
+        options=default_parse_options,
+    )
+    layouts = []
+    for c in tu.cursor.get_children():
+        if c.kind == CursorKind.STRUCT_DECL:
+            align = c.type.get_offset("m") // 8
+            layouts.append((c.type.get_size() - align, align))
+    return dict(zip(LP64_TARGET_LAYOUT, layouts))
+
+
 ######################################################
 # helpers for visiting the AST recursively
 def visit(node, func):
@@ -157,6 +428,19 @@ def visit(node, func):
         visit(c, func)
 
 
+def get_file_name(node):
+    # normalized path of the file where the node is declared, None for the translation unit
+    f = node.location.file
+    if f:
+        return os.path.realpath(f.name)
+
+
+def is_in_files(node, file_names):
+    # True if the node is declared in one of the files, `file_names` must be normalized
+    name = get_file_name(node)
+    return name is None or name in file_names
+
+
 def print_ast(node):
     # show the AST tree
 
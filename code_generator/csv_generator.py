@@ -0,0 +1,178 @@
+#!/usr/bin/python3
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+
+"""
+generate CSV export and import code for C++ classes, based on `csv/CSVIO.h` and the header-only `csv.hpp`
++ each class is flattened into columns: fixed-size array `int_array` into `int_array_0, int_array_1, ...`,
+  C-style matrix `m` into `m_0_0, m_0_1, ...`, nested class `ds` into `ds.integer, ...`
++ `CSV::codec<T>` specialization: column names, buffered row writer, row reader
+
+Variable-length fields (`std::vector`, pointers) can not be flattened into a fixed set of columns, they are skipped.
+
+Usage: `csv_generator.py input_header.h output_header_csv.h --namespace NameSpaceName`
+"""
+
+import sys
+import os.path
+import argparse
+
+# `clang_util` is imported only by the parse stage, emitters work on the schema
+from schema import *
+from h5type_generator import code_generator, guess_namespace, _parse_header
+
+
+class csv_generator(code_generator):
+    """ emitter of CSV row writer and reader, consumes the same schema as `hdf5_generator`
+    """
+
+    # kinds of a single column
+    scalar_field_kinds = (FIELD_BUILTIN, FIELD_ENUM, FIELD_STD_STRING, FIELD_CSTR)
+
+    def __init__(
+        self,
+        input_header,
+        output_header,
+        ns_name="",
+        clang_args=None,
+        project_headers=None,
+        schema=None,
+    ):
+        super(csv_generator, self).__init__(
+            input_header, output_header, ns_name, clang_args, project_headers, schema
+        )
+        csv_headers = f"""#include <string>
+        #include <vector>
+        #include "{self.input_header_file}"
+        #include "CSVIO.h"
+        """
+        self.header_codes.append(csv_headers)
+        self.codec_codes = []  # `CSV::codec<T>` specialization
+
+    def generate(self):
+        for record in self.schema.records:
+            self.generate_class_code(record)
+        self.post()
+
+    def post(self):
+        self.extra_decl_codes.append("namespace CSV{")
+        self.extra_decl_codes.append("\n".join(self.codec_codes))
+        self.extra_decl_codes.append("} // namespace CSV ")
+
+    def get_nested_record(self, field):
+        # only classes in the input header are flattened
+        return self.schema.get_record(field.type_name) or self.schema.get_record(
+            field.canonical_type_name
+        )
+
+    def flatten(self, record, column_prefix="", expr_prefix="obj.", visiting=()):
+        """ list of (column_name, value_expression, readable) for all fixed-size public fields
+        """
+        columns = []
+        for field in record.fields:
+            col = column_prefix + field.name
+            expr = expr_prefix + field.name
+            if not field.is_public or 0 in field.extents:
+                print(f"skip field `{field.name}` of kind {field.kind}, type `{field.type_name}`")
+            elif field.kind in self.scalar_field_kinds:
+                columns.append((col, expr, field.kind != FIELD_CSTR))
+            elif field.kind in (FIELD_CSTYLE_ARRAY, FIELD_STD_ARRAY) and len(field.extents) == 1:
+                for i in range(int(field.extents[0])):
+                    columns.append((f"{col}_{i}", f"{expr}[{i}]", True))
+            elif field.kind == FIELD_CSTYLE_MATRIX:
+                rows, cols = field.extents
+                for i in range(int(rows)):
+                    for j in range(int(cols)):
+                        columns.append((f"{col}_{i}_{j}", f"{expr}[{i}][{j}]", True))
+            elif field.kind == FIELD_RECORD and self.get_nested_record(field):
+                nested = self.get_nested_record(field)
+                if nested.type_name in visiting:
+                    continue  # recursive type by value is not possible, guard anyway
+                columns.extend(
+                    self.flatten(nested, col + ".", expr + ".", visiting + (nested.type_name,))
+                )
+            else:
+                print(f"skip field `{field.name}` of kind {field.kind}, type `{field.type_name}`")
+        return columns
+
+    def generate_class_code(self, record):
+        print("generating csv code for: `%s`" % record.type_name)
+        if record.is_template:
+            print("template class is not supported yet")
+            return
+        columns = self.flatten(record, visiting=(record.type_name,))
+        self.codec_codes.append(self.generate_codec(record, columns))
+
+    def generate_codec(self, record, columns):
+        type_name = record.type_name
+        names = ",\n                    ".join(f'"{c[0]}"' for c in columns)
+        write_code = "\n                ".join(f"w.write({c[1]});" for c in columns)
+        read_code = "\n                ".join(
+            f"CSV::read_field(row, index[{i}], {c[1]});" for i, c in enumerate(columns) if c[2]
+        )
+
+        return f"""template <>
+        struct codec<{type_name}>
+        {{
+            static const std::vector<std::string> &columns()
+            {{
+                static const std::vector<std::string> names = {{
+                    {names}}};
+                return names;
+            }}
+
+            static void write_row(row_writer &w, const {type_name} &obj)
+            {{
+                {write_code}
+                w.end_row();
+            }}
+
+            /// `index[i]` is the position of `columns()[i]` in the row, negative if the column is missing
+            static void read_row(csv::CSVRow &row, const int *index, {type_name} &obj)
+            {{
+                {read_code}
+            }}
+        }};
+        """
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="generate CSV writer and reader code for C++ classes")
+    parser.add_argument("input_header", nargs="?", default="../demo/CodeGen_types.h")
+    parser.add_argument("output_header", nargs="?", help="default: input_header with `_csv.h` suffix")
+    parser.add_argument("--namespace", help="namespace of the classes in the input header")
+    parser.add_argument("-I", dest="include_dirs", action="append", default=[], help="include dir")
+    parser.add_argument(
+        "--project-header",
+        dest="project_headers",
+        action="append",
+        default=[],
+        help="also generate for classes declared in this included header, repeatable",
+    )
+    parser.add_argument("--cache-dir", help="skip parsing if the input and its includes unchanged")
+    parser.add_argument("--schema", help="load the schema json instead of parsing by libclang")
+    args = parser.parse_args()
+
+    input_file = args.input_header
+    if not os.path.exists(input_file) and not args.schema:
+        raise Exception(
+            f"{input_file} does not exist, check filename and current working directory"
+        )
+    output_file = args.output_header or input_file.replace(".h", "_csv.h")
+
+    if args.schema:
+        schema = header_schema.load(args.schema)
+    else:
+        job = {
+            "input": input_file,
+            "clang_args": [f"-I{d}" for d in args.include_dirs],
+            "project_headers": args.project_headers,
+            "cache_dir": args.cache_dir,
+        }
+        schema = header_schema.from_dict(_parse_header(job))
+
+    g = csv_generator(input_file, output_file, args.namespace or guess_namespace(input_file), schema=schema)
+    g.generate()
+    g.write_code()
@@ -0,0 +1,99 @@
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+"""
+on-disk cache for incremental code generation, libclang is skipped for a cache hit
+
+each entry is a json file named by the cache key, i.e. the hash of the input header content,
+compiler args and generator version (and any other generation option from the caller).
+The entry records all included files resolved by libclang in the previous parse,
+it is a hit only if none of these dependencies has changed since then.
+"""
+
+import os
+import os.path
+import json
+import hashlib
+
+
+def file_digest(file_name):
+    h = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def make_key(*parts):
+    # hash of any json serializable values, e.g. file digest, clang args, version
+    h = hashlib.sha256()
+    h.update(json.dumps(parts, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_if_changed(file_name, content):
+    """ keep the file untouched if the content is identical,
+    so the file timestamp is not changed and dependent targets are not rebuilt
+    return True if the file has been written
+    """
+    data = content.encode("utf-8")
+    if os.path.exists(file_name):
+        with open(file_name, "rb") as f:
+            if f.read() == data:
+                return False
+    with open(file_name, "wb") as f:
+        f.write(data)
+    return True
+
+
+class generation_cache(object):
+    """ key -> (dependencies, payload) stored in `cache_dir/<key>.json`
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_file(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    @staticmethod
+    def _file_state(file_name):
+        st = os.stat(file_name)
+        return [st.st_mtime_ns, st.st_size]
+
+    def _is_dependency_changed(self, file_name, record):
+        # record: [mtime_ns, size, sha256], the content is hashed only if the stat has changed
+        if not os.path.exists(file_name):
+            return True
+        if self._file_state(file_name) == record[:2]:
+            return False
+        return file_digest(file_name) != record[2]
+
+    def lookup(self, key):
+        # return the payload stored by `store()` or None if missed
+        entry_file = self._entry_file(key)
+        if not os.path.exists(entry_file):
+            return None
+        try:
+            with open(entry_file) as f:
+                entry = json.load(f)
+        except ValueError:
+            return None  # truncated by an interrupted write
+        for file_name, record in entry["dependencies"].items():
+            if self._is_dependency_changed(file_name, record):
+                return None
+        return entry["payload"]
+
+    def store(self, key, dependencies, payload):
+        # dependencies: file names, included headers resolved by libclang
+        records = {}
+        for file_name in dependencies:
+            if os.path.exists(file_name):
+                records[file_name] = self._file_state(file_name) + [file_digest(file_name)]
+        entry = {"dependencies": records, "payload": payload}
+        # write into a tmp file then rename, parallel batch workers may store the same key
+        tmp_file = self._entry_file(key) + f".{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_file, self._entry_file(key))
@@ -11,23 +11,43 @@ see folder Readme for more details
 
 import sys
 import os.path
+import glob
+import json
+import time
+import argparse
 from collections import OrderedDict
 
-# from . import clang_util
-from clang_util import *
+# `clang_util` is imported only by the parse stage, emitters work on the schema
+from schema import *
+from generation_cache import generation_cache, file_digest, make_key, write_if_changed
+
+# bump it if the generated code changes, the source of the generator is also hashed into cache keys
+GENERATOR_VERSION = "0.10.1"
 
 
 class code_generator(object):
     """ base class for all code generators
     """
 
-    def __init__(self, input_header, output_header, ns_name=""):
+    def __init__(
+        self,
+        input_header,
+        output_header,
+        ns_name="",
+        clang_args=None,
+        project_headers=None,
+        schema=None,
+    ):
         self.is_header_only = True
         # extract only filename, without path
         self.input_header_file = input_header
 
-        index = cx.Index.create()
-        self.root_cursor = index.parse(input_file, ["c++", "-std=c++11"]).cursor
+        if schema is None:
+            # libclang is needed only if the schema is not given, e.g. loaded from json
+            from clang_util import parse_schema
+
+            schema = parse_schema(input_header, clang_args, project_headers)
+        self.schema = schema
 
         if output_header:
             self.output_header_file = output_header
@@ -38,6 +58,8 @@ class code_generator(object):
         self.namespace_name = ns_name
 
         self.generated_types = {}
+        # types generated from other headers in batch mode, full type name -> output header
+        self.external_types = {}
         self.header_codes = []
         basic_header = """#pragma once
         // this file is generated by a python script, do not edit manually
@@ -47,25 +69,28 @@ class code_generator(object):
         self.impl_codes = ["/// implication code, put into cpp file"]
         self.extra_decl_codes = []  # decl code in another namespace
 
-    def write_code(self):
+    def format_code(self):
         # currently header only mode
-        with open(self.output_header_file, "w") as f:
-            f.writelines("\n".join(self.header_codes))
-            f.write("\n\n")
+        codes = ["\n".join(self.header_codes), "\n\n"]
 
-            if self.namespace_name:
-                f.write(f"namespace {self.namespace_name}{{")
+        if self.namespace_name:
+            codes.append(f"namespace {self.namespace_name}{{")
 
-            f.writelines("\n".join(self.decl_codes))
-            f.write("\n\n")
-            f.writelines("\n".join(self.impl_codes))
+        codes.append("\n".join(self.decl_codes))
+        codes.append("\n\n")
+        codes.append("\n".join(self.impl_codes))
 
-            if self.namespace_name:
-                f.write(f"\n}} // namespace {self.namespace_name}\n")
+        if self.namespace_name:
+            codes.append(f"\n}} // namespace {self.namespace_name}\n")
 
-            if self.extra_decl_codes:
-                f.write("\n\n")
-                f.write("\n".join(self.extra_decl_codes))
+        if self.extra_decl_codes:
+            codes.append("\n\n")
+            codes.append("\n".join(self.extra_decl_codes))
+        return "".join(codes)
+
+    def write_code(self):
+        # the output file is untouched if unchanged, to avoid recompiling downstream code
+        return write_if_changed(self.output_header_file, self.format_code())
 
 
 class hdf5_generator(code_generator):
@@ -79,40 +104,76 @@ class hdf5_generator(code_generator):
     # still error in C++
     string_template = r""" todo """
 
-    def __init__(self, input_header, output_header, ns_name=""):
-        super(hdf5_generator, self).__init__(input_header, output_header, ns_name)
+    def __init__(
+        self,
+        input_header,
+        output_header,
+        ns_name="",
+        clang_args=None,
+        project_headers=None,
+        schema=None,
+    ):
+        super(hdf5_generator, self).__init__(
+            input_header, output_header, ns_name, clang_args, project_headers, schema
+        )
         h5_headers = f"""#include <H5Cpp.h>
+        #include <atomic>
         #include <cstring>
+        #include <array>
+        #include <mutex>
+        #include <vector>
         #include "{self.input_header_file}"
         #include "HDF5_TypeTraits.h"
+        #include "DataMatrix.h"
         #define TO_H5T(type_name) \
         (*HDF5::to_h5type<type_name>::get())
         """
         self.header_codes.append(h5_headers)
         self.sio_codes = []
-        self.init_codes = ["/// this code section init instances, put into cpp file"]
+        self.init_function_name = "init_h5types"
+        self.init_codes = []  # calls of CompType functions for the optional eager init
+        self.type_fwd_codes = []  # declaration of CompType functions, a field type may be defined later
         self.type_trait_codes = []
-        # print_ast(self.root_cursor)
+        # default dataset storage policy of generated types, chunk_bytes None: `DATA_H5_CHUNK_BYTES`
+        self.storage_options = {"chunk_bytes": None, "deflate": 0, "shuffle": False, "fletcher32": False}
+        # on-disk CompType without padding, the memory CompType is unchanged
+        self.packed = False
+        # struct-of-arrays writer and reader, one dataset per member
+        self.columnar = False
+        # `std::vector<std::vector<T>>` rows in a CSR store next to the dataset, instead of a vlen matrix
+        self.ragged_csr = False
 
     def prepare(self):
-        self.init_codes.append(
+        if self.columnar:
+            self.header_codes.append('#include "HDF5IO.h"')
+        if self.ragged_csr or self.has_dynamic_tensor():
+            self.header_codes.append('#include "HDF5_Ragged.h"')
+        self.decl_codes.append(
             """
         #if defined(__GNUC__)
+        #pragma GCC diagnostic push
         #pragma GCC diagnostic ignored "-Winvalid-offsetof"
         #endif """
         )
-        self.init_codes.append("void init_h5types(){")
 
     def post(self):
-        self.init_codes.append("\n}  // end of function init_h5types() \n")
-        self.init_codes.append(
+        self.decl_codes[1:1] = self.type_fwd_codes
+        self.decl_codes.append(
             """
-        #ifdef __GCC__
+        #if defined(__GNUC__)
         #pragma GCC diagnostic pop
         #endif """
         )
+        init_lines = "\n            ".join(self.init_codes)
+        init_code = f"""
+        /// optional, CompType is built on first use; call it to build all types eagerly, e.g. at startup
+        inline void {self.init_function_name}()
+        {{
+            {init_lines}
+        }}
+        """
 
-        self.impl_codes = self.init_codes + self.sio_codes
+        self.impl_codes = [init_code] + self.sio_codes
 
         self.extra_decl_codes.append("namespace HDF5{")
         self.extra_decl_codes.append("\n".join(self.type_trait_codes))
@@ -120,21 +181,21 @@ class hdf5_generator(code_generator):
 
     def generate(self):
         self.prepare()
-        self.walk(self.root_cursor)
+        self.walk(self.schema)
         self.post()
 
-    def walk(self, node):
-        # node is also a Cursor type in clang nomenclature
-        if node.kind == CursorKind.STRUCT_DECL or node.kind == CursorKind.CLASS_DECL:
-            self.generate_class_code(node)
+    def walk(self, schema):
+        # records are in the declaration order of the input header, nested class after its parent
+        for record in schema.records:
+            self.generate_class_code(record)
 
-        if node.kind == CursorKind.ENUM_DECL:
-            self.generate_enum_code(node)
+        for enum_name in schema.enums:
+            self.generate_enum_code(enum_name)
 
-        for c in node.get_children():
-            self.walk(c)  # recursive
+    def has_dynamic_tensor(self):
+        return any(f.is_dynamic_tensor for r in self.schema.records for f in r.fields)
 
-    def generate_enum_code(self, node):
+    def generate_enum_code(self, enum_name):
         # it is possible to get value and name of enum by clang
         pass
 
@@ -144,12 +205,12 @@ class hdf5_generator(code_generator):
         # H5::StrType(H5::PredType::C_S1, H5T_VARIABLE)) to write char* string_array[],
         # std::vector<std::string>
 
-        _h5type_name = f"{class_name}_{field.spelling}_h5type"
+        _h5type_name = f"{class_name}_{field.name}_h5type"
         # el_h5type_name = char or u8char_t
         _template = f"""
         auto {_h5type_name} = H5::StrType(H5::PredType::C_S1, H5T_VARIABLE);
-        {self.get_h5type(class_name)}.insertMember(\"{field.spelling}\", 
-            HOFFSET({class_name}, {field.spelling}), {_h5type_name});"""
+        h5type.insertMember(\"{field.name}\", 
+            HOFFSET({class_name}, {field.name}), {_h5type_name});"""
 
         return _template
 
@@ -160,21 +221,21 @@ class hdf5_generator(code_generator):
         # std::vector<std::string>
 
         # el_type_name = "char"
-        # _h5type_name = f"{class_name}_{field.spelling}_h5type"
+        # _h5type_name = f"{class_name}_{field.name}_h5type"
         # el_h5type_name = f"TO_H5T({el_type_name})"
-        # vl_field_name = f"{field.spelling}_hvl"
+        # vl_field_name = f"{field.name}_hvl"
         # offset_str = f"HOFFSET({class_name}, {vl_field_name})"
         # _template = f"""
         # auto {_h5type_name} = H5::VarLenType({el_h5type_name});
-        # {self.get_h5type(class_name)}.insertMember(\"{field.spelling}\",
+        # h5type.insertMember(\"{field.name}\",
         #     {offset_str}, {_h5type_name});"""
 
-        _h5type_name = f"{class_name}_{field.spelling}_h5type"
-        vl_field_name = f"{field.spelling}_cstr"
+        _h5type_name = f"{class_name}_{field.name}_h5type"
+        vl_field_name = f"{field.name}_cstr"
         offset_str = f"HOFFSET({class_name}, {vl_field_name})"
         _template = f"""
         auto {_h5type_name} = H5::StrType(H5::PredType::C_S1, H5T_VARIABLE);
-        {self.get_h5type(class_name)}.insertMember(\"{field.spelling}\", 
+        h5type.insertMember(\"{field.name}\", 
             {offset_str}, {_h5type_name});"""
 
         return _template
@@ -183,34 +244,55 @@ class hdf5_generator(code_generator):
         # todo: std::vector<T> using vlen_type, delay the insertMember until runtime
         # a per-field write serializer() is needed, inject meta data as Attribute like type
 
-        el_type_name = get_template_arguments(get_code(field))[0]
-        _h5type_name = f"{class_name}_{field.spelling}_h5type"
+        el_type_name = field.element_type
+        _h5type_name = f"{class_name}_{field.name}_h5type"
         el_h5type_name = f"TO_H5T({el_type_name})"
-        vl_field_name = f"{field.spelling}_hvl"
+        vl_field_name = f"{field.name}_hvl"
         offset_str = f"HOFFSET({class_name}, {vl_field_name})"
         _template = f"""
         auto {_h5type_name} = H5::VarLenType({el_h5type_name});
-        {self.get_h5type(class_name)}.insertMember(\"{field.spelling}\", 
+        h5type.insertMember(\"{field.name}\", 
             {offset_str}, {_h5type_name});"""
 
         return _template
 
+    def generate_vlen_matrix_type(self, class_name, field):
+        # std::vector<std::vector<T>> is packed into a single row-major buffer `data::Matrix<T>`
+        # saved as a flat vlen array and the column count, rows = len / cols
+        if self.ragged_csr:
+            return self.generate_ragged_type(class_name, field)
+
+        el_h5type_name = f"TO_H5T({field.element_type})"
+        _h5type_name = f"{class_name}_{field.name}_h5type"
+        _template = f"""
+        auto {_h5type_name} = H5::VarLenType({el_h5type_name});
+        h5type.insertMember(\"{field.name}\", 
+            HOFFSET({class_name}, {field.name}_hvl), {_h5type_name});
+        h5type.insertMember(\"{field.name}_cols\", 
+            HOFFSET({class_name}, {field.name}_cols), TO_H5T(unsigned long long));"""
+
+        return _template
+
+    def generate_ragged_type(self, class_name, field):
+        # rows are in the CSR store `HDF5::RaggedStore`, the record has only its row range
+        return f"""
+        h5type.insertMember(\"{field.name}_row_start\", 
+            HOFFSET({class_name}, {field.name}_row_start), TO_H5T(unsigned long long));
+        h5type.insertMember(\"{field.name}_rows\", 
+            HOFFSET({class_name}, {field.name}_rows), TO_H5T(unsigned long long));"""
+
     def generate_array_type(self, class_name, array_field):
-        # C style fixed size 1D Array only ,  1D array with contiguous memory storage
+        # C style fixed size 1D Array and 2D matrix, contiguous memory storage
         # add attribute into ArrayType
 
-        dim = 1  # 1D array
-        array_field_name = array_field.spelling
-        if is_std_array(array_field):
-            # not working for `get_template_argument_value`
-            # array_size = array_field.get_template_argument_value(1)
-            # el_type_name = array_field.get_template_argument_type(0).spelling
-            el_type_name, array_size = get_template_arguments(get_code(array_field))
-        else:
-            array_size = array_field.type.element_count
-            el_type_name = array_field.type.element_type.spelling
+        # both std::array and C-style array, resolved by `classify_field()`
+        dim = len(array_field.extents)  # 2 for C-style matrix `T A[M][N]`
+        array_field_name = array_field.name
+        el_type_name = array_field.element_type
+        if 0 in array_field.extents:
+            return f"// WARNING: skip array `{array_field_name}` of unknown size `{array_field.type_name}`"
 
-        dim_array_expr = f"{{{array_size}}}"
+        dim_array_expr = "{" + ", ".join(str(e) for e in array_field.extents) + "}"
         dim_name = f"{class_name}_{array_field_name}_dims"
         el_h5type_name = f"TO_H5T({el_type_name})"
         array_h5type_name = f"{class_name}_{array_field_name}_h5type"
@@ -218,14 +300,65 @@ class hdf5_generator(code_generator):
         array_template = f"""
         hsize_t {dim_name}[] = {dim_array_expr};
         auto {array_h5type_name} = H5::ArrayType({el_h5type_name}, {dim}, {dim_name});
-        {self.get_h5type(class_name)}.insertMember(\"{array_field_name}\", 
+        h5type.insertMember(\"{array_field_name}\", 
             HOFFSET({class_name}, {array_field_name}), {array_h5type_name});"""
 
         return array_template
 
-    def is_user_type(self, field_decl):
+    def get_tensor_dims(self, field):
+        # dims of a fixed-size tensor in memory order, a column-major matrix is seen transposed in file
+        dims = list(field.extents)
+        if field.layout == LAYOUT_COLUMN_MAJOR:
+            dims.reverse()
+        if field.kind == FIELD_EIGEN_MATRIX and 1 in dims:
+            dims = [dims[0] * dims[1]]  # Eigen vector as 1D array
+        return dims
+
+    def generate_tensor_type(self, class_name, field):
+        # Eigen and xtensor members: fixed size is an ArrayType inserted in place, without copy;
+        # the values of runtime size are in the store `<dataset>.<member>`, the record has the row and shape
+        k = field.name
+        if not field.extents or not field.element_type:
+            return f"/// WARNING: member `{k}` of type `{field.type_name}` not supported, shape is unknown"
+        _h5type_name = f"{class_name}_{k}_h5type"
+        dim_name = f"{class_name}_{k}_dims"
+        if field.is_dynamic_tensor:
+            return f"""
+        h5type.insertMember(\"{k}_row\", 
+            HOFFSET({class_name}, {k}_row), TO_H5T(unsigned long long));
+        hsize_t {dim_name}[] = {{{len(field.extents)}}};
+        auto {_h5type_name} = H5::ArrayType(TO_H5T(unsigned long long), 1, {dim_name});
+        h5type.insertMember(\"{k}_shape\", 
+            HOFFSET({class_name}, {k}_shape), {_h5type_name});"""
+
+        dims = self.get_tensor_dims(field)
+        dim_array_expr = "{" + ", ".join(str(e) for e in dims) + "}"
+        return f"""
+        hsize_t {dim_name}[] = {dim_array_expr};
+        auto {_h5type_name} = H5::ArrayType(TO_H5T({field.element_type}), {len(dims)}, {dim_name});
+        h5type.insertMember(\"{k}\", 
+            HOFFSET({class_name}, {k}), {_h5type_name});"""
+
+    def is_user_type(self, field):
         # class or struct,   "TypeKind.RECORD"
-        return field_decl.type.spelling in self.generated_types
+        return self.get_user_type_name(field) is not None
+
+    def get_user_type_name(self, field):
+        # field type spelling may be not fully qualified, e.g. `CDataStruct`
+        for name in (field.type_name, field.canonical_type_name):
+            if name in self.generated_types:
+                return name
+
+    def use_external_type(self, field):
+        # include the generated header of the type defined in another input header
+        output_header = self.external_types.get(field.canonical_type_name)
+        if not output_header:
+            return False
+        output_dir = os.path.dirname(os.path.abspath(self.output_header_file))
+        include_line = f'#include "{os.path.relpath(output_header, output_dir)}"'
+        if include_line not in self.header_codes:
+            self.header_codes.append(include_line)
+        return True
 
     def get_h5type(self, class_name):
         pos = class_name.find("_hvl")
@@ -240,103 +373,268 @@ class hdf5_generator(code_generator):
         {{
             static inline const H5::DataType *get(void)
             {{
-                return &{self.namespace_name}::{class_name}_h5type;
+                return &{self.namespace_name}::{class_name}_h5type();
             }}
         }};
         """
 
-    # format(class_name, array_field_name, el_type_name, dim, dim_array_expr)
-    def generate_field(self, class_name, field_decl, field_type=None):
-        """ 
+    def generate_h5type_function(self, class_name, field_codes):
+        # CompType is built on first use; the HDF5 calls are serialized with other threads by
+        # `HDF5::library_mutex()`, taken before the function-local static so that the lock order is always
+        # the same if a nested user type is built by the call to its own function
+        func_name = self.get_h5type(class_name)
+        field_lines = "\n".join(field_codes)
+        return f"""inline const H5::CompType &{func_name}()
+        {{
+            static std::atomic<const H5::CompType *> built(nullptr);
+            if (const H5::CompType *p = built.load(std::memory_order_acquire))
+                return *p;
+            std::lock_guard<std::recursive_mutex> lock(HDF5::library_mutex());
+            static const H5::CompType type = []() {{
+                H5::CompType h5type(sizeof({class_name}));
+                {field_lines}
+                return h5type;
+            }}();
+            built.store(&type, std::memory_order_release);
+            return type;
+        }}
         """
-        field_name = field_decl.spelling
-        if not field_type:
-            field_type = field_decl.type
-        field_type_name = field_decl.type.spelling  # field_decl.type.kind  -> TypeKind
-        is_template = field_decl.get_num_template_arguments()
-        print(
-            f"{field_name}, {is_template} {field_type.spelling}, ", get_code(field_decl),
-        )
 
-        if is_cstyle_array(field_decl) or is_std_array(field_decl):
-            return self.generate_array_type(class_name, field_decl)
-        elif is_std_vector(field_decl):
+    def generate_to_h5filetype_trait(self, class_name):
+        # `CompType::pack()` modifies the type in place, it is applied to a copy, the copy ctor shares the id;
+        # built under the lock on first use like `<class_name>_h5type()`, then returned without the lock
+        return f"""template <>
+        struct to_h5filetype<{self.namespace_name}::{class_name}>
+        {{
+            static inline const H5::DataType *get(void)
+            {{
+                static std::atomic<const H5::DataType *> built(nullptr);
+                if (const H5::DataType *p = built.load(std::memory_order_acquire))
+                    return p;
+                std::lock_guard<std::recursive_mutex> lock(library_mutex());
+                static const H5::CompType type = []() {{
+                    H5::CompType t;
+                    t.copy({self.namespace_name}::{class_name}_h5type());
+                    t.pack();
+                    return t;
+                }}();
+                built.store(&type, std::memory_order_release);
+                return &type;
+            }}
+        }};
+        """
+
+    def generate_to_h5storage_trait(self, record_name, class_name):
+        # per-type chunk size from the record size in file, `<class_name>_hvl` for vlen class
+        opts = self.storage_options
+        chunk_bytes = opts.get("chunk_bytes") or "DATA_H5_CHUNK_BYTES"
+        filters = ""
+        if opts.get("shuffle"):
+            filters += ".set_shuffle()"
+        if opts.get("deflate"):
+            filters += f".set_deflate({opts['deflate']})"
+        if opts.get("fletcher32"):
+            filters += ".set_fletcher32()"
+        if self.packed:
+            record_size = f"to_h5filetype<{self.namespace_name}::{record_name}>::get()->getSize()"
+        else:
+            record_size = f"sizeof({self.namespace_name}::{class_name})"
+        return f"""template <>
+        struct to_h5storage<{self.namespace_name}::{record_name}>
+        {{
+            static inline StoragePolicy &get(void)
+            {{
+                static StoragePolicy policy = 
+                    StoragePolicy::chunked({record_size}, {chunk_bytes}){filters};
+                return policy;
+            }}
+        }};
+        """
+
+    # format(class_name, array_field_name, el_type_name, dim, dim_array_expr)
+    def generate_field(self, class_name, field):
+        """ field: `field_info` resolved by `classify_field()`
+        """
+        field_name = field.name
+        field_type_name = field.type_name
+
+        if field.kind in (FIELD_CSTYLE_ARRAY, FIELD_STD_ARRAY, FIELD_CSTYLE_MATRIX):
+            return self.generate_array_type(class_name, field)
+        elif field.kind == FIELD_VLEN_MATRIX:
+            return self.generate_vlen_matrix_type(class_name, field)
+        elif field.kind == FIELD_STD_VECTOR:
             # return f"// WARNING: skip vlen array `{field_name}` of type `{field_type_name}`"
-            return self.generate_vlen_array_type(class_name, field_decl)
-        elif is_std_string(field_decl):
-            return self.generate_std_string_type(class_name, field_decl)
-        elif is_cstr_string(field_decl):
-            return self.generate_cstr_type(class_name, field_decl)
-
-        elif field_type.kind == TypeKind.POINTER:  # type detect is working for pointer
-            # return f"// WARNING: skip raw pointer `{field_name}` of type `{field_type_name}`"
-            return self.generate_field(class_name, field_decl, field_type=field_type.pointee)
-        elif is_smart_pointer(field_decl):
+            return self.generate_vlen_array_type(class_name, field)
+        elif field.kind == FIELD_STD_STRING:
+            return self.generate_std_string_type(class_name, field)
+        elif field.kind == FIELD_CSTR:
+            return self.generate_cstr_type(class_name, field)
+        elif field.kind in TENSOR_FIELD_KINDS:
+            return self.generate_tensor_type(class_name, field)
+
+        elif field.kind == FIELD_POINTER:  # type detect is working for pointer
+            return f"// WARNING: skip raw pointer `{field_name}` of type `{field_type_name}`"
+        elif field.kind == FIELD_SMART_POINTER:
             return f"// WARNING: skip smart pointer `{field_name}` of type `{field_type_name}`"
-            # target_type = get_template_arguments(get_code(field))[0]  # str value
-            # return self.generate_field(class_name, field_decl, field_type=target_type)
+            # target_type = field.element_type  # str value
 
         # elif field_decl.is_reference():
         #    field_decl.referenced
         #    return f"// WARNING: skip reference type `{field_type_name}`"
-        elif is_builtin_type(field_decl):
+        elif field.kind == FIELD_BUILTIN:
             field_h5type_name = f"TO_H5T({field_type_name})"
-            return f"""{self.get_h5type(class_name)}.insertMember(\"{field_name}\", 
+            return f"""h5type.insertMember(\"{field_name}\", 
                 HOFFSET({class_name}, {field_name}), {field_h5type_name});"""
-        elif field_decl.is_anonymous():
+        elif field.kind == FIELD_ANONYMOUS:
             return f"// WARNING: skip anonymous `{field_name}` of type `{field_type_name}`"
-        elif field_decl.is_scoped_enum():  ## field_decl.is_enum() or
+        elif field.kind == FIELD_ENUM:
             return f"// WARNING: skip enum type `{field_type_name}`"
-        elif self.is_user_type(field_decl):
-            if field_type_name in self.generated_types:
-                field_h5type_name = self.generated_types[field_type_name]
-                return f"""{self.get_h5type(class_name)}.insertMember(\"{field_name}\", 
+        elif field.kind == FIELD_RECORD:
+            if self.is_user_type(field):
+                field_h5type_name = self.generated_types[self.get_user_type_name(field)]
+                return f"""h5type.insertMember(\"{field_name}\", 
+                    HOFFSET({class_name}, {field_name}), {field_h5type_name});"""
+            elif self.use_external_type(field):
+                field_h5type_name = f"TO_H5T({field.canonical_type_name})"
+                return f"""h5type.insertMember(\"{field_name}\", 
                     HOFFSET({class_name}, {field_name}), {field_h5type_name});"""
             else:
                 return f"/// WARNING: `{field_type_name}` yet generated, check if inside the input header"
         else:
             return f"/// WARNING: member `{field_name}` of type `{field_type_name}` not supported"
 
-    def generate_hvl_class(self, cls, vl_fields):
+    # fields of these kinds are written into file and can be copied by `operator =`
+    assignable_field_kinds = (FIELD_BUILTIN, FIELD_STD_ARRAY, FIELD_CSTR, FIELD_RECORD) + TENSOR_FIELD_KINDS
+
+    def generate_hvl_class(self, record, vl_fields):
         # copy into a derived class with extra hvl_t field
-        class_name = cls.spelling
+        class_name = record.name
         ext_class_name = class_name + "_hvl"
         vl = []
         ctor = []
-        for k, vtype in vl_fields.items():
-            if vtype == "std::vector":
-                ctor.append(f"{k}_hvl.p = obj.{k}.data();")
+        for k, field in vl_fields.items():
+            if field.kind == FIELD_STD_VECTOR:
+                # hvl_t.p is not const, but the buffer is only read by H5Dwrite
+                ctor.append(f"{k}_hvl.p = const_cast<{field.element_type}*>(obj.{k}.data());")
                 ctor.append(f"{k}_hvl.len = obj.{k}.size();")
                 vl.append(f"hvl_t {k}_hvl;")
-            if vtype == "std::string":
+            if field.kind == FIELD_STD_STRING:
                 # ctor.append(f"{k}_hvl.p = std::malloc(sizeof(char) * (obj.{k}.size()+1));")
                 # ctor.append(f"std::strcpy((char*)({k}_hvl.p), obj.{k}.data());  // fixme: free()")
                 # ctor.append(f"{k}_hvl.len = obj.{k}.size()  + 1;")
                 ctor.append(f"{k}_cstr = obj.{k}.c_str();")
                 vl.append(f"const char* {k}_cstr;")
+            if field.kind == FIELD_VLEN_MATRIX and self.ragged_csr:
+                # the first row is set by `<class>_append_ragged()` when rows are written
+                ctor.append(f"{k}_row_start = 0;")
+                ctor.append(f"{k}_rows = obj.{k}.size();")
+                vl.append(f"unsigned long long {k}_row_start;")
+                vl.append(f"unsigned long long {k}_rows;")
+            elif field.kind == FIELD_VLEN_MATRIX:
+                # rows are packed into a buffer owned by this object, hvl_t points into it
+                el_type_name = field.element_type
+                ctor.append(f"{k}_mat = data::Matrix<{el_type_name}>::from_nested(obj.{k});")
+                ctor.append(f"{k}_hvl.p = {k}_mat.data();")
+                ctor.append(f"{k}_hvl.len = {k}_mat.size();")
+                ctor.append(f"{k}_cols = {k}_mat.cols();")
+                vl.append(f"data::Matrix<{el_type_name}> {k}_mat;")
+                vl.append(f"hvl_t {k}_hvl;")
+                vl.append(f"unsigned long long {k}_cols;")
+            if field.is_dynamic_tensor:
+                # the row is set by `<class>_append_ragged()` when values are written
+                rank = len(field.extents)
+                ctor.append(f"{k}_row = 0;")
+                if field.kind == FIELD_EIGEN_MATRIX:
+                    ctor.append(f"{k}_shape[0] = obj.{k}.rows();")
+                    ctor.append(f"{k}_shape[1] = obj.{k}.cols();")
+                else:
+                    ctor.append(f"for (size_t d = 0; d < {rank}; d++)")
+                    ctor.append(f"    {k}_shape[d] = obj.{k}.shape()[d];")
+                vl.append(f"unsigned long long {k}_row;")
+                vl.append(f"unsigned long long {k}_shape[{rank}];")
 
         des = []
-        for k, vtype in vl_fields.items():
-            field = get_field_by_name(cls, k)
-            if vtype == "std::string":
+        for k, field in vl_fields.items():
+            if field.kind == FIELD_STD_STRING:
                 # des.append(
                 #     f"""// std::string from char* and length
                 # {k} = "fixme"; //  std::string({k}_hvl.p, {k}_hvl.len);
                 # """
                 # )
                 des.append(f"{k} = {k}_cstr;")
-            if vtype == "std::vector":
-                el_type_name = get_template_arguments(get_code(field))[0]
+            if field.kind == FIELD_STD_VECTOR:
+                el_type_name = field.element_type
                 des.append(
                     f"""
                 auto {k}_ptr = static_cast<{el_type_name}*>({k}_hvl.p);
                 {k}.assign({k}_ptr, {k}_ptr + {k}_hvl.len);
                 """
                 )
+            if field.kind == FIELD_VLEN_MATRIX and not self.ragged_csr:
+                el_type_name = field.element_type
+                des.append(
+                    f"""
+                size_t {k}_rows = {k}_cols ? {k}_hvl.len / {k}_cols : 0;
+                {k} = data::MatrixView<const {el_type_name}>(static_cast<const {el_type_name}*>({k}_hvl.p), 
+                        {k}_rows, {k}_cols).to_nested();
+                """
+                )
+
+        # view ctor copies only fields written into the file, the base vlen fields stay empty
+        view = []
+        for field in record.fields:
+            if not field.is_public or field.is_vlen:
+                continue
+            if field.kind in (FIELD_CSTYLE_ARRAY, FIELD_CSTYLE_MATRIX):
+                view.append(f"std::memcpy(&{field.name}, &obj.{field.name}, sizeof({field.name}));")
+            elif field.kind in self.assignable_field_kinds:
+                view.append(f"{field.name} = obj.{field.name};")
+
+        # zero-copy accessors of the vlen data read into a `HDF5::VlenArena`
+        acc = []
+        for k, field in vl_fields.items():
+            el_type_name = field.element_type
+            if field.kind == FIELD_STD_STRING:
+                acc.append(
+                    f"""#if DATA_HAS_STRING_VIEW
+            std::string_view {k}_view() const {{ return {k}_cstr ? std::string_view({k}_cstr) : std::string_view(); }}
+            #endif"""
+                )
+            if field.kind == FIELD_STD_VECTOR:
+                acc.append(
+                    f"""data::ArrayView<const {el_type_name}> {k}_view() const
+            {{
+                return {{static_cast<const {el_type_name}*>({k}_hvl.p), {k}_hvl.len}};
+            }}"""
+                )
+            if field.kind == FIELD_VLEN_MATRIX and self.ragged_csr:
+                acc.append(
+                    f"""data::RaggedView<const {el_type_name}> {k}_view(const HDF5::RaggedRows<{el_type_name}> &rows) const
+            {{
+                return rows.view({k}_row_start, {k}_rows);
+            }}"""
+                )
+            elif field.kind == FIELD_VLEN_MATRIX:
+                acc.append(
+                    f"""data::MatrixView<const {el_type_name}> {k}_view() const
+            {{
+                return {{static_cast<const {el_type_name}*>({k}_hvl.p), {k}_cols ? {k}_hvl.len / {k}_cols : 0, {k}_cols}};
+            }}"""
+                )
+            if field.is_dynamic_tensor:
+                acc.append(
+                    f"""/// values in the storage order of `{field.type_name}`, e.g. to be mapped by `Eigen::Map`
+            data::ArrayView<const {el_type_name}> {k}_view(const HDF5::RaggedRows<{el_type_name}> &rows) const
+            {{
+                return rows.view({k}_row, 1)[0];
+            }}"""
+                )
 
         ctor_lines = "\n".join(ctor)
         des_lines = "\n".join(des)
+        acc_lines = "\n".join(acc)
         vl_lines = "\n".join(vl)
+        view_lines = "\n".join(view)
 
         return f"""class {ext_class_name} : public {class_name}{{
             public:
@@ -348,100 +646,521 @@ class hdf5_generator(code_generator):
 
             {ext_class_name} (){{  }}  // default ctor
 
-            {ext_class_name} ({class_name}& obj): {class_name}(obj)
+            {ext_class_name} (const {class_name}& obj): {class_name}(obj)
             {{
                 {ctor_lines}
             }}
 
-            /// needed for deserialization 
+            /// for batch write, vlen fields point into the buffers of `obj` without copy
+            /// `obj` must outlive this view object
+            {ext_class_name} (const {class_name}& obj, HDF5::hvl_view_t)
+            {{
+                {view_lines}
+                {ctor_lines}
+            }}
+
+            /// needed for deserialization, the base object is moved out
             {class_name} get_base()
             {{
                 {des_lines}
-                {class_name} obj(*this);
-                return obj;
+                return std::move(static_cast<{class_name}&>(*this));
             }}
 
+            /// views of the vlen fields after `{class_name}_read_views()`, no copy
+            {acc_lines}
+
         }};
         """
 
-    def get_varlen_types(self, cls):
-        #
-        vl_fields = OrderedDict()
-        for field in cls.get_children():
-            if (
-                field.kind == CursorKind.FIELD_DECL
-                and field.access_specifier == cx.AccessSpecifier.PUBLIC
-            ):
-                if is_std_vector(field):
-                    vl_fields[field.spelling] = "std::vector"
-                if is_std_string(field):
-                    vl_fields[field.spelling] = "std::string"
-
-        return vl_fields
-
-    def generate_class_code(self, cls):
+    def generate_class_code(self, record):
         # apply to only data class, trivial? no pointer type
 
-        vl_fields = self.get_varlen_types(cls)
+        vl_fields = OrderedDict((f.name, f) for f in record.vlen_fields)
         if len(vl_fields.keys()) > 0:
-            class_name = cls.spelling + "_hvl"
+            class_name = record.name + "_hvl"
         else:
-            class_name = cls.spelling
+            class_name = record.name
 
-        print("generating code for: `%s`, full type name: `%s`" % (cls.spelling, cls.type.spelling))
+        print("generating code for: `%s`, full type name: `%s`" % (record.name, record.type_name))
 
-        if cls.kind == CursorKind.CLASS_TEMPLATE:
+        if record.is_template:
             print("template class is not supported yet")
             return
 
         protected_fields = OrderedDict()
+        field_codes = []
         # non-Recurse for children of this class
-        for field in cls.get_children():
-            if field.kind == CursorKind.FIELD_DECL:
-                self.init_codes.append(self.generate_field(class_name, field))
+        for field in record.fields:
+            field_codes.append(self.generate_field(class_name, field))
 
-            if field.access_specifier == cx.AccessSpecifier.PROTECTED:
-                protected_fields[field.spelling] = "protected"
-            if field.access_specifier == cx.AccessSpecifier.PRIVATE:
-                protected_fields[field.spelling] = "private"
+            if not field.is_public:
+                protected_fields[field.name] = field.access
 
-        self.init_codes.append(f"// end of CompType member/field definition for {class_name}\n")
         # register the user type, so it can be field type of another user type
-        self.generated_types[cls.type.spelling] = f"{class_name}_h5type"
+        self.generated_types[record.type_name] = self.get_h5type(class_name) + "()"
+        self.type_fwd_codes.append(f"inline const H5::CompType &{self.get_h5type(class_name)}();")
+        self.init_codes.append(f"{self.get_h5type(class_name)}();")
 
         # is_trivially_copyable() is not available in clang, monkey_patch?
         # if not cls.type.is_pod():  # is_pod() is too strict requirement
         if vl_fields:
             if not self.is_header_only:
-                self.generate_serializer_decl(cls)
+                self.generate_serializer_decl(record)
 
-            self.sio_codes.append(self.generate_serializer_impl(cls, vl_fields))
-            self.sio_codes.append(self.generate_deserializer_impl(cls))
+            if self.get_ragged_fields(record):
+                self.sio_codes.append(self.generate_ragged_impl(record))
+            self.sio_codes.append(self.generate_serializer_impl(record, vl_fields))
+            self.sio_codes.append(self.generate_deserializer_impl(record))
 
             # FIXME for not pod class, sizeof() does not reflect the storage size
-            self.decl_codes.append(self.generate_hvl_class(cls, vl_fields))
-            size_str = f"sizeof({class_name})"  # + {len(vl_fields.keys())}*sizeof(hvl_t)
-            type_decl = f"H5::CompType {cls.spelling}_h5type({size_str});"
-        else:
-            type_decl = f"H5::CompType {class_name}_h5type(sizeof({class_name}));"
-        self.decl_codes.append(type_decl)
-        self.type_trait_codes.append(self.generate_to_h5type_trait(cls.spelling))
+            self.decl_codes.append(self.generate_hvl_class(record, vl_fields))
+        self.decl_codes.append(self.generate_h5type_function(class_name, field_codes))
+        self.type_trait_codes.append(self.generate_to_h5type_trait(record.name))
+        if self.packed:
+            self.type_trait_codes.append(self.generate_to_h5filetype_trait(record.name))
+        self.type_trait_codes.append(self.generate_to_h5storage_trait(record.name, class_name))
+        self.sio_codes.append(self.generate_projection_impl(record, class_name))
+        if self.columnar:
+            self.sio_codes.append(self.generate_columnar_impl(record))
+            self.type_trait_codes.append(self.generate_to_h5columns_trait(record.name))
         #
 
+    def get_hvl_member_layout(self, field):
+        """ (size, align) of the members added into `<class>_hvl` for a vlen field,
+        computed from the layout of pointer, size_t and unsigned long long of the parsed target
+        """
+        target = self.schema.target_layout
+        ull = target["unsigned long long"]
+        if field.is_dynamic_tensor:
+            # row and shape of a tensor of runtime size
+            return [ull, (ull[0] * len(field.extents), ull[1])]
+        if field.kind == FIELD_VLEN_MATRIX and self.ragged_csr:
+            return [ull, ull]  # row start and row count in the CSR store
+        hvl = _struct_layout([target["size_t"], target["pointer"]])  # hvl_t {size_t len; void *p;}
+        if field.kind == FIELD_STD_VECTOR:
+            return [hvl]
+        if field.kind == FIELD_STD_STRING:
+            return [target["pointer"]]  # const char*
+        if field.kind == FIELD_VLEN_MATRIX:
+            # data::Matrix<T> of a std::vector<T> (3 pointers) with rows and cols, hvl_t, cols
+            matrix = _struct_layout([target["pointer"]] * 3 + [target["size_t"]] * 2)
+            return [matrix, hvl, ull]
+        return []
+
+    def get_vlen_file_size(self, field):
+        """ size of the vlen field in the CompType, which is also the size in a packed file type
+        """
+        if field.kind == FIELD_CSTR:
+            return self.schema.target_layout["pointer"][0]
+        layout = self.get_hvl_member_layout(field)
+        if field.kind == FIELD_VLEN_MATRIX and not self.ragged_csr:
+            layout = layout[1:]  # the matrix buffer is not written
+        return sum(size for size, _ in layout)
+
+    def get_packed_size(self, record, visiting=()):
+        """ bytes of the members written into the CompType, i.e. size of the packed file type, None if unknown
+        """
+        total = 0
+        for field in record.fields:
+            if field.is_vlen or field.kind == FIELD_CSTR:
+                total += self.get_vlen_file_size(field)
+            elif field.kind in (
+                FIELD_BUILTIN,
+                FIELD_CSTYLE_ARRAY,
+                FIELD_STD_ARRAY,
+                FIELD_CSTYLE_MATRIX,
+            ) + TENSOR_FIELD_KINDS:
+                if field.size is None or 0 in field.extents:
+                    return None
+                total += field.size
+            elif field.kind == FIELD_RECORD:
+                nested = self.schema.get_record(field.type_name) or self.schema.get_record(
+                    field.canonical_type_name
+                )
+                # `H5Tpack` packs the nested CompType recursively
+                if nested and nested.type_name not in visiting:
+                    size = self.get_packed_size(nested, visiting + (nested.type_name,))
+                elif field.canonical_type_name in self.external_types:
+                    size = field.size  # upper bound, its schema is not known here
+                else:
+                    size = 0  # not written
+                if size is None:
+                    return None
+                total += size
+        return total
+
+    def get_padding(self, record):
+        """ (holes, reordered_size) of the in-memory layout of `record` by field offsets,
+        holes: bytes between fields and the tail padding,
+        reordered_size: sizeof the class if fields are declared in descending alignment
+        """
+        fields = [f for f in record.fields if f.offset is not None and f.size is not None]
+        if record.size is None or len(fields) < len(record.fields):
+            return None, None
+        end = 0
+        holes = 0
+        for f in sorted(fields, key=lambda f: f.offset):
+            holes += max(0, f.offset - end)
+            end = max(end, f.offset + f.size)
+        holes += record.size - end
+
+        offset = 0
+        for f in sorted(fields, key=lambda f: -(f.align or 1)):
+            offset = _align_up(offset, f.align or 1) + f.size
+        reordered_size = _align_up(offset, record.align or 1)
+        return holes, reordered_size
+
+    def get_memory_size(self, record):
+        """ size of the memory CompType: sizeof the class, or the estimated sizeof `<class>_hvl`
+        """
+        if record.size is None:
+            return None
+        layout = [(record.size, record.align or 1)]
+        for field in record.vlen_fields:
+            layout += self.get_hvl_member_layout(field)
+        return _struct_layout(layout)[0]
+
+    def padding_report(self):
+        """ list of dict, padding waste of each record written into file
+        memory: bytes per record of the memory CompType, also the file type if not packed
+        packed: bytes per record of the packed file type, the sum of written members
+        holes: padding bytes between fields and at the end of the class
+        reordered: sizeof the class with fields declared in descending alignment
+        """
+        rows = []
+        for record in self.schema.records:
+            if record.is_template:
+                continue
+            memory = self.get_memory_size(record)
+            packed = self.get_packed_size(record, (record.type_name,))
+            holes, reordered = self.get_padding(record)
+            saved = (memory - packed) / memory if memory and packed is not None else None
+            rows.append(
+                {
+                    "type": record.type_name,
+                    "sizeof": record.size,
+                    "memory": memory,
+                    "packed": packed,
+                    "saved": saved,
+                    "holes": holes,
+                    "reordered": reordered,
+                    "estimated": record.has_vlen,
+                }
+            )
+        return rows
+
+    def get_projection_type_name(self, field):
+        # C++ type with the memory layout of the field, None if the field is not in CompType or vlen
+        if not field.is_public or 0 in field.extents:
+            return None
+        if field.kind == FIELD_CSTYLE_ARRAY:
+            return f"std::array<{field.element_type}, {field.extents[0]}>"
+        elif field.kind == FIELD_CSTYLE_MATRIX:
+            rows, cols = field.extents
+            return f"std::array<std::array<{field.element_type}, {cols}>, {rows}>"
+        elif field.kind in (FIELD_BUILTIN, FIELD_STD_ARRAY):
+            return field.type_name
+        elif field.kind in TENSOR_FIELD_KINDS and field.element_type and not field.is_dynamic_tensor:
+            return field.type_name
+        elif field.kind == FIELD_RECORD:
+            if self.is_user_type(field) or field.canonical_type_name in self.external_types:
+                return field.type_name
+
+    def generate_projection_impl(self, record, class_name):
+        # per-field reader, the memory CompType has only this member, so vlen members are not read
+        lines = []
+        for field in record.fields:
+            type_name = self.get_projection_type_name(field)
+            if not type_name:
+                continue
+            lines.append(
+                f"""/// read only the member `{field.name}` of all records of a `{record.name}` dataset
+        inline std::vector<{type_name}> {record.name}_read_{field.name}(const H5::DataSet & dataset) {{
+            auto ptype = HDF5::projection_type({self.get_h5type(class_name)}(), sizeof({type_name}), {{{{"{field.name}", 0}}}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<{type_name}> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }}
+        """
+            )
+        return "\n".join(lines)
+
+    def flatten_columns(self, record, column_prefix="", expr_prefix="", visiting=()):
+        """ list of (column_name, field, expression) for public fields, members of nested classes
+        in the input header are flattened into columns `member.field`, `expression` of `records[i]`
+        """
+        columns = []
+        for field in record.fields:
+            col = column_prefix + field.name
+            expr = expr_prefix + field.name
+            nested = None
+            if field.kind == FIELD_RECORD:
+                nested = self.schema.get_record(field.type_name) or self.schema.get_record(
+                    field.canonical_type_name
+                )
+            if not field.is_public or 0 in field.extents:
+                continue
+            elif nested and nested.type_name not in visiting:
+                columns.extend(
+                    self.flatten_columns(nested, col + ".", expr + ".", visiting + (nested.type_name,))
+                )
+            elif field.kind == FIELD_RECORD and field.canonical_type_name not in self.external_types:
+                continue
+            else:
+                columns.append((col, field, expr))
+        return columns
+
+    def generate_column_code(self, column):
+        """ (write_code, read_code) of one column, None if the field can not be a column
+        """
+        col, field, expr = column
+        if field.kind in (FIELD_BUILTIN, FIELD_RECORD, FIELD_ENUM):
+            el_type_name = field.canonical_type_name
+            write_ptr = f"&records[i].{expr}"
+            read_ptr = f"&records[i].{expr}"
+            if field.kind == FIELD_ENUM:
+                # enum is written as its underlying integer type
+                el_type_name = f"std::underlying_type<{field.canonical_type_name}>::type"
+                write_ptr = f"reinterpret_cast<const {el_type_name}*>({write_ptr})"
+                read_ptr = f"reinterpret_cast<{el_type_name}*>({read_ptr})"
+            extents = "{}"
+        elif field.kind in (FIELD_CSTYLE_ARRAY, FIELD_STD_ARRAY, FIELD_CSTYLE_MATRIX):
+            el_type_name = field.element_type
+            index = "[0]" * len(field.extents)
+            write_ptr = read_ptr = f"&records[i].{expr}{index}"
+            extents = "{" + ", ".join(str(e) for e in field.extents) + "}"
+        elif field.kind in TENSOR_FIELD_KINDS and field.element_type and not field.is_dynamic_tensor:
+            el_type_name = field.element_type
+            write_ptr = read_ptr = f"records[i].{expr}.data()"
+            extents = "{" + ", ".join(str(e) for e in self.get_tensor_dims(field)) + "}"
+        elif field.kind in (FIELD_STD_VECTOR, FIELD_STD_STRING, FIELD_CSTR):
+            el_type_name = "char" if field.kind != FIELD_STD_VECTOR else field.element_type
+            if field.kind == FIELD_CSTR:
+                value = f"records[i].{expr}"
+                view = f"{value} ? {value} : \"\", {value} ? std::strlen({value}) : 0"
+            else:
+                view = f"records[i].{expr}.data(), records[i].{expr}.size()"
+            write_code = f"""data::IO::WriteVlenColumn<{el_type_name}>(count,
+                [&](size_t i) {{ return data::ArrayView<const {el_type_name}>({view}); }}, group, "{col}", policy);"""
+            if field.kind == FIELD_CSTR:
+                return write_code, None  # the pointer can not own the string read back
+            read_code = f"""{{
+                auto column = data::IO::ReadRagged<{el_type_name}>(group, "{col}", start, count);
+                for (size_t i = 0; i < records.size(); i++)
+                    records[i].{expr}.assign(column[i].begin(), column[i].end());
+            }}"""
+            return write_code, read_code
+        else:
+            return None, None
+        write_code = f"""data::IO::WriteColumn<{el_type_name}>(count, {extents},
+                [&](size_t i) {{ return {write_ptr}; }}, group, "{col}", policy);"""
+        read_code = f"""data::IO::ReadColumnInto<{el_type_name}>(group, "{col}", start, records.size(),
+                [&](size_t i) {{ return {read_ptr}; }});"""
+        return write_code, read_code
+
+    def generate_columnar_impl(self, record):
+        # struct-of-arrays: each member is gathered into a typed dataset, vlen member into a ragged group
+        class_name = record.name
+        write_lines = []
+        read_lines = []
+        for column in self.flatten_columns(record, visiting=(record.type_name,)):
+            write_code, read_code = self.generate_column_code(column)
+            if write_code is None:
+                write_lines.append(f"// WARNING: skip `{column[2]}` of type `{column[1].type_name}`")
+            else:
+                write_lines.append(write_code)
+            if read_code:
+                read_lines.append(read_code)
+        write_lines = "\n".join(write_lines)
+        read_lines = "\n".join(read_lines)
+        return f"""/// write each member of `count` records into a dataset of `group`, see `data::IO::WriteColumns()`
+        inline void {class_name}_write_columns(const {class_name}* records, size_t count,
+                   std::shared_ptr<DATA_H5Location> group, const HDF5::StoragePolicy & policy) {{
+            {write_lines}
+        }}
+
+        /// read records `[start, start + count)` from the datasets of `group`, see `data::IO::ReadColumns()`
+        inline std::vector<{class_name}> {class_name}_read_columns(std::shared_ptr<DATA_H5Location> group,
+                   hsize_t start, hsize_t count) {{
+            std::vector<{class_name}> records(count);
+            {read_lines}
+            return records;
+        }}
+        """
+
+    def generate_to_h5columns_trait(self, class_name):
+        return f"""template <>
+        struct to_h5columns<{self.namespace_name}::{class_name}>
+        {{
+            static inline void write(const {self.namespace_name}::{class_name} *records, size_t count,
+                                     std::shared_ptr<DATA_H5Location> group, const StoragePolicy &policy)
+            {{
+                {self.namespace_name}::{class_name}_write_columns(records, count, group, policy);
+            }}
+            static inline std::vector<{self.namespace_name}::{class_name}> read(
+                std::shared_ptr<DATA_H5Location> group, hsize_t start, hsize_t count)
+            {{
+                return {self.namespace_name}::{class_name}_read_columns(group, start, count);
+            }}
+        }};
+        """
+
     ####################################################################
 
-    def generate_serializer_decl(self, cls):
-        class_name = cls.spelling
+    def generate_serializer_decl(self, record):
+        class_name = record.name
         return f"""void {class_name}_serialize(const {class_name}& obj, 
             const H5::CompType& h5tobj, H5::H5Object& h5o);"""
 
-    def generate_deserializer_decl(self, cls):
-        class_name = cls.spelling
+    def generate_deserializer_decl(self, record):
+        class_name = record.name
         return f"""{class_name} {class_name}_deserialize(H5::H5Object&, const H5::CompType& h5tobj); """
 
-    def generate_serializer_impl(self, cls, vl_fields):
+    def get_ragged_fields(self, record):
+        # fields stored by `HDF5::RaggedStore`: nested vectors in CSR mode, tensors of runtime size
+        return [
+            f
+            for f in record.vlen_fields
+            if (f.kind == FIELD_VLEN_MATRIX and self.ragged_csr) or f.is_dynamic_tensor
+        ]
+
+    def generate_tensor_store_impl(self, record, field):
+        # (append, read, rows function) of a tensor of runtime size, the values of each record are a row
+        # of the store in the storage order of the tensor, written from and read into `.data()`
+        class_name = record.name
+        k = field.name
+        el_type_name = field.element_type
+        if field.kind == FIELD_EIGEN_MATRIX:
+            resize = f"out[i].{k}.resize(buf[i].{k}_shape[0], buf[i].{k}_shape[1]);"
+        else:
+            rank = len(field.extents)
+            resize = f"""std::array<size_t, {rank}> shape;
+                    std::copy(buf[i].{k}_shape, buf[i].{k}_shape + {rank}, shape.begin());
+                    out[i].{k}.resize(shape);"""
+        append = f"""{{
+                HDF5::RaggedStore<{el_type_name}> store(dataset, "{k}", true);
+                unsigned long long row;
+                if (count == 1)
+                    row = store.append_row(first[0].{k}.data(), first[0].{k}.size());
+                else
+                {{
+                    data::RaggedArray<{el_type_name}> values;
+                    for (size_t i = 0; i < count; i++)
+                        values.push_back(first[i].{k}.data(), first[i].{k}.size());
+                    row = store.append(values);
+                }}
+                for (size_t i = 0; i < count; i++)
+                    buf[i].{k}_row = row + i;
+            }}"""
+        read = f"""{{
+                const auto rows = {class_name}_read_{k}_rows(dataset, buf, count);
+                for (size_t i = 0; i < count; i++)
+                {{
+                    const auto values = buf[i].{k}_view(rows);
+                    {resize}
+                    std::copy(values.begin(), values.end(), out[i].{k}.data());
+                }}
+            }}"""
+        rows_func = f"""/// load the values of `{k}` of the records by one read of each dataset of the store,
+        /// then `records[i].{k}_view(rows)` is the view of the values of record `i`
+        inline HDF5::RaggedRows<{el_type_name}> {class_name}_read_{k}_rows(const H5::DataSet & dataset,
+                   const {class_name}_hvl* records, size_t count) {{
+            if (count == 0)
+                return HDF5::RaggedRows<{el_type_name}>();
+            unsigned long long first = std::numeric_limits<unsigned long long>::max();
+            unsigned long long last = 0;
+            for (size_t i = 0; i < count; i++)
+            {{
+                first = std::min(first, records[i].{k}_row);
+                last = std::max(last, records[i].{k}_row + 1);
+            }}
+            return HDF5::RaggedStore<{el_type_name}>(dataset, "{k}").read(first, last - first);
+        }}
+        """
+        return append, read, rows_func
+
+    def generate_ragged_impl(self, record):
+        # rows of all records in a batch are gathered into one `data::RaggedArray`, appended by one write
+        class_name = record.name
+        append_lines = []
+        read_lines = []
+        rows_funcs = []
+        for field in self.get_ragged_fields(record):
+            if field.is_dynamic_tensor:
+                append, read, rows_func = self.generate_tensor_store_impl(record, field)
+                append_lines.append(append)
+                read_lines.append(read)
+                rows_funcs.append(rows_func)
+                continue
+            k = field.name
+            el_type_name = field.element_type
+            append_lines.append(
+                f"""{{
+                HDF5::RaggedStore<{el_type_name}> store(dataset, "{k}", true);
+                data::RaggedArray<{el_type_name}> ragged;
+                for (size_t i = 0; i < count; i++)
+                    for (const auto &row : first[i].{k})
+                        ragged.push_back(row.data(), row.size());
+                unsigned long long row = store.append(ragged);
+                for (size_t i = 0; i < count; i++)
+                {{
+                    buf[i].{k}_row_start = row;
+                    row += buf[i].{k}_rows;
+                }}
+            }}"""
+            )
+            read_lines.append(
+                f"""{{
+                const auto rows = {class_name}_read_{k}_rows(dataset, buf, count);
+                for (size_t i = 0; i < count; i++)
+                    out[i].{k} = buf[i].{k}_view(rows).to_nested();
+            }}"""
+            )
+            rows_funcs.append(
+                f"""/// load the rows of `{k}` of the records by one read of each CSR dataset,
+        /// then `records[i].{k}_view(rows)` is the view of the rows of record `i`
+        inline HDF5::RaggedRows<{el_type_name}> {class_name}_read_{k}_rows(const H5::DataSet & dataset,
+                   const {class_name}_hvl* records, size_t count) {{
+            unsigned long long first = std::numeric_limits<unsigned long long>::max();
+            unsigned long long last = 0;
+            for (size_t i = 0; i < count; i++)
+            {{
+                if (records[i].{k}_rows == 0)
+                    continue;
+                first = std::min(first, records[i].{k}_row_start);
+                last = std::max(last, records[i].{k}_row_start + records[i].{k}_rows);
+            }}
+            if (last == 0)
+                return HDF5::RaggedRows<{el_type_name}>();
+            return HDF5::RaggedStore<{el_type_name}>(dataset, "{k}").read(first, last - first);
+        }}
+        """
+            )
+        append_lines = "\n".join(append_lines)
+        read_lines = "\n".join(read_lines)
+        rows_funcs = "\n".join(rows_funcs)
+        return f"""{rows_funcs}
+
+        /// append the rows of ragged and tensor members of `count` records to their stores next to `dataset`,
+        /// and set the first row of each record in `buf`
+        inline void {class_name}_append_ragged(const {class_name}* first, size_t count, {class_name}_hvl* buf,
+                   H5::DataSet & dataset) {{
+            {append_lines}
+        }}
+
+        /// copy the rows of ragged and tensor members of `count` records from their stores into `out`
+        inline void {class_name}_read_ragged(const {class_name}_hvl* buf, size_t count, {class_name}* out,
+                   const H5::DataSet & dataset) {{
+            {read_lines}
+        }}
+        """
+
+    def generate_serializer_impl(self, record, vl_fields):
         # per-element write
-        class_name = cls.spelling
+        class_name = record.name
 
         _s = f"""
         template <> struct to_h5serializer<{self.namespace_name}::{class_name}>
@@ -450,21 +1169,33 @@ class hdf5_generator(code_generator):
             {{
                 return {self.namespace_name}::{class_name}_serialize;
             }}
+            static inline const BatchSerializer<{self.namespace_name}::{class_name}> get_batch(void)
+            {{
+                return {self.namespace_name}::{class_name}_serialize_batch;
+            }}
         }};
         """
         self.type_trait_codes.append(_s)
+        self.type_trait_codes.append(self.generate_to_h5staging_trait(class_name))
+
+        append_ragged = ""
+        if self.get_ragged_fields(record):
+            append_ragged = f"{class_name}_append_ragged(&obj, 1, &tmp, dataset);"
 
         lines = []
         lines.append(
-            f"""void {class_name}_serialize({class_name}& obj, H5::DataSet & dataset, 
+            f"""inline void {class_name}_serialize(const {class_name}& obj, H5::DataSet & dataset, 
                    const H5::DataSpace * memspace, const H5::DataSpace * space) {{
+                DATA_H5_PROBE("{class_name}_serialize", dataset.getObjName(), "{self.namespace_name}::{class_name}");
+                DATA_H5_PROBE_RECORDS(1, sizeof({class_name}_hvl));
                 {class_name}_hvl tmp(obj);
+                {append_ragged}
                 if(memspace)
-                    dataset.write(&tmp, {class_name}_h5type, *memspace, *space);
+                    DATA_H5_CALL(dataset.write(&tmp, {class_name}_h5type(), *memspace, *space));
                 else
                 {{
                     // todo check if it attributeval, attrib
-                    //dataset.write({class_name}_h5type, &tmp);
+                    //dataset.write({class_name}_h5type(), &tmp);
                 }}
 
             """
@@ -481,11 +1212,65 @@ class hdf5_generator(code_generator):
         #         """
 
         lines.append(f"}} //  end of `{class_name}` serializer function\n")
+        lines.append(self.generate_batch_serializer_impl(record))
         return "\n".join(lines)
 
-    def generate_deserializer_impl(self, cls):
+    def generate_batch_serializer_impl(self, record):
+        # convert the whole range into a contiguous hvl buffer, then write in one H5Dwrite
+        # the conversion has no HDF5 call, so that it can be done on another thread than the write
+        class_name = record.name
+        append_ragged = ""
+        if self.get_ragged_fields(record):
+            append_ragged = f"{class_name}_append_ragged(first, count, buf, dataset);"
+        return f"""/// vlen fields of the staged records point into the buffers of `first`, no HDF5 call
+        inline std::vector<{class_name}_hvl> {class_name}_pack_batch(const {class_name}* first, size_t count) {{
+            std::vector<{class_name}_hvl> buf;
+            buf.reserve(count);
+            for (size_t i = 0; i < count; i++)
+                buf.emplace_back(first[i], HDF5::hvl_view_t());
+            return buf;
+        }}
+
+        /// write the records staged by `{class_name}_pack_batch()`, `first` must be still alive
+        inline void {class_name}_write_staged(const {class_name}* first, {class_name}_hvl* buf, size_t count,
+                   H5::DataSet & dataset, const H5::DataSpace * memspace, const H5::DataSpace * space) {{
+            {append_ragged}
+            if(memspace)
+                DATA_H5_CALL(dataset.write(buf, {class_name}_h5type(), *memspace, *space));
+            else
+                DATA_H5_CALL(dataset.write(buf, {class_name}_h5type()));
+        }}
+
+        inline void {class_name}_serialize_batch(const {class_name}* first, size_t count,
+                   H5::DataSet & dataset, const H5::DataSpace * memspace, const H5::DataSpace * space) {{
+            DATA_H5_PROBE("{class_name}_serialize_batch", dataset.getObjName(), "{self.namespace_name}::{class_name}");
+            DATA_H5_PROBE_RECORDS(count, count * sizeof({class_name}_hvl));
+            auto buf = {class_name}_pack_batch(first, count);
+            {class_name}_write_staged(first, buf.data(), count, dataset, memspace, space);
+        }} //  end of `{class_name}` batch serializer function
+        """
+
+    def generate_to_h5staging_trait(self, class_name):
+        ns = self.namespace_name
+        return f"""template <>
+        struct to_h5staging<{ns}::{class_name}>
+        {{
+            typedef {ns}::{class_name}_hvl type;
+            static inline std::vector<type> pack(const {ns}::{class_name} *first, size_t count)
+            {{
+                return {ns}::{class_name}_pack_batch(first, count);
+            }}
+            static inline void write(const {ns}::{class_name} *first, type *staged, size_t count, H5::DataSet &dataset,
+                                     const H5::DataSpace *memspace, const H5::DataSpace *space)
+            {{
+                {ns}::{class_name}_write_staged(first, staged, count, dataset, memspace, space);
+            }}
+        }};
+        """
+
+    def generate_deserializer_impl(self, record):
         # flatten but keep the shape as attribute?
-        class_name = cls.spelling
+        class_name = record.name
 
         _d = f"""
         template <> struct to_h5deserializer<{self.namespace_name}::{class_name}>
@@ -494,41 +1279,407 @@ class hdf5_generator(code_generator):
             {{
                 return {self.namespace_name}::{class_name}_deserialize;
             }}
+            static inline const BatchDeserializer<{self.namespace_name}::{class_name}> get_batch(void)
+            {{
+                return {self.namespace_name}::{class_name}_deserialize_batch;
+            }}
         }};
         """
         self.type_trait_codes.append(_d)
 
-        return f"""{class_name} {class_name}_deserialize(H5::DataSet & dataset, 
+        # vlen memory of `char*` fields is reclaimed, the pointer can not be kept in the result
+        reset_cstr = "\n".join(
+            f"obj.{f.name} = nullptr;" for f in record.fields if f.is_public and f.kind == FIELD_CSTR
+        )
+        reset_cstr_batch = "\n".join(
+            f"out[i].{f.name} = nullptr;"
+            for f in record.fields
+            if f.is_public and f.kind == FIELD_CSTR
+        )
+        read_ragged = read_ragged_batch = ""
+        if self.get_ragged_fields(record):
+            read_ragged = f"{class_name}_read_ragged(&tmp, 1, &obj, dataset);"
+            read_ragged_batch = f"{class_name}_read_ragged(buf.data(), count, out, dataset);"
+
+        return f"""inline {class_name} {class_name}_deserialize(H5::DataSet & dataset, 
                    const H5::DataSpace * memspace, const H5::DataSpace * space) {{
+            DATA_H5_PROBE("{class_name}_deserialize", dataset.getObjName(), "{self.namespace_name}::{class_name}");
+            DATA_H5_PROBE_RECORDS(1, sizeof({class_name}_hvl));
+            HDF5::VlenArena arena(4096);
             {class_name}_hvl tmp;
-            dataset.write(&tmp, {class_name}_h5type, *memspace, *space);
-            return tmp.get_base();
-        }}"""
+            DATA_H5_CALL(dataset.read(&tmp, {class_name}_h5type(), *memspace, *space, arena.xfer_plist()));
+            {class_name} obj = tmp.get_base();
+            {reset_cstr}
+            {read_ragged}
+            return obj;
+        }}
+
+        /// read the range in one H5Dread into a contiguous hvl buffer, vlen memory from an arena
+        /// released at once after conversion
+        inline void {class_name}_deserialize_batch({class_name}* out, size_t count, H5::DataSet & dataset, 
+                   const H5::DataSpace * memspace, const H5::DataSpace * space) {{
+            DATA_H5_PROBE("{class_name}_deserialize_batch", dataset.getObjName(), "{self.namespace_name}::{class_name}");
+            DATA_H5_PROBE_RECORDS(count, count * sizeof({class_name}_hvl));
+            HDF5::VlenArena arena;
+            std::vector<{class_name}_hvl> buf(count);
+            if(memspace)
+                DATA_H5_CALL(dataset.read(buf.data(), {class_name}_h5type(), *memspace, *space, arena.xfer_plist()));
+            else
+                DATA_H5_CALL(dataset.read(buf.data(), {class_name}_h5type(), H5::DataSpace::ALL, H5::DataSpace::ALL, arena.xfer_plist()));
+            for (size_t i = 0; i < count; i++)
+            {{
+                out[i] = buf[i].get_base();
+                {reset_cstr_batch}
+            }}
+            {read_ragged_batch}
+        }} //  end of `{class_name}` batch deserializer function
+
+        /// zero-copy read of `count` records from `start`, all if `count == 0`, vlen fields are not
+        /// converted but point into `arena`, see `{class_name}_hvl::<field>_view()`; valid until the arena is cleared
+        inline std::vector<{class_name}_hvl> {class_name}_read_views(const H5::DataSet & dataset, HDF5::VlenArena & arena,
+                   hsize_t start = 0, hsize_t count = 0) {{
+            H5::DataSpace space = dataset.getSpace();
+            hsize_t dims[1];
+            space.getSimpleExtentDims(dims);
+            start = std::min(start, dims[0]);
+            if (count == 0 || start + count > dims[0])
+                count = dims[0] - start;
+            std::vector<{class_name}_hvl> buf(count);
+            if (count == 0)
+                return buf;
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            dataset.read(buf.data(), {class_name}_h5type(), memspace, space, arena.xfer_plist());
+            return buf;
+        }}
+        """
 
 
-if __name__ == "__main__":
+####################################################################
+# batch mode: generate code for many headers on a process pool
 
-    input_file = "../demo/CodeGen_types.h"
 
-    if len(sys.argv) >= 2:
-        input_file = sys.argv[1]
+def _align_up(offset, align):
+    return (offset + align - 1) // align * align
 
-    # tmp
+
+def _struct_layout(members):
+    # (size, align) of a struct of members given as (size, align) in the declaration order
+    size = 0
+    for member_size, member_align in members:
+        size = _align_up(size, member_align) + member_size
+    align = max([1] + [a for _, a in members])
+    return _align_up(size, align), align
+
+
+def print_padding_report(rows, file=None):
+    """ print the rows of `hdf5_generator.padding_report()` as a table
+    """
+    _n = lambda v: "?" if v is None else str(v)
+    width = max([len("type")] + [len(r["type"]) for r in rows])
+    print(
+        f"{'type':<{width}} {'sizeof':>7} {'memory':>7} {'packed':>7} {'saved':>6} {'holes':>6} {'reordered':>9}",
+        file=file,
+    )
+    for r in rows:
+        saved = "?" if r["saved"] is None else f"{r['saved'] * 100:.0f}%"
+        memory = _n(r["memory"]) + ("~" if r["estimated"] else "")
+        print(
+            f"{r['type']:<{width}} {_n(r['sizeof']):>7} {memory:>7} {_n(r['packed']):>7} {saved:>6}"
+            f" {_n(r['holes']):>6} {_n(r['reordered']):>9}",
+            file=file,
+        )
+    print(
+        "memory: bytes per record in file without `--packed`, `~` for the estimated size of `<class>_hvl`;"
+        " reordered: sizeof the class with members in descending alignment",
+        file=file,
+    )
+
+
+def guess_namespace(input_file):
+    # tmp, todo: detect namespace_name
     if input_file.find("EERA") >= 0:
-        namespace = "EERAModel"
+        return "EERAModel"
     else:
-        namespace = "CodeGen"
-    if not os.path.exists(input_file):
+        return "CodeGen"
+
+
+def get_output_file(input_file, output_dir=None):
+    output_file = input_file.replace(".h", "_hdf5.h")
+    if output_dir:
+        output_file = os.path.join(output_dir, os.path.basename(output_file))
+    return output_file
+
+
+def get_init_function_name(output_file):
+    # batch mode: each generated header has its own init function, e.g. `init_CodeGen_types_h5types()`
+    stem = os.path.splitext(os.path.basename(output_file))[0]
+    if stem.endswith("_hdf5"):
+        stem = stem[: -len("_hdf5")]
+    return f"init_{stem}_h5types"
+
+
+def expand_headers(patterns, manifest=None):
+    """ header file list from file names or glob patterns,
+    and a manifest file listing one header per line, `#` for comment line
+    """
+    if manifest:
+        manifest_dir = os.path.dirname(manifest)
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(os.path.join(manifest_dir, line))
+    headers = []
+    for p in patterns:
+        for h in sorted(glob.glob(p)) or [p]:
+            if h not in headers:
+                headers.append(h)
+    return headers
+
+
+_generator_version = None
+
+
+def get_generator_version():
+    # any change in the generator source code invalidates the cache
+    global _generator_version
+    if _generator_version is None:
+        this_dir = os.path.dirname(os.path.abspath(__file__))
+        sources = ["h5type_generator.py", "clang_util.py", "schema.py", "generation_cache.py"]
+        digests = [file_digest(os.path.join(this_dir, f)) for f in sources]
+        _generator_version = make_key(GENERATOR_VERSION, digests)
+    return _generator_version
+
+
+def get_cache_key(stage, job, *extra):
+    # key for the input header content, compiler args, generator version and options
+    return make_key(
+        stage,
+        get_generator_version(),
+        os.path.realpath(job["input"]),
+        file_digest(job["input"]),
+        job["clang_args"],
+        sorted(os.path.realpath(f) for f in job.get("project_headers") or []),
+        *extra,
+    )
+
+
+def _parse_header(job):
+    """ parse stage, return the schema as dict which can be sent between processes
+    libclang is not loaded if the cache hits
+    """
+    cache = generation_cache(job["cache_dir"]) if job.get("cache_dir") else None
+    if cache:
+        key = get_cache_key("schema", job)
+        schema_dict = cache.lookup(key)
+        # an entry of another schema version is a miss, it is replaced below
+        if schema_dict is not None and schema_dict.get("version") == SCHEMA_VERSION:
+            return schema_dict
+    from clang_util import parse_schema
+
+    schema = parse_schema(job["input"], job["clang_args"], job.get("project_headers"))
+    schema_dict = schema.to_dict()
+    if cache:
+        cache.store(key, schema.dependencies, schema_dict)
+    return schema_dict
+
+
+def get_record_types(schema_dict):
+    # full type names of classes defined in the header, for the batch mode registry
+    return [r["type_name"] for r in schema_dict["records"] if not r["is_template"]]
+
+
+def _generate_header(job):
+    """ emit and write one output header from the schema, parse the input if no schema in job
+    job: dict of input, output, namespace, clang_args, and optional keys:
+        project_headers, schema, external_types, init_function_name, cache_dir, storage, packed, columnar, ragged_csr, padding_report
+    """
+    start = time.time()
+    schema_dict = job.get("schema") or _parse_header(job)
+    g = hdf5_generator(
+        job["input"], job["output"], job["namespace"], schema=header_schema.from_dict(schema_dict)
+    )
+    g.external_types = job.get("external_types", {})
+    g.storage_options.update(job.get("storage") or {})
+    g.packed = job.get("packed", False)
+    g.columnar = job.get("columnar", False)
+    g.ragged_csr = job.get("ragged_csr", False)
+    g.init_function_name = job.get("init_function_name", "init_h5types")
+    g.generate()
+    written = g.write_code()
+    result = {
+        "input": job["input"],
+        "output": job["output"],
+        "types": list(g.generated_types.keys()),
+        "written": written,
+        "seconds": time.time() - start,
+    }
+    if job.get("padding_report"):
+        result["padding"] = g.padding_report()
+    return result
+
+
+def generate_batch(
+    input_files,
+    output_dir=None,
+    ns_name=None,
+    clang_args=None,
+    jobs=None,
+    cache_dir=None,
+    storage=None,
+    packed=False,
+    padding_report=False,
+    columnar=False,
+    ragged_csr=False,
+    project_headers=None,
+):
+    """ parse and generate headers in parallel, each worker process loads libclang only once
+    1. parse all headers into schemas to build the registry of types: full type name -> output header
+    2. emit each header from its schema with types from other headers, so they can be used as field type
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    start = time.time()
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    tasks = []
+    for input_file in input_files:
+        if not os.path.exists(input_file):
+            raise Exception(f"{input_file} does not exist, check filename and current working directory")
+        tasks.append(
+            {
+                "input": input_file,
+                "output": get_output_file(input_file, output_dir),
+                "namespace": ns_name or guess_namespace(input_file),
+                "clang_args": clang_args,
+                "project_headers": project_headers,
+                "cache_dir": cache_dir,
+                "storage": storage,
+                "packed": packed,
+                "columnar": columnar,
+                "ragged_csr": ragged_csr,
+                "padding_report": padding_report,
+            }
+        )
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        registry = {}
+        for task, schema_dict in zip(tasks, pool.map(_parse_header, tasks)):
+            task["schema"] = schema_dict
+            for t in get_record_types(schema_dict):
+                registry.setdefault(t, task["output"])  # first definition wins
+        for task in tasks:
+            task["external_types"] = {t: o for t, o in registry.items() if o != task["output"]}
+            task["init_function_name"] = get_init_function_name(task["output"])
+        results = list(pool.map(_generate_header, tasks))
+
+    return {
+        "headers": results,
+        "header_count": len(results),
+        "type_count": len(registry),
+        "seconds": time.time() - start,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="generate HDF5 CompType code for C++ classes")
+    parser.add_argument("input_header", nargs="?", default="../demo/CodeGen_types.h")
+    parser.add_argument("output_header", nargs="?", help="default: input_header with `_hdf5.h` suffix")
+    parser.add_argument("--namespace", help="namespace of the classes in the input header(s)")
+    parser.add_argument("-I", dest="include_dirs", action="append", default=[], help="include dir")
+    parser.add_argument(
+        "--project-header",
+        dest="project_headers",
+        action="append",
+        default=[],
+        help="also generate for classes declared in this included header, repeatable",
+    )
+    parser.add_argument("--batch", nargs="+", metavar="HEADER", help="headers or glob patterns")
+    parser.add_argument("--manifest", help="file listing one header per line, for batch mode")
+    parser.add_argument("--output-dir", help="output folder for batch mode, default: beside input")
+    parser.add_argument("-j", "--jobs", type=int, help="process count, default: cpu count")
+    parser.add_argument("--summary", help="write batch summary into this json file")
+    parser.add_argument("--cache-dir", help="skip parsing if the input and its includes unchanged")
+    parser.add_argument("--dump-schema", help="write the parsed schema into this json file")
+    parser.add_argument("--schema", help="load the schema json instead of parsing by libclang")
+    parser.add_argument("--chunk-bytes", type=int, help="target chunk size in bytes of generated types")
+    parser.add_argument("--deflate", type=int, default=0, help="default gzip level 1-9 of generated types")
+    parser.add_argument("--shuffle", action="store_true", help="shuffle filter by default")
+    parser.add_argument("--fletcher32", action="store_true", help="checksum filter by default")
+    parser.add_argument("--packed", action="store_true", help="packed on-disk CompType without padding")
+    parser.add_argument("--columnar", action="store_true", help="struct-of-arrays writer and reader")
+    parser.add_argument("--ragged-csr", action="store_true", help="nested vector rows in CSR datasets")
+    parser.add_argument("--padding-report", action="store_true", help="print padding bytes of each class")
+    args = parser.parse_args()
+
+    clang_args = [f"-I{d}" for d in args.include_dirs]  # appended to the default args
+    storage = {
+        "chunk_bytes": args.chunk_bytes,
+        "deflate": args.deflate,
+        "shuffle": args.shuffle,
+        "fletcher32": args.fletcher32,
+    }
+
+    if args.batch or args.manifest:
+        input_files = expand_headers(list(args.batch or []), args.manifest)
+        summary = generate_batch(
+            input_files,
+            args.output_dir,
+            args.namespace,
+            clang_args,
+            args.jobs,
+            args.cache_dir,
+            storage,
+            args.packed,
+            args.padding_report,
+            args.columnar,
+            args.ragged_csr,
+            args.project_headers,
+        )
+        for r in summary["headers"]:
+            state = "written" if r["written"] else "unchanged"
+            print(f"{r['input']} -> {r['output']}: {len(r['types'])} types {state}, {r['seconds']:.3f} s")
+        if args.padding_report:
+            print_padding_report([row for r in summary["headers"] for row in r["padding"]])
+        print(
+            f"generated {summary['type_count']} types from {summary['header_count']} headers"
+            f" in {summary['seconds']:.3f} s"
+        )
+        if args.summary:
+            with open(args.summary, "w") as f:
+                json.dump(summary, f, indent=2)
+        sys.exit(0)
+
+    input_file = args.input_header
+    namespace = args.namespace or guess_namespace(input_file)
+    if not os.path.exists(input_file) and not args.schema:
         raise Exception(
             f"{input_file} does not exist, check filename and current working directory"
         )
 
-    if len(sys.argv) >= 3:
-        output_file = sys.argv[2]
+    output_file = args.output_header or get_output_file(input_file)
+
+    job = {
+        "input": input_file,
+        "output": output_file,
+        "namespace": namespace,
+        "clang_args": clang_args,
+        "project_headers": args.project_headers,
+        "cache_dir": args.cache_dir,
+        "storage": storage,
+        "packed": args.packed,
+        "columnar": args.columnar,
+        "ragged_csr": args.ragged_csr,
+        "padding_report": args.padding_report,
+    }
+    if args.schema:
+        job["schema"] = header_schema.load(args.schema).to_dict()
     else:
-        output_file = input_file.replace(".h", "_hdf5.h")
-
-    g = hdf5_generator(input_file, output_file, ns_name=namespace)
-    # todo: detect namespace_name
-    g.generate()
-    g.write_code()
+        job["schema"] = _parse_header(job)
+    if args.dump_schema:
+        header_schema.from_dict(job["schema"]).dump(args.dump_schema)
+    result = _generate_header(job)
+    if args.padding_report:
+        print_padding_report(result["padding"])
@@ -0,0 +1,239 @@
+#!/usr/bin/python3
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+
+"""
+generate json serialization code for C++ classes, based on the header-only `json.hpp`
++ `to_json()` and `from_json()` for `nlohmann::json`
++ `JSON::codec<T>` specialization in `json/JSONIO.h`: write CBOR and MessagePack directly
+  without `nlohmann::json` DOM, decode by the SAX interface of `json.hpp`
+
+Usage: `json_generator.py input_header.h output_header_json.h --namespace NameSpaceName`
+"""
+
+import sys
+import os.path
+import argparse
+
+# `clang_util` is imported only by the parse stage, emitters work on the schema
+from schema import *
+from h5type_generator import code_generator, guess_namespace, _parse_header
+
+
+class json_generator(code_generator):
+    """ emitter of json and compact binary codec, consumes the same schema as `hdf5_generator`
+    """
+
+    # fields of these kinds are written, `char*` can be written but not decoded
+    encodable_field_kinds = (
+        FIELD_BUILTIN,
+        FIELD_CSTYLE_ARRAY,
+        FIELD_CSTYLE_MATRIX,
+        FIELD_STD_ARRAY,
+        FIELD_STD_VECTOR,
+        FIELD_VLEN_MATRIX,
+        FIELD_STD_STRING,
+        FIELD_CSTR,
+        FIELD_ENUM,
+        FIELD_RECORD,
+    )
+
+    def __init__(
+        self,
+        input_header,
+        output_header,
+        ns_name="",
+        clang_args=None,
+        project_headers=None,
+        schema=None,
+    ):
+        super(json_generator, self).__init__(
+            input_header, output_header, ns_name, clang_args, project_headers, schema
+        )
+        json_headers = f"""#include <string>
+        #include <vector>
+        #include <array>
+        #include "json.hpp"
+        #include "{self.input_header_file}"
+        #include "JSONIO.h"
+        """
+        self.header_codes.append(json_headers)
+        self.json_codes = []  # to_json() and from_json() found by ADL, in the namespace of classes
+        self.codec_codes = []  # `JSON::codec<T>` specialization
+        self.record_types = set()
+
+    def generate(self):
+        self.record_types = set(r.type_name for r in self.schema.records)
+        for record in self.schema.records:
+            self.generate_class_code(record)
+        self.post()
+
+    def post(self):
+        self.impl_codes = self.json_codes
+        self.extra_decl_codes.append("namespace JSON{")
+        self.extra_decl_codes.append("\n".join(self.codec_codes))
+        self.extra_decl_codes.append("} // namespace JSON ")
+
+    def is_encodable(self, field):
+        if not field.is_public or field.kind not in self.encodable_field_kinds:
+            return False
+        if 0 in field.extents:
+            return False  # array of unknown size
+        if field.kind == FIELD_RECORD:
+            # codec is generated only for classes in the input header
+            return field.type_name in self.record_types or field.canonical_type_name in self.record_types
+        return True
+
+    def is_decodable(self, field):
+        return self.is_encodable(field) and field.kind != FIELD_CSTR
+
+    def generate_class_code(self, record):
+        print("generating json code for: `%s`" % record.type_name)
+        if record.is_template:
+            print("template class is not supported yet")
+            return
+
+        fields = []
+        for field in record.fields:
+            if self.is_encodable(field):
+                fields.append(field)
+            else:
+                print(f"skip field `{field.name}` of kind {field.kind}, type `{field.type_name}`")
+        self.json_codes.append(self.generate_json_functions(record, fields))
+        self.codec_codes.append(self.generate_codec(record, fields))
+
+    def generate_json_functions(self, record, fields):
+        # DOM based conversion for text json, `nlohmann::json j = obj;` and `j.get<T>()`
+        type_name = record.type_name
+        to_lines = []
+        from_lines = []
+        for f in fields:
+            if f.kind == FIELD_CSTR:
+                to_lines.append(
+                    f'j["{f.name}"] = obj.{f.name} ? nlohmann::json(obj.{f.name}) : nlohmann::json(nullptr);'
+                )
+            else:
+                to_lines.append(f'j["{f.name}"] = obj.{f.name};')
+            if not self.is_decodable(f):
+                continue
+            if f.kind == FIELD_CSTYLE_MATRIX:
+                # json.hpp can not convert into `T[M][N]` directly, but each row `T[N]`
+                from_lines.append(
+                    f'for (std::size_t i = 0; i < {f.extents[0]}; i++)\n'
+                    f'                nlohmann::from_json(j.at("{f.name}").at(i), obj.{f.name}[i]);'
+                )
+            elif f.kind == FIELD_CSTYLE_ARRAY:
+                from_lines.append(f'nlohmann::from_json(j.at("{f.name}"), obj.{f.name});')
+            else:
+                from_lines.append(f'j.at("{f.name}").get_to(obj.{f.name});')
+        to_code = "\n            ".join(to_lines)
+        from_code = "\n            ".join(from_lines)
+
+        return f"""
+        inline void to_json(nlohmann::json &j, const {type_name} &obj)
+        {{
+            j = nlohmann::json::object();
+            {to_code}
+        }}
+
+        inline void from_json(const nlohmann::json &j, {type_name} &obj)
+        {{
+            {from_code}
+        }}
+        """
+
+    def generate_codec(self, record, fields):
+        # a map of field name to value is written, fields are assigned from SAX events by the sink
+        type_name = record.type_name
+        encode_lines = []
+        for f in fields:
+            encode_lines.append(f'w.key("{f.name}");')
+            encode_lines.append(f"JSON::encode(w, obj.{f.name});")
+
+        decodable = [f for f in fields if self.is_decodable(f)]
+        bind_lines = [f"{f.name}_sink.bind(&p->{f.name});" for f in decodable]
+        key_lines = [f'if (k == "{f.name}") return &{f.name}_sink;' for f in decodable]
+        member_lines = [
+            f"codec<decltype({type_name}::{f.name})>::sink {f.name}_sink;" for f in decodable
+        ]
+
+        encode_code = "\n                ".join(encode_lines)
+        bind_code = "\n                    ".join(bind_lines)
+        key_code = "\n                    ".join(key_lines)
+        member_code = "\n                ".join(member_lines)
+
+        return f"""template <>
+        struct codec<{type_name}>
+        {{
+            template <class Writer>
+            static void encode(Writer &w, const {type_name} &obj)
+            {{
+                w.begin_map({len(fields)});
+                {encode_code}
+            }}
+
+            /// assign fields from SAX events, unknown keys are skipped
+            class sink : public JSON::sink
+            {{
+            public:
+                void bind({type_name} *p)
+                {{
+                    {bind_code}
+                }}
+                bool on_start_object(std::size_t) override
+                {{
+                    return true;
+                }}
+                JSON::sink *on_key(const std::string &k) override
+                {{
+                    {key_code}
+                    return nullptr;
+                }}
+
+            private:
+                {member_code}
+            }};
+        }};
+        """
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="generate json and CBOR/MessagePack code for C++ classes")
+    parser.add_argument("input_header", nargs="?", default="../demo/CodeGen_types.h")
+    parser.add_argument("output_header", nargs="?", help="default: input_header with `_json.h` suffix")
+    parser.add_argument("--namespace", help="namespace of the classes in the input header")
+    parser.add_argument("-I", dest="include_dirs", action="append", default=[], help="include dir")
+    parser.add_argument(
+        "--project-header",
+        dest="project_headers",
+        action="append",
+        default=[],
+        help="also generate for classes declared in this included header, repeatable",
+    )
+    parser.add_argument("--cache-dir", help="skip parsing if the input and its includes unchanged")
+    parser.add_argument("--schema", help="load the schema json instead of parsing by libclang")
+    args = parser.parse_args()
+
+    input_file = args.input_header
+    if not os.path.exists(input_file) and not args.schema:
+        raise Exception(
+            f"{input_file} does not exist, check filename and current working directory"
+        )
+    output_file = args.output_header or input_file.replace(".h", "_json.h")
+
+    if args.schema:
+        schema = header_schema.load(args.schema)
+    else:
+        job = {
+            "input": input_file,
+            "clang_args": [f"-I{d}" for d in args.include_dirs],
+            "project_headers": args.project_headers,
+            "cache_dir": args.cache_dir,
+        }
+        schema = header_schema.from_dict(_parse_header(job))
+
+    g = json_generator(input_file, output_file, args.namespace or guess_namespace(input_file), schema=schema)
+    g.generate()
+    g.write_code()
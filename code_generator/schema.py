@@ -0,0 +1,227 @@
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+"""
+intermediate schema of the classes parsed from the input header
+
+It is produced by the parse stage `clang_util.parse_schema()`, all emitters
+(code generators) consume this schema, so that several output formats cost one parse.
+This module must not import `clang.cindex`, the schema can be dumped into json
+and loaded back on a machine without libclang.
+"""
+
+import json
+
+SCHEMA_VERSION = 3
+
+# (size, align) in a struct of the types used by the members the generator adds into `<class>_hvl`,
+# for the target of the parse; LP64, e.g. x86_64 Linux, if the schema is not parsed
+LP64_TARGET_LAYOUT = {"pointer": (8, 8), "size_t": (8, 8), "unsigned long long": (8, 8)}
+
+# field kinds, each FIELD_DECL is tokenized once and resolved into a `field_info`,
+# emitters switch on `field_info.kind` instead of calling the predicates in `clang_util`
+FIELD_BUILTIN = "builtin"
+FIELD_CSTYLE_ARRAY = "cstyle_array"
+FIELD_STD_ARRAY = "std_array"
+FIELD_STD_VECTOR = "std_vector"
+FIELD_STD_STRING = "std_string"
+FIELD_CSTR = "cstr"
+FIELD_POINTER = "pointer"
+FIELD_SMART_POINTER = "smart_pointer"
+FIELD_CSTYLE_MATRIX = "cstyle_matrix"
+FIELD_VLEN_MATRIX = "vlen_matrix"
+FIELD_EIGEN_MATRIX = "eigen_matrix"
+FIELD_XTENSOR_MATRIX = "xtensor_matrix"
+FIELD_ANONYMOUS = "anonymous"
+FIELD_ENUM = "enum"
+FIELD_RECORD = "record"  # user type: class or struct
+FIELD_UNSUPPORTED = "unsupported"
+
+VLEN_FIELD_KINDS = (FIELD_STD_VECTOR, FIELD_STD_STRING, FIELD_VLEN_MATRIX)
+# Eigen and xtensor members, extent -1 for a dimension of runtime size
+TENSOR_FIELD_KINDS = (FIELD_EIGEN_MATRIX, FIELD_XTENSOR_MATRIX)
+LAYOUT_ROW_MAJOR = "row_major"
+LAYOUT_COLUMN_MAJOR = "column_major"
+
+
+class field_info(object):
+    """ compact descriptor of a FIELD_DECL, resolved once by `clang_util.classify_field()`
+    it holds only plain python values, no reference to the libclang cursor
+    offset, size and align are in bytes, None if unknown to the compiler, e.g. template
+    """
+
+    __slots__ = (
+        "name",
+        "kind",
+        "type_name",
+        "canonical_type_name",
+        "element_type",
+        "extents",
+        "template_args",
+        "layout",
+        "access",
+        "offset",
+        "size",
+        "align",
+        "code",
+    )
+
+    def __init__(
+        self,
+        name,
+        kind,
+        type_name,
+        canonical_type_name="",
+        element_type="",
+        extents=(),
+        template_args=(),
+        layout="",
+        access="public",
+        offset=None,
+        size=None,
+        align=None,
+        code="",
+    ):
+        self.name = name
+        self.kind = kind
+        self.type_name = type_name
+        self.canonical_type_name = canonical_type_name or type_name
+        self.element_type = element_type  # array/vector element, pointee type
+        self.extents = tuple(extents)  # fixed array size for each dim
+        self.template_args = tuple(template_args)
+        self.layout = layout  # storage order of tensor members, empty for other kinds
+        self.access = access
+        self.offset = offset
+        self.size = size
+        self.align = align
+        self.code = code  # source code of the decl, for diagnosis only
+
+    @property
+    def is_public(self):
+        return self.access == "public"
+
+    @property
+    def is_vlen(self):
+        return self.kind in VLEN_FIELD_KINDS or self.is_dynamic_tensor
+
+    @property
+    def is_dynamic_tensor(self):
+        # tensor of runtime size, its values are written out of the record
+        return self.kind in TENSOR_FIELD_KINDS and -1 in self.extents
+
+    def to_dict(self):
+        d = {k: getattr(self, k) for k in self.__slots__}
+        d["extents"] = list(self.extents)
+        d["template_args"] = list(self.template_args)
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+    def __repr__(self):
+        return f"field_info({self.name}, {self.kind}, `{self.type_name}`)"
+
+
+class record_info(object):
+    """ class or struct, fields are in declaration order
+    name: class name without namespace, type_name: full type name, e.g. `CodeGen::CDataStruct`
+    parent: full type name of the enclosing class for a nested class
+    """
+
+    def __init__(
+        self,
+        name,
+        type_name,
+        fields=(),
+        is_template=False,
+        size=None,
+        align=None,
+        parent=None,
+    ):
+        self.name = name
+        self.type_name = type_name
+        self.fields = list(fields)
+        self.is_template = is_template
+        self.size = size
+        self.align = align
+        self.parent = parent
+
+    @property
+    def vlen_fields(self):
+        # public `std::vector` and `std::string` fields
+        return [f for f in self.fields if f.is_public and f.is_vlen]
+
+    @property
+    def has_vlen(self):
+        return len(self.vlen_fields) > 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "type_name": self.type_name,
+            "fields": [f.to_dict() for f in self.fields],
+            "is_template": self.is_template,
+            "size": self.size,
+            "align": self.align,
+            "parent": self.parent,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        d["fields"] = [field_info.from_dict(f) for f in d["fields"]]
+        return cls(**d)
+
+    def __repr__(self):
+        return f"record_info({self.type_name}, {len(self.fields)} fields)"
+
+
+class header_schema(object):
+    """ all classes defined in the input header, in the declaration (nesting) order
+    enums: full type names of enum declared, dependencies: files included by the input header
+    target_layout: (size, align) of the types in `LP64_TARGET_LAYOUT` for the target of the parse
+    """
+
+    def __init__(self, input_header, records=(), enums=(), dependencies=(), target_layout=None):
+        self.input_header = input_header
+        self.records = list(records)
+        self.enums = list(enums)
+        self.dependencies = list(dependencies)
+        self.target_layout = dict(target_layout or LP64_TARGET_LAYOUT)
+
+    def get_record(self, type_name):
+        for r in self.records:
+            if r.type_name == type_name:
+                return r
+
+    def to_dict(self):
+        return {
+            "version": SCHEMA_VERSION,
+            "input_header": self.input_header,
+            "records": [r.to_dict() for r in self.records],
+            "enums": self.enums,
+            "dependencies": self.dependencies,
+            "target_layout": {k: list(v) for k, v in self.target_layout.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        if d.get("version") != SCHEMA_VERSION:
+            raise ValueError(f"schema version {d.get('version')} is not supported")
+        return cls(
+            d["input_header"],
+            [record_info.from_dict(r) for r in d["records"]],
+            d["enums"],
+            d["dependencies"],
+            {k: tuple(v) for k, v in d["target_layout"].items()},
+        )
+
+    def dump(self, file_name):
+        with open(file_name, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,278 @@
+#pragma once
+#include <cstdio>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <vector>
+#include <ostream>
+#include <functional>
+#include <stdexcept>
+#include <limits>
+#include <type_traits>
+#if __cplusplus >= 201703L && __has_include(<charconv>)
+#include <charconv>
+#endif
+
+#include "csv.hpp"
+
+/**
+ * CSV export and import of user types with flattened columns
+ *
+ * the generated `*_csv.h` header specializes `CSV::codec<T>` for each user class,
+ * fixed-size arrays are expanded into `name_0, name_1`, nested classes into `name.member`.
+ * Rows are formatted into a large buffer without iostream, the buffer is written as a block.
+ * Reading is based on the streaming parser `csv::CSVReader` of `csv.hpp`.
+ * */
+namespace CSV
+{
+    /// `codec<T>::columns()`, `codec<T>::write_row()` and `codec<T>::read_row()`, specialized by the generated header
+    template <typename T>
+    struct codec;
+
+    /**
+     * @brief buffered CSV row writer, numbers are formatted without iostream
+     *
+     * the buffer is passed to the output function when it is full, and on `flush()` or destruction
+     * */
+    class row_writer
+    {
+    public:
+        typedef std::function<void(const char *, std::size_t)> output_t;
+
+        explicit row_writer(output_t output, char delimiter = ',', std::size_t buffer_size = 1 << 20)
+            : m_output(output), m_delimiter(delimiter), m_capacity(buffer_size)
+        {
+            m_buffer.reserve(m_capacity + max_field_size);
+        }
+
+        explicit row_writer(std::FILE *file, char delimiter = ',', std::size_t buffer_size = 1 << 20)
+            : row_writer([file](const char *s, std::size_t n) { std::fwrite(s, 1, n, file); }, delimiter, buffer_size)
+        {
+        }
+
+        explicit row_writer(std::ostream &os, char delimiter = ',', std::size_t buffer_size = 1 << 20)
+            : row_writer([&os](const char *s, std::size_t n) { os.write(s, static_cast<std::streamsize>(n)); },
+                         delimiter, buffer_size)
+        {
+        }
+
+        row_writer(const row_writer &) = delete;
+        row_writer &operator=(const row_writer &) = delete;
+
+        ~row_writer()
+        {
+            flush();
+        }
+
+        template <typename T>
+        typename std::enable_if<std::is_integral<T>::value && !std::is_same<T, bool>::value>::type
+        write(T v)
+        {
+            begin_field();
+            char tmp[24];
+            char *end = tmp + sizeof(tmp);
+            char *p = end;
+            typedef typename std::make_unsigned<T>::type U;
+            const bool negative = v < 0;
+            U u = negative ? static_cast<U>(0) - static_cast<U>(v) : static_cast<U>(v);
+            do
+            {
+                *--p = static_cast<char>('0' + u % 10);
+                u /= 10;
+            } while (u);
+            if (negative)
+                *--p = '-';
+            m_buffer.append(p, end);
+        }
+
+        void write(bool v)
+        {
+            begin_field();
+            m_buffer.push_back(v ? '1' : '0');
+        }
+
+        template <typename T>
+        typename std::enable_if<std::is_floating_point<T>::value>::type
+        write(T v)
+        {
+            begin_field();
+            char tmp[max_field_size];
+#if defined(__cpp_lib_to_chars) && __cpp_lib_to_chars >= 201611L
+            // shortest representation which is parsed back into the same value
+            auto r = std::to_chars(tmp, tmp + sizeof(tmp), v);
+            m_buffer.append(tmp, r.ptr);
+#else
+            // the short form `digits10` is used if it is parsed back into the same value
+            int n = std::snprintf(tmp, sizeof(tmp), "%.*g", std::numeric_limits<T>::digits10,
+                                  static_cast<double>(v));
+            if (static_cast<T>(std::strtod(tmp, nullptr)) != v)
+                n = std::snprintf(tmp, sizeof(tmp), "%.*g", std::numeric_limits<T>::max_digits10,
+                                  static_cast<double>(v));
+            m_buffer.append(tmp, static_cast<std::size_t>(n));
+#endif
+        }
+
+        template <typename T>
+        typename std::enable_if<std::is_enum<T>::value>::type
+        write(T v)
+        {
+            write(static_cast<typename std::underlying_type<T>::type>(v));
+        }
+
+        void write(const std::string &s)
+        {
+            write_string(s.data(), s.size());
+        }
+
+        /// nullptr is written as an empty field
+        void write(const char *s)
+        {
+            write_string(s ? s : "", s ? std::strlen(s) : 0);
+        }
+
+        /// the field is quoted only if it has the delimiter, quote or line break
+        void write_string(const char *s, std::size_t n)
+        {
+            begin_field();
+            bool quote = false;
+            for (std::size_t i = 0; i < n && !quote; i++)
+                quote = s[i] == m_delimiter || s[i] == '"' || s[i] == '\n' || s[i] == '\r';
+            if (!quote)
+            {
+                m_buffer.append(s, n);
+                return;
+            }
+            m_buffer.push_back('"');
+            for (std::size_t i = 0; i < n; i++)
+            {
+                if (s[i] == '"')
+                    m_buffer.push_back('"');
+                m_buffer.push_back(s[i]);
+            }
+            m_buffer.push_back('"');
+        }
+
+        void end_row()
+        {
+            m_buffer.push_back('\n');
+            m_first_field = true;
+            if (m_buffer.size() >= m_capacity)
+                flush();
+        }
+
+        void flush()
+        {
+            if (!m_buffer.empty())
+                m_output(m_buffer.data(), m_buffer.size());
+            m_buffer.clear();
+        }
+
+    private:
+        static const std::size_t max_field_size = 64;
+
+        void begin_field()
+        {
+            if (!m_first_field)
+                m_buffer.push_back(m_delimiter);
+            m_first_field = false;
+        }
+
+        output_t m_output;
+        char m_delimiter;
+        std::size_t m_capacity;
+        std::string m_buffer;
+        bool m_first_field = true;
+    };
+
+    /// header line of flattened column names
+    template <class T>
+    void write_header(row_writer &w)
+    {
+        for (const auto &name : codec<T>::columns())
+            w.write(name);
+        w.end_row();
+    }
+
+    template <class T>
+    void write_csv(std::FILE *file, const std::vector<T> &records, char delimiter = ',')
+    {
+        row_writer w(file, delimiter);
+        write_header<T>(w);
+        for (const auto &r : records)
+            codec<T>::write_row(w, r);
+    }
+
+    template <class T>
+    void write_csv(const std::string &file_name, const std::vector<T> &records, char delimiter = ',')
+    {
+        std::FILE *file = std::fopen(file_name.c_str(), "wb");
+        if (!file)
+            throw std::runtime_error("can not open file to write: " + file_name);
+        write_csv<T>(file, records, delimiter);
+        std::fclose(file);
+    }
+
+    /// missing column, index < 0, is skipped
+    template <typename T>
+    typename std::enable_if<std::is_arithmetic<T>::value && !std::is_same<T, bool>::value>::type
+    read_field(csv::CSVRow &row, int index, T &value)
+    {
+        if (index >= 0)
+            value = row[static_cast<std::size_t>(index)].get<T>();
+    }
+
+    inline void read_field(csv::CSVRow &row, int index, bool &value)
+    {
+        if (index >= 0)
+            value = row[static_cast<std::size_t>(index)].get<int>() != 0;
+    }
+
+    template <typename T>
+    typename std::enable_if<std::is_enum<T>::value>::type
+    read_field(csv::CSVRow &row, int index, T &value)
+    {
+        if (index >= 0)
+            value = static_cast<T>(row[static_cast<std::size_t>(index)].get<typename std::underlying_type<T>::type>());
+    }
+
+    inline void read_field(csv::CSVRow &row, int index, std::string &value)
+    {
+        if (index >= 0)
+            value = row[static_cast<std::size_t>(index)].get<std::string>();
+    }
+
+    /// column indices of `codec<T>::columns()` in the file, -1 if the column is not found
+    template <class T>
+    std::vector<int> column_indices(const csv::CSVReader &reader)
+    {
+        std::vector<int> indices;
+        for (const auto &name : codec<T>::columns())
+            indices.push_back(reader.index_of(name));
+        return indices;
+    }
+
+    /// read all rows of the reader into records, each row is parsed into a record directly
+    template <class T>
+    std::vector<T> read_rows(csv::CSVReader &reader)
+    {
+        const std::vector<int> indices = column_indices<T>(reader);
+        std::vector<T> records;
+        csv::CSVRow row;
+        while (reader.read_row(row))
+        {
+            records.emplace_back();
+            codec<T>::read_row(row, indices.data(), records.back());
+        }
+        return records;
+    }
+
+    template <class T>
+    std::vector<T> read_csv(const std::string &file_name, char delimiter = ',')
+    {
+        csv::CSVFormat format;
+        format.delimiter(delimiter).header_row(0);
+        csv::CSVReader reader(file_name, format);
+        return read_rows<T>(reader);
+    }
+} // namespace CSV
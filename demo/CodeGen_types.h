@@ -11,6 +11,7 @@ namespace CodeGen
         int integer;
         double scalar;
         float scalar_array[3];
+        float cstyle_matrix[2][2]; // H5::ArrayType of rank 2
     };
 
     /// example complex type data to write into HDF5,  not a realist data type
@@ -30,6 +31,9 @@ namespace CodeGen
         std::string std_str; // std::string is not trivial copyable
 
         std::vector<int> vlen_vector; // variable length array/vector
+        // packed into a single buffer, rows must have the same size;
+        // with `--ragged-csr`, rows of any size are appended into CSR datasets next to the dataset
+        std::vector<std::vector<double>> vlen_matrix;
 
         //int &int_reference;  // must init in ctor
         //double *scalar_pointer;
@@ -0,0 +1,39 @@
+#include "CodeGen_types_csv.h"
+using namespace CodeGen;
+
+#include <cassert> // will be disabled if NDEBUG macro is defined
+#include <iostream>
+#include <sstream>
+
+int main()
+{
+    CDataStruct v1 = {1, 2.3, {1.0, 2.0, 3.0}};
+    CDataStruct v2 = {10, 23.0, {4.0, 5.0, 6.0}};
+    std::vector<ComplexData> cvalues;
+    cvalues.emplace_back(1.0, v1, "std_string1", std::array<double, 3>{1.1, 2.2, 3.2}, std::vector<int>{1, 2});
+    cvalues.emplace_back(2.0, v2, "std_string, \"quoted\"", std::array<double, 3>{4.4, 5.5, 6.6}, std::vector<int>{1, 2, 3, 4});
+    cvalues[1].int_array[1] = -7;
+    for (auto &v : cvalues)
+        v.c_str = v.std_str.c_str(); // reset after the vector reallocation
+
+    // flattened columns: `int_array_0`, `ds.integer`, ..., variable-length fields are skipped
+    const std::string file_name = "CodeGen_demo.csv";
+    CSV::write_csv(file_name, cvalues);
+
+    std::vector<ComplexData> records = CSV::read_csv<ComplexData>(file_name);
+    assert(records.size() == cvalues.size());
+    assert(records[1].std_str == cvalues[1].std_str && records[1].int_array[1] == -7);
+    assert(records[0].std_array == cvalues[0].std_array && records[1].ds.integer == 10);
+    assert(records[0].ds.scalar == cvalues[0].ds.scalar);
+
+    // row writer to any output, e.g. a stream, the buffer is written as a block
+    std::stringstream ss;
+    {
+        CSV::row_writer w(ss, ';');
+        CSV::write_header<CDataStruct>(w);
+        CSV::codec<CDataStruct>::write_row(w, v2);
+    }
+    std::cout << ss.str();
+
+    std::cout << "csv serialization demo completed successfully\n";
+}
@@ -0,0 +1,134 @@
+#pragma once
+        // this file is generated by a python script, do not edit manually
+        
+#include <string>
+        #include <vector>
+        #include "CodeGen_types.h"
+        #include "CSVIO.h"
+        
+
+namespace CodeGen{/// this code section declare types, put into header file
+
+/// implication code, put into cpp file
+} // namespace CodeGen
+
+
+namespace CSV{
+template <>
+        struct codec<CodeGen::CDataStruct>
+        {
+            static const std::vector<std::string> &columns()
+            {
+                static const std::vector<std::string> names = {
+                    "integer",
+                    "scalar",
+                    "scalar_array_0",
+                    "scalar_array_1",
+                    "scalar_array_2",
+                    "cstyle_matrix_0_0",
+                    "cstyle_matrix_0_1",
+                    "cstyle_matrix_1_0",
+                    "cstyle_matrix_1_1"};
+                return names;
+            }
+
+            static void write_row(row_writer &w, const CodeGen::CDataStruct &obj)
+            {
+                w.write(obj.integer);
+                w.write(obj.scalar);
+                w.write(obj.scalar_array[0]);
+                w.write(obj.scalar_array[1]);
+                w.write(obj.scalar_array[2]);
+                w.write(obj.cstyle_matrix[0][0]);
+                w.write(obj.cstyle_matrix[0][1]);
+                w.write(obj.cstyle_matrix[1][0]);
+                w.write(obj.cstyle_matrix[1][1]);
+                w.end_row();
+            }
+
+            /// `index[i]` is the position of `columns()[i]` in the row, negative if the column is missing
+            static void read_row(csv::CSVRow &row, const int *index, CodeGen::CDataStruct &obj)
+            {
+                CSV::read_field(row, index[0], obj.integer);
+                CSV::read_field(row, index[1], obj.scalar);
+                CSV::read_field(row, index[2], obj.scalar_array[0]);
+                CSV::read_field(row, index[3], obj.scalar_array[1]);
+                CSV::read_field(row, index[4], obj.scalar_array[2]);
+                CSV::read_field(row, index[5], obj.cstyle_matrix[0][0]);
+                CSV::read_field(row, index[6], obj.cstyle_matrix[0][1]);
+                CSV::read_field(row, index[7], obj.cstyle_matrix[1][0]);
+                CSV::read_field(row, index[8], obj.cstyle_matrix[1][1]);
+            }
+        };
+        
+template <>
+        struct codec<CodeGen::ComplexData>
+        {
+            static const std::vector<std::string> &columns()
+            {
+                static const std::vector<std::string> names = {
+                    "scalar",
+                    "int_array_0",
+                    "int_array_1",
+                    "std_array_0",
+                    "std_array_1",
+                    "std_array_2",
+                    "ds.integer",
+                    "ds.scalar",
+                    "ds.scalar_array_0",
+                    "ds.scalar_array_1",
+                    "ds.scalar_array_2",
+                    "ds.cstyle_matrix_0_0",
+                    "ds.cstyle_matrix_0_1",
+                    "ds.cstyle_matrix_1_0",
+                    "ds.cstyle_matrix_1_1",
+                    "c_str",
+                    "std_str"};
+                return names;
+            }
+
+            static void write_row(row_writer &w, const CodeGen::ComplexData &obj)
+            {
+                w.write(obj.scalar);
+                w.write(obj.int_array[0]);
+                w.write(obj.int_array[1]);
+                w.write(obj.std_array[0]);
+                w.write(obj.std_array[1]);
+                w.write(obj.std_array[2]);
+                w.write(obj.ds.integer);
+                w.write(obj.ds.scalar);
+                w.write(obj.ds.scalar_array[0]);
+                w.write(obj.ds.scalar_array[1]);
+                w.write(obj.ds.scalar_array[2]);
+                w.write(obj.ds.cstyle_matrix[0][0]);
+                w.write(obj.ds.cstyle_matrix[0][1]);
+                w.write(obj.ds.cstyle_matrix[1][0]);
+                w.write(obj.ds.cstyle_matrix[1][1]);
+                w.write(obj.c_str);
+                w.write(obj.std_str);
+                w.end_row();
+            }
+
+            /// `index[i]` is the position of `columns()[i]` in the row, negative if the column is missing
+            static void read_row(csv::CSVRow &row, const int *index, CodeGen::ComplexData &obj)
+            {
+                CSV::read_field(row, index[0], obj.scalar);
+                CSV::read_field(row, index[1], obj.int_array[0]);
+                CSV::read_field(row, index[2], obj.int_array[1]);
+                CSV::read_field(row, index[3], obj.std_array[0]);
+                CSV::read_field(row, index[4], obj.std_array[1]);
+                CSV::read_field(row, index[5], obj.std_array[2]);
+                CSV::read_field(row, index[6], obj.ds.integer);
+                CSV::read_field(row, index[7], obj.ds.scalar);
+                CSV::read_field(row, index[8], obj.ds.scalar_array[0]);
+                CSV::read_field(row, index[9], obj.ds.scalar_array[1]);
+                CSV::read_field(row, index[10], obj.ds.scalar_array[2]);
+                CSV::read_field(row, index[11], obj.ds.cstyle_matrix[0][0]);
+                CSV::read_field(row, index[12], obj.ds.cstyle_matrix[0][1]);
+                CSV::read_field(row, index[13], obj.ds.cstyle_matrix[1][0]);
+                CSV::read_field(row, index[14], obj.ds.cstyle_matrix[1][1]);
+                CSV::read_field(row, index[16], obj.std_str);
+            }
+        };
+        
+} // namespace CSV 
\ No newline at end of file
@@ -1,9 +1,19 @@
 #include "HDF5IO.h"
-
+#include "HDF5_Pipeline.h"
+#include "HDF5_Mmap.h"
+
+// the generated header of the layout this demo is built for, see demo/CMakeLists.txt
+#if CODEGEN_DEMO_COLUMNAR
+#include "CodeGen_types_hdf5_columnar.h"
+#elif CODEGEN_DEMO_RAGGED_CSR
+#include "CodeGen_types_hdf5_csr.h"
+#else
 #include "CodeGen_types_hdf5.h"
+#endif
 using namespace CodeGen;
 
 #include <cassert> // will be disabled if NDEBUG macro is defined
+#include <thread>
 
 // https://support.hdfgroup.org/HDF5/doc/cpplus_RM/compound_8cpp-example.html
 
@@ -25,6 +35,11 @@ void test_h5(std::shared_ptr<H5File> file)
     ComplexData cd1(1.0, v1, "std_string1", {1.1, 2.2, 3.2}, {1, 2});
 
     ComplexData cd2(2.0, v2, "std_string_value2", {4.4, 5.5, 6.6}, {1, 2, 3, 4});
+#if CODEGEN_DEMO_RAGGED_CSR
+    cd2.vlen_matrix = {{1.0, 2.0}, {3.0}, {4.0, 5.0, 6.0}}; // ragged rows in CSR datasets
+#else
+    cd2.vlen_matrix = {{1.0, 2.0}, {3.0, 4.0}, {5.0, 6.0}}; // packed into a single buffer, rows of the same size
+#endif
 #else
     ComplexData cd1(1.0, v1); // = {1.0, {1, 2, 3}, "complex", v1};
     ComplexData cd2(2.0, v2); //  = {2.0, {4, 5, 6}, "complex", v2};
@@ -35,17 +50,97 @@ void test_h5(std::shared_ptr<H5File> file)
     // std::array<> is trivially-copyable, so it is working
     data::IO::WriteAttribute<CDataStruct>(v1, file, "simple_data_attrib");
 
+    // contiguous dataset of POD records, mapped from the file without copy, or read if it can not be mapped
+    data::IO::WriteVector<CDataStruct>(values, file, DS_NAME, HDF5::StoragePolicy::contiguous());
+    {
+        HDF5::MappedVector<CDataStruct> mapped(file, DS_NAME);
+        assert(mapped.size() == 2 && mapped[1].integer == v2.integer && mapped[1].scalar_array[2] == 6.0f);
+        std::cout << DS_NAME << (mapped.is_mapped() ? " is mapped" : " is read") << std::endl;
+    }
+
 #if DATA_USE_COMPLEX_FIELDS
     data::IO::WriteVector<ComplexData>(cvalues, file, "complex_data");
-    // writing is correct, but ReadVector() still fail
-    // auto cv = data::IO::ReadVector<ComplexData>(file, "complex_data",
-    //                                              ComplexData_deserialize);
-    // for (const ComplexData &v : cv)
-    // {
-    //     std::cout << v.ds.integer << std::endl;
-    // }
+    auto cv = data::IO::ReadVector<ComplexData>(file, "complex_data");
+    assert(cv.size() == cvalues.size());
+    for (const ComplexData &v : cv)
+    {
+        std::cout << v.ds.integer << ", " << v.std_str << ", " << v.vlen_vector.size() << std::endl;
+    }
+    assert(cv[1].vlen_matrix == cd2.vlen_matrix);
+
+    {
+        // extendible dataset, records are written by every 3 records and on destruction
+        data::IO::Appender<ComplexData> appender(file, "complex_data_series", 3);
+        for (int step = 0; step < 10; step++)
+        {
+            cd1.scalar = step;
+            appender.append(cd1);
+        }
+    }
+    auto series = data::IO::ReadVector<ComplexData>(file, "complex_data_series");
+    assert(series.size() == 10 && series[9].scalar == 9.0 && series[9].std_str == cd1.std_str);
+
+    {
+        // records are converted by 2 worker threads and written by an I/O thread, in blocks of 4 records
+        HDF5::PipelinedWriter<ComplexData> writer(file, "complex_data_pipelined", 2, 4);
+        for (int step = 0; step < 10; step++)
+        {
+            cd1.scalar = step;
+            writer.append(cd1);
+        }
+    }
+    auto pipelined = data::IO::ReadVector<ComplexData>(file, "complex_data_pipelined");
+    assert(pipelined.size() == 10 && pipelined[9].scalar == 9.0 && pipelined[9].vlen_matrix == cd1.vlen_matrix);
+
+    // read only some members, the vlen members are not read
+    DataSet series_dataset = file->openDataSet("complex_data_series");
+    std::vector<double> scalars = ComplexData_read_scalar(series_dataset);
+    auto structs = ComplexData_read_ds(series_dataset);
+    assert(scalars.size() == 10 && scalars[9] == 9.0 && structs[9].integer == v1.integer);
+    auto int_arrays = data::IO::ReadMember<std::array<int, 2>, ComplexData>(file, "complex_data_series", "int_array");
+    assert(int_arrays.size() == 10);
+
+    // range read, and block-wise read with a bounded buffer
+    auto part = data::IO::ReadVector<ComplexData>(file, "complex_data_series", 4, 3);
+    assert(part.size() == 3 && part[0].scalar == 4.0);
+    data::IO::BlockReader<ComplexData> reader(file, "complex_data_series", 4);
+    double sum = 0;
+    for (const ComplexData &r : reader)
+        sum += r.scalar;
+    assert(sum == 45.0);
+
+    // zero-copy read, vlen members point into the arena until it is cleared or destroyed
+    HDF5::VlenArena arena;
+    DataSet complex_dataset = file->openDataSet("complex_data");
+    auto views = ComplexData_read_views(complex_dataset, arena);
+    assert(views[1].vlen_vector_view().size() == 4);
+#if CODEGEN_DEMO_RAGGED_CSR
+    // rows of the nested vector of all records by one read of each CSR dataset, viewed per record
+    auto matrix_rows = ComplexData_read_vlen_matrix_rows(complex_dataset, views.data(), views.size());
+    auto matrix_view = views[1].vlen_matrix_view(matrix_rows);
+    assert(matrix_view.rows() == 3 && matrix_view[1].size() == 1 && matrix_view[2][2] == 6.0);
 #else
-    data::IO::WriteVector<ComplexData>(cvalues, file, "complex_data", ComplexData_h5type);
+    auto matrix_view = views[1].vlen_matrix_view();
+    assert(matrix_view.rows() == 3 && matrix_view.cols() == 2 && matrix_view(2, 1) == 6.0);
+#endif
+    assert(std::string(views[1].std_str_cstr) == cd2.std_str);
+#if DATA_HAS_STRING_VIEW
+    assert(views[0].std_str_view() == cd1.std_str);
+#endif
+
+#if CODEGEN_DEMO_COLUMNAR
+    // struct-of-arrays, one dataset per member, a member is scanned without reading the others
+    data::IO::WriteColumns<ComplexData>(series, file, "complex_data_columns");
+    auto columns = data::IO::ReadColumns<ComplexData>(file, "complex_data_columns", 2, 5);
+    assert(columns.size() == 5 && columns[0].scalar == 2.0 && columns[4].ds.integer == v1.integer);
+    assert(columns[4].std_str == cd1.std_str && columns[4].vlen_vector == cd1.vlen_vector);
+    auto scalar_column = data::IO::ReadColumn<double>(file, "complex_data_columns/scalar", 8);
+    assert(scalar_column.size() == 2 && scalar_column[1] == 9.0);
+    auto vector_column = data::IO::ReadRagged<int>(file, "complex_data_columns/vlen_vector");
+    assert(vector_column.rows() == 10 && vector_column[9].size() == cd1.vlen_vector.size());
+#endif
+#else
+    data::IO::WriteVector<ComplexData>(cvalues, file, "complex_data");
 #endif
 
     std::vector<std::string> lines = {"line1", "line2"};
@@ -55,7 +150,21 @@ void test_h5(std::shared_ptr<H5File> file)
     data::IO::WriteMatrix<int>(mat, file, "IntMatrix");
 
     auto m = data::IO::ReadMatrix<int>(file, "IntMatrix");
-    assert(m.size() == 2);
+    assert(m == mat);
+
+    // row-major flat buffer, a strided view writes a block without copy
+    data::Matrix<double> fmat(3, 4);
+    for (size_t i = 0; i < fmat.rows(); i++)
+        for (size_t j = 0; j < fmat.cols(); j++)
+            fmat(i, j) = i * 10 + j;
+    data::MatrixView<const double> block(fmat.data() + 1, 3, 2, fmat.cols()); // columns 1, 2
+    data::IO::WriteMatrix<double>(block, file, "DoubleMatrixBlock");
+    auto fm = data::IO::ReadFlatMatrix<double>(file, "DoubleMatrixBlock");
+    assert(fm.rows() == 3 && fm.cols() == 2 && fm(2, 1) == 22.0);
+
+    // chunked and compressed per call, or per type by `HDF5::to_h5storage<T>::get()`
+    auto policy = HDF5::StoragePolicy::chunked(sizeof(double)).set_shuffle().set_deflate(6);
+    data::IO::WriteMatrix<double>(fmat, file, "DoubleMatrixCompressed", policy);
 
 #if DATA_USE_EIGEN
 
@@ -65,9 +174,12 @@ void test_h5(std::shared_ptr<H5File> file)
     /// directly use EigenHDF5::save,  it is working
     EigenHDF5::save(*file, "EigenMatrixDataSet", emat); // first param is a reference  type
 
-    // still some compiling error, anyway, just use EigenHDF5::save
-    //data::IO::WriteEigen(emat, *file, "EigenMatrix");
-    //auto em = data::IO::ReadEigen<Eigen::Matrix3d>(*file, "EigenMatrix");
+    // written from `emat.data()` in column-major order, the dataset is marked by the attribute `storage_order`
+    data::IO::WriteEigen(emat, file, "EigenMatrix");
+    auto em = data::IO::ReadEigen<Eigen::Matrix3d>(file, "EigenMatrix");
+    assert(em == emat);
+    auto em_rm = data::IO::ReadEigen<Eigen::Matrix<double, 3, 3, Eigen::RowMajor>>(file, "EigenMatrix");
+    assert(em_rm == emat);
 #endif
 }
 
@@ -75,10 +187,21 @@ int main()
 {
     /// this part demo model result writting into HDF5
     std::shared_ptr<H5File> file = std::make_shared<H5File>(H5FILE_NAME, H5F_ACC_TRUNC);
-    init_h5types();
+    // no init call is needed, CompType is built on first use, also from concurrent threads
+    std::vector<const H5::DataType *> types(4);
+    std::vector<std::thread> threads;
+    for (size_t i = 0; i < types.size(); i++)
+        threads.emplace_back([&types, i]() { types[i] = HDF5::to_h5type<ComplexData>::get(); });
+    for (auto &t : threads)
+        t.join();
+    assert(types[0] == types[3] && types[0]->getSize() == sizeof(ComplexData_hvl));
     //test_vlen(file);  // error
     test_h5(file);
 
     file->close();
+#if DATA_H5_INSTRUMENT
+    // statistics per operation, dataset and type, enabled by `-DDATA_H5_INSTRUMENT=1`
+    std::cout << HDF5::instrument::registry::instance().to_json();
+#endif
     std::cout << "HDF5 serialization demo completed successfully\n";
 }
\ No newline at end of file
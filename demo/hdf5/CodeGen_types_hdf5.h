@@ -0,0 +1,596 @@
+#pragma once
+        // this file is generated by a python script, do not edit manually
+        
+#include <H5Cpp.h>
+        #include <cstring>
+        #include <array>
+        #include <vector>
+        #include "CodeGen_types.h"
+        #include "HDF5_TypeTraits.h"
+        #include "DataMatrix.h"
+        #define TO_H5T(type_name)         (*HDF5::to_h5type<type_name>::get())
+        
+#include "HDF5IO.h"
+#include "HDF5_Ragged.h"
+
+namespace CodeGen{/// this code section declare types, put into header file
+inline const H5::CompType &CDataStruct_h5type();
+inline const H5::CompType &ComplexData_h5type();
+
+        #if defined(__GNUC__)
+        #pragma GCC diagnostic push
+        #pragma GCC diagnostic ignored "-Winvalid-offsetof"
+        #endif 
+inline const H5::CompType &CDataStruct_h5type()
+        {
+            static const H5::CompType type = []() {
+                H5::CompType h5type(sizeof(CDataStruct));
+                h5type.insertMember("integer", 
+                HOFFSET(CDataStruct, integer), TO_H5T(int));
+h5type.insertMember("scalar", 
+                HOFFSET(CDataStruct, scalar), TO_H5T(double));
+
+        hsize_t CDataStruct_scalar_array_dims[] = {3};
+        auto CDataStruct_scalar_array_h5type = H5::ArrayType(TO_H5T(float), 1, CDataStruct_scalar_array_dims);
+        h5type.insertMember("scalar_array", 
+            HOFFSET(CDataStruct, scalar_array), CDataStruct_scalar_array_h5type);
+
+        hsize_t CDataStruct_cstyle_matrix_dims[] = {2, 2};
+        auto CDataStruct_cstyle_matrix_h5type = H5::ArrayType(TO_H5T(float), 2, CDataStruct_cstyle_matrix_dims);
+        h5type.insertMember("cstyle_matrix", 
+            HOFFSET(CDataStruct, cstyle_matrix), CDataStruct_cstyle_matrix_h5type);
+                return h5type;
+            }();
+            return type;
+        }
+        
+class ComplexData_hvl : public ComplexData{
+            public:
+            // make base class's private and protected field public
+            // using ComplexData::field_name;
+
+            /// extra hvl_t fields for all varlen fields of the base class
+            const char* std_str_cstr;
+hvl_t vlen_vector_hvl;
+unsigned long long vlen_matrix_row_start;
+unsigned long long vlen_matrix_rows;
+
+            ComplexData_hvl (){  }  // default ctor
+
+            ComplexData_hvl (const ComplexData& obj): ComplexData(obj)
+            {
+                std_str_cstr = obj.std_str.c_str();
+vlen_vector_hvl.p = const_cast<int*>(obj.vlen_vector.data());
+vlen_vector_hvl.len = obj.vlen_vector.size();
+vlen_matrix_row_start = 0;
+vlen_matrix_rows = obj.vlen_matrix.size();
+            }
+
+            /// for batch write, vlen fields point into the buffers of `obj` without copy
+            /// `obj` must outlive this view object
+            ComplexData_hvl (const ComplexData& obj, HDF5::hvl_view_t)
+            {
+                scalar = obj.scalar;
+std::memcpy(&int_array, &obj.int_array, sizeof(int_array));
+std_array = obj.std_array;
+ds = obj.ds;
+c_str = obj.c_str;
+                std_str_cstr = obj.std_str.c_str();
+vlen_vector_hvl.p = const_cast<int*>(obj.vlen_vector.data());
+vlen_vector_hvl.len = obj.vlen_vector.size();
+vlen_matrix_row_start = 0;
+vlen_matrix_rows = obj.vlen_matrix.size();
+            }
+
+            /// needed for deserialization, the base object is moved out
+            ComplexData get_base()
+            {
+                std_str = std_str_cstr;
+
+                auto vlen_vector_ptr = static_cast<int*>(vlen_vector_hvl.p);
+                vlen_vector.assign(vlen_vector_ptr, vlen_vector_ptr + vlen_vector_hvl.len);
+                
+                return std::move(static_cast<ComplexData&>(*this));
+            }
+
+            /// views of the vlen fields after `ComplexData_read_views()`, no copy
+            #if DATA_HAS_STRING_VIEW
+            std::string_view std_str_view() const { return std_str_cstr ? std::string_view(std_str_cstr) : std::string_view(); }
+            #endif
+data::ArrayView<const int> vlen_vector_view() const
+            {
+                return {static_cast<const int*>(vlen_vector_hvl.p), vlen_vector_hvl.len};
+            }
+data::RaggedView<const double> vlen_matrix_view(const HDF5::RaggedRows<double> &rows) const
+            {
+                return rows.view(vlen_matrix_row_start, vlen_matrix_rows);
+            }
+
+        };
+        
+inline const H5::CompType &ComplexData_h5type()
+        {
+            static const H5::CompType type = []() {
+                H5::CompType h5type(sizeof(ComplexData_hvl));
+                h5type.insertMember("scalar", 
+                HOFFSET(ComplexData_hvl, scalar), TO_H5T(double));
+
+        hsize_t ComplexData_hvl_int_array_dims[] = {2};
+        auto ComplexData_hvl_int_array_h5type = H5::ArrayType(TO_H5T(int), 1, ComplexData_hvl_int_array_dims);
+        h5type.insertMember("int_array", 
+            HOFFSET(ComplexData_hvl, int_array), ComplexData_hvl_int_array_h5type);
+
+        hsize_t ComplexData_hvl_std_array_dims[] = {3};
+        auto ComplexData_hvl_std_array_h5type = H5::ArrayType(TO_H5T(double), 1, ComplexData_hvl_std_array_dims);
+        h5type.insertMember("std_array", 
+            HOFFSET(ComplexData_hvl, std_array), ComplexData_hvl_std_array_h5type);
+h5type.insertMember("ds", 
+                    HOFFSET(ComplexData_hvl, ds), CDataStruct_h5type());
+
+        auto ComplexData_hvl_c_str_h5type = H5::StrType(H5::PredType::C_S1, H5T_VARIABLE);
+        h5type.insertMember("c_str", 
+            HOFFSET(ComplexData_hvl, c_str), ComplexData_hvl_c_str_h5type);
+
+        auto ComplexData_hvl_std_str_h5type = H5::StrType(H5::PredType::C_S1, H5T_VARIABLE);
+        h5type.insertMember("std_str", 
+            HOFFSET(ComplexData_hvl, std_str_cstr), ComplexData_hvl_std_str_h5type);
+
+        auto ComplexData_hvl_vlen_vector_h5type = H5::VarLenType(TO_H5T(int));
+        h5type.insertMember("vlen_vector", 
+            HOFFSET(ComplexData_hvl, vlen_vector_hvl), ComplexData_hvl_vlen_vector_h5type);
+
+        h5type.insertMember("vlen_matrix_row_start", 
+            HOFFSET(ComplexData_hvl, vlen_matrix_row_start), TO_H5T(unsigned long long));
+        h5type.insertMember("vlen_matrix_rows", 
+            HOFFSET(ComplexData_hvl, vlen_matrix_rows), TO_H5T(unsigned long long));
+                return h5type;
+            }();
+            return type;
+        }
+        
+
+        #if defined(__GNUC__)
+        #pragma GCC diagnostic pop
+        #endif 
+
+
+        /// optional, CompType is built on first use; call it to build all types eagerly, e.g. at startup
+        inline void init_h5types()
+        {
+            CDataStruct_h5type();
+            ComplexData_h5type();
+        }
+        
+/// read only the member `integer` of all records of a `CDataStruct` dataset
+        std::vector<int> CDataStruct_read_integer(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(CDataStruct_h5type(), sizeof(int), {{"integer", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<int> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `scalar` of all records of a `CDataStruct` dataset
+        std::vector<double> CDataStruct_read_scalar(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(CDataStruct_h5type(), sizeof(double), {{"scalar", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<double> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `scalar_array` of all records of a `CDataStruct` dataset
+        std::vector<std::array<float, 3>> CDataStruct_read_scalar_array(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(CDataStruct_h5type(), sizeof(std::array<float, 3>), {{"scalar_array", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<std::array<float, 3>> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `cstyle_matrix` of all records of a `CDataStruct` dataset
+        std::vector<std::array<std::array<float, 2>, 2>> CDataStruct_read_cstyle_matrix(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(CDataStruct_h5type(), sizeof(std::array<std::array<float, 2>, 2>), {{"cstyle_matrix", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<std::array<std::array<float, 2>, 2>> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// write each member of `count` records into a dataset of `group`, see `data::IO::WriteColumns()`
+        inline void CDataStruct_write_columns(const CDataStruct* records, size_t count,
+                   std::shared_ptr<DATA_H5Location> group, const HDF5::StoragePolicy & policy) {
+            data::IO::WriteColumn<int>(count, {},
+                [&](size_t i) { return &records[i].integer; }, group, "integer", policy);
+data::IO::WriteColumn<double>(count, {},
+                [&](size_t i) { return &records[i].scalar; }, group, "scalar", policy);
+data::IO::WriteColumn<float>(count, {3},
+                [&](size_t i) { return &records[i].scalar_array[0]; }, group, "scalar_array", policy);
+data::IO::WriteColumn<float>(count, {2, 2},
+                [&](size_t i) { return &records[i].cstyle_matrix[0][0]; }, group, "cstyle_matrix", policy);
+        }
+
+        /// read records `[start, start + count)` from the datasets of `group`, see `data::IO::ReadColumns()`
+        inline std::vector<CDataStruct> CDataStruct_read_columns(std::shared_ptr<DATA_H5Location> group,
+                   hsize_t start, hsize_t count) {
+            std::vector<CDataStruct> records(count);
+            data::IO::ReadColumnInto<int>(group, "integer", start, records.size(),
+                [&](size_t i) { return &records[i].integer; });
+data::IO::ReadColumnInto<double>(group, "scalar", start, records.size(),
+                [&](size_t i) { return &records[i].scalar; });
+data::IO::ReadColumnInto<float>(group, "scalar_array", start, records.size(),
+                [&](size_t i) { return &records[i].scalar_array[0]; });
+data::IO::ReadColumnInto<float>(group, "cstyle_matrix", start, records.size(),
+                [&](size_t i) { return &records[i].cstyle_matrix[0][0]; });
+            return records;
+        }
+        
+/// load the rows of `vlen_matrix` of the records by one read of each CSR dataset,
+        /// then `records[i].vlen_matrix_view(rows)` is the view of the rows of record `i`
+        inline HDF5::RaggedRows<double> ComplexData_read_vlen_matrix_rows(const H5::DataSet & dataset,
+                   const ComplexData_hvl* records, size_t count) {
+            unsigned long long first = std::numeric_limits<unsigned long long>::max();
+            unsigned long long last = 0;
+            for (size_t i = 0; i < count; i++)
+            {
+                if (records[i].vlen_matrix_rows == 0)
+                    continue;
+                first = std::min(first, records[i].vlen_matrix_row_start);
+                last = std::max(last, records[i].vlen_matrix_row_start + records[i].vlen_matrix_rows);
+            }
+            if (last == 0)
+                return HDF5::RaggedRows<double>();
+            return HDF5::RaggedStore<double>(dataset, "vlen_matrix").read(first, last - first);
+        }
+        
+
+        /// append the rows of ragged and tensor members of `count` records to their stores next to `dataset`,
+        /// and set the first row of each record in `buf`
+        inline void ComplexData_append_ragged(const ComplexData* first, size_t count, ComplexData_hvl* buf,
+                   H5::DataSet & dataset) {
+            {
+                HDF5::RaggedStore<double> store(dataset, "vlen_matrix", true);
+                data::RaggedArray<double> ragged;
+                for (size_t i = 0; i < count; i++)
+                    for (const auto &row : first[i].vlen_matrix)
+                        ragged.push_back(row.data(), row.size());
+                unsigned long long row = store.append(ragged);
+                for (size_t i = 0; i < count; i++)
+                {
+                    buf[i].vlen_matrix_row_start = row;
+                    row += buf[i].vlen_matrix_rows;
+                }
+            }
+        }
+
+        /// copy the rows of ragged and tensor members of `count` records from their stores into `out`
+        inline void ComplexData_read_ragged(const ComplexData_hvl* buf, size_t count, ComplexData* out,
+                   const H5::DataSet & dataset) {
+            {
+                const auto rows = ComplexData_read_vlen_matrix_rows(dataset, buf, count);
+                for (size_t i = 0; i < count; i++)
+                    out[i].vlen_matrix = buf[i].vlen_matrix_view(rows).to_nested();
+            }
+        }
+        
+void ComplexData_serialize(const ComplexData& obj, H5::DataSet & dataset, 
+                   const H5::DataSpace * memspace, const H5::DataSpace * space) {
+                DATA_H5_PROBE("ComplexData_serialize", dataset.getObjName(), "CodeGen::ComplexData");
+                DATA_H5_PROBE_RECORDS(1, sizeof(ComplexData_hvl));
+                ComplexData_hvl tmp(obj);
+                ComplexData_append_ragged(&obj, 1, &tmp, dataset);
+                if(memspace)
+                    DATA_H5_CALL(dataset.write(&tmp, ComplexData_h5type(), *memspace, *space));
+                else
+                {
+                    // todo check if it attributeval, attrib
+                    //dataset.write(ComplexData_h5type(), &tmp);
+                }
+
+            
+} //  end of `ComplexData` serializer function
+
+/// vlen fields of the staged records point into the buffers of `first`, no HDF5 call
+        inline std::vector<ComplexData_hvl> ComplexData_pack_batch(const ComplexData* first, size_t count) {
+            std::vector<ComplexData_hvl> buf;
+            buf.reserve(count);
+            for (size_t i = 0; i < count; i++)
+                buf.emplace_back(first[i], HDF5::hvl_view_t());
+            return buf;
+        }
+
+        /// write the records staged by `ComplexData_pack_batch()`, `first` must be still alive
+        inline void ComplexData_write_staged(const ComplexData* first, ComplexData_hvl* buf, size_t count,
+                   H5::DataSet & dataset, const H5::DataSpace * memspace, const H5::DataSpace * space) {
+            ComplexData_append_ragged(first, count, buf, dataset);
+            if(memspace)
+                DATA_H5_CALL(dataset.write(buf, ComplexData_h5type(), *memspace, *space));
+            else
+                DATA_H5_CALL(dataset.write(buf, ComplexData_h5type()));
+        }
+
+        void ComplexData_serialize_batch(const ComplexData* first, size_t count,
+                   H5::DataSet & dataset, const H5::DataSpace * memspace, const H5::DataSpace * space) {
+            DATA_H5_PROBE("ComplexData_serialize_batch", dataset.getObjName(), "CodeGen::ComplexData");
+            DATA_H5_PROBE_RECORDS(count, count * sizeof(ComplexData_hvl));
+            auto buf = ComplexData_pack_batch(first, count);
+            ComplexData_write_staged(first, buf.data(), count, dataset, memspace, space);
+        } //  end of `ComplexData` batch serializer function
+        
+ComplexData ComplexData_deserialize(H5::DataSet & dataset, 
+                   const H5::DataSpace * memspace, const H5::DataSpace * space) {
+            DATA_H5_PROBE("ComplexData_deserialize", dataset.getObjName(), "CodeGen::ComplexData");
+            DATA_H5_PROBE_RECORDS(1, sizeof(ComplexData_hvl));
+            HDF5::VlenArena arena(4096);
+            ComplexData_hvl tmp;
+            DATA_H5_CALL(dataset.read(&tmp, ComplexData_h5type(), *memspace, *space, arena.xfer_plist()));
+            ComplexData obj = tmp.get_base();
+            obj.c_str = nullptr;
+            ComplexData_read_ragged(&tmp, 1, &obj, dataset);
+            return obj;
+        }
+
+        /// read the range in one H5Dread into a contiguous hvl buffer, vlen memory from an arena
+        /// released at once after conversion
+        void ComplexData_deserialize_batch(ComplexData* out, size_t count, H5::DataSet & dataset, 
+                   const H5::DataSpace * memspace, const H5::DataSpace * space) {
+            DATA_H5_PROBE("ComplexData_deserialize_batch", dataset.getObjName(), "CodeGen::ComplexData");
+            DATA_H5_PROBE_RECORDS(count, count * sizeof(ComplexData_hvl));
+            HDF5::VlenArena arena;
+            std::vector<ComplexData_hvl> buf(count);
+            if(memspace)
+                DATA_H5_CALL(dataset.read(buf.data(), ComplexData_h5type(), *memspace, *space, arena.xfer_plist()));
+            else
+                DATA_H5_CALL(dataset.read(buf.data(), ComplexData_h5type(), H5::DataSpace::ALL, H5::DataSpace::ALL, arena.xfer_plist()));
+            for (size_t i = 0; i < count; i++)
+            {
+                out[i] = buf[i].get_base();
+                out[i].c_str = nullptr;
+            }
+            ComplexData_read_ragged(buf.data(), count, out, dataset);
+        } //  end of `ComplexData` batch deserializer function
+
+        /// zero-copy read of `count` records from `start`, all if `count == 0`, vlen fields are not
+        /// converted but point into `arena`, see `ComplexData_hvl::<field>_view()`; valid until the arena is cleared
+        std::vector<ComplexData_hvl> ComplexData_read_views(const H5::DataSet & dataset, HDF5::VlenArena & arena,
+                   hsize_t start = 0, hsize_t count = 0) {
+            H5::DataSpace space = dataset.getSpace();
+            hsize_t dims[1];
+            space.getSimpleExtentDims(dims);
+            start = std::min(start, dims[0]);
+            if (count == 0 || start + count > dims[0])
+                count = dims[0] - start;
+            std::vector<ComplexData_hvl> buf(count);
+            if (count == 0)
+                return buf;
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            dataset.read(buf.data(), ComplexData_h5type(), memspace, space, arena.xfer_plist());
+            return buf;
+        }
+        
+/// read only the member `scalar` of all records of a `ComplexData` dataset
+        std::vector<double> ComplexData_read_scalar(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(ComplexData_h5type(), sizeof(double), {{"scalar", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<double> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `int_array` of all records of a `ComplexData` dataset
+        std::vector<std::array<int, 2>> ComplexData_read_int_array(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(ComplexData_h5type(), sizeof(std::array<int, 2>), {{"int_array", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<std::array<int, 2>> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `std_array` of all records of a `ComplexData` dataset
+        std::vector<std::array<double, 3>> ComplexData_read_std_array(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(ComplexData_h5type(), sizeof(std::array<double, 3>), {{"std_array", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<std::array<double, 3>> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// read only the member `ds` of all records of a `ComplexData` dataset
+        std::vector<CDataStruct> ComplexData_read_ds(const H5::DataSet & dataset) {
+            auto ptype = HDF5::projection_type(ComplexData_h5type(), sizeof(CDataStruct), {{"ds", 0}});
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<CDataStruct> vec(dims[0]);
+            if (dims[0] > 0)
+                dataset.read(vec.data(), ptype);
+            return vec;
+        }
+        
+/// write each member of `count` records into a dataset of `group`, see `data::IO::WriteColumns()`
+        inline void ComplexData_write_columns(const ComplexData* records, size_t count,
+                   std::shared_ptr<DATA_H5Location> group, const HDF5::StoragePolicy & policy) {
+            data::IO::WriteColumn<double>(count, {},
+                [&](size_t i) { return &records[i].scalar; }, group, "scalar", policy);
+data::IO::WriteColumn<int>(count, {2},
+                [&](size_t i) { return &records[i].int_array[0]; }, group, "int_array", policy);
+data::IO::WriteColumn<double>(count, {3},
+                [&](size_t i) { return &records[i].std_array[0]; }, group, "std_array", policy);
+data::IO::WriteColumn<int>(count, {},
+                [&](size_t i) { return &records[i].ds.integer; }, group, "ds.integer", policy);
+data::IO::WriteColumn<double>(count, {},
+                [&](size_t i) { return &records[i].ds.scalar; }, group, "ds.scalar", policy);
+data::IO::WriteColumn<float>(count, {3},
+                [&](size_t i) { return &records[i].ds.scalar_array[0]; }, group, "ds.scalar_array", policy);
+data::IO::WriteColumn<float>(count, {2, 2},
+                [&](size_t i) { return &records[i].ds.cstyle_matrix[0][0]; }, group, "ds.cstyle_matrix", policy);
+data::IO::WriteVlenColumn<char>(count,
+                [&](size_t i) { return data::ArrayView<const char>(records[i].c_str ? records[i].c_str : "", records[i].c_str ? std::strlen(records[i].c_str) : 0); }, group, "c_str", policy);
+data::IO::WriteVlenColumn<char>(count,
+                [&](size_t i) { return data::ArrayView<const char>(records[i].std_str.data(), records[i].std_str.size()); }, group, "std_str", policy);
+data::IO::WriteVlenColumn<int>(count,
+                [&](size_t i) { return data::ArrayView<const int>(records[i].vlen_vector.data(), records[i].vlen_vector.size()); }, group, "vlen_vector", policy);
+// WARNING: skip `vlen_matrix` of type `int`
+        }
+
+        /// read records `[start, start + count)` from the datasets of `group`, see `data::IO::ReadColumns()`
+        inline std::vector<ComplexData> ComplexData_read_columns(std::shared_ptr<DATA_H5Location> group,
+                   hsize_t start, hsize_t count) {
+            std::vector<ComplexData> records(count);
+            data::IO::ReadColumnInto<double>(group, "scalar", start, records.size(),
+                [&](size_t i) { return &records[i].scalar; });
+data::IO::ReadColumnInto<int>(group, "int_array", start, records.size(),
+                [&](size_t i) { return &records[i].int_array[0]; });
+data::IO::ReadColumnInto<double>(group, "std_array", start, records.size(),
+                [&](size_t i) { return &records[i].std_array[0]; });
+data::IO::ReadColumnInto<int>(group, "ds.integer", start, records.size(),
+                [&](size_t i) { return &records[i].ds.integer; });
+data::IO::ReadColumnInto<double>(group, "ds.scalar", start, records.size(),
+                [&](size_t i) { return &records[i].ds.scalar; });
+data::IO::ReadColumnInto<float>(group, "ds.scalar_array", start, records.size(),
+                [&](size_t i) { return &records[i].ds.scalar_array[0]; });
+data::IO::ReadColumnInto<float>(group, "ds.cstyle_matrix", start, records.size(),
+                [&](size_t i) { return &records[i].ds.cstyle_matrix[0][0]; });
+{
+                auto column = data::IO::ReadRagged<char>(group, "std_str", start, count);
+                for (size_t i = 0; i < records.size(); i++)
+                    records[i].std_str.assign(column[i].begin(), column[i].end());
+            }
+{
+                auto column = data::IO::ReadRagged<int>(group, "vlen_vector", start, count);
+                for (size_t i = 0; i < records.size(); i++)
+                    records[i].vlen_vector.assign(column[i].begin(), column[i].end());
+            }
+            return records;
+        }
+        
+} // namespace CodeGen
+
+
+namespace HDF5{
+template <>
+        struct to_h5type<CodeGen::CDataStruct>
+        {
+            static inline const H5::DataType *get(void)
+            {
+                return &CodeGen::CDataStruct_h5type();
+            }
+        };
+        
+template <>
+        struct to_h5storage<CodeGen::CDataStruct>
+        {
+            static inline StoragePolicy &get(void)
+            {
+                static StoragePolicy policy = 
+                    StoragePolicy::chunked(sizeof(CodeGen::CDataStruct), DATA_H5_CHUNK_BYTES);
+                return policy;
+            }
+        };
+        
+template <>
+        struct to_h5columns<CodeGen::CDataStruct>
+        {
+            static inline void write(const CodeGen::CDataStruct *records, size_t count,
+                                     std::shared_ptr<DATA_H5Location> group, const StoragePolicy &policy)
+            {
+                CodeGen::CDataStruct_write_columns(records, count, group, policy);
+            }
+            static inline std::vector<CodeGen::CDataStruct> read(
+                std::shared_ptr<DATA_H5Location> group, hsize_t start, hsize_t count)
+            {
+                return CodeGen::CDataStruct_read_columns(group, start, count);
+            }
+        };
+        
+
+        template <> struct to_h5serializer<CodeGen::ComplexData>
+        {
+            static inline const Serializer<CodeGen::ComplexData> get(void)
+            {
+                return CodeGen::ComplexData_serialize;
+            }
+            static inline const BatchSerializer<CodeGen::ComplexData> get_batch(void)
+            {
+                return CodeGen::ComplexData_serialize_batch;
+            }
+        };
+        
+template <>
+        struct to_h5staging<CodeGen::ComplexData>
+        {
+            typedef CodeGen::ComplexData_hvl type;
+            static inline std::vector<type> pack(const CodeGen::ComplexData *first, size_t count)
+            {
+                return CodeGen::ComplexData_pack_batch(first, count);
+            }
+            static inline void write(const CodeGen::ComplexData *first, type *staged, size_t count, H5::DataSet &dataset,
+                                     const H5::DataSpace *memspace, const H5::DataSpace *space)
+            {
+                CodeGen::ComplexData_write_staged(first, staged, count, dataset, memspace, space);
+            }
+        };
+        
+
+        template <> struct to_h5deserializer<CodeGen::ComplexData>
+        {
+            static inline const Deserializer<CodeGen::ComplexData> get(void)
+            {
+                return CodeGen::ComplexData_deserialize;
+            }
+            static inline const BatchDeserializer<CodeGen::ComplexData> get_batch(void)
+            {
+                return CodeGen::ComplexData_deserialize_batch;
+            }
+        };
+        
+template <>
+        struct to_h5type<CodeGen::ComplexData>
+        {
+            static inline const H5::DataType *get(void)
+            {
+                return &CodeGen::ComplexData_h5type();
+            }
+        };
+        
+template <>
+        struct to_h5storage<CodeGen::ComplexData>
+        {
+            static inline StoragePolicy &get(void)
+            {
+                static StoragePolicy policy = 
+                    StoragePolicy::chunked(sizeof(CodeGen::ComplexData_hvl), DATA_H5_CHUNK_BYTES);
+                return policy;
+            }
+        };
+        
+template <>
+        struct to_h5columns<CodeGen::ComplexData>
+        {
+            static inline void write(const CodeGen::ComplexData *records, size_t count,
+                                     std::shared_ptr<DATA_H5Location> group, const StoragePolicy &policy)
+            {
+                CodeGen::ComplexData_write_columns(records, count, group, policy);
+            }
+            static inline std::vector<CodeGen::ComplexData> read(
+                std::shared_ptr<DATA_H5Location> group, hsize_t start, hsize_t count)
+            {
+                return CodeGen::ComplexData_read_columns(group, start, count);
+            }
+        };
+        
+} // namespace HDF5 
\ No newline at end of file
@@ -0,0 +1,49 @@
+#include "CodeGen_types_json.h"
+using namespace CodeGen;
+
+#include <cassert> // will be disabled if NDEBUG macro is defined
+#include <iostream>
+#include <sstream>
+
+int main()
+{
+    CDataStruct v1 = {1, 2.3, {1.0, 2.0, 3.0}};
+    CDataStruct v2 = {10, 23.0, {4.0, 5.0, 6.0}};
+    std::vector<ComplexData> cvalues;
+    cvalues.emplace_back(1.0, v1, "std_string1", std::array<double, 3>{1.1, 2.2, 3.2}, std::vector<int>{1, 2});
+    cvalues.emplace_back(2.0, v2, "std_string_value2", std::array<double, 3>{4.4, 5.5, 6.6}, std::vector<int>{1, 2, 3, 4});
+    cvalues[1].vlen_matrix = {{1.0, 2.0}, {3.0}};
+
+    // text json by the DOM
+    nlohmann::json j = cvalues[1];
+    std::cout << j.dump() << std::endl;
+    auto from_text = j.get<ComplexData>();
+    assert(from_text.std_str == cvalues[1].std_str && from_text.vlen_matrix == cvalues[1].vlen_matrix);
+
+    // compact binary without DOM, it can also be parsed by `nlohmann::json::from_cbor()`
+    std::vector<std::uint8_t> cbor = JSON::to_cbor(cvalues);
+    assert(nlohmann::json::from_cbor(cbor)[1] == nlohmann::json::from_cbor(nlohmann::json::to_cbor(j)));
+    std::vector<ComplexData> decoded;
+    JSON::from_cbor(cbor, decoded);
+    assert(decoded.size() == 2 && decoded[1].vlen_vector == cvalues[1].vlen_vector && decoded[1].ds.integer == 10);
+
+    std::vector<std::uint8_t> msgpack = JSON::to_msgpack(cvalues);
+    std::vector<ComplexData> decoded2;
+    JSON::from_msgpack(msgpack, decoded2);
+    assert(decoded2[0].std_array == cvalues[0].std_array && decoded2[1].int_array[1] == cvalues[1].int_array[1]);
+    std::cout << "cbor: " << cbor.size() << " bytes, msgpack: " << msgpack.size() << " bytes, json: "
+              << nlohmann::json(cvalues).dump().size() << " bytes" << std::endl;
+
+    // stream of records, one record after another
+    std::stringstream ss;
+    JSON::msgpack_writer w(ss);
+    for (const auto &v : cvalues)
+        JSON::encode(w, v);
+    ComplexData record;
+    size_t count = 0;
+    while (JSON::decode_next(ss, record, JSON::input_format_t::msgpack))
+        count++;
+    assert(count == cvalues.size() && record.scalar == 2.0);
+
+    std::cout << "json serialization demo completed successfully\n";
+}
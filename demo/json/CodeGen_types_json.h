@@ -0,0 +1,177 @@
+#pragma once
+        // this file is generated by a python script, do not edit manually
+        
+#include <string>
+        #include <vector>
+        #include <array>
+        #include "json.hpp"
+        #include "CodeGen_types.h"
+        #include "JSONIO.h"
+        
+
+namespace CodeGen{/// this code section declare types, put into header file
+
+
+        inline void to_json(nlohmann::json &j, const CodeGen::CDataStruct &obj)
+        {
+            j = nlohmann::json::object();
+            j["integer"] = obj.integer;
+            j["scalar"] = obj.scalar;
+            j["scalar_array"] = obj.scalar_array;
+            j["cstyle_matrix"] = obj.cstyle_matrix;
+        }
+
+        inline void from_json(const nlohmann::json &j, CodeGen::CDataStruct &obj)
+        {
+            j.at("integer").get_to(obj.integer);
+            j.at("scalar").get_to(obj.scalar);
+            nlohmann::from_json(j.at("scalar_array"), obj.scalar_array);
+            for (std::size_t i = 0; i < 2; i++)
+                nlohmann::from_json(j.at("cstyle_matrix").at(i), obj.cstyle_matrix[i]);
+        }
+        
+
+        inline void to_json(nlohmann::json &j, const CodeGen::ComplexData &obj)
+        {
+            j = nlohmann::json::object();
+            j["scalar"] = obj.scalar;
+            j["int_array"] = obj.int_array;
+            j["std_array"] = obj.std_array;
+            j["ds"] = obj.ds;
+            j["c_str"] = obj.c_str ? nlohmann::json(obj.c_str) : nlohmann::json(nullptr);
+            j["std_str"] = obj.std_str;
+            j["vlen_vector"] = obj.vlen_vector;
+            j["vlen_matrix"] = obj.vlen_matrix;
+        }
+
+        inline void from_json(const nlohmann::json &j, CodeGen::ComplexData &obj)
+        {
+            j.at("scalar").get_to(obj.scalar);
+            nlohmann::from_json(j.at("int_array"), obj.int_array);
+            j.at("std_array").get_to(obj.std_array);
+            j.at("ds").get_to(obj.ds);
+            j.at("std_str").get_to(obj.std_str);
+            j.at("vlen_vector").get_to(obj.vlen_vector);
+            j.at("vlen_matrix").get_to(obj.vlen_matrix);
+        }
+        
+} // namespace CodeGen
+
+
+namespace JSON{
+template <>
+        struct codec<CodeGen::CDataStruct>
+        {
+            template <class Writer>
+            static void encode(Writer &w, const CodeGen::CDataStruct &obj)
+            {
+                w.begin_map(4);
+                w.key("integer");
+                JSON::encode(w, obj.integer);
+                w.key("scalar");
+                JSON::encode(w, obj.scalar);
+                w.key("scalar_array");
+                JSON::encode(w, obj.scalar_array);
+                w.key("cstyle_matrix");
+                JSON::encode(w, obj.cstyle_matrix);
+            }
+
+            /// assign fields from SAX events, unknown keys are skipped
+            class sink : public JSON::sink
+            {
+            public:
+                void bind(CodeGen::CDataStruct *p)
+                {
+                    integer_sink.bind(&p->integer);
+                    scalar_sink.bind(&p->scalar);
+                    scalar_array_sink.bind(&p->scalar_array);
+                    cstyle_matrix_sink.bind(&p->cstyle_matrix);
+                }
+                bool on_start_object(std::size_t) override
+                {
+                    return true;
+                }
+                JSON::sink *on_key(const std::string &k) override
+                {
+                    if (k == "integer") return &integer_sink;
+                    if (k == "scalar") return &scalar_sink;
+                    if (k == "scalar_array") return &scalar_array_sink;
+                    if (k == "cstyle_matrix") return &cstyle_matrix_sink;
+                    return nullptr;
+                }
+
+            private:
+                codec<decltype(CodeGen::CDataStruct::integer)>::sink integer_sink;
+                codec<decltype(CodeGen::CDataStruct::scalar)>::sink scalar_sink;
+                codec<decltype(CodeGen::CDataStruct::scalar_array)>::sink scalar_array_sink;
+                codec<decltype(CodeGen::CDataStruct::cstyle_matrix)>::sink cstyle_matrix_sink;
+            };
+        };
+        
+template <>
+        struct codec<CodeGen::ComplexData>
+        {
+            template <class Writer>
+            static void encode(Writer &w, const CodeGen::ComplexData &obj)
+            {
+                w.begin_map(8);
+                w.key("scalar");
+                JSON::encode(w, obj.scalar);
+                w.key("int_array");
+                JSON::encode(w, obj.int_array);
+                w.key("std_array");
+                JSON::encode(w, obj.std_array);
+                w.key("ds");
+                JSON::encode(w, obj.ds);
+                w.key("c_str");
+                JSON::encode(w, obj.c_str);
+                w.key("std_str");
+                JSON::encode(w, obj.std_str);
+                w.key("vlen_vector");
+                JSON::encode(w, obj.vlen_vector);
+                w.key("vlen_matrix");
+                JSON::encode(w, obj.vlen_matrix);
+            }
+
+            /// assign fields from SAX events, unknown keys are skipped
+            class sink : public JSON::sink
+            {
+            public:
+                void bind(CodeGen::ComplexData *p)
+                {
+                    scalar_sink.bind(&p->scalar);
+                    int_array_sink.bind(&p->int_array);
+                    std_array_sink.bind(&p->std_array);
+                    ds_sink.bind(&p->ds);
+                    std_str_sink.bind(&p->std_str);
+                    vlen_vector_sink.bind(&p->vlen_vector);
+                    vlen_matrix_sink.bind(&p->vlen_matrix);
+                }
+                bool on_start_object(std::size_t) override
+                {
+                    return true;
+                }
+                JSON::sink *on_key(const std::string &k) override
+                {
+                    if (k == "scalar") return &scalar_sink;
+                    if (k == "int_array") return &int_array_sink;
+                    if (k == "std_array") return &std_array_sink;
+                    if (k == "ds") return &ds_sink;
+                    if (k == "std_str") return &std_str_sink;
+                    if (k == "vlen_vector") return &vlen_vector_sink;
+                    if (k == "vlen_matrix") return &vlen_matrix_sink;
+                    return nullptr;
+                }
+
+            private:
+                codec<decltype(CodeGen::ComplexData::scalar)>::sink scalar_sink;
+                codec<decltype(CodeGen::ComplexData::int_array)>::sink int_array_sink;
+                codec<decltype(CodeGen::ComplexData::std_array)>::sink std_array_sink;
+                codec<decltype(CodeGen::ComplexData::ds)>::sink ds_sink;
+                codec<decltype(CodeGen::ComplexData::std_str)>::sink std_str_sink;
+                codec<decltype(CodeGen::ComplexData::vlen_vector)>::sink vlen_vector_sink;
+                codec<decltype(CodeGen::ComplexData::vlen_matrix)>::sink vlen_matrix_sink;
+            };
+        };
+        
+} // namespace JSON 
\ No newline at end of file
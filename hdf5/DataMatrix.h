@@ -0,0 +1,308 @@
+#pragma once
+#include <cstddef>
+#include <vector>
+#include <stdexcept>
+#include <type_traits>
+
+namespace data
+{
+    /**
+     * @brief non-owning view of a contiguous 1D array, like `std::span` of C++20
+     * */
+    template <class T>
+    class ArrayView
+    {
+    public:
+        typedef typename std::remove_const<T>::type value_type;
+
+        ArrayView()
+            : m_data(nullptr), m_size(0)
+        {
+        }
+
+        ArrayView(T *data, size_t size)
+            : m_data(data), m_size(size)
+        {
+        }
+
+        T *data() const { return m_data; }
+        size_t size() const { return m_size; }
+        bool empty() const { return m_size == 0; }
+        T *begin() const { return m_data; }
+        T *end() const { return m_data + m_size; }
+        T &operator[](size_t i) const { return m_data[i]; }
+
+        std::vector<value_type> to_vector() const { return std::vector<value_type>(begin(), end()); }
+
+    private:
+        T *m_data;
+        size_t m_size;
+    };
+
+    /**
+     * @brief non-owning row-major 2D view over caller memory, like a 2D span
+     *
+     * element `(i, j)` is at `data[i * stride + j]`, `stride >= cols` is the row pitch in elements,
+     * so that a block of a larger row-major buffer can be viewed without copy.
+     * Template parameter `T` can be const qualified for a read-only view.
+     * */
+    template <class T>
+    class MatrixView
+    {
+    public:
+        typedef typename std::remove_const<T>::type value_type;
+
+        MatrixView()
+            : m_data(nullptr), m_rows(0), m_cols(0), m_stride(0)
+        {
+        }
+
+        MatrixView(T *data, size_t rows, size_t cols, size_t stride = 0)
+            : m_data(data), m_rows(rows), m_cols(cols), m_stride(stride ? stride : cols)
+        {
+            if (m_stride < m_cols)
+                throw std::invalid_argument("row stride must not be less than the column count");
+        }
+
+        /// a mutable view converts to a read-only view
+        template <class U, typename = typename std::enable_if<std::is_same<const U, T>::value>::type>
+        MatrixView(const MatrixView<U> &other)
+            : m_data(other.data()), m_rows(other.rows()), m_cols(other.cols()), m_stride(other.stride())
+        {
+        }
+
+        T *data() const { return m_data; }
+        size_t rows() const { return m_rows; }
+        size_t cols() const { return m_cols; }
+        size_t stride() const { return m_stride; }
+        size_t size() const { return m_rows * m_cols; }
+        bool empty() const { return size() == 0; }
+        /// true if rows are stored back to back, i.e. the view is a single flat buffer
+        bool is_contiguous() const { return m_stride == m_cols; }
+
+        T &operator()(size_t i, size_t j) const { return m_data[i * m_stride + j]; }
+        T *row(size_t i) const { return m_data + i * m_stride; }
+
+        /// unpack into `std::vector<std::vector<T>>`, one allocation per row
+        std::vector<std::vector<value_type>> to_nested() const
+        {
+            std::vector<std::vector<value_type>> mat;
+            mat.reserve(m_rows);
+            for (size_t i = 0; i < m_rows; i++)
+                mat.emplace_back(row(i), row(i) + m_cols);
+            return mat;
+        }
+
+    private:
+        T *m_data;
+        size_t m_rows;
+        size_t m_cols;
+        size_t m_stride;
+    };
+
+    /**
+     * @brief row-major 2D matrix owning a single contiguous buffer
+     *
+     * it replaces `std::vector<std::vector<T>>` for IO, the whole matrix is a single buffer.
+     * */
+    template <class T>
+    class Matrix
+    {
+    public:
+        typedef T value_type;
+
+        Matrix()
+            : m_rows(0), m_cols(0)
+        {
+        }
+
+        Matrix(size_t rows, size_t cols, const T &value = T())
+            : m_buffer(rows * cols, value), m_rows(rows), m_cols(cols)
+        {
+        }
+
+        /// copy from a view, a strided view is packed
+        explicit Matrix(const MatrixView<const T> &view)
+            : m_rows(view.rows()), m_cols(view.cols())
+        {
+            m_buffer.reserve(view.size());
+            for (size_t i = 0; i < m_rows; i++)
+                m_buffer.insert(m_buffer.end(), view.row(i), view.row(i) + m_cols);
+        }
+
+        /// pack a nested vector into a single buffer, all rows must have the same size
+        static Matrix from_nested(const std::vector<std::vector<T>> &mat)
+        {
+            const size_t rows = mat.size();
+            const size_t cols = rows ? mat[0].size() : 0;
+            Matrix m;
+            m.m_buffer.reserve(rows * cols);
+            for (const auto &v : mat)
+            {
+                if (v.size() != cols)
+                    throw std::invalid_argument("rows of nested vector do not have the same size");
+                m.m_buffer.insert(m.m_buffer.end(), v.begin(), v.end());
+            }
+            m.m_rows = rows;
+            m.m_cols = cols;
+            return m;
+        }
+
+        void resize(size_t rows, size_t cols)
+        {
+            m_buffer.resize(rows * cols);
+            m_rows = rows;
+            m_cols = cols;
+        }
+
+        T *data() { return m_buffer.data(); }
+        const T *data() const { return m_buffer.data(); }
+        size_t rows() const { return m_rows; }
+        size_t cols() const { return m_cols; }
+        size_t size() const { return m_buffer.size(); }
+        bool empty() const { return m_buffer.empty(); }
+
+        T &operator()(size_t i, size_t j) { return m_buffer[i * m_cols + j]; }
+        const T &operator()(size_t i, size_t j) const { return m_buffer[i * m_cols + j]; }
+
+        MatrixView<T> view() { return MatrixView<T>(data(), m_rows, m_cols); }
+        MatrixView<const T> view() const { return MatrixView<const T>(data(), m_rows, m_cols); }
+
+        std::vector<std::vector<T>> to_nested() const { return view().to_nested(); }
+
+    private:
+        std::vector<T> m_buffer;
+        size_t m_rows;
+        size_t m_cols;
+    };
+
+    /**
+     * @brief non-owning view of rows of different lengths, over the buffers of a `RaggedArray`
+     *
+     * `offsets` has `rows + 1` elements, `values` points to the value of `offsets[0]`,
+     * so that a range of rows of a larger ragged array is viewed without rebasing its offsets.
+     * */
+    template <class T>
+    class RaggedView
+    {
+    public:
+        typedef typename std::remove_const<T>::type value_type;
+        typedef unsigned long long offset_type;
+
+        RaggedView()
+            : m_offsets(nullptr), m_values(nullptr), m_rows(0)
+        {
+        }
+
+        RaggedView(const offset_type *offsets, T *values, size_t rows)
+            : m_offsets(offsets), m_values(values), m_rows(rows)
+        {
+        }
+
+        size_t rows() const { return m_rows; }
+        bool empty() const { return m_rows == 0; }
+        size_t row_size(size_t i) const { return m_offsets[i + 1] - m_offsets[i]; }
+        /// value count of all rows
+        size_t size() const { return m_rows ? m_offsets[m_rows] - m_offsets[0] : 0; }
+
+        ArrayView<T> row(size_t i) const
+        {
+            return ArrayView<T>(m_values + (m_offsets[i] - m_offsets[0]), row_size(i));
+        }
+        ArrayView<T> operator[](size_t i) const { return row(i); }
+
+        std::vector<std::vector<value_type>> to_nested() const
+        {
+            std::vector<std::vector<value_type>> v;
+            v.reserve(m_rows);
+            for (size_t i = 0; i < m_rows; i++)
+                v.push_back(row(i).to_vector());
+            return v;
+        }
+
+    private:
+        const offset_type *m_offsets;
+        T *m_values;
+        size_t m_rows;
+    };
+
+    /**
+     * @brief rows of different lengths in a single buffer, the CSR layout without column indices
+     *
+     * row `i` is `values[offsets[i], offsets[i + 1])`, `offsets` has `rows() + 1` elements starting with 0,
+     * a row is accessed as `ArrayView` without allocation.
+     * */
+    template <class T>
+    class RaggedArray
+    {
+    public:
+        typedef T value_type;
+        typedef unsigned long long offset_type;
+
+        RaggedArray()
+            : m_offsets(1, 0)
+        {
+        }
+
+        /// take the buffers, offsets are not required to start with 0
+        RaggedArray(std::vector<offset_type> offsets, std::vector<T> values)
+            : m_offsets(std::move(offsets)), m_values(std::move(values))
+        {
+            if (m_offsets.empty())
+                m_offsets.push_back(0);
+            const offset_type first = m_offsets.front();
+            if (first)
+                for (auto &o : m_offsets)
+                    o -= first;
+            if (m_offsets.back() != m_values.size())
+                throw std::invalid_argument("the last offset does not match the value count");
+        }
+
+        static RaggedArray from_nested(const std::vector<std::vector<T>> &rows)
+        {
+            RaggedArray r;
+            r.reserve(rows.size(), 0);
+            for (const auto &v : rows)
+                r.push_back(v.data(), v.size());
+            return r;
+        }
+
+        void reserve(size_t rows, size_t values)
+        {
+            m_offsets.reserve(rows + 1);
+            m_values.reserve(values);
+        }
+
+        void push_back(const T *first, size_t count)
+        {
+            m_values.insert(m_values.end(), first, first + count);
+            m_offsets.push_back(m_values.size());
+        }
+
+        size_t rows() const { return m_offsets.size() - 1; }
+        bool empty() const { return rows() == 0; }
+        size_t row_size(size_t i) const { return m_offsets[i + 1] - m_offsets[i]; }
+
+        ArrayView<const T> row(size_t i) const
+        {
+            return ArrayView<const T>(m_values.data() + m_offsets[i], row_size(i));
+        }
+        ArrayView<const T> operator[](size_t i) const { return row(i); }
+
+        const std::vector<offset_type> &offsets() const { return m_offsets; }
+        const std::vector<T> &values() const { return m_values; }
+
+        /// rows `[first, first + count)` without copy
+        RaggedView<const T> view(size_t first, size_t count) const
+        {
+            return RaggedView<const T>(m_offsets.data() + first, m_values.data() + m_offsets[first], count);
+        }
+        RaggedView<const T> view() const { return view(0, rows()); }
+
+        std::vector<std::vector<T>> to_nested() const { return view().to_nested(); }
+
+    private:
+        std::vector<offset_type> m_offsets;
+        std::vector<T> m_values;
+    };
+} // namespace data
@@ -5,10 +5,14 @@
 #include <vector>
 #include <type_traits> // C++11
 #include <functional>
+#include <algorithm>
+#include <iterator>
+#include <limits>
 
 #include <H5Cpp.h>
 using namespace H5;
 #include "HDF5_TypeTraits.h"
+#include "DataMatrix.h"
 
 #if DATA_USE_EIGEN
 // origin repo:  https://github.com/garrison/eigen3-hdf5  does not work with HDF5 1.10.1
@@ -77,11 +81,14 @@ namespace data
         static bool WriteAttribute(const T &val, std::shared_ptr<H5Object> h5loc,
                                    std::string attribute_name)
         {
+            DATA_H5_PROBE("WriteAttribute", attribute_name, HDF5::instrument::type_name<T>());
             const DataType &dtype = *HDF5::to_h5type<T>::get();
-            Attribute attrib(h5loc->createAttribute(attribute_name, dtype, H5S_SCALAR));
+            const DataType &file_type = *HDF5::to_h5filetype<T>::get();
+            Attribute attrib(DATA_H5_CALL(h5loc->createAttribute(attribute_name, file_type, H5S_SCALAR)));
 
             const void *buf = std::addressof(val);
-            attrib.write(dtype, buf); //  this write() applies to field/member DataType
+            DATA_H5_CALL(attrib.write(dtype, buf)); //  this write() applies to field/member DataType
+            DATA_H5_PROBE_RECORDS(1, dtype.getSize());
 
             attrib.close();
             return true;
@@ -123,226 +130,1008 @@ namespace data
          * @param vec data to write  of type `const std::vector<T>`
          * @param h5loc handle/pointer to H5File
          * @param dataset_name dataset name
-         * @param dtype hdf5 data type definition (metadata)
+         * @param policy chunk and filters for dataset creation, default: the policy registered for `T`
          * 
          * @return true if successful 
          * 
-         * todo:  serializer
-         *   is_contiguous  if T is numeric type, , typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type
+         * if the generated batch serializer is available, e.g. class with vlen fields,
+         * the whole vector is converted into a contiguous buffer and written in one call
          * 
          * */
         template <class T>
-        static bool WriteVector(std::vector<T> vec, std::shared_ptr<DATA_H5Location> h5loc,
-                                std::string dataset_name)
+        static bool WriteVector(const std::vector<T> &vec, std::shared_ptr<DATA_H5Location> h5loc,
+                                std::string dataset_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
         {
+            DATA_H5_PROBE("WriteVector", dataset_name, HDF5::instrument::type_name<T>());
             const DataType &dtype = *HDF5::to_h5type<T>::get();
-            HDF5::Serializer<T> serializer = HDF5::to_h5serializer<T>::get();
+            const DataType &file_type = *HDF5::to_h5filetype<T>::get();
             const int RANK = 1;
             hsize_t dims[RANK] = {vec.size()};
             DataSpace space(RANK, dims);
-            DataSet dataset(h5loc->createDataSet(dataset_name, dtype, space));
+            DataSet dataset(DATA_H5_CALL(h5loc->createDataSet(dataset_name, file_type, space,
+                                                              policy.create_plist(file_type, RANK, dims))));
+            DATA_H5_PROBE_DATASET(dataset);
 
-            // if buffer is contiguous (trivially-copyable) no need for a per element copy
-            if (!serializer)
+            WriteRecords<T>(vec.data(), vec.size(), dataset, space, 0);
+            DATA_H5_PROBE_RECORDS(vec.size(), vec.size() * dtype.getSize());
+            space.close();
+            dataset.close();
+            return true;
+        }
+
+        /**
+         * @brief write `count` records into rows `[start, start + count)` of a 1D dataset
+         * 
+         * @param first pointer to the first record of a contiguous range
+         * @param space file dataspace of the dataset, its selection is changed
+         * 
+         * if the generated batch serializer is available, e.g. class with vlen fields,
+         * the range is converted into a contiguous buffer and written in one call,
+         * trivially-copyable `T` is written directly by one H5Dwrite,
+         * otherwise each record is written by the generated serializer.
+         * */
+        template <class T>
+        static void WriteRecords(const T *first, size_t count, DataSet &dataset, DataSpace &space, hsize_t start)
+        {
+            const DataType &dtype = *HDF5::to_h5type<T>::get();
+            HDF5::Serializer<T> serializer = HDF5::to_h5serializer<T>::get();
+            HDF5::BatchSerializer<T> batch_serializer = HDF5::to_h5serializer<T>::get_batch();
+            const int RANK = 1;
+            if (count == 0)
+                return;
+
+            hsize_t offset[RANK] = {start}; // starting point row index
+            hsize_t block[RANK] = {count};
+            if (batch_serializer || !serializer)
             {
-                //const void *buf = std::addressof(v);
-                dataset.write(vec.data(), dtype);
+                DataSpace memspace(RANK, block, NULL);
+                space.selectHyperslab(H5S_SELECT_SET, block, offset);
+                if (batch_serializer)
+                    batch_serializer(first, count, dataset, &memspace, &space);
+                else
+                    DATA_H5_CALL(dataset.write(first, dtype, memspace, space)); // no per element copy
+                memspace.close();
             }
             else
             {
-                hsize_t offset[RANK] = {0}; // starting point row, col index
-                hsize_t count[RANK] = {1};  // block count
+                hsize_t count1[RANK] = {1}; // block count
                 hsize_t stride[RANK] = {1}; // block stride
-                hsize_t block[RANK] = {1};
+                block[0] = 1;
 
                 DataSpace memspace(RANK, block, NULL); // sub dataspace for each row
 
                 // subset selection:
                 // https://support.hdfgroup.org/ftp/HDF5/current/src/unpacked/c++/examples/h5tutr_subset.cpp
-                for (auto &v : vec)
+                for (size_t i = 0; i < count; i++)
                 {
-                    space.selectHyperslab(H5S_SELECT_SET, count, offset, stride, block);
-                    serializer(v, dataset, &memspace, &space); // base ptr to destruct the derived class, memeroy leak?
+                    space.selectHyperslab(H5S_SELECT_SET, count1, offset, stride, block);
+                    serializer(first[i], dataset, &memspace, &space);
                     offset[0] = offset[0] + 1;
                 }
                 memspace.close();
             }
-            space.close();
-            dataset.close();
-            return true;
         }
 
         /**
-         * @brief read dataset into a vector<DataStruct>
+         * @brief row count of an existing 1D dataset to append to
          * 
-         * @param h5loc handle/pointer to H5File/Group
-         * @param dtype hdf5 data type definition for the element
-         * @param dataset_name dataset name
+         * throw `std::runtime_error` if the dataset can not be extended, i.e. it is not chunked,
+         * or its max dims is not unlimited, e.g. written by `WriteVector()` with a fixed size
+         * */
+        static hsize_t GetExtendibleLength(const DataSet &dataset, const std::string &dataset_name)
+        {
+            DataSpace space = dataset.getSpace();
+            if (space.getSimpleExtentNdims() != 1)
+                throw std::runtime_error("dataset to append to is not 1D: " + dataset_name);
+            hsize_t dims[1], maxdims[1];
+            space.getSimpleExtentDims(dims, maxdims);
+            DSetCreatPropList plist = dataset.getCreatePlist();
+            if (plist.getLayout() != H5D_CHUNKED || maxdims[0] != H5S_UNLIMITED)
+                throw std::runtime_error("dataset to append to is not chunked of unlimited max dims: " + dataset_name);
+            return dims[0];
+        }
+
+        /**
+         * @brief buffered appender to an extendible 1D dataset, e.g. one record per timestep
          * 
-         * @return type `const std::vector<T>`
+         * the dataset of unlimited max dims is opened if existing, otherwise created with
+         * the storage policy of `T`, which is always chunked. Records are kept in a buffer of
+         * fixed capacity, default one chunk, then each full buffer is written by one hyperslab write
+         * after extending the dataset, so the memory does not grow with the run length.
+         * The buffer is flushed on `close()` or destruction.
+         * */
+        template <class T>
+        class Appender
+        {
+        public:
+            Appender(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name, size_t capacity = 0,
+                     const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
+                : m_length(0)
+            {
+                const DataType &dtype = *HDF5::to_h5type<T>::get();
+                HDF5::StoragePolicy p = policy;
+                if (p.chunk_elements == 0)
+                    p.chunk_elements = HDF5::StoragePolicy::chunked(dtype.getSize()).chunk_elements;
+
+                if (H5Lexists(h5loc->getId(), dataset_name.c_str(), H5P_DEFAULT) > 0)
+                {
+                    m_dataset = h5loc->openDataSet(dataset_name);
+                    m_length = GetExtendibleLength(m_dataset, dataset_name);
+                }
+                else
+                {
+                    const int RANK = 1;
+                    hsize_t dims[RANK] = {0};
+                    hsize_t maxdims[RANK] = {H5S_UNLIMITED};
+                    DataSpace space(RANK, dims, maxdims);
+                    const DataType &file_type = *HDF5::to_h5filetype<T>::get();
+                    m_dataset = h5loc->createDataSet(dataset_name, file_type, space,
+                                                     p.create_plist(file_type, RANK, dims, maxdims));
+                }
+                m_capacity = capacity ? capacity : p.chunk_elements;
+                m_buffer.reserve(m_capacity);
+            }
+
+            Appender(const Appender &) = delete;
+            Appender &operator=(const Appender &) = delete;
+
+            ~Appender()
+            {
+                try
+                {
+                    close();
+                }
+                catch (...)
+                {
+                    std::cerr << "failed to flush the buffered records to dataset\n";
+                }
+            }
+
+            void append(const T &value)
+            {
+                m_buffer.push_back(value);
+                if (m_buffer.size() >= m_capacity)
+                    flush();
+            }
+
+            void append(T &&value)
+            {
+                m_buffer.push_back(std::move(value));
+                if (m_buffer.size() >= m_capacity)
+                    flush();
+            }
+
+            /// extend the dataset and write the buffered records, the buffer capacity is kept
+            void flush()
+            {
+                if (m_buffer.empty())
+                    return;
+                DATA_H5_PROBE("Appender::flush", m_dataset.getObjName(), HDF5::instrument::type_name<T>());
+                DATA_H5_PROBE_RECORDS(m_buffer.size(), m_buffer.size() * HDF5::to_h5type<T>::get()->getSize());
+                hsize_t new_length = m_length + m_buffer.size();
+                DATA_H5_CALL(m_dataset.extend(&new_length));
+                DataSpace space = m_dataset.getSpace();
+                WriteRecords<T>(m_buffer.data(), m_buffer.size(), m_dataset, space, m_length);
+                m_length = new_length;
+                m_buffer.clear();
+            }
+
+            void close()
+            {
+                if (!is_open())
+                    return;
+                flush();
+                m_dataset.close();
+            }
+
+            bool is_open() const
+            {
+                return m_dataset.getId() > 0;
+            }
+
+            /// record count, including the buffered records
+            size_t size() const
+            {
+                return m_length + m_buffer.size();
+            }
+
+        private:
+            DataSet m_dataset;
+            hsize_t m_length; ///< record count written into the dataset
+            size_t m_capacity;
+            std::vector<T> m_buffer;
+        };
+
+        /**
+         * @brief read rows `[start, start + count)` of a 1D dataset into `out`
          * 
-         * Template parameter `T` must be `std::is_trivially_copyable`
-         * in order to use `memcpy()` to initialize class T
+         * @param out pointer to the first of `count` default constructed records
+         * @param space file dataspace of the dataset, its selection is changed
          * 
-         * todo: , typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type
-         *  then give the default val as nullptr
+         * if the generated batch deserializer is available, e.g. class with vlen fields,
+         * the range is read in one call into a hvl buffer then converted, and vlen memory is reclaimed.
+         * trivially-copyable `T` is read directly by one H5Dread.
          * */
         template <class T>
-        static const std::vector<T> ReadVector(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name)
+        static void ReadRecords(T *out, size_t count, DataSet &dataset, DataSpace &space, hsize_t start)
         {
             const DataType &dtype = *HDF5::to_h5type<T>::get();
-            HDF5::Deserializer<T> deserializer = HDF5::to_h5deserializer<T>();
-            DataSet dataset(h5loc->openDataSet(dataset_name));
-
+            HDF5::Deserializer<T> deserializer = HDF5::to_h5deserializer<T>::get();
+            HDF5::BatchDeserializer<T> batch_deserializer = HDF5::to_h5deserializer<T>::get_batch();
             const int RANK = 1;
-            hsize_t dims[1];
-            DataSpace space = dataset.getSpace();
-            //assert(dataset.isSimple());                        // load all into memory from the whole file
-            auto rank = space.getSimpleExtentDims(dims, NULL); // rank = 1
-            const size_t length = dims[0];
-            std::vector<T> vec;
-
-            // if buffer is contiguous, all-in-one copy is possible
-            // but it makes no diff per element or copy
-            hsize_t offset[RANK] = {0}; // starting point row, col index
-            hsize_t count[RANK] = {1};  // block count
-            hsize_t stride[RANK] = {1}; // block stride
-            hsize_t block[RANK] = {1};
-
-            DataSpace memspace(RANK, block, NULL); // sub dataspace for each row
-
-            vec.reserve(length);
-            for (size_t i = 0; i < length; i++)
-            {
-                T tmp;
-                if (!deserializer)
-                    dataset.read(&tmp, dtype); // memcpy()  todo: will auto move pos cursor?
+            if (count == 0)
+                return;
+
+            hsize_t offset[RANK] = {start}; // starting point row index
+            hsize_t block[RANK] = {count};
+            if (batch_deserializer || !deserializer)
+            {
+                DataSpace memspace(RANK, block, NULL);
+                space.selectHyperslab(H5S_SELECT_SET, block, offset);
+                if (batch_deserializer)
+                    batch_deserializer(out, count, dataset, &memspace, &space);
                 else
+                    DATA_H5_CALL(dataset.read(out, dtype, memspace, space)); // memcpy() into the contiguous buffer
+                memspace.close();
+            }
+            else
+            {
+                hsize_t count1[RANK] = {1}; // block count
+                hsize_t stride[RANK] = {1}; // block stride
+                block[0] = 1;
+
+                DataSpace memspace(RANK, block, NULL); // sub dataspace for each row
+                for (size_t i = 0; i < count; i++)
                 {
-                    space.selectHyperslab(H5S_SELECT_SET, count, offset, stride, block);
-                    tmp = deserializer(dataset, &memspace, &space);
+                    space.selectHyperslab(H5S_SELECT_SET, count1, offset, stride, block);
+                    out[i] = deserializer(dataset, &memspace, &space);
                     offset[0] = offset[0] + 1;
                 }
-                vec.emplace_back(tmp);
+                memspace.close();
             }
-            memspace.close();
+        }
+
+        /**
+         * @brief read dataset into a vector<DataStruct>
+         * 
+         * @param h5loc handle/pointer to H5File/Group
+         * @param dataset_name dataset name
+         * 
+         * @return type `std::vector<T>`
+         * 
+         * Template parameter `T` must be default constructible.
+         * For trivially-copyable T, the whole dataset is read into `vec.data()` by one H5Dread,
+         * if the generated batch deserializer is available, e.g. class with vlen fields,
+         * all records are read in one call into a hvl buffer then converted.
+         * */
+        template <class T>
+        static std::vector<T> ReadVector(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name)
+        {
+            DATA_H5_PROBE("ReadVector", dataset_name, HDF5::instrument::type_name<T>());
+            DataSet dataset(DATA_H5_CALL(h5loc->openDataSet(dataset_name)));
+            DATA_H5_PROBE_DATASET(dataset);
+            hsize_t dims[1];
+            DataSpace space = dataset.getSpace();
+            space.getSimpleExtentDims(dims, NULL); // rank = 1
+            std::vector<T> vec(dims[0]);
+            ReadRecords<T>(vec.data(), vec.size(), dataset, space, 0);
+            DATA_H5_PROBE_RECORDS(vec.size(), vec.size() * HDF5::to_h5type<T>::get()->getSize());
             space.close();
             dataset.close();
             return vec;
         }
 
         /**
-         * @brief write 2D array into a H5::DataSet
+         * @brief read records `[start, start + count)` of a dataset into a vector<DataStruct>
+         * 
+         * the range is clipped to the dataset length
+         * */
+        template <class T>
+        static std::vector<T> ReadVector(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name,
+                                         hsize_t start, hsize_t count)
+        {
+            DATA_H5_PROBE("ReadVector", dataset_name, HDF5::instrument::type_name<T>());
+            DataSet dataset(DATA_H5_CALL(h5loc->openDataSet(dataset_name)));
+            DATA_H5_PROBE_DATASET(dataset);
+            hsize_t dims[1];
+            DataSpace space = dataset.getSpace();
+            space.getSimpleExtentDims(dims, NULL); // rank = 1
+            start = std::min(start, dims[0]);
+            std::vector<T> vec(std::min(count, dims[0] - start));
+            ReadRecords<T>(vec.data(), vec.size(), dataset, space, start);
+            DATA_H5_PROBE_RECORDS(vec.size(), vec.size() * HDF5::to_h5type<T>::get()->getSize());
+            space.close();
+            dataset.close();
+            return vec;
+        }
+
+        /**
+         * @brief read a large 1D dataset block by block, e.g. larger than the memory
+         * 
+         * each block is fetched by one hyperslab read into a single buffer reused for all blocks,
+         * vlen memory of hvl classes is reclaimed after each block is converted,
+         * so the peak memory is bounded by the block size, by default the chunk size of the dataset.
+         * 
+         * generator style: `while (reader.next()) use(reader.block());`
+         * or iterate records: `for (const T &r : reader)`
+         * */
+        template <class T>
+        class BlockReader
+        {
+        public:
+            BlockReader(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name, size_t block_size = 0,
+                        hsize_t start = 0, hsize_t count = H5S_UNLIMITED)
+                : m_dataset(h5loc->openDataSet(dataset_name)), m_space(m_dataset.getSpace())
+            {
+                hsize_t dims[1];
+                m_space.getSimpleExtentDims(dims, NULL);
+                m_start = m_position = std::min(start, dims[0]);
+                m_end = m_start + std::min(count, dims[0] - m_start);
+
+                if (block_size == 0)
+                {
+                    H5::DSetCreatPropList plist = m_dataset.getCreatePlist();
+                    hsize_t chunk_dims[1] = {0};
+                    if (plist.getLayout() == H5D_CHUNKED)
+                        plist.getChunk(1, chunk_dims);
+                    block_size = chunk_dims[0] ? chunk_dims[0]
+                                               : HDF5::StoragePolicy::chunked(m_dataset.getDataType().getSize()).chunk_elements;
+                }
+                m_block_size = block_size;
+                m_buffer.reserve(m_block_size);
+            }
+
+            BlockReader(const BlockReader &) = delete;
+            BlockReader &operator=(const BlockReader &) = delete;
+
+            /// fetch the next block into `block()`, false if all records have been read
+            bool next()
+            {
+                const size_t n = std::min<hsize_t>(m_block_size, m_end - m_position);
+                m_block_start = m_position;
+                m_buffer.resize(n);
+                if (n == 0)
+                    return false;
+                DATA_H5_PROBE("BlockReader::next", m_dataset.getObjName(), HDF5::instrument::type_name<T>());
+                DATA_H5_PROBE_RECORDS(n, n * HDF5::to_h5type<T>::get()->getSize());
+                ReadRecords<T>(m_buffer.data(), n, m_dataset, m_space, m_position);
+                m_position += n;
+                return true;
+            }
+
+            const std::vector<T> &block() const
+            {
+                return m_buffer;
+            }
+
+            /// index in the dataset of the first record in `block()`
+            hsize_t block_start() const
+            {
+                return m_block_start;
+            }
+
+            /// record count in the range to read
+            size_t size() const
+            {
+                return m_end - m_start;
+            }
+
+            /// single-pass input iterator over the records, blocks are fetched on demand
+            class iterator
+            {
+            public:
+                typedef std::input_iterator_tag iterator_category;
+                typedef T value_type;
+                typedef std::ptrdiff_t difference_type;
+                typedef const T *pointer;
+                typedef const T &reference;
+
+                iterator(BlockReader *reader = nullptr)
+                    : m_reader(reader), m_index(0)
+                {
+                    if (m_reader && !m_reader->next())
+                        m_reader = nullptr;
+                }
+
+                reference operator*() const { return m_reader->m_buffer[m_index]; }
+                pointer operator->() const { return &m_reader->m_buffer[m_index]; }
+
+                iterator &operator++()
+                {
+                    if (++m_index >= m_reader->m_buffer.size())
+                    {
+                        m_index = 0;
+                        if (!m_reader->next())
+                            m_reader = nullptr;
+                    }
+                    return *this;
+                }
+
+                bool operator==(const iterator &other) const { return m_reader == other.m_reader && m_index == other.m_index; }
+                bool operator!=(const iterator &other) const { return !(*this == other); }
+
+            private:
+                BlockReader *m_reader;
+                size_t m_index;
+            };
+
+            /// start iteration from the current position
+            iterator begin() { return iterator(this); }
+            iterator end() { return iterator(); }
+
+        private:
+            DataSet m_dataset;
+            DataSpace m_space;
+            hsize_t m_start;
+            hsize_t m_end;
+            hsize_t m_position;
+            hsize_t m_block_start = 0;
+            size_t m_block_size;
+            std::vector<T> m_buffer;
+        };
+
+        /**
+         * @brief read a subset of compound members of all records in a dataset
+         * 
+         * @param h5loc handle/pointer to H5File/Group
+         * @param dataset_name dataset name
+         * @param mem_type memory CompType of `T`, e.g. built by `HDF5::projection_type()`
+         * 
+         * @return type `std::vector<T>`, `T` is a trivially-copyable projection struct or a member type
+         * 
+         * only the members in `mem_type` are read, the whole records are not materialized
+         * */
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static std::vector<T> ReadProjection(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name,
+                                             const H5::CompType &mem_type)
+        {
+            DATA_H5_PROBE("ReadProjection", dataset_name, HDF5::instrument::type_name<T>());
+            DataSet dataset(DATA_H5_CALL(h5loc->openDataSet(dataset_name)));
+            DATA_H5_PROBE_DATASET(dataset);
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            std::vector<T> vec(dims[0]);
+            if (dims[0] > 0)
+                DATA_H5_CALL(dataset.read(vec.data(), mem_type));
+            DATA_H5_PROBE_RECORDS(vec.size(), vec.size() * sizeof(T));
+            dataset.close();
+            return vec;
+        }
+
+        /**
+         * @brief read one compound member of all records in a dataset of `RecordT`
+         * 
+         * @return type `std::vector<T>`, `T` has the layout of the member, e.g. `std::array<int, 2>` for `int[2]`
+         * */
+        template <class T, class RecordT, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static std::vector<T> ReadMember(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name,
+                                         const std::string &member_name)
+        {
+            const H5::CompType &record_type = static_cast<const H5::CompType &>(*HDF5::to_h5type<RecordT>::get());
+            return ReadProjection<T>(h5loc, dataset_name, HDF5::projection_type(record_type, sizeof(T), {{member_name, 0}}));
+        }
+
+        /**
+         * @brief write 2D array into a H5::DataSet by a single H5Dwrite
          *  template parameter T  can be scalar or any trivially_copyable user type
          * 
-         * @param mat data to write  of type `const std::vector<std::vector<T>>`
+         * @param mat row-major view of type `data::MatrixView<const T>`, can be strided
          * @param h5loc handle/pointer to H5File
          * @param dataset_name dataset name
-         * @param dtype hdf5 data type definition for the element, CompType or PredType::NATIVE_*
+         * @param policy chunk and filters for dataset creation, default: the policy registered for `T`
          * 
          * @return true if successful 
          * 
+         * For a strided view, the memory dataspace is `rows x stride` with a hyperslab
+         * of `rows x cols` selected, so the padding columns are skipped by HDF5 without a copy.
          * */
         template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
-        static bool WriteMatrix(const std::vector<std::vector<T>> mat, std::shared_ptr<DATA_H5Location> h5loc,
-                                const std::string dataset_name)
+        static bool WriteMatrix(const data::MatrixView<const T> &mat, std::shared_ptr<DATA_H5Location> h5loc,
+                                const std::string dataset_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
         {
+            DATA_H5_PROBE("WriteMatrix", dataset_name, HDF5::instrument::type_name<T>());
+            DATA_H5_PROBE_RECORDS(mat.rows(), mat.size() * sizeof(T));
             const DataType &dtype = *HDF5::to_h5type<T>::get();
+            const DataType &file_type = *HDF5::to_h5filetype<T>::get();
             const int RANK = 2;
-            hsize_t colsize = mat[0].size();
-            hsize_t offset[2] = {0, 0}; // starting point row, col index
-            hsize_t count[2] = {1, 1};  // block count
-            hsize_t stride[2] = {1, 1}; // block stride
-            hsize_t block[2] = {1, colsize};
-            hsize_t dims[RANK] = {mat.size(), colsize};
+            hsize_t dims[RANK] = {mat.rows(), mat.cols()};
             DataSpace space(RANK, dims);
-            DataSet dataset(h5loc->createDataSet(dataset_name, dtype, space));
-            DataSpace memspace(RANK, block, NULL); // sub dataspace for each row
+            DataSet dataset(DATA_H5_CALL(h5loc->createDataSet(dataset_name, file_type, space,
+                                                              policy.create_plist(file_type, RANK, dims))));
+            DATA_H5_PROBE_DATASET(dataset);
+
+            if (mat.empty())
+            {
+                // nothing to write, the dataset has a zero-sized dim
+            }
+            else if (mat.is_contiguous())
+            {
+                DATA_H5_CALL(dataset.write(mat.data(), dtype));
+            }
+            else
+            {
+                hsize_t mem_dims[RANK] = {mat.rows(), mat.stride()};
+                hsize_t offset[RANK] = {0, 0};
+                DataSpace memspace(RANK, mem_dims);
+                memspace.selectHyperslab(H5S_SELECT_SET, dims, offset);
+                DATA_H5_CALL(dataset.write(mat.data(), dtype, memspace, space));
+                memspace.close();
+            }
+            space.close();
+            dataset.close();
+            return true;
+        }
+
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static bool WriteMatrix(const data::Matrix<T> &mat, std::shared_ptr<DATA_H5Location> h5loc,
+                                const std::string dataset_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
+        {
+            return WriteMatrix<T>(mat.view(), h5loc, dataset_name, policy);
+        }
+
+        /**
+         * @brief write 2D array into a H5::DataSet
+         *  template parameter T  can be scalar or any trivially_copyable user type
+         * 
+         * @param mat data to write  of type `const std::vector<std::vector<T>>`, rows must have the same size
+         * @param h5loc handle/pointer to H5File
+         * @param dataset_name dataset name
+         * 
+         * @return true if successful 
+         * 
+         * rows are packed into a single buffer, then written by one H5Dwrite
+         * */
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static bool WriteMatrix(const std::vector<std::vector<T>> &mat, std::shared_ptr<DATA_H5Location> h5loc,
+                                const std::string dataset_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
+        {
+            return WriteMatrix<T>(data::Matrix<T>::from_nested(mat), h5loc, dataset_name, policy);
+        }
+
+        /**
+         * @brief read 2D array from a H5::DataSet into caller memory by a single H5Dread
+         * 
+         * @param h5loc handle/pointer to H5File
+         * @param dataset_name dataset name
+         * @param mat row-major view, can be strided, its column count must match the dataset
+         * @param row_start first row to read, `mat.rows()` rows are read
+         * 
+         * @return true if successful 
+         * 
+         * */
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static bool ReadMatrix(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name,
+                               const data::MatrixView<T> &mat, hsize_t row_start = 0)
+        {
+            DATA_H5_PROBE("ReadMatrix", dataset_name, HDF5::instrument::type_name<T>());
+            DATA_H5_PROBE_RECORDS(mat.rows(), mat.size() * sizeof(T));
+            const DataType &dtype = *HDF5::to_h5type<T>::get();
+            const int RANK = 2;
+            DataSet dataset(DATA_H5_CALL(h5loc->openDataSet(dataset_name)));
+            DATA_H5_PROBE_DATASET(dataset);
+            DataSpace space = dataset.getSpace();
+            hsize_t dims[RANK];
+            space.getSimpleExtentDims(dims, NULL);
+            if (dims[1] != mat.cols() || row_start + mat.rows() > dims[0])
+                throw std::invalid_argument("matrix shape does not match the dataset " + dataset_name);
 
-            // subset selection: hyperslab selections and element selections, to avoid creating T[][]
-            // https://support.hdfgroup.org/ftp/HDF5/current/src/unpacked/c++/examples/h5tutr_subset.cpp
-            for (const auto &v : mat)
+            if (mat.empty())
             {
-                space.selectHyperslab(H5S_SELECT_SET, count, offset, stride, block);
-                const void *buf = v.data();
-                dataset.write(buf, dtype, memspace, space);
-                offset[0] = offset[0] + 1;
+                // zero-sized selection
+            }
+            else if (mat.is_contiguous() && mat.rows() == dims[0])
+            {
+                DATA_H5_CALL(dataset.read(mat.data(), dtype));
+            }
+            else
+            {
+                hsize_t count[RANK] = {mat.rows(), mat.cols()};
+                hsize_t offset[RANK] = {row_start, 0};
+                hsize_t mem_dims[RANK] = {mat.rows(), mat.stride()};
+                hsize_t mem_offset[RANK] = {0, 0};
+                space.selectHyperslab(H5S_SELECT_SET, count, offset);
+                DataSpace memspace(RANK, mem_dims);
+                memspace.selectHyperslab(H5S_SELECT_SET, count, mem_offset);
+                DATA_H5_CALL(dataset.read(mat.data(), dtype, memspace, space));
+                memspace.close();
             }
-            memspace.close();
             space.close();
             dataset.close();
             return true;
         }
 
+        /**
+         * @brief read 2D array from a H5::DataSet into a single buffer
+         * 
+         * @return matrix of the type `data::Matrix<T>`
+         * */
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static data::Matrix<T> ReadFlatMatrix(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name)
+        {
+            const int RANK = 2;
+            hsize_t dims[RANK];
+            {
+                DataSet dataset(h5loc->openDataSet(dataset_name));
+                dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            }
+            data::Matrix<T> mat(dims[0], dims[1]);
+            ReadMatrix<T>(h5loc, dataset_name, mat.view());
+            return mat;
+        }
+
+        /**
+         * @brief read rows `[row_start, row_start + row_count)` from a H5::DataSet into a single buffer
+         * */
+        template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
+        static data::Matrix<T> ReadFlatMatrix(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name,
+                                              hsize_t row_start, hsize_t row_count)
+        {
+            const int RANK = 2;
+            hsize_t dims[RANK];
+            {
+                DataSet dataset(h5loc->openDataSet(dataset_name));
+                dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            }
+            data::Matrix<T> mat(row_count, dims[1]);
+            ReadMatrix<T>(h5loc, dataset_name, mat.view(), row_start);
+            return mat;
+        }
+
         /**
          * @brief read 2D array from a H5::DataSet
          *  template parameter T  can be scalar or any trivially_copyable user type
          * 
          * @param h5loc handle/pointer to H5File
          * @param dataset_name dataset name
-         * @param dtype hdf5 data type definition for the element, CompType or PredType::NATIVE_*
          * 
          * @return matrix of the type `std::vector<std::vector<T>>`
          * 
+         * the dataset is read by one H5Dread into a single buffer, then unpacked into rows
          * */
         template <class T, typename = typename std::enable_if<std::is_trivially_copyable<T>::value>::type>
         static std::vector<std::vector<T>> ReadMatrix(std::shared_ptr<DATA_H5Location> h5loc,
                                                       std::string dataset_name)
         {
-            const DataType &dtype = *HDF5::to_h5type<T>::get();
-            std::vector<std::vector<T>> mat;
-            const int RANK = 2;
-            DataSet dataset(h5loc->openDataSet(dataset_name));
+            return ReadFlatMatrix<T>(h5loc, dataset_name).to_nested();
+        }
 
-            hsize_t dims[RANK];
+        /**
+         * @brief write a buffer of shape `dims` into a new dataset, one column of a struct-of-arrays group
+         *
+         * the chunk size of `policy` is ignored, it is computed from the element size if a filter is set,
+         * otherwise the column is contiguous
+         * */
+        template <class E>
+        static void WriteColumnData(const E *data, const std::vector<hsize_t> &dims,
+                                    std::shared_ptr<DATA_H5Location> h5loc, const std::string &column_name,
+                                    const HDF5::StoragePolicy &policy = HDF5::to_h5storage<E>::get())
+        {
+            const DataType &dtype = *HDF5::to_h5type<E>::get();
+            const DataType &file_type = *HDF5::to_h5filetype<E>::get();
+            HDF5::StoragePolicy p = policy;
+            p.chunk_elements = 0;
+            const int rank = static_cast<int>(dims.size());
+            DataSpace space(rank, dims.data());
+            DataSet dataset(DATA_H5_CALL(h5loc->createDataSet(column_name, file_type, space,
+                                                              p.create_plist(file_type, rank, dims.data()))));
+            if (space.getSimpleExtentNpoints() > 0)
+                DATA_H5_CALL(dataset.write(data, dtype));
+            space.close();
+            dataset.close();
+        }
+
+        /**
+         * @brief gather one member of `count` records into a column dataset of the shape `count x extents`
+         *
+         * @param count record count
+         * @param extents element count of each dim of the member, empty for a scalar member, e.g. `{2}` for `int[2]`
+         * @param get `get(i)` returns `const E*` to the elements of the member in record `i`
+         * @param h5loc group of the columns
+         * @param column_name dataset name
+         * @param policy filters of the dataset, the chunk size is computed from the element size
+         * */
+        template <class E, class Getter>
+        static void WriteColumn(size_t count, const std::vector<hsize_t> &extents, Getter get,
+                                std::shared_ptr<DATA_H5Location> h5loc, const std::string &column_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<E>::get())
+        {
+            DATA_H5_PROBE("WriteColumn", column_name, HDF5::instrument::type_name<E>());
+            size_t per_record = 1;
+            for (hsize_t e : extents)
+                per_record *= e;
+            std::vector<E> buffer(count * per_record);
+            for (size_t i = 0; i < count; i++)
+                std::copy_n(get(i), per_record, buffer.data() + i * per_record);
+            std::vector<hsize_t> dims(1, count);
+            dims.insert(dims.end(), extents.begin(), extents.end());
+            WriteColumnData<E>(buffer.data(), dims, h5loc, column_name, policy);
+            DATA_H5_PROBE_RECORDS(count, buffer.size() * sizeof(E));
+        }
+
+        /**
+         * @brief write rows of different lengths into a group of two datasets, `row_offsets` and `values`
+         *
+         * `row_offsets` has `rows + 1` elements, row `i` is `values[row_offsets[i], row_offsets[i + 1])`
+         * */
+        template <class E>
+        static bool WriteRagged(const data::RaggedArray<E> &ragged, std::shared_ptr<DATA_H5Location> h5loc,
+                                const std::string &group_name,
+                                const HDF5::StoragePolicy &policy = HDF5::to_h5storage<E>::get())
+        {
+            DATA_H5_PROBE("WriteRagged", group_name, HDF5::instrument::type_name<E>());
+            auto group = std::make_shared<H5::Group>(DATA_H5_CALL(h5loc->createGroup(group_name)));
+            DATA_H5_PROBE_DATASET(*group);
+            typedef typename data::RaggedArray<E>::offset_type offset_type;
+            WriteColumnData<offset_type>(ragged.offsets().data(), {ragged.offsets().size()}, group, "row_offsets",
+                                         policy);
+            WriteColumnData<E>(ragged.values().data(), {ragged.values().size()}, group, "values", policy);
+            DATA_H5_PROBE_RECORDS(ragged.rows(), ragged.offsets().size() * sizeof(offset_type) +
+                                                     ragged.values().size() * sizeof(E));
+            group->close();
+            return true;
+        }
+
+        /**
+         * @brief gather a vlen member of `count` records, e.g. `std::vector<E>` or `std::string`, by `WriteRagged()`
+         *
+         * @param get `get(i)` returns `data::ArrayView<const E>` of the member in record `i`
+         * */
+        template <class E, class Getter>
+        static void WriteVlenColumn(size_t count, Getter get, std::shared_ptr<DATA_H5Location> h5loc,
+                                    const std::string &column_name,
+                                    const HDF5::StoragePolicy &policy = HDF5::to_h5storage<E>::get())
+        {
+            size_t total = 0;
+            for (size_t i = 0; i < count; i++)
+                total += get(i).size();
+            data::RaggedArray<E> ragged;
+            ragged.reserve(count, total);
+            for (size_t i = 0; i < count; i++)
+            {
+                const data::ArrayView<const E> v = get(i);
+                ragged.push_back(v.data(), v.size());
+            }
+            WriteRagged<E>(ragged, h5loc, column_name, policy);
+        }
+
+        /**
+         * @brief read rows `[start, start + count)` of a column into a flat vector, only these bytes are read
+         *
+         * the range is clipped to the dataset length, a row of a `n x extents` column has `product(extents)` elements
+         * */
+        template <class E>
+        static std::vector<E> ReadColumn(std::shared_ptr<DATA_H5Location> h5loc, const std::string &column_name,
+                                         hsize_t start = 0, hsize_t count = std::numeric_limits<hsize_t>::max())
+        {
+            DATA_H5_PROBE("ReadColumn", column_name, HDF5::instrument::type_name<E>());
+            DataSet dataset(DATA_H5_CALL(h5loc->openDataSet(column_name)));
+            DATA_H5_PROBE_DATASET(dataset);
             DataSpace space = dataset.getSpace();
-            //assert(dataset.isSimple());                        // load all into memory from the whole file
-            auto rank = space.getSimpleExtentDims(dims, NULL); // rank = 1
-            const hsize_t rowsize = dims[0];
-            const hsize_t colsize = dims[1];
-
-            hsize_t offset[RANK] = {0, 0}; // starting point row, col index
-            hsize_t count[RANK] = {1, 1};  // block count
-            hsize_t stride[RANK] = {1, 1}; // block stride
-            hsize_t block[RANK] = {1, colsize};
-
-            DataSpace memspace(RANK, block, NULL); // sub dataspace for each row
-
-            // subset selection: hyperslab selections and element selections, to avoid creating T[][]
-            // https://support.hdfgroup.org/ftp/HDF5/current/src/unpacked/c++/examples/h5tutr_subset.cpp
-            for (hsize_t i = 0; i < rowsize; i++)
-            {
-                space.selectHyperslab(H5S_SELECT_SET, count, offset, stride, block);
-                std::vector<T> vec(colsize);
-                void *buf = vec.data();
-                dataset.read(buf, dtype, memspace, space);
-                mat.emplace_back(vec);
-                offset[0] = offset[0] + 1;
-            }
-            memspace.close();
+            const int rank = space.getSimpleExtentNdims();
+            std::vector<hsize_t> dims(rank);
+            space.getSimpleExtentDims(dims.data(), NULL);
+            start = std::min(start, dims[0]);
+            dims[0] = std::min(count, dims[0] - start);
+            size_t size = 1;
+            for (hsize_t d : dims)
+                size *= d;
+            std::vector<E> vec(size);
+            if (size > 0)
+            {
+                std::vector<hsize_t> offset(rank, 0);
+                offset[0] = start;
+                space.selectHyperslab(H5S_SELECT_SET, dims.data(), offset.data());
+                DataSpace memspace(rank, dims.data());
+                DATA_H5_CALL(dataset.read(vec.data(), *HDF5::to_h5type<E>::get(), memspace, space));
+                memspace.close();
+            }
+            DATA_H5_PROBE_RECORDS(dims[0], size * sizeof(E));
             space.close();
             dataset.close();
-            return mat;
+            return vec;
+        }
+
+        /**
+         * @brief read rows `[start, start + count)` of a column and scatter into `count` records
+         *
+         * @param set `set(i)` returns `E*` to the elements of the member in record `i`
+         * */
+        template <class E, class Setter>
+        static void ReadColumnInto(std::shared_ptr<DATA_H5Location> h5loc, const std::string &column_name,
+                                   hsize_t start, size_t count, Setter set)
+        {
+            const std::vector<E> column = ReadColumn<E>(h5loc, column_name, start, count);
+            if (count == 0)
+                return;
+            const size_t per_record = column.size() / count;
+            if (per_record * count != column.size() || per_record == 0)
+                throw std::runtime_error("row count of the column does not match the records: " + column_name);
+            for (size_t i = 0; i < count; i++)
+                std::copy_n(column.data() + i * per_record, per_record, set(i));
+        }
+
+        /**
+         * @brief read rows `[start, start + count)` of a group written by `WriteRagged()`
+         *
+         * only the offsets of these rows and their values are read, the range is clipped to the row count
+         * */
+        template <class E>
+        static data::RaggedArray<E> ReadRagged(std::shared_ptr<DATA_H5Location> h5loc, const std::string &group_name,
+                                               hsize_t start = 0, hsize_t count = std::numeric_limits<hsize_t>::max())
+        {
+            typedef typename data::RaggedArray<E>::offset_type offset_type;
+            const hsize_t offset_count = count < std::numeric_limits<hsize_t>::max() ? count + 1 : count;
+            std::vector<offset_type> offsets =
+                ReadColumn<offset_type>(h5loc, group_name + "/row_offsets", start, offset_count);
+            if (offsets.empty())
+                return data::RaggedArray<E>();
+            std::vector<E> values =
+                ReadColumn<E>(h5loc, group_name + "/values", offsets.front(), offsets.back() - offsets.front());
+            return data::RaggedArray<E>(std::move(offsets), std::move(values));
+        }
+
+        /**
+         * @brief write records as struct-of-arrays: a group of one dataset per member, by the generated `to_h5columns<T>`
+         *
+         * @param vec records to write
+         * @param h5loc handle/pointer to H5File or H5::Group
+         * @param group_name name of the new group
+         * @param policy filters of all columns, default: the policy registered for `T`
+         *
+         * members of nested classes are flattened into columns `member.field`, vlen members are written
+         * by `WriteRagged()`, the record count is saved as the group attribute `records`
+         * */
+        template <class T>
+        static bool WriteColumns(const std::vector<T> &vec, std::shared_ptr<DATA_H5Location> h5loc,
+                                 std::string group_name,
+                                 const HDF5::StoragePolicy &policy = HDF5::to_h5storage<T>::get())
+        {
+            DATA_H5_PROBE("WriteColumns", group_name, HDF5::instrument::type_name<T>());
+            auto group = std::make_shared<H5::Group>(DATA_H5_CALL(h5loc->createGroup(group_name)));
+            DATA_H5_PROBE_DATASET(*group);
+            HDF5::to_h5columns<T>::write(vec.data(), vec.size(), group, policy);
+            const unsigned long long records = vec.size();
+            Attribute attrib(group->createAttribute("records", PredType::NATIVE_ULLONG, H5S_SCALAR));
+            attrib.write(PredType::NATIVE_ULLONG, &records);
+            DATA_H5_PROBE_RECORDS(vec.size(), 0);
+            attrib.close();
+            group->close();
+            return true;
+        }
+
+        /**
+         * @brief read records `[start, start + count)` of a group written by `WriteColumns()`
+         *
+         * the range is clipped to the record count, use `ReadColumn()` to scan a single member
+         * */
+        template <class T>
+        static std::vector<T> ReadColumns(std::shared_ptr<DATA_H5Location> h5loc, std::string group_name,
+                                          hsize_t start = 0, hsize_t count = std::numeric_limits<hsize_t>::max())
+        {
+            DATA_H5_PROBE("ReadColumns", group_name, HDF5::instrument::type_name<T>());
+            auto group = std::make_shared<H5::Group>(DATA_H5_CALL(h5loc->openGroup(group_name)));
+            DATA_H5_PROBE_DATASET(*group);
+            unsigned long long records = 0;
+            Attribute attrib(group->openAttribute("records"));
+            attrib.read(PredType::NATIVE_ULLONG, &records);
+            attrib.close();
+            start = std::min<hsize_t>(start, records);
+            count = std::min<hsize_t>(count, records - start);
+            std::vector<T> vec = HDF5::to_h5columns<T>::read(group, start, count);
+            DATA_H5_PROBE_RECORDS(vec.size(), 0);
+            group->close();
+            return vec;
         }
 
 #if DATA_USE_EIGEN
         /**
-         *  write any Eigen dense Vector and Matrix types
+         * @brief write an Eigen dense matrix or vector straight from `.data()`, without copy or transpose
+         *
+         * dims are in the storage order, so a column-major matrix is seen transposed by a row-major reader,
+         * the attribute `storage_order` of value "row_major" or "column_major" is used by `ReadEigen()`.
+         * The dataset is created with the storage policy of the scalar type, or the given `policy`
          * */
         template <typename Derived>
-        void WriteEigen(const Eigen::EigenBase<Derived> &mat, std::shared_ptr<DATA_H5Location> h5loc, const std::string dataset_name)
+        static bool WriteEigen(const Eigen::PlainObjectBase<Derived> &mat, std::shared_ptr<DATA_H5Location> h5loc,
+                               const std::string dataset_name,
+                               const HDF5::StoragePolicy &policy = HDF5::to_h5storage<typename Derived::Scalar>::get())
         {
-            EigenHDF5::save(*h5loc, dataset_name, mat);
+            typedef typename Derived::Scalar Scalar;
+            DATA_H5_PROBE("WriteEigen", dataset_name, HDF5::instrument::type_name<Derived>());
+            DATA_H5_PROBE_RECORDS(mat.rows(), mat.size() * sizeof(Scalar));
+            const bool row_major = Derived::IsRowMajor;
+            const int RANK = 2;
+            hsize_t dims[RANK] = {static_cast<hsize_t>(mat.rows()), static_cast<hsize_t>(mat.cols())};
+            if (!row_major)
+                std::swap(dims[0], dims[1]);
+            const DataType &file_type = *HDF5::to_h5filetype<Scalar>::get();
+            DataSpace space(RANK, dims);
+            DataSet dataset(DATA_H5_CALL(h5loc->createDataSet(dataset_name, file_type, space,
+                                                              policy.create_plist(file_type, RANK, dims))));
+            DATA_H5_PROBE_DATASET(dataset);
+            if (mat.size() > 0)
+                DATA_H5_CALL(dataset.write(mat.data(), *HDF5::to_h5type<Scalar>::get()));
+            writeStringAttribute(&dataset, "storage_order", row_major ? "row_major" : "column_major");
+            return true;
+        }
+
+        /// an expression, block or map is evaluated into a matrix first
+        template <typename Derived>
+        static bool WriteEigen(const Eigen::DenseBase<Derived> &mat, std::shared_ptr<DATA_H5Location> h5loc,
+                               const std::string dataset_name,
+                               const HDF5::StoragePolicy &policy = HDF5::to_h5storage<typename Derived::Scalar>::get())
+        {
+            const typename Derived::PlainObject plain = mat;
+            return WriteEigen(plain, h5loc, dataset_name, policy);
         }
 
         /**
-         *  read any Eigen dense Vector and Matrix types
+         * @brief read a 1D or 2D dataset into an Eigen dense type, e.g. `ReadEigen<Eigen::MatrixXd>()`
+         *
+         * the values are read straight into `.data()` if the storage order in file, row-major if the dataset
+         * has no attribute `storage_order`, is the order of `MatrixType`; otherwise into a matrix of the file
+         * order, which is assigned to the result.
          * */
-        template <typename Derived>
-        Eigen::DenseBase<Derived> ReadEigen(std::shared_ptr<DATA_H5Location> h5loc, const std::string dataset_name)
+        template <typename MatrixType>
+        static MatrixType ReadEigen(std::shared_ptr<DATA_H5Location> h5loc, const std::string dataset_name)
         {
-            Eigen::DenseBase<Derived> mat;
-            EigenHDF5::load(*h5loc, dataset_name, mat);
+            typedef typename MatrixType::Scalar Scalar;
+            DATA_H5_PROBE("ReadEigen", dataset_name, HDF5::instrument::type_name<MatrixType>());
+            DataSet dataset = h5loc->openDataSet(dataset_name);
+            DATA_H5_PROBE_DATASET(dataset);
+            DataSpace space = dataset.getSpace();
+            const int rank = space.getSimpleExtentNdims();
+            if (rank < 1 || rank > 2)
+                throw std::runtime_error("dataset is not a vector or matrix: " + dataset_name);
+            hsize_t dims[2] = {1, 1};
+            space.getSimpleExtentDims(dims);
+
+            bool row_major = true;
+            if (dataset.attrExists("storage_order"))
+            {
+                Attribute at = dataset.openAttribute("storage_order");
+                std::string order;
+                at.read(at.getStrType(), order);
+                row_major = order.compare(0, 9, "row_major") == 0;
+            }
+            Eigen::Index rows = row_major ? dims[0] : dims[1];
+            Eigen::Index cols = row_major ? dims[1] : dims[0];
+            const bool is_vector = MatrixType::RowsAtCompileTime == 1 || MatrixType::ColsAtCompileTime == 1;
+            if (rank == 1 || (is_vector && (rows == 1 || cols == 1)))
+            {
+                // a vector dataset into a column or row vector
+                const Eigen::Index n = rows * cols;
+                rows = MatrixType::RowsAtCompileTime == 1 ? 1 : n;
+                cols = MatrixType::RowsAtCompileTime == 1 ? n : 1;
+            }
+            if ((MatrixType::RowsAtCompileTime != Eigen::Dynamic && MatrixType::RowsAtCompileTime != rows) ||
+                (MatrixType::ColsAtCompileTime != Eigen::Dynamic && MatrixType::ColsAtCompileTime != cols))
+                throw std::runtime_error("dataset shape does not match the Eigen type: " + dataset_name);
+
+            MatrixType mat;
+            mat.resize(rows, cols);
+            DATA_H5_PROBE_RECORDS(rows, mat.size() * sizeof(Scalar));
+            if (mat.size() == 0)
+                return mat;
+            const DataType &dtype = *HDF5::to_h5type<Scalar>::get();
+            if (rank == 1 || rows == 1 || cols == 1 || row_major == bool(MatrixType::IsRowMajor))
+                DATA_H5_CALL(dataset.read(mat.data(), dtype));
+            else if (row_major)
+            {
+                Eigen::Matrix<Scalar, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> tmp(rows, cols);
+                DATA_H5_CALL(dataset.read(tmp.data(), dtype));
+                mat = tmp;
+            }
+            else
+            {
+                Eigen::Matrix<Scalar, Eigen::Dynamic, Eigen::Dynamic, Eigen::ColMajor> tmp(rows, cols);
+                DATA_H5_CALL(dataset.read(tmp.data(), dtype));
+                mat = tmp;
+            }
             return mat;
         }
 #endif
@@ -0,0 +1,265 @@
+#pragma once
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <functional>
+#include <map>
+#include <mutex>
+#include <sstream>
+#include <string>
+#include <tuple>
+#include <typeinfo>
+#include <vector>
+
+#if defined(__GNUG__)
+#include <cxxabi.h>
+#include <cstdlib>
+#endif
+
+/**
+ * opt-in instrumentation of `data::IO` in HDF5IO.h and the generated serializers
+ *
+ * compile with `-DDATA_H5_INSTRUMENT=1` to enable, otherwise the probe macros expand to nothing
+ * (or to the bare HDF5 call) and there is no runtime cost at all.
+ * Each probed operation, e.g. `WriteVector` or `ComplexData_serialize_batch`, counts calls, records and bytes,
+ * the time of HDF5 calls wrapped by `DATA_H5_CALL()` and the rest as conversion time,
+ * aggregated per operation, dataset and type in `HDF5::instrument::registry`.
+ * */
+#ifndef DATA_H5_INSTRUMENT
+#define DATA_H5_INSTRUMENT 0
+#endif
+
+namespace HDF5
+{
+    namespace instrument
+    {
+        /// aggregated or per-call statistics, conversion time = total time - H5 call time
+        struct stats
+        {
+            std::uint64_t calls = 0;
+            std::uint64_t records = 0;
+            std::uint64_t bytes = 0; ///< bytes of the memory type, vlen data is not counted
+            double convert_seconds = 0;
+            double h5_seconds = 0;
+
+            stats &operator+=(const stats &o)
+            {
+                calls += o.calls;
+                records += o.records;
+                bytes += o.bytes;
+                convert_seconds += o.convert_seconds;
+                h5_seconds += o.h5_seconds;
+                return *this;
+            }
+        };
+
+        struct event
+        {
+            std::string operation;
+            std::string dataset;
+            std::string type;
+            stats value;
+        };
+
+        /// readable type name for the registry
+        template <class T>
+        std::string type_name()
+        {
+            const char *name = typeid(T).name();
+#if defined(__GNUG__)
+            int status = 0;
+            char *demangled = abi::__cxa_demangle(name, nullptr, nullptr, &status);
+            if (status == 0 && demangled)
+            {
+                std::string s(demangled);
+                std::free(demangled);
+                return s;
+            }
+#endif
+            return name;
+        }
+
+        /**
+         * @brief thread-safe registry of statistics per (operation, dataset, type)
+         * */
+        class registry
+        {
+        public:
+            typedef std::function<void(const event &)> callback_t;
+
+            static registry &instance()
+            {
+                static registry r;
+                return r;
+            }
+
+            void add(const event &e)
+            {
+                callback_t cb;
+                {
+                    std::lock_guard<std::mutex> lock(m_mutex);
+                    m_stats[std::make_tuple(e.operation, e.dataset, e.type)] += e.value;
+                    cb = m_callback;
+                }
+                if (cb)
+                    cb(e);
+            }
+
+            /// called after each probed operation, in the calling thread
+            void set_callback(callback_t cb)
+            {
+                std::lock_guard<std::mutex> lock(m_mutex);
+                m_callback = cb;
+            }
+
+            std::vector<event> snapshot() const
+            {
+                std::lock_guard<std::mutex> lock(m_mutex);
+                std::vector<event> events;
+                for (const auto &it : m_stats)
+                    events.push_back({std::get<0>(it.first), std::get<1>(it.first), std::get<2>(it.first), it.second});
+                return events;
+            }
+
+            void reset()
+            {
+                std::lock_guard<std::mutex> lock(m_mutex);
+                m_stats.clear();
+            }
+
+            std::string to_json() const
+            {
+                std::ostringstream os;
+                os << "[";
+                const auto events = snapshot();
+                for (size_t i = 0; i < events.size(); i++)
+                {
+                    const event &e = events[i];
+                    os << (i ? "," : "") << "\n  {\"operation\": " << quote(e.operation)
+                       << ", \"dataset\": " << quote(e.dataset) << ", \"type\": " << quote(e.type)
+                       << ", \"calls\": " << e.value.calls << ", \"records\": " << e.value.records
+                       << ", \"bytes\": " << e.value.bytes << ", \"convert_seconds\": " << e.value.convert_seconds
+                       << ", \"h5_seconds\": " << e.value.h5_seconds << "}";
+                }
+                os << "\n]\n";
+                return os.str();
+            }
+
+        private:
+            static std::string quote(const std::string &s)
+            {
+                std::string q = "\"";
+                for (char c : s)
+                {
+                    if (c == '"' || c == '\\')
+                        q.push_back('\\');
+                    if (static_cast<unsigned char>(c) < 0x20)
+                    {
+                        char buf[8];
+                        std::snprintf(buf, sizeof(buf), "\\u%04x", c);
+                        q += buf;
+                    }
+                    else
+                        q.push_back(c);
+                }
+                return q + "\"";
+            }
+
+            mutable std::mutex m_mutex;
+            std::map<std::tuple<std::string, std::string, std::string>, stats> m_stats;
+            callback_t m_callback;
+        };
+
+        typedef std::chrono::steady_clock clock;
+
+        /**
+         * @brief RAII probe of one operation, recorded into the registry on destruction
+         *
+         * probes nest per thread, the time of a HDF5 call is added to all enclosing probes
+         * */
+        class scope
+        {
+        public:
+            scope(const char *operation, std::string dataset, std::string type)
+                : m_parent(current()), m_start(clock::now())
+            {
+                m_event.operation = operation;
+                m_event.dataset = std::move(dataset);
+                m_event.type = std::move(type);
+                m_event.value.calls = 1;
+                current() = this;
+            }
+
+            scope(const scope &) = delete;
+            scope &operator=(const scope &) = delete;
+
+            ~scope()
+            {
+                current() = m_parent;
+                const double total = std::chrono::duration<double>(clock::now() - m_start).count();
+                m_event.value.convert_seconds = total - m_event.value.h5_seconds;
+                registry::instance().add(m_event);
+            }
+
+            /// full path of the dataset once it is opened, the same key as in the generated serializers
+            void set_dataset(std::string dataset)
+            {
+                m_event.dataset = std::move(dataset);
+            }
+
+            void add(std::uint64_t records, std::uint64_t bytes)
+            {
+                m_event.value.records += records;
+                m_event.value.bytes += bytes;
+            }
+
+            /// innermost probe of this thread, nullptr if none
+            static scope *&current()
+            {
+                static thread_local scope *s = nullptr;
+                return s;
+            }
+
+            static void add_h5_seconds(double seconds)
+            {
+                for (scope *s = current(); s; s = s->m_parent)
+                    s->m_event.value.h5_seconds += seconds;
+            }
+
+        private:
+            scope *m_parent;
+            clock::time_point m_start;
+            event m_event;
+        };
+
+        /// call `f()` and add its time to the enclosing probes as HDF5 call time
+        template <class F>
+        auto timed(F f) -> decltype(f())
+        {
+            struct timer
+            {
+                clock::time_point start = clock::now();
+                ~timer()
+                {
+                    scope::add_h5_seconds(std::chrono::duration<double>(clock::now() - start).count());
+                }
+            } t;
+            return f();
+        }
+    } // namespace instrument
+} // namespace HDF5
+
+#if DATA_H5_INSTRUMENT
+/// probe the enclosing block as `operation` on `dataset` of `type`, one probe per block
+#define DATA_H5_PROBE(operation, dataset, type) \
+    HDF5::instrument::scope _data_h5_probe((operation), (dataset), (type))
+#define DATA_H5_PROBE_RECORDS(records, bytes) _data_h5_probe.add((records), (bytes))
+#define DATA_H5_PROBE_DATASET(dataset) _data_h5_probe.set_dataset((dataset).getObjName())
+/// HDF5 call expression, its time is not counted as conversion
+#define DATA_H5_CALL(expression) HDF5::instrument::timed([&]() { return expression; })
+#else
+#define DATA_H5_PROBE(operation, dataset, type)
+#define DATA_H5_PROBE_RECORDS(records, bytes)
+#define DATA_H5_PROBE_DATASET(dataset)
+#define DATA_H5_CALL(expression) expression
+#endif
@@ -0,0 +1,164 @@
+#pragma once
+#include <cstddef>
+#include <memory>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+#if defined(__unix__) || defined(__APPLE__)
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#define DATA_H5_HAS_MMAP 1
+#else
+#define DATA_H5_HAS_MMAP 0
+#endif
+
+#include "HDF5IO.h"
+
+/**
+ * zero-copy read of a 1D dataset of trivially-copyable records by `mmap` of the raw data in the file
+ *
+ * it is possible only if the dataset is contiguous, i.e. not chunked and without filter, its storage is allocated
+ * in a single file by the default `sec2` driver, the file type is identical to the memory type of `T`,
+ * e.g. not `--packed`, and the data address is aligned for `T`. Otherwise the dataset is read by
+ * `data::IO::ReadVector<T>()`. Pages are loaded on access and shared by all processes mapping the same file.
+ * */
+namespace HDF5
+{
+    /**
+     * @brief read-only span of the records of a dataset, mapped from the file or read into a vector
+     *
+     * the mapping is valid until this object is destroyed, independent of the file and dataset handles;
+     * the file must not be modified meanwhile.
+     * */
+    template <class T>
+    class MappedVector
+    {
+        static_assert(std::is_trivially_copyable<T>::value, "only trivially-copyable records can be mapped");
+
+    public:
+        MappedVector(std::shared_ptr<DATA_H5Location> h5loc, const std::string &dataset_name)
+            : m_data(nullptr), m_size(0), m_map(nullptr), m_map_length(0)
+        {
+            DATA_H5_PROBE("MappedVector", dataset_name, instrument::type_name<T>());
+            H5::DataSet dataset = h5loc->openDataSet(dataset_name);
+            DATA_H5_PROBE_DATASET(dataset);
+            if (!map(dataset))
+            {
+                m_vector = data::IO::ReadVector<T>(h5loc, dataset_name);
+                m_data = m_vector.data();
+                m_size = m_vector.size();
+            }
+            DATA_H5_PROBE_RECORDS(m_size, m_size * sizeof(T));
+        }
+
+        MappedVector(const MappedVector &) = delete;
+        MappedVector &operator=(const MappedVector &) = delete;
+
+        MappedVector(MappedVector &&o)
+            : m_data(o.m_data), m_size(o.m_size), m_vector(std::move(o.m_vector)), m_map(o.m_map),
+              m_map_length(o.m_map_length)
+        {
+            if (!m_map)
+                m_data = m_vector.data();
+            o.m_data = nullptr;
+            o.m_size = 0;
+            o.m_map = nullptr;
+            o.m_map_length = 0;
+        }
+
+        ~MappedVector()
+        {
+#if DATA_H5_HAS_MMAP
+            if (m_map)
+                munmap(m_map, m_map_length);
+#endif
+        }
+
+        /// true if the records are mapped from the file, false if they are read into memory
+        bool is_mapped() const { return m_map != nullptr; }
+
+        const T *data() const { return m_data; }
+        size_t size() const { return m_size; }
+        bool empty() const { return m_size == 0; }
+        const T *begin() const { return m_data; }
+        const T *end() const { return m_data + m_size; }
+        const T &operator[](size_t i) const { return m_data[i]; }
+        data::ArrayView<const T> view() const { return data::ArrayView<const T>(m_data, m_size); }
+
+    private:
+        /// map the raw data if all checks pass, false to fall back to a read
+        bool map(const H5::DataSet &dataset)
+        {
+#if DATA_H5_HAS_MMAP
+            H5::DataSpace space = dataset.getSpace();
+            if (space.getSimpleExtentNdims() != 1)
+                return false;
+            hsize_t dims[1];
+            space.getSimpleExtentDims(dims);
+
+            H5::DSetCreatPropList plist = dataset.getCreatePlist();
+            if (plist.getLayout() != H5D_CONTIGUOUS || plist.getNfilters() > 0 || plist.getExternalCount() > 0)
+                return false;
+            if (!(dataset.getDataType() == *to_h5type<T>::get()) || dataset.getDataType().getSize() != sizeof(T))
+                return false;
+            if (dims[0] == 0)
+                return true; // nothing to map, empty span
+            if (!is_sec2_file(dataset))
+                return false;
+            const haddr_t offset = dataset.getOffset();
+            if (offset == HADDR_UNDEF || offset % alignof(T) != 0)
+                return false; // storage is not allocated, or misaligned records
+
+            unsigned intent = 0;
+            hid_t file_id = H5Iget_file_id(dataset.getId());
+            if (H5Fget_intent(file_id, &intent) >= 0 && (intent & H5F_ACC_RDWR))
+                H5Fflush(file_id, H5F_SCOPE_LOCAL); // raw data cached by HDF5 is written to the file first
+            H5Idec_ref(file_id);
+
+            const size_t bytes = dims[0] * sizeof(T);
+            int fd = ::open(dataset.getFileName().c_str(), O_RDONLY);
+            if (fd < 0)
+                return false;
+            struct stat st;
+            const long page = sysconf(_SC_PAGESIZE);
+            const off_t base = static_cast<off_t>(offset / page * page);
+            const size_t delta = static_cast<size_t>(offset - base);
+            void *p = MAP_FAILED;
+            if (fstat(fd, &st) == 0 && static_cast<haddr_t>(st.st_size) >= offset + bytes)
+                p = mmap(nullptr, bytes + delta, PROT_READ, MAP_SHARED, fd, base);
+            ::close(fd); // the mapping keeps the file open
+            if (p == MAP_FAILED)
+                return false;
+            m_map = p;
+            m_map_length = bytes + delta;
+            m_data = reinterpret_cast<const T *>(static_cast<const char *>(p) + delta);
+            m_size = dims[0];
+            return true;
+#else
+            (void)dataset;
+            return false;
+#endif
+        }
+
+        /// raw data at the file offset of `H5Dget_offset()`, not split or in memory by another driver
+        static bool is_sec2_file(const H5::DataSet &dataset)
+        {
+            hid_t file_id = H5Iget_file_id(dataset.getId());
+            hid_t fapl = H5Fget_access_plist(file_id);
+            const bool sec2 = fapl >= 0 && H5Pget_driver(fapl) == H5FD_SEC2;
+            if (fapl >= 0)
+                H5Pclose(fapl);
+            H5Idec_ref(file_id);
+            return sec2;
+        }
+
+        const T *m_data;
+        size_t m_size;
+        std::vector<T> m_vector; ///< records read by the fallback
+        void *m_map;
+        size_t m_map_length;
+    };
+} // namespace HDF5
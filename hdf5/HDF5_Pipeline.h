@@ -0,0 +1,418 @@
+#pragma once
+#include <condition_variable>
+#include <cstring>
+#include <deque>
+#include <exception>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <type_traits>
+#include <vector>
+
+#include "HDF5IO.h"
+
+/**
+ * pipelined writer of records into an extendible 1D dataset
+ *
+ * the caller hands off blocks of records and continues; a pool of worker threads converts each block
+ * into the memory layout of H5Dwrite, i.e. `<class_name>_hvl` with the vlen pointers gathered, or the
+ * records without padding if the file type is packed; one I/O thread writes the converted blocks in order.
+ * HDF5 is only called by the I/O thread while the writer is open, and the HDF5 calls of all writers are
+ * serialized by `HDF5::pipeline_mutex()`, so the HDF5 library is not required to be thread-safe.
+ * Other threads of the application must hold this mutex to call HDF5 while a writer is open,
+ * unless the library is built with `--enable-threadsafe`.
+ * */
+namespace HDF5
+{
+    /// lock of the HDF5 calls of pipelined writers, the I/O threads of two writers do not call HDF5 concurrently;
+    /// it is `HDF5::library_mutex()`, also held while a generated CompType is built on first use
+    inline std::recursive_mutex &pipeline_mutex()
+    {
+        return library_mutex();
+    }
+
+    /**
+     * @brief writer of records by a pool of conversion threads and one I/O thread
+     *
+     * records are kept in a block of `block_size`, default one chunk; a full block is submitted to the pipeline.
+     * At most `max_blocks` blocks are in flight, submitted but not written yet, `append()` waits for a free slot,
+     * so the memory is bounded. An error of a worker or the I/O thread is thrown by the next `append()`,
+     * `flush()` or `close()` in the caller thread, the blocks after the error are not written.
+     * */
+    template <class T>
+    class PipelinedWriter
+    {
+    public:
+        typedef typename to_h5staging<T>::type staged_type;
+
+        /**
+         * @param workers conversion threads, 0: one less than the hardware threads, at least one
+         * @param block_size records per block, 0: the chunk size of the storage policy
+         * @param max_blocks blocks in flight, 0: twice the worker count plus two
+         * */
+        PipelinedWriter(std::shared_ptr<DATA_H5Location> h5loc, std::string dataset_name, size_t workers = 0,
+                        size_t block_size = 0, size_t max_blocks = 0,
+                        const StoragePolicy &policy = to_h5storage<T>::get())
+            : m_length(0), m_submitted(0), m_stop(false)
+        {
+            std::unique_lock<std::recursive_mutex> h5_lock(pipeline_mutex());
+            const H5::DataType &dtype = *to_h5type<T>::get();
+            StoragePolicy p = policy;
+            if (p.chunk_elements == 0)
+                p.chunk_elements = StoragePolicy::chunked(dtype.getSize()).chunk_elements;
+
+            if (H5Lexists(h5loc->getId(), dataset_name.c_str(), H5P_DEFAULT) > 0)
+            {
+                m_dataset = h5loc->openDataSet(dataset_name);
+                m_length = data::IO::GetExtendibleLength(m_dataset, dataset_name);
+            }
+            else
+            {
+                const int RANK = 1;
+                hsize_t dims[RANK] = {0};
+                hsize_t maxdims[RANK] = {H5S_UNLIMITED};
+                H5::DataSpace space(RANK, dims, maxdims);
+                const H5::DataType &file_type = *to_h5filetype<T>::get();
+                m_dataset = h5loc->createDataSet(dataset_name, file_type, space,
+                                                 p.create_plist(file_type, RANK, dims, maxdims));
+            }
+            m_name = m_dataset.getObjName();
+            init_packing();
+            h5_lock.unlock();
+
+            if (workers == 0)
+                workers = std::max(2u, std::thread::hardware_concurrency()) - 1;
+            m_block_size = block_size ? block_size : p.chunk_elements;
+            m_max_blocks = max_blocks ? max_blocks : 2 * workers + 2;
+            m_block.reserve(m_block_size);
+            for (size_t i = 0; i < workers; i++)
+                m_workers.emplace_back([this]() { convert_loop(); });
+            m_io = std::thread([this]() { write_loop(); });
+        }
+
+        PipelinedWriter(const PipelinedWriter &) = delete;
+        PipelinedWriter &operator=(const PipelinedWriter &) = delete;
+
+        ~PipelinedWriter()
+        {
+            try
+            {
+                close();
+            }
+            catch (...)
+            {
+                std::cerr << "failed to write the pipelined records to dataset\n";
+            }
+        }
+
+        void append(const T &value)
+        {
+            m_block.push_back(value);
+            if (m_block.size() >= m_block_size)
+                submit_block();
+        }
+
+        void append(T &&value)
+        {
+            m_block.push_back(std::move(value));
+            if (m_block.size() >= m_block_size)
+                submit_block();
+        }
+
+        /// hand off a block of records of any size without copy, the buffered records are submitted first
+        void append(std::vector<T> &&records)
+        {
+            submit_block();
+            submit(std::move(records));
+        }
+
+        /// submit the buffered records and wait until all submitted blocks are written
+        void flush()
+        {
+            submit_block();
+            std::unique_lock<std::mutex> lock(m_mutex);
+            m_cv.wait(lock, [this]() { return m_blocks.empty(); });
+            rethrow();
+        }
+
+        /// flush, stop the threads and close the dataset
+        void close()
+        {
+            if (!is_open())
+                return;
+            std::exception_ptr error;
+            try
+            {
+                flush();
+            }
+            catch (...)
+            {
+                error = std::current_exception();
+            }
+            {
+                std::lock_guard<std::mutex> lock(m_mutex);
+                m_stop = true;
+            }
+            m_cv.notify_all();
+            for (auto &t : m_workers)
+                t.join();
+            m_workers.clear();
+            m_io.join();
+            std::lock_guard<std::recursive_mutex> h5_lock(pipeline_mutex());
+            m_dataset.close();
+            if (error)
+                std::rethrow_exception(error);
+        }
+
+        bool is_open() const
+        {
+            return m_io.joinable();
+        }
+
+        /// record count, including the records not written yet
+        size_t size() const
+        {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            return m_length + m_submitted + m_block.size();
+        }
+
+    private:
+        struct Block
+        {
+            std::vector<T> records;
+            std::vector<staged_type> staged; ///< `<class_name>_hvl` of the records
+            std::vector<char> packed;        ///< records in the layout of the packed file type
+            bool converted = false;
+        };
+
+        /// byte range of a member in the memory type and in the packed file type
+        struct MemberCopy
+        {
+            size_t mem_offset;
+            size_t file_offset;
+            size_t size;
+        };
+
+        static constexpr bool is_staged = !std::is_same<staged_type, T>::value;
+
+        /// padding is removed by the workers if the file type is packed and has no vlen member
+        void init_packing()
+        {
+            const H5::DataType &dtype = *to_h5type<T>::get();
+            const H5::DataType &file_type = *to_h5filetype<T>::get();
+            m_file_size = file_type.getSize();
+            if (is_staged || !std::is_trivially_copyable<T>::value || m_file_size >= dtype.getSize() ||
+                dtype.getClass() != H5T_COMPOUND || dtype.detectClass(H5T_VLEN) || dtype.detectClass(H5T_STRING))
+                return;
+            member_copies(static_cast<const H5::CompType &>(dtype), static_cast<const H5::CompType &>(file_type),
+                          0, 0, m_copies);
+        }
+
+        static void member_copies(const H5::CompType &mem, const H5::CompType &file, size_t mem_base,
+                                  size_t file_base, std::vector<MemberCopy> &copies)
+        {
+            for (int i = 0; i < mem.getNmembers(); i++)
+            {
+                const int j = file.getMemberIndex(mem.getMemberName(i));
+                const size_t mem_offset = mem_base + mem.getMemberOffset(i);
+                const size_t file_offset = file_base + file.getMemberOffset(j);
+                if (mem.getMemberClass(i) == H5T_COMPOUND)
+                {
+                    member_copies(mem.getMemberCompType(i), file.getMemberCompType(j), mem_offset, file_offset,
+                                  copies);
+                    continue;
+                }
+                const size_t size = mem.getMemberDataType(i).getSize();
+                MemberCopy *last = copies.empty() ? nullptr : &copies.back();
+                if (last && last->mem_offset + last->size == mem_offset && last->file_offset + last->size == file_offset)
+                    last->size += size; // adjacent in both layouts, a single memcpy
+                else
+                    copies.push_back({mem_offset, file_offset, size});
+            }
+        }
+
+        void submit_block()
+        {
+            if (m_block.empty())
+                return;
+            std::vector<T> records;
+            records.reserve(m_block_size);
+            std::swap(records, m_block);
+            submit(std::move(records));
+        }
+
+        void submit(std::vector<T> &&records)
+        {
+            if (records.empty())
+                return;
+            std::shared_ptr<Block> block = std::make_shared<Block>();
+            block->records = std::move(records);
+            {
+                std::unique_lock<std::mutex> lock(m_mutex);
+                // backpressure: wait until a block in flight is written
+                m_cv.wait(lock, [this]() { return m_blocks.size() < m_max_blocks || m_error; });
+                rethrow();
+                m_submitted += block->records.size();
+                m_blocks.push_back(block);
+                m_queue.push_back(block);
+            }
+            m_cv.notify_all();
+        }
+
+        /// the error is kept, the writer can only be closed after an error
+        void rethrow()
+        {
+            if (m_error)
+                std::rethrow_exception(m_error);
+        }
+
+        void set_error(std::exception_ptr error)
+        {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            if (!m_error)
+                m_error = error;
+        }
+
+        /// worker thread: convert blocks in any order, no HDF5 call
+        void convert_loop()
+        {
+            for (;;)
+            {
+                std::shared_ptr<Block> block;
+                {
+                    std::unique_lock<std::mutex> lock(m_mutex);
+                    m_cv.wait(lock, [this]() { return m_stop || !m_queue.empty(); });
+                    if (m_queue.empty())
+                        return;
+                    block = m_queue.front();
+                    m_queue.pop_front();
+                }
+                try
+                {
+                    DATA_H5_PROBE("PipelinedWriter::convert", m_name, instrument::type_name<T>());
+                    DATA_H5_PROBE_RECORDS(block->records.size(), block->records.size() * sizeof(T));
+                    convert(*block, std::integral_constant<bool, is_staged>());
+                }
+                catch (...)
+                {
+                    set_error(std::current_exception());
+                }
+                {
+                    std::lock_guard<std::mutex> lock(m_mutex);
+                    block->converted = true;
+                }
+                m_cv.notify_all();
+            }
+        }
+
+        void convert(Block &block, std::true_type)
+        {
+            block.staged = to_h5staging<T>::pack(block.records.data(), block.records.size());
+        }
+
+        void convert(Block &block, std::false_type)
+        {
+            if (m_copies.empty())
+                return; // written as they are
+            const size_t n = block.records.size();
+            block.packed.resize(n * m_file_size);
+            const char *src = reinterpret_cast<const char *>(block.records.data());
+            char *dst = block.packed.data();
+            for (size_t i = 0; i < n; i++, src += sizeof(T), dst += m_file_size)
+                for (const auto &c : m_copies)
+                    std::memcpy(dst + c.file_offset, src + c.mem_offset, c.size);
+        }
+
+        /// I/O thread: write the converted blocks in the order of submission
+        void write_loop()
+        {
+            for (;;)
+            {
+                std::shared_ptr<Block> block;
+                bool skip;
+                {
+                    std::unique_lock<std::mutex> lock(m_mutex);
+                    m_cv.wait(lock, [this]() {
+                        return (!m_blocks.empty() && m_blocks.front()->converted) || (m_stop && m_blocks.empty());
+                    });
+                    if (m_blocks.empty())
+                        return;
+                    block = m_blocks.front();
+                    skip = static_cast<bool>(m_error);
+                }
+                try
+                {
+                    if (!skip)
+                        write(*block);
+                }
+                catch (...)
+                {
+                    set_error(std::current_exception());
+                }
+                {
+                    std::lock_guard<std::mutex> lock(m_mutex);
+                    m_blocks.pop_front();
+                    m_submitted -= block->records.size();
+                    if (!skip)
+                        m_length += block->records.size();
+                }
+                m_cv.notify_all();
+            }
+        }
+
+        void write(Block &block)
+        {
+            std::lock_guard<std::recursive_mutex> h5_lock(pipeline_mutex());
+            DATA_H5_PROBE("PipelinedWriter::write", m_name, instrument::type_name<T>());
+            const hsize_t count = block.records.size();
+            DATA_H5_PROBE_RECORDS(count, count * to_h5type<T>::get()->getSize());
+            hsize_t start = m_length;
+            hsize_t new_length = start + count;
+            DATA_H5_CALL(m_dataset.extend(&new_length));
+            H5::DataSpace space = m_dataset.getSpace();
+            write(block, space, start, std::integral_constant<bool, is_staged>());
+        }
+
+        void write(Block &block, H5::DataSpace &space, hsize_t start, std::true_type)
+        {
+            hsize_t count = block.records.size();
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            to_h5staging<T>::write(block.records.data(), block.staged.data(), count, m_dataset, &memspace, &space);
+        }
+
+        void write(Block &block, H5::DataSpace &space, hsize_t start, std::false_type)
+        {
+            if (block.packed.empty())
+            {
+                data::IO::WriteRecords<T>(block.records.data(), block.records.size(), m_dataset, space, start);
+                return;
+            }
+            // same memory and file type, no conversion by HDF5
+            hsize_t count = block.records.size();
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            DATA_H5_CALL(m_dataset.write(block.packed.data(), *to_h5filetype<T>::get(), memspace, space));
+        }
+
+        H5::DataSet m_dataset;
+        std::string m_name;
+        hsize_t m_length;    ///< record count written into the dataset, changed by the I/O thread
+        size_t m_submitted;  ///< record count submitted but not written
+        size_t m_block_size;
+        size_t m_max_blocks;
+        size_t m_file_size;
+        std::vector<MemberCopy> m_copies; ///< empty if padding is not removed by the workers
+        std::vector<T> m_block;           ///< records buffered by the caller thread
+
+        mutable std::mutex m_mutex;
+        std::condition_variable m_cv;
+        std::deque<std::shared_ptr<Block>> m_blocks; ///< blocks in flight, in the order of submission
+        std::deque<std::shared_ptr<Block>> m_queue;  ///< blocks waiting for a worker
+        std::exception_ptr m_error;
+        bool m_stop;
+        std::vector<std::thread> m_workers;
+        std::thread m_io;
+    };
+} // namespace HDF5
@@ -0,0 +1,175 @@
+#pragma once
+#include <string>
+#include <vector>
+#include <stdexcept>
+#include <algorithm>
+#include <limits>
+
+#include <H5Cpp.h>
+#include "HDF5_TypeTraits.h"
+#include "DataMatrix.h"
+
+/**
+ * CSR storage of ragged members of records, e.g. `std::vector<std::vector<int>> neighbours`
+ *
+ * the rows of all records are appended to the group `<dataset>.<member>` next to the record dataset,
+ * a flat `values` dataset and the `row_offsets` index, the same layout as `data::IO::WriteRagged()`.
+ * Each record keeps the index of its first row and its row count in the CompType, so that the rows of
+ * a range of records are read by one read of each dataset, without a vlen type or a vector per row.
+ * The values of an Eigen or xtensor member of runtime size are stored in the same way, one row per record.
+ * */
+namespace HDF5
+{
+    /**
+     * @brief rows of a ragged member loaded for a range of records, `first_row` is the index of `rows.row(0)`
+     * */
+    template <class T>
+    struct RaggedRows
+    {
+        unsigned long long first_row = 0;
+        data::RaggedArray<T> rows;
+
+        /// rows `[row_start, row_start + count)` by the row index in the store, without copy
+        data::RaggedView<const T> view(unsigned long long row_start, unsigned long long count) const
+        {
+            if (count == 0)
+                return data::RaggedView<const T>();
+            if (row_start < first_row || row_start + count > first_row + rows.rows())
+                throw std::out_of_range("ragged rows are not loaded");
+            return rows.view(row_start - first_row, count);
+        }
+    };
+
+    /**
+     * @brief CSR store of a ragged member, the group `<dataset>.<member>` of extendible datasets
+     * `row_offsets`, which has one element more than rows, and `values`
+     * */
+    template <class T>
+    class RaggedStore
+    {
+    public:
+        typedef unsigned long long offset_type;
+
+        /**
+         * @brief open the store of `member` of the records in `dataset`, create it if `create`
+         *
+         * @param policy filters of the new datasets, the chunk size is computed from the element size
+         * */
+        RaggedStore(const H5::DataSet &dataset, const std::string &member, bool create = false,
+                    const StoragePolicy &policy = to_h5storage<T>::get())
+        {
+            // absolute path, any object in the file can be the location
+            const std::string name = dataset.getObjName() + "." + member;
+            if (dataset.nameExists(name))
+            {
+                H5::Group group = dataset.openGroup(name);
+                m_offsets = group.openDataSet("row_offsets");
+                m_values = group.openDataSet("values");
+            }
+            else if (create)
+            {
+                H5::Group group = dataset.createGroup(name);
+                m_offsets = create_dataset<offset_type>(group, "row_offsets", policy);
+                m_values = create_dataset<T>(group, "values", policy);
+                const offset_type zero = 0;
+                write_range<offset_type>(m_offsets, &zero, 0, 1);
+            }
+            else
+                throw std::runtime_error("ragged member is not found: " + name);
+        }
+
+        offset_type rows() const
+        {
+            return length(m_offsets) - 1;
+        }
+
+        /**
+         * @brief append the rows by one write of each dataset
+         *
+         * @return the index of the first appended row
+         * */
+        offset_type append(const data::RaggedArray<T> &ragged)
+        {
+            const hsize_t n = length(m_offsets);
+            const hsize_t base = length(m_values); // equal to the last offset
+            std::vector<offset_type> offsets(ragged.offsets().begin() + 1, ragged.offsets().end());
+            for (auto &o : offsets)
+                o += base;
+            write_range<offset_type>(m_offsets, offsets.data(), n, offsets.size());
+            write_range<T>(m_values, ragged.values().data(), base, ragged.values().size());
+            return n - 1;
+        }
+
+        /// append a row straight from caller memory, @return the index of the row
+        offset_type append_row(const T *data, offset_type size)
+        {
+            const hsize_t n = length(m_offsets);
+            const offset_type end = length(m_values) + size;
+            write_range<offset_type>(m_offsets, &end, n, 1);
+            write_range<T>(m_values, data, end - size, size);
+            return n - 1;
+        }
+
+        /// rows `[row_start, row_start + count)` by one read of each dataset
+        RaggedRows<T> read(offset_type row_start, offset_type count) const
+        {
+            RaggedRows<T> r;
+            r.first_row = row_start;
+            std::vector<offset_type> offsets(count + 1);
+            read_range<offset_type>(m_offsets, offsets.data(), row_start, offsets.size());
+            std::vector<T> values(offsets.back() - offsets.front());
+            read_range<T>(m_values, values.data(), offsets.front(), values.size());
+            r.rows = data::RaggedArray<T>(std::move(offsets), std::move(values));
+            return r;
+        }
+
+    private:
+        template <class E>
+        static H5::DataSet create_dataset(const H5::Group &group, const std::string &name,
+                                          const StoragePolicy &policy)
+        {
+            StoragePolicy p = policy;
+            p.chunk_elements = StoragePolicy::chunked(sizeof(E)).chunk_elements;
+            hsize_t dims[1] = {0};
+            hsize_t maxdims[1] = {H5S_UNLIMITED};
+            H5::DataSpace space(1, dims, maxdims);
+            const H5::DataType &file_type = *to_h5filetype<E>::get();
+            return group.createDataSet(name, file_type, space, p.create_plist(file_type, 1, dims, maxdims));
+        }
+
+        static hsize_t length(const H5::DataSet &dataset)
+        {
+            hsize_t dims[1];
+            dataset.getSpace().getSimpleExtentDims(dims, NULL);
+            return dims[0];
+        }
+
+        template <class E>
+        static void write_range(H5::DataSet &dataset, const E *data, hsize_t start, hsize_t count)
+        {
+            if (count == 0)
+                return;
+            hsize_t new_length = start + count;
+            if (new_length > length(dataset))
+                DATA_H5_CALL(dataset.extend(&new_length));
+            H5::DataSpace space = dataset.getSpace();
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            DATA_H5_CALL(dataset.write(data, *to_h5type<E>::get(), memspace, space));
+        }
+
+        template <class E>
+        static void read_range(const H5::DataSet &dataset, E *data, hsize_t start, hsize_t count)
+        {
+            if (count == 0)
+                return;
+            H5::DataSpace space = dataset.getSpace();
+            space.selectHyperslab(H5S_SELECT_SET, &count, &start);
+            H5::DataSpace memspace(1, &count);
+            DATA_H5_CALL(dataset.read(data, *to_h5type<E>::get(), memspace, space));
+        }
+
+        H5::DataSet m_offsets;
+        H5::DataSet m_values;
+    };
+} // namespace HDF5
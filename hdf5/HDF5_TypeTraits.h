@@ -4,23 +4,258 @@
 
 #pragma once
 
+#include <algorithm>
+#include <atomic>
 #include <complex>
 #include <cstddef>
 #include <cassert>
 #include <string>
 #include <vector>
+#include <utility>
 #include <functional>
+#include <memory>
+#include <mutex>
 
 #include <H5Cpp.h>
+#include "HDF5_Instrument.h"
+
+#if __cplusplus >= 201703L
+#include <string_view>
+#define DATA_HAS_STRING_VIEW 1
+#endif
 
 namespace HDF5
 {
-    /// TODO: apply constness to the input parameter `const T& `
+    /**
+     * @brief lock of HDF5 calls from several threads, needed if the HDF5 library is not built thread-safe
+     *
+     * it is held while a generated CompType, a complex or a string type is built on first use, and by
+     * `HDF5::PipelinedWriter` for each HDF5 call; it is recursive, since the CompType of a nested class
+     * is built from within.
+     * */
+    inline std::recursive_mutex &library_mutex()
+    {
+        static std::recursive_mutex m;
+        return m;
+    }
+
     template <class T>
-    using Serializer = std::function<void(T &, H5::DataSet &, const H5::DataSpace *, const H5::DataSpace *)>;
+    using Serializer = std::function<void(const T &, H5::DataSet &, const H5::DataSpace *, const H5::DataSpace *)>;
     template <class T>
     using Deserializer = std::function<T(H5::DataSet &, const H5::DataSpace *, const H5::DataSpace *)>;
 
+    /// write the contiguous range `[first, first + count)` by a single H5Dwrite
+    /// the range is selected by `memspace` and file `space`, or the whole dataset if nullptr
+    template <class T>
+    using BatchSerializer = std::function<void(const T *first, size_t count, H5::DataSet &,
+                                               const H5::DataSpace *, const H5::DataSpace *)>;
+
+    /// read into the contiguous range `[out, out + count)` by a single H5Dread,
+    /// vlen memory is allocated from a `VlenArena` of this read and released at once
+    template <class T>
+    using BatchDeserializer = std::function<void(T *out, size_t count, H5::DataSet &,
+                                                 const H5::DataSpace *, const H5::DataSpace *)>;
+
+    /// tag for the generated `<class_name>_hvl` ctor, the vlen fields refer to the object's buffers
+    struct hvl_view_t
+    {
+    };
+
+    /**
+     * @brief bump allocator for the vlen memory of `H5Dread`, instead of one malloc per string or vector
+     *
+     * `xfer_plist()` installs this arena as the vlen memory manager by `H5Pset_vlen_mem_manager`,
+     * free is a no-op, all memory is released at once by `clear()` or destruction.
+     * It is not thread-safe, use one arena per read.
+     * */
+    class VlenArena
+    {
+    public:
+        explicit VlenArena(size_t block_size = 64 * 1024)
+            : m_block_size(block_size), m_capacity(0), m_offset(0), m_used(0)
+        {
+        }
+
+        VlenArena(const VlenArena &) = delete;
+        VlenArena &operator=(const VlenArena &) = delete;
+
+        void *allocate(size_t size)
+        {
+            const size_t align = alignof(std::max_align_t);
+            size = std::max<size_t>((size + align - 1) / align * align, align);
+            if (m_offset + size > m_capacity)
+            {
+                const size_t capacity = std::max(m_block_size, size);
+                m_blocks.emplace_back(new std::max_align_t[(capacity + align - 1) / align]);
+                m_block_sizes.push_back(capacity);
+                m_capacity = capacity;
+                m_offset = 0;
+            }
+            void *p = reinterpret_cast<char *>(m_blocks.back().get()) + m_offset;
+            m_offset += size;
+            m_used += size;
+            return p;
+        }
+
+        /// release all memory, pointers into this arena are invalid afterwards
+        void clear()
+        {
+            m_blocks.clear();
+            m_block_sizes.clear();
+            m_capacity = m_offset = m_used = 0;
+        }
+
+        /// bytes allocated, including alignment padding
+        size_t used() const { return m_used; }
+
+        /// whether `p` points into a block of this arena
+        bool contains(const void *p) const
+        {
+            const char *c = static_cast<const char *>(p);
+            for (size_t i = 0; i < m_blocks.size(); i++)
+            {
+                const char *block = reinterpret_cast<const char *>(m_blocks[i].get());
+                if (c >= block && c < block + m_block_sizes[i])
+                    return true;
+            }
+            return false;
+        }
+
+        /// transfer property list for `DataSet::read()`, vlen memory is allocated from this arena
+        H5::DSetMemXferPropList xfer_plist()
+        {
+            H5::DSetMemXferPropList plist;
+            plist.setVlenMemManager(&VlenArena::allocate_callback, this, &VlenArena::free_callback, nullptr);
+            return plist;
+        }
+
+    private:
+        static void *allocate_callback(size_t size, void *info)
+        {
+            return static_cast<VlenArena *>(info)->allocate(size);
+        }
+        static void free_callback(void *, void *)
+        {
+        }
+
+        size_t m_block_size;
+        size_t m_capacity; // of the last block
+        size_t m_offset;   // in the last block
+        size_t m_used;
+        std::vector<std::unique_ptr<std::max_align_t[]>> m_blocks;
+        std::vector<size_t> m_block_sizes;
+    };
+
+/// target size of a chunk in bytes for the generated per-type storage policy
+#ifndef DATA_H5_CHUNK_BYTES
+#define DATA_H5_CHUNK_BYTES (64 * 1024)
+#endif
+
+    /**
+     * @brief dataset storage layout and filters, applied when the dataset is created
+     *
+     * default is the contiguous layout without filter, any filter needs chunked layout,
+     * if `chunk_elements` is zero, the chunk size is computed from the element size.
+     * */
+    struct StoragePolicy
+    {
+        hsize_t chunk_elements = 0; ///< element count per chunk, 0 for contiguous layout
+        int deflate_level = 0;      ///< gzip level 1-9, 0 for no deflate
+        bool shuffle = false;       ///< byte shuffle before deflate, better ratio for compound records
+        bool fletcher32 = false;    ///< checksum of each chunk
+
+        static StoragePolicy contiguous()
+        {
+            return StoragePolicy();
+        }
+
+        /// chunk of about `chunk_bytes`, at least one element
+        static StoragePolicy chunked(size_t element_size, size_t chunk_bytes = DATA_H5_CHUNK_BYTES)
+        {
+            StoragePolicy p;
+            p.chunk_elements = std::max<size_t>(1, chunk_bytes / std::max<size_t>(1, element_size));
+            return p;
+        }
+
+        StoragePolicy &set_deflate(int level = 4)
+        {
+            deflate_level = level;
+            return *this;
+        }
+
+        StoragePolicy &set_shuffle(bool on = true)
+        {
+            shuffle = on;
+            return *this;
+        }
+
+        StoragePolicy &set_fletcher32(bool on = true)
+        {
+            fletcher32 = on;
+            return *this;
+        }
+
+        bool has_filters() const
+        {
+            return deflate_level > 0 || shuffle || fletcher32;
+        }
+
+        bool is_chunked() const
+        {
+            return chunk_elements > 0 || has_filters();
+        }
+
+        /**
+         * @brief dataset creation property list for the dataspace `dims` and optional `maxdims`
+         *
+         * chunk dims are filled from the last dim, so that a chunk holds whole rows if possible,
+         * the chunk can not be larger than a fixed-size dim, an empty fixed-size dataset stays contiguous.
+         * */
+        H5::DSetCreatPropList create_plist(const H5::DataType &dtype, int rank, const hsize_t *dims,
+                                           const hsize_t *maxdims = nullptr) const
+        {
+            H5::DSetCreatPropList plist;
+            if (!is_chunked())
+                return plist;
+
+            hsize_t remaining = chunk_elements ? chunk_elements : chunked(dtype.getSize()).chunk_elements;
+            std::vector<hsize_t> chunk_dims(rank);
+            for (int i = rank - 1; i >= 0; i--)
+            {
+                hsize_t limit = maxdims ? maxdims[i] : dims[i];
+                if (limit == 0)
+                    return plist; // chunked layout can not be used
+                hsize_t c = (i == 0) ? remaining : std::min<hsize_t>(dims[i] ? dims[i] : 1, remaining);
+                if (limit != H5S_UNLIMITED)
+                    c = std::min(c, limit);
+                chunk_dims[i] = std::max<hsize_t>(1, c);
+                remaining = std::max<hsize_t>(1, remaining / chunk_dims[i]);
+            }
+            plist.setChunk(rank, chunk_dims.data());
+            // filter pipeline order: shuffle, deflate, then checksum of the compressed chunk
+            if (shuffle)
+                plist.setShuffle();
+            if (deflate_level > 0)
+                plist.setDeflate(deflate_level);
+            if (fletcher32)
+                plist.setFletcher32();
+            return plist;
+        }
+    };
+
+    /// storage policy used by `data::IO` to create the dataset of element type `T`,
+    /// it can be changed at runtime for a type, e.g. `to_h5storage<T>::get().set_deflate(6)`,
+    /// but not concurrently with the dataset creation
+    template <typename T>
+    struct to_h5storage
+    {
+        static inline StoragePolicy &get(void)
+        {
+            static StoragePolicy policy; // contiguous
+            return policy;
+        }
+    };
+
     template <typename T>
     struct to_h5serializer
     {
@@ -28,6 +263,26 @@ namespace HDF5
         {
             return nullptr;
         }
+        static inline const BatchSerializer<T> get_batch(void)
+        {
+            return nullptr;
+        }
+    };
+
+    /**
+     * @brief conversion of records into the memory layout of H5Dwrite, split from the write,
+     * so that it can run on worker threads, e.g. by `HDF5::PipelinedWriter`
+     *
+     * the default is no conversion, the records are written as they are. The generated header
+     * specializes it for classes with vlen fields, `type` is `<class_name>_hvl`, with the static functions:
+     * `std::vector<type> pack(const T *first, size_t count)` without any HDF5 call, and
+     * `void write(const T *first, type *staged, size_t count, H5::DataSet &, const H5::DataSpace *memspace,
+     * const H5::DataSpace *space)`; the staged records refer to the buffers of the records.
+     * */
+    template <typename T>
+    struct to_h5staging
+    {
+        typedef T type;
     };
 
     template <typename T>
@@ -37,11 +292,62 @@ namespace HDF5
         {
             return nullptr;
         }
+        static inline const BatchDeserializer<T> get_batch(void)
+        {
+            return nullptr;
+        }
     };
 
     template <typename T>
     struct to_h5type;
 
+    /**
+     * @brief struct-of-arrays writer and reader of `T`, used by `data::IO::WriteColumns/ReadColumns`
+     *
+     * specialized by the generated header in columnar mode, with the static functions:
+     * `write(const T *records, size_t count, std::shared_ptr<H5::Group> group, const StoragePolicy &policy)`
+     * `std::vector<T> read(std::shared_ptr<H5::Group> group, hsize_t start, hsize_t count)`
+     * */
+    template <typename T>
+    struct to_h5columns;
+
+    /**
+     * @brief on-disk data type of `T` used to create datasets and attributes, the memory type by default
+     *
+     * the generated header in packed mode specializes it for user types with a packed copy of the CompType,
+     * HDF5 removes the padding of the memory type on write and inserts it back on read.
+     * */
+    template <typename T>
+    struct to_h5filetype
+    {
+        static inline const H5::DataType *get(void)
+        {
+            return to_h5type<T>::get();
+        }
+    };
+
+    /**
+     * @brief memory CompType of a projection struct of `size` bytes, e.g. a subset of record members
+     *
+     * @param full the CompType of the whole record
+     * @param members member names of `full` and their offsets in the projection struct
+     *
+     * reading a dataset with this memory type transfers only these members,
+     * the other members, even vlen members, are not touched.
+     * */
+    inline H5::CompType projection_type(const H5::CompType &full, size_t size,
+                                        const std::vector<std::pair<std::string, size_t>> &members)
+    {
+        H5::CompType ptype(size);
+        for (const auto &m : members)
+        {
+            const int index = full.getMemberIndex(m.first);
+            H5::DataType mtype = full.getMemberDataType(index);
+            ptype.insertMember(m.first, m.second, mtype);
+        }
+        return ptype;
+    }
+
     // floating-point types
 
     template <>
@@ -184,8 +490,13 @@ namespace HDF5
 
         static const ComplexH5Type<T> *get_singleton(void)
         {
-            // NOTE: constructing this could be a race condition
+            // built under `library_mutex()` like the generated CompTypes, then read without lock
+            static std::atomic<const ComplexH5Type<T> *> built(nullptr);
+            if (const ComplexH5Type<T> *p = built.load(std::memory_order_acquire))
+                return p;
+            std::lock_guard<std::recursive_mutex> lock(library_mutex());
             static ComplexH5Type<T> singleton;
+            built.store(&singleton, std::memory_order_release);
             return &singleton;
         }
     };
@@ -206,7 +517,12 @@ namespace HDF5
     {
         static inline const H5::DataType *get(void)
         {
+            static std::atomic<const H5::DataType *> built(nullptr);
+            if (const H5::DataType *p = built.load(std::memory_order_acquire))
+                return p;
+            std::lock_guard<std::recursive_mutex> lock(library_mutex());
             static const H5::StrType strtype(0, H5T_VARIABLE);
+            built.store(&strtype, std::memory_order_release);
             return &strtype;
         }
     };
@@ -216,7 +532,12 @@ namespace HDF5
     {
         static inline const H5::DataType *get(void)
         {
+            static std::atomic<const H5::DataType *> built(nullptr);
+            if (const H5::DataType *p = built.load(std::memory_order_acquire))
+                return p;
+            std::lock_guard<std::recursive_mutex> lock(library_mutex());
             static const H5::StrType strtype(0, H5T_VARIABLE);
+            built.store(&strtype, std::memory_order_release);
             return &strtype;
         }
     };
@@ -230,7 +551,12 @@ namespace HDF5
     {
         static inline const H5::DataType *get(void)
         {
+            static std::atomic<const H5::DataType *> built(nullptr);
+            if (const H5::DataType *p = built.load(std::memory_order_acquire))
+                return p;
+            std::lock_guard<std::recursive_mutex> lock(library_mutex());
             static const H5::StrType strtype(0, N);
+            built.store(&strtype, std::memory_order_release);
             return &strtype;
         }
     };
@@ -240,7 +566,12 @@ namespace HDF5
     {
         static inline const H5::DataType *get(void)
         {
+            static std::atomic<const H5::DataType *> built(nullptr);
+            if (const H5::DataType *p = built.load(std::memory_order_acquire))
+                return p;
+            std::lock_guard<std::recursive_mutex> lock(library_mutex());
             static const H5::StrType strtype(0, N);
+            built.store(&strtype, std::memory_order_release);
             return &strtype;
         }
     };
@@ -0,0 +1,729 @@
+#pragma once
+#include <cstdint>
+#include <cstring>
+#include <string>
+#include <vector>
+#include <array>
+#include <memory>
+#include <algorithm>
+#include <istream>
+#include <ostream>
+#include <stdexcept>
+#include <type_traits>
+
+#include "json.hpp"
+
+/**
+ * compact binary serialization (CBOR, MessagePack) of user types without a `nlohmann::json` DOM
+ *
+ * the generated `*_json.h` header specializes `JSON::codec<T>` for each user class,
+ * `JSON::codec<T>::encode()` writes the value straight into a writer,
+ * `JSON::codec<T>::sink` receives the SAX events of `nlohmann::json::sax_parse()` and assigns the fields.
+ * */
+namespace JSON
+{
+    typedef nlohmann::detail::output_adapter_t<std::uint8_t> output_adapter_t;
+    typedef nlohmann::json::input_format_t input_format_t;
+
+    /// write bytes into a `std::ostream` of char, e.g. std::ofstream opened in binary mode
+    class ostream_adapter : public nlohmann::detail::output_adapter_protocol<std::uint8_t>
+    {
+    public:
+        explicit ostream_adapter(std::ostream &os)
+            : m_stream(os)
+        {
+        }
+        void write_character(std::uint8_t c) override
+        {
+            m_stream.put(static_cast<char>(c));
+        }
+        void write_characters(const std::uint8_t *s, std::size_t length) override
+        {
+            m_stream.write(reinterpret_cast<const char *>(s), static_cast<std::streamsize>(length));
+        }
+
+    private:
+        std::ostream &m_stream;
+    };
+
+    inline bool is_little_endian()
+    {
+        const std::uint16_t one = 1;
+        return *reinterpret_cast<const std::uint8_t *>(&one) == 1;
+    }
+
+    /// common part of the binary writers, numbers are in big-endian byte order
+    class binary_writer_base
+    {
+    public:
+        explicit binary_writer_base(std::vector<std::uint8_t> &buffer)
+            : m_output(std::make_shared<nlohmann::detail::output_vector_adapter<std::uint8_t>>(buffer))
+        {
+        }
+        explicit binary_writer_base(std::ostream &os)
+            : m_output(std::make_shared<ostream_adapter>(os))
+        {
+        }
+        explicit binary_writer_base(output_adapter_t output)
+            : m_output(output)
+        {
+        }
+
+        void key(const char *k)
+        {
+            write_string(k, std::strlen(k));
+        }
+
+        virtual void write_string(const char *s, std::size_t n) = 0;
+
+    protected:
+        void put(std::uint8_t c)
+        {
+            m_output->write_character(c);
+        }
+
+        void put_bytes(const char *s, std::size_t n)
+        {
+            m_output->write_characters(reinterpret_cast<const std::uint8_t *>(s), n);
+        }
+
+        template <class T>
+        void put_big_endian(T value)
+        {
+            std::array<std::uint8_t, sizeof(T)> bytes;
+            std::memcpy(bytes.data(), &value, sizeof(T));
+            if (is_little_endian())
+                std::reverse(bytes.begin(), bytes.end());
+            m_output->write_characters(bytes.data(), sizeof(T));
+        }
+
+        output_adapter_t m_output;
+    };
+
+    /// RFC 7049 CBOR writer, containers are written with definite length
+    class cbor_writer : public binary_writer_base
+    {
+    public:
+        using binary_writer_base::binary_writer_base;
+
+        void write_null() { put(0xF6); }
+        void write(bool v) { put(v ? 0xF5 : 0xF4); }
+        void write(std::int64_t v)
+        {
+            if (v >= 0)
+                write_head(0, static_cast<std::uint64_t>(v));
+            else
+                write_head(1, static_cast<std::uint64_t>(-1 - v));
+        }
+        void write(std::uint64_t v) { write_head(0, v); }
+        void write(float v)
+        {
+            put(0xFA);
+            put_big_endian(v);
+        }
+        void write(double v)
+        {
+            put(0xFB);
+            put_big_endian(v);
+        }
+        void write_string(const char *s, std::size_t n) override
+        {
+            write_head(3, n);
+            put_bytes(s, n);
+        }
+        void begin_array(std::size_t n) { write_head(4, n); }
+        void begin_map(std::size_t n) { write_head(5, n); }
+
+    private:
+        void write_head(std::uint8_t major, std::uint64_t n)
+        {
+            const std::uint8_t m = static_cast<std::uint8_t>(major << 5);
+            if (n < 24)
+                put(static_cast<std::uint8_t>(m | n));
+            else if (n <= 0xFF)
+            {
+                put(m | 24);
+                put(static_cast<std::uint8_t>(n));
+            }
+            else if (n <= 0xFFFF)
+            {
+                put(m | 25);
+                put_big_endian(static_cast<std::uint16_t>(n));
+            }
+            else if (n <= 0xFFFFFFFF)
+            {
+                put(m | 26);
+                put_big_endian(static_cast<std::uint32_t>(n));
+            }
+            else
+            {
+                put(m | 27);
+                put_big_endian(n);
+            }
+        }
+    };
+
+    /// MessagePack writer, integers use the smallest representation
+    class msgpack_writer : public binary_writer_base
+    {
+    public:
+        using binary_writer_base::binary_writer_base;
+
+        void write_null() { put(0xC0); }
+        void write(bool v) { put(v ? 0xC3 : 0xC2); }
+        void write(std::int64_t v)
+        {
+            if (v >= 0)
+                write(static_cast<std::uint64_t>(v));
+            else if (v >= -32)
+                put(static_cast<std::uint8_t>(static_cast<std::int8_t>(v))); // negative fixint
+            else if (v >= INT8_MIN)
+            {
+                put(0xD0);
+                put_big_endian(static_cast<std::int8_t>(v));
+            }
+            else if (v >= INT16_MIN)
+            {
+                put(0xD1);
+                put_big_endian(static_cast<std::int16_t>(v));
+            }
+            else if (v >= INT32_MIN)
+            {
+                put(0xD2);
+                put_big_endian(static_cast<std::int32_t>(v));
+            }
+            else
+            {
+                put(0xD3);
+                put_big_endian(v);
+            }
+        }
+        void write(std::uint64_t v)
+        {
+            if (v < 128)
+                put(static_cast<std::uint8_t>(v)); // positive fixint
+            else if (v <= 0xFF)
+            {
+                put(0xCC);
+                put(static_cast<std::uint8_t>(v));
+            }
+            else if (v <= 0xFFFF)
+            {
+                put(0xCD);
+                put_big_endian(static_cast<std::uint16_t>(v));
+            }
+            else if (v <= 0xFFFFFFFF)
+            {
+                put(0xCE);
+                put_big_endian(static_cast<std::uint32_t>(v));
+            }
+            else
+            {
+                put(0xCF);
+                put_big_endian(v);
+            }
+        }
+        void write(float v)
+        {
+            put(0xCA);
+            put_big_endian(v);
+        }
+        void write(double v)
+        {
+            put(0xCB);
+            put_big_endian(v);
+        }
+        void write_string(const char *s, std::size_t n) override
+        {
+            if (n < 32)
+                put(static_cast<std::uint8_t>(0xA0 | n));
+            else if (n <= 0xFF)
+            {
+                put(0xD9);
+                put(static_cast<std::uint8_t>(n));
+            }
+            else if (n <= 0xFFFF)
+            {
+                put(0xDA);
+                put_big_endian(static_cast<std::uint16_t>(n));
+            }
+            else
+            {
+                put(0xDB);
+                put_big_endian(static_cast<std::uint32_t>(n));
+            }
+            put_bytes(s, n);
+        }
+        void begin_array(std::size_t n) { write_container(n, 0x90, 0xDC, 0xDD); }
+        void begin_map(std::size_t n) { write_container(n, 0x80, 0xDE, 0xDF); }
+
+    private:
+        void write_container(std::size_t n, std::uint8_t fix, std::uint8_t c16, std::uint8_t c32)
+        {
+            if (n < 16)
+                put(static_cast<std::uint8_t>(fix | n));
+            else if (n <= 0xFFFF)
+            {
+                put(c16);
+                put_big_endian(static_cast<std::uint16_t>(n));
+            }
+            else
+            {
+                put(c32);
+                put_big_endian(static_cast<std::uint32_t>(n));
+            }
+        }
+    };
+
+    /**
+     * @brief receiver of the SAX events of one value
+     *
+     * a value event not expected by the sink returns false, then the parsing is stopped.
+     * For a container, the sink of each element or member is returned by `on_element()` or `on_key()`,
+     * nullptr to skip the value, e.g. unknown keys.
+     * */
+    class sink
+    {
+    public:
+        virtual ~sink() {}
+        virtual bool on_null() { return false; }
+        virtual bool on_bool(bool) { return false; }
+        virtual bool on_int(std::int64_t) { return false; }
+        virtual bool on_uint(std::uint64_t) { return false; }
+        virtual bool on_float(double) { return false; }
+        virtual bool on_string(std::string &) { return false; }
+        virtual bool on_start_object(std::size_t) { return false; }
+        virtual sink *on_key(const std::string &) { return nullptr; }
+        virtual bool on_start_array(std::size_t) { return false; }
+        virtual sink *on_element() { return nullptr; }
+        virtual bool on_end() { return true; }
+    };
+
+    /// nlohmann SAX interface, dispatch events to the sink of the root value and its children
+    class sax_decoder : public nlohmann::json_sax<nlohmann::json>
+    {
+    public:
+        explicit sax_decoder(sink *root)
+            : m_root(root)
+        {
+        }
+
+        bool null() override
+        {
+            sink *s = next();
+            return !s || s->on_null();
+        }
+        bool boolean(bool v) override
+        {
+            sink *s = next();
+            return !s || s->on_bool(v);
+        }
+        bool number_integer(number_integer_t v) override
+        {
+            sink *s = next();
+            return !s || s->on_int(v);
+        }
+        bool number_unsigned(number_unsigned_t v) override
+        {
+            sink *s = next();
+            return !s || s->on_uint(v);
+        }
+        bool number_float(number_float_t v, const string_t &) override
+        {
+            sink *s = next();
+            return !s || s->on_float(v);
+        }
+        bool string(string_t &v) override
+        {
+            sink *s = next();
+            return !s || s->on_string(v);
+        }
+        bool start_object(std::size_t n) override
+        {
+            sink *s = next();
+            m_stack.push_back(frame{s, nullptr, true});
+            return !s || s->on_start_object(n);
+        }
+        bool key(string_t &k) override
+        {
+            frame &f = m_stack.back();
+            f.pending = f.target ? f.target->on_key(k) : nullptr;
+            return true;
+        }
+        bool end_object() override
+        {
+            return end();
+        }
+        bool start_array(std::size_t n) override
+        {
+            sink *s = next();
+            m_stack.push_back(frame{s, nullptr, false});
+            return !s || s->on_start_array(n);
+        }
+        bool end_array() override
+        {
+            return end();
+        }
+        bool parse_error(std::size_t, const std::string &, const nlohmann::detail::exception &ex) override
+        {
+            m_error = ex.what();
+            return false;
+        }
+
+        const std::string &error() const
+        {
+            return m_error;
+        }
+
+    private:
+        struct frame
+        {
+            sink *target;  ///< nullptr if the container is skipped
+            sink *pending; ///< sink for the value of the last key
+            bool is_object;
+        };
+
+        sink *next()
+        {
+            if (m_stack.empty())
+            {
+                sink *s = m_root; // the root sink receives only one value
+                m_root = nullptr;
+                return s;
+            }
+            frame &f = m_stack.back();
+            if (!f.target)
+                return nullptr;
+            if (f.is_object)
+            {
+                sink *s = f.pending;
+                f.pending = nullptr;
+                return s;
+            }
+            return f.target->on_element();
+        }
+
+        bool end()
+        {
+            frame f = m_stack.back();
+            m_stack.pop_back();
+            return !f.target || f.target->on_end();
+        }
+
+        sink *m_root;
+        std::vector<frame> m_stack;
+        std::string m_error;
+    };
+
+    /// `codec<T>::encode(writer, value)` and `codec<T>::sink`, specialized by the generated header
+    template <typename T, typename Enable = void>
+    struct codec;
+
+    template <class Writer, class T>
+    inline void encode(Writer &w, const T &value)
+    {
+        codec<T>::encode(w, value);
+    }
+
+    /// integers are written as int64/uint64, the writer selects the smallest encoding
+    template <typename T>
+    struct wire_type
+    {
+        typedef typename std::conditional<
+            std::is_same<T, bool>::value, bool,
+            typename std::conditional<
+                std::is_floating_point<T>::value,
+                typename std::conditional<std::is_same<T, float>::value, float, double>::type,
+                typename std::conditional<std::is_signed<T>::value, std::int64_t, std::uint64_t>::type>::type>::type type;
+    };
+
+    template <typename T>
+    class number_sink : public sink
+    {
+    public:
+        void bind(T *p) { m_value = p; }
+        bool on_bool(bool v) override { return assign(v); }
+        bool on_int(std::int64_t v) override { return assign(v); }
+        bool on_uint(std::uint64_t v) override { return assign(v); }
+        bool on_float(double v) override { return assign(v); }
+
+    private:
+        template <typename V>
+        bool assign(V v)
+        {
+            *m_value = static_cast<T>(v);
+            return true;
+        }
+        T *m_value = nullptr;
+    };
+
+    template <typename T>
+    struct codec<T, typename std::enable_if<std::is_arithmetic<T>::value>::type>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const T &v)
+        {
+            w.write(static_cast<typename wire_type<T>::type>(v));
+        }
+        typedef number_sink<T> sink;
+    };
+
+    /// enum is written as its underlying integer
+    template <typename T>
+    class enum_sink : public sink
+    {
+    public:
+        typedef typename std::underlying_type<T>::type underlying_type;
+        void bind(T *p) { m_value = p; }
+        bool on_int(std::int64_t v) override { return assign(v); }
+        bool on_uint(std::uint64_t v) override { return assign(v); }
+
+    private:
+        template <typename V>
+        bool assign(V v)
+        {
+            *m_value = static_cast<T>(static_cast<underlying_type>(v));
+            return true;
+        }
+        T *m_value = nullptr;
+    };
+
+    template <typename T>
+    struct codec<T, typename std::enable_if<std::is_enum<T>::value>::type>
+    {
+        typedef typename std::underlying_type<T>::type underlying_type;
+        template <class Writer>
+        static void encode(Writer &w, const T &v)
+        {
+            codec<underlying_type>::encode(w, static_cast<underlying_type>(v));
+        }
+        typedef enum_sink<T> sink;
+    };
+
+    class string_sink : public sink
+    {
+    public:
+        void bind(std::string *p) { m_value = p; }
+        bool on_string(std::string &v) override
+        {
+            *m_value = std::move(v);
+            return true;
+        }
+
+    private:
+        std::string *m_value = nullptr;
+    };
+
+    template <>
+    struct codec<std::string>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const std::string &v)
+        {
+            w.write_string(v.data(), v.size());
+        }
+        typedef string_sink sink;
+    };
+
+    /// `char*` is only written, it can not own the decoded string
+    template <>
+    struct codec<const char *>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const char *v)
+        {
+            if (v)
+                w.write_string(v, std::strlen(v));
+            else
+                w.write_null();
+        }
+    };
+
+    template <>
+    struct codec<char *> : public codec<const char *>
+    {
+    };
+
+    /// sink of `std::vector<T>`, the element sink is rebound to each new element
+    template <typename T>
+    class vector_sink : public sink
+    {
+    public:
+        void bind(std::vector<T> *p) { m_value = p; }
+        bool on_start_array(std::size_t n) override
+        {
+            m_value->clear();
+            if (n != static_cast<std::size_t>(-1)) // unknown size
+                m_value->reserve(n);
+            return true;
+        }
+        sink *on_element() override
+        {
+            m_value->emplace_back();
+            m_element.bind(&m_value->back());
+            return &m_element;
+        }
+
+    private:
+        std::vector<T> *m_value = nullptr;
+        typename codec<T>::sink m_element;
+    };
+
+    /// `std::vector<bool>` stores packed bits, not `bool` objects to bind, each decoded element is appended
+    template <>
+    class vector_sink<bool> : public sink
+    {
+    public:
+        void bind(std::vector<bool> *p) { m_element.m_value = m_value = p; }
+        bool on_start_array(std::size_t n) override
+        {
+            m_value->clear();
+            if (n != static_cast<std::size_t>(-1)) // unknown size
+                m_value->reserve(n);
+            return true;
+        }
+        sink *on_element() override { return &m_element; }
+
+    private:
+        class element_sink : public sink
+        {
+        public:
+            bool on_bool(bool v) override { return append(v); }
+            bool on_int(std::int64_t v) override { return append(v != 0); }
+            bool on_uint(std::uint64_t v) override { return append(v != 0); }
+            bool on_float(double v) override { return append(v != 0); }
+
+            std::vector<bool> *m_value = nullptr;
+
+        private:
+            bool append(bool v)
+            {
+                m_value->push_back(v);
+                return true;
+            }
+        };
+
+        std::vector<bool> *m_value = nullptr;
+        element_sink m_element;
+    };
+
+    template <typename T>
+    struct codec<std::vector<T>>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const std::vector<T> &v)
+        {
+            w.begin_array(v.size());
+            for (const auto &e : v)
+                codec<T>::encode(w, e);
+        }
+        typedef vector_sink<T> sink;
+    };
+
+    /// sink of fixed-size `std::array<T, N>` and `T[N]`, extra elements are skipped
+    template <typename T, std::size_t N>
+    class array_sink : public sink
+    {
+    public:
+        void bind(std::array<T, N> *p) { m_first = p->data(); }
+        void bind(T (*p)[N]) { m_first = *p; }
+        bool on_start_array(std::size_t) override
+        {
+            m_index = 0;
+            return true;
+        }
+        sink *on_element() override
+        {
+            if (m_index >= N)
+                return nullptr;
+            m_element.bind(&m_first[m_index++]);
+            return &m_element;
+        }
+
+    private:
+        T *m_first = nullptr;
+        std::size_t m_index = 0;
+        typename codec<T>::sink m_element;
+    };
+
+    template <typename T, std::size_t N>
+    struct codec<std::array<T, N>>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const std::array<T, N> &v)
+        {
+            w.begin_array(N);
+            for (const auto &e : v)
+                codec<T>::encode(w, e);
+        }
+        typedef array_sink<T, N> sink;
+    };
+
+    template <typename T, std::size_t N>
+    struct codec<T[N]>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const T (&v)[N])
+        {
+            w.begin_array(N);
+            for (const auto &e : v)
+                codec<T>::encode(w, e);
+        }
+        typedef array_sink<T, N> sink;
+    };
+
+    template <class T>
+    std::vector<std::uint8_t> to_cbor(const T &value)
+    {
+        std::vector<std::uint8_t> buffer;
+        cbor_writer w(buffer);
+        encode(w, value);
+        return buffer;
+    }
+
+    template <class T>
+    std::vector<std::uint8_t> to_msgpack(const T &value)
+    {
+        std::vector<std::uint8_t> buffer;
+        msgpack_writer w(buffer);
+        encode(w, value);
+        return buffer;
+    }
+
+    /// decode one value from the input adapter by SAX, no DOM is built
+    template <class T>
+    void decode(nlohmann::detail::input_adapter &&input, T &value, input_format_t format, bool strict = true)
+    {
+        typename codec<T>::sink root;
+        root.bind(&value);
+        sax_decoder sax(&root);
+        if (!nlohmann::json::sax_parse(std::move(input), &sax, format, strict))
+            throw std::runtime_error("failed to decode: " + (sax.error().empty() ? "unexpected value type" : sax.error()));
+    }
+
+    template <class T>
+    void from_cbor(const std::vector<std::uint8_t> &bytes, T &value)
+    {
+        decode(nlohmann::detail::input_adapter(bytes), value, input_format_t::cbor);
+    }
+
+    template <class T>
+    void from_msgpack(const std::vector<std::uint8_t> &bytes, T &value)
+    {
+        decode(nlohmann::detail::input_adapter(bytes), value, input_format_t::msgpack);
+    }
+
+    /**
+     * @brief read the next value of a sequence written into a stream, e.g. one record after another
+     *
+     * @return false if the end of stream is reached
+     * */
+    template <class T>
+    bool decode_next(std::istream &is, T &value, input_format_t format)
+    {
+        if (is.peek() == std::istream::traits_type::eof())
+            return false;
+        decode(nlohmann::detail::input_adapter(is), value, format, false);
+        return true;
+    }
+} // namespace JSON
@@ -0,0 +1,51 @@
+# copyright Qingfeng Xia @ UKAEA, 2020
+# License:  same as RAMP
+
+"""
+pytest fixtures of the code generator tests, run `python3 -m pytest tests/code_generator`
+
+the generator modules import each other by module name, so its folder is put into `sys.path`
+"""
+
+import os
+import os.path
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+CODE_GENERATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "code_generator")
+sys.path.insert(0, os.path.realpath(CODE_GENERATOR_DIR))
+
+
+@pytest.fixture(scope="session")
+def clang_args():
+    """ extra args for libclang, tests using it are skipped if libclang can not be loaded
+    libclang may not find its own `stddef.h`, the builtin include dir of gcc is used instead
+    """
+    cindex = pytest.importorskip("clang.cindex")
+    import clang_util  # set the library file
+
+    try:
+        cindex.Index.create()
+    except Exception as e:
+        pytest.skip(f"libclang is not available: {e}")
+    args = []
+    gcc = shutil.which("gcc")
+    if gcc:
+        include_dir = subprocess.check_output([gcc, "-print-file-name=include"], universal_newlines=True).strip()
+        if os.path.isdir(include_dir):
+            args.append(f"-isystem{include_dir}")
+    return args
+
+
+@pytest.fixture
+def write_header(tmp_path):
+    # write a header into the tmp folder, return its path as str
+    def _write(name, code):
+        p = tmp_path / name
+        p.write_text(code)
+        return str(p)
+
+    return _write
@@ -0,0 +1,79 @@
+"""
+tests of the batch mode, `h5type_generator.generate_batch()`
+the types of all headers are merged into one registry, a class of one header is a field type in another
+"""
+
+import os.path
+
+from h5type_generator import expand_headers, generate_batch, get_init_function_name, get_record_types
+
+BASE_HEADER = """
+#pragma once
+namespace N
+{
+    struct Point { double x; double y; };
+}
+"""
+
+USER_HEADER = """
+#pragma once
+#include "base.h"
+namespace N
+{
+    struct Segment { Point start; Point end; int id; };
+}
+"""
+
+# a second definition of `N::Point` is not registered, the first header wins
+DUPLICATE_HEADER = """
+#pragma once
+namespace N
+{
+    struct Point { double x; double y; };
+}
+"""
+
+
+def test_batch_registry_merges_types_across_headers(tmp_path, write_header, clang_args):
+    base = write_header("base.h", BASE_HEADER)
+    user = write_header("user.h", USER_HEADER)
+    out_dir = str(tmp_path / "gen")
+    summary = generate_batch([base, user], out_dir, "N", clang_args, jobs=2)
+
+    assert summary["header_count"] == 2
+    assert summary["type_count"] == 2
+    types = {os.path.basename(r["output"]): r["types"] for r in summary["headers"]}
+    assert types == {"base_hdf5.h": ["N::Point"], "user_hdf5.h": ["N::Segment"]}
+
+    with open(os.path.join(out_dir, "user_hdf5.h")) as f:
+        code = f.read()
+    assert '#include "base_hdf5.h"' in code
+    assert get_init_function_name(os.path.join(out_dir, "user_hdf5.h")) in code
+    with open(os.path.join(out_dir, "base_hdf5.h")) as f:
+        assert "Point_h5type()" in f.read()
+
+
+def test_batch_registry_first_definition_wins(tmp_path, write_header, clang_args):
+    first = write_header("base.h", BASE_HEADER)
+    second = write_header("duplicate.h", DUPLICATE_HEADER)
+    summary = generate_batch([first, second], str(tmp_path / "gen"), "N", clang_args, jobs=1)
+    assert summary["type_count"] == 1
+
+
+def test_get_record_types_skips_templates():
+    schema_dict = {
+        "records": [
+            {"type_name": "N::A", "is_template": False},
+            {"type_name": "N::B<T>", "is_template": True},
+        ]
+    }
+    assert get_record_types(schema_dict) == ["N::A"]
+
+
+def test_expand_headers_from_patterns_and_manifest(tmp_path):
+    for name in ("a.h", "b.h", "c.h"):
+        (tmp_path / name).write_text("")
+    manifest = tmp_path / "headers.txt"
+    manifest.write_text("# comment line\nc.h\n\na.h\n")
+    headers = expand_headers([str(tmp_path / "*.h")], str(manifest))
+    assert [os.path.basename(h) for h in headers] == ["a.h", "b.h", "c.h"]
@@ -0,0 +1,131 @@
+"""
+tests of `clang_util.classify_field()`, each FIELD_DECL is resolved once into a `field_info`,
+and of the declarations visited by `clang_util.parse_schema()`
+"""
+
+import os.path
+
+from schema import *
+
+HEADER = """
+#include <array>
+#include <string>
+#include <vector>
+
+namespace N
+{
+    enum Color { red, green };
+    struct Inner { int i; };
+
+    struct Record
+    {
+        int integer;
+        double scalar_array[3];
+        float matrix[2][2];
+        std::vector<int> vlen_vector;
+        std::string name;
+        std::array<int, 2> int_array;
+        std::vector<std::vector<double>> vlen_matrix;
+        const char *cstr;
+        Inner inner;
+        Color color;
+        double *pointer;
+    private:
+        int hidden;
+    };
+}
+"""
+
+
+def classify_record_fields(file_name, clang_args, record_name):
+    from clang.cindex import CursorKind
+    from clang_util import classify_field, parse_header, visit
+
+    tu = parse_header(file_name, clang_args)
+    records = []
+    visit(
+        tu.cursor,
+        lambda n: records.append(n)
+        if n.kind in (CursorKind.STRUCT_DECL, CursorKind.CLASS_TEMPLATE)
+        and n.spelling == record_name
+        and n.is_definition()
+        else None,
+    )
+    assert len(records) == 1
+    fields = [classify_field(c) for c in records[0].get_children() if c.kind == CursorKind.FIELD_DECL]
+    return {f.name: f for f in fields}
+
+
+def test_classify_field_kinds(write_header, clang_args):
+    fields = classify_record_fields(write_header("record.h", HEADER), clang_args, "Record")
+    kinds = {name: f.kind for name, f in fields.items()}
+    assert kinds == {
+        "integer": FIELD_BUILTIN,
+        "scalar_array": FIELD_CSTYLE_ARRAY,
+        "matrix": FIELD_CSTYLE_MATRIX,
+        "vlen_vector": FIELD_STD_VECTOR,
+        "name": FIELD_STD_STRING,
+        "int_array": FIELD_STD_ARRAY,
+        "vlen_matrix": FIELD_VLEN_MATRIX,
+        "cstr": FIELD_CSTR,
+        "inner": FIELD_RECORD,
+        "color": FIELD_ENUM,
+        "pointer": FIELD_POINTER,
+        "hidden": FIELD_BUILTIN,
+    }
+
+
+def test_classify_field_element_and_extents(write_header, clang_args):
+    fields = classify_record_fields(write_header("record.h", HEADER), clang_args, "Record")
+    assert fields["scalar_array"].element_type == "double"
+    assert fields["scalar_array"].extents == (3,)
+    assert fields["matrix"].element_type == "float"
+    assert fields["matrix"].extents == (2, 2)
+    assert fields["vlen_vector"].element_type == "int"
+    assert fields["int_array"].element_type == "int"
+    assert fields["int_array"].extents == ("2",)
+    assert fields["vlen_matrix"].element_type == "double"
+    assert fields["pointer"].element_type == "double"
+    assert fields["inner"].canonical_type_name == "N::Inner"
+
+
+def test_classify_field_access_and_layout(write_header, clang_args):
+    fields = classify_record_fields(write_header("record.h", HEADER), clang_args, "Record")
+    assert fields["integer"].is_public
+    assert not fields["hidden"].is_public
+    assert fields["integer"].offset == 0 and fields["integer"].size == 4
+    assert fields["scalar_array"].offset == 8 and fields["scalar_array"].size == 24
+    assert fields["vlen_vector"].is_vlen and fields["name"].is_vlen
+    assert not fields["int_array"].is_vlen
+
+
+def test_classify_field_template_has_unknown_size(write_header, clang_args):
+    code = "template <typename T> struct Holder { T value; int count; };"
+    fields = classify_record_fields(write_header("holder.h", code), clang_args, "Holder")
+    assert fields["count"].kind == FIELD_BUILTIN
+    assert fields["value"].size is None and fields["value"].offset is None
+
+
+def test_parse_schema_prunes_std_library(write_header, clang_args):
+    from clang_util import parse_schema
+
+    schema = parse_schema(write_header("record.h", HEADER), clang_args)
+    assert [r.type_name for r in schema.records] == ["N::Inner", "N::Record"]
+    assert schema.enums == ["N::Color"]
+    assert any(os.path.basename(f) == "vector" for f in schema.dependencies)  # included, but not visited
+
+
+def test_parse_schema_prunes_headers_out_of_allow_list(write_header, clang_args):
+    from clang_util import parse_schema
+
+    write_header("other.h", "#pragma once\nstruct Other { int i; };\nenum OtherEnum { x };\n")
+    project = write_header("project.h", '#pragma once\n#include "other.h"\nstruct Project { Other o; };\n')
+    header = write_header("input.h", '#include "project.h"\nstruct Input { Project p; struct Nested { int k; } n; };\n')
+
+    schema = parse_schema(header, clang_args)
+    assert [r.type_name for r in schema.records] == ["Input", "Input::Nested"]
+    assert schema.enums == []
+
+    schema = parse_schema(header, clang_args, [project])
+    assert [r.type_name for r in schema.records] == ["Project", "Input", "Input::Nested"]
+    assert schema.records[2].parent == "Input"
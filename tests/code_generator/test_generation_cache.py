@@ -0,0 +1,86 @@
+"""
+tests of the incremental regeneration: `generation_cache` entries and `write_if_changed()`
+"""
+
+import os
+
+from generation_cache import generation_cache, make_key, write_if_changed
+
+
+def touch_later(file_name, content):
+    # rewrite with a different mtime, the stat check alone must not decide a hit
+    st = os.stat(file_name)
+    with open(file_name, "w") as f:
+        f.write(content)
+    os.utime(file_name, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_cache_hit_until_dependency_changes(tmp_path):
+    dep = tmp_path / "dep.h"
+    dep.write_text("struct A { int i; };")
+    cache = generation_cache(str(tmp_path / "cache"))
+    key = make_key("schema", "version", str(dep))
+
+    assert cache.lookup(key) is None
+    cache.store(key, [str(dep)], {"records": [1, 2]})
+    assert cache.lookup(key) == {"records": [1, 2]}
+
+    touch_later(str(dep), "struct A { int i; };")  # same content, new mtime
+    assert cache.lookup(key) == {"records": [1, 2]}
+
+    touch_later(str(dep), "struct A { double d; };")
+    assert cache.lookup(key) is None
+
+
+def test_cache_miss_if_dependency_removed(tmp_path):
+    dep = tmp_path / "dep.h"
+    dep.write_text("")
+    cache = generation_cache(str(tmp_path / "cache"))
+    cache.store("k", [str(dep)], [])
+    os.remove(str(dep))
+    assert cache.lookup("k") is None
+
+
+def test_cache_miss_if_entry_truncated(tmp_path):
+    cache = generation_cache(str(tmp_path / "cache"))
+    cache.store("k", [], {"a": 1})
+    with open(os.path.join(cache.cache_dir, "k.json"), "w") as f:
+        f.write('{"dependencies": {')
+    assert cache.lookup("k") is None
+
+
+def test_make_key_depends_on_all_parts():
+    assert make_key("a", ["-I."], 1) == make_key("a", ["-I."], 1)
+    assert make_key("a", ["-I."], 1) != make_key("a", ["-I.."], 1)
+
+
+def test_write_if_changed(tmp_path):
+    out = str(tmp_path / "out.h")
+    assert write_if_changed(out, "int a;\n")
+    mtime = os.stat(out).st_mtime_ns
+    assert not write_if_changed(out, "int a;\n")
+    assert os.stat(out).st_mtime_ns == mtime
+    assert write_if_changed(out, "int b;\n")
+    with open(out) as f:
+        assert f.read() == "int b;\n"
+
+
+def test_parse_header_skips_libclang_on_hit(tmp_path, write_header, clang_args, monkeypatch):
+    import clang_util
+    from h5type_generator import _parse_header
+
+    dep = write_header("dep.h", "#pragma once\nstruct A { int i; };\n")
+    header = write_header("input.h", '#include "dep.h"\nstruct B { A a; };\n')
+    job = {"input": header, "clang_args": clang_args, "cache_dir": str(tmp_path / "cache")}
+
+    calls = []
+    parse_schema = clang_util.parse_schema
+    monkeypatch.setattr(clang_util, "parse_schema", lambda *a: calls.append(a) or parse_schema(*a))
+
+    first = _parse_header(job)
+    assert _parse_header(job) == first
+    assert len(calls) == 1
+
+    touch_later(dep, "#pragma once\nstruct A { int i; double d; };\n")
+    _parse_header(job)
+    assert len(calls) == 2
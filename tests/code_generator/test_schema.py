@@ -0,0 +1,155 @@
+"""
+tests of the schema IR shared by all emitters, it is serializable and loaded without libclang
+"""
+
+import json
+
+import pytest
+
+from schema import *
+
+HEADER = """
+#include <string>
+#include <vector>
+
+namespace N
+{
+    enum class Mode { a, b };
+    struct Record
+    {
+        int integer;
+        double values[3];
+        std::vector<float> series;
+        std::string name;
+        Mode mode;
+        struct Nested { int k; } nested;
+    };
+}
+"""
+
+
+def make_schema():
+    fields = [
+        field_info("integer", FIELD_BUILTIN, "int", offset=0, size=4, align=4),
+        field_info("values", FIELD_CSTYLE_ARRAY, "double[3]", element_type="double", extents=(3,)),
+        field_info("series", FIELD_STD_VECTOR, "std::vector<float>", element_type="float", template_args=("float",)),
+        field_info("hidden", FIELD_BUILTIN, "int", access="private"),
+    ]
+    record = record_info("Record", "N::Record", fields, size=48, align=8)
+    return header_schema("input.h", [record], ["N::Mode"], ["input.h", "dep.h"])
+
+
+def test_field_info_round_trip():
+    f = field_info("m", FIELD_EIGEN_MATRIX, "Eigen::MatrixXd", element_type="double", extents=(-1, -1),
+                   layout=LAYOUT_COLUMN_MAJOR)
+    g = field_info.from_dict(json.loads(json.dumps(f.to_dict())))
+    assert g.to_dict() == f.to_dict()
+    assert g.extents == (-1, -1) and g.is_dynamic_tensor and g.is_vlen
+
+
+def test_header_schema_round_trip_through_json():
+    schema = make_schema()
+    d = json.loads(json.dumps(schema.to_dict()))
+    assert d["version"] == SCHEMA_VERSION
+    loaded = header_schema.from_dict(d)
+    assert loaded.to_dict() == schema.to_dict()
+
+    record = loaded.get_record("N::Record")
+    assert [f.name for f in record.fields] == ["integer", "values", "series", "hidden"]
+    assert record.fields[1].extents == (3,)
+    assert [f.name for f in record.vlen_fields] == ["series"]
+    assert not record.fields[3].is_public
+    assert loaded.enums == ["N::Mode"] and loaded.dependencies == ["input.h", "dep.h"]
+
+
+def test_header_schema_dump_and_load(tmp_path):
+    file_name = str(tmp_path / "schema.json")
+    schema = make_schema()
+    schema.dump(file_name)
+    assert header_schema.load(file_name).to_dict() == schema.to_dict()
+
+
+def test_header_schema_rejects_other_version():
+    d = make_schema().to_dict()
+    d["version"] = SCHEMA_VERSION - 1
+    with pytest.raises(ValueError):
+        header_schema.from_dict(d)
+
+
+def test_parsed_schema_round_trip(write_header, clang_args):
+    from clang_util import parse_schema
+
+    schema = parse_schema(write_header("record.h", HEADER), clang_args)
+    assert [r.type_name for r in schema.records] == ["N::Record", "N::Record::Nested"]
+    assert schema.records[1].parent == "N::Record"
+    assert schema.enums == ["N::Mode"]
+    assert header_schema.from_dict(json.loads(json.dumps(schema.to_dict()))).to_dict() == schema.to_dict()
+
+
+def test_project_headers_allow_list(write_header, clang_args):
+    from clang_util import parse_schema
+
+    dep = write_header("dep.h", "#pragma once\nstruct Dep { int i; };\n")
+    header = write_header("input.h", '#include "dep.h"\nstruct Input { Dep d; };\n')
+    assert [r.name for r in parse_schema(header, clang_args).records] == ["Input"]
+    assert [r.name for r in parse_schema(header, clang_args, [dep]).records] == ["Dep", "Input"]
+
+
+def test_emitter_output_equal_for_loaded_schema(tmp_path, write_header, clang_args):
+    from clang_util import parse_schema
+    from h5type_generator import hdf5_generator
+
+    header = write_header("record.h", HEADER)
+    schema = parse_schema(header, clang_args)
+    outputs = []
+    for s in (schema, header_schema.from_dict(json.loads(json.dumps(schema.to_dict())))):
+        g = hdf5_generator(header, str(tmp_path / "record_hdf5.h"), "N", schema=s)
+        g.generate()
+        outputs.append(g.format_code())
+    assert "Record_h5type()" in outputs[0]
+    assert outputs[0] == outputs[1]
+
+
+def test_stale_cached_schema_is_a_miss(tmp_path, write_header, clang_args):
+    from generation_cache import generation_cache
+    from h5type_generator import _parse_header, get_cache_key
+
+    header = write_header("record.h", HEADER)
+    job = {"input": header, "clang_args": clang_args, "cache_dir": str(tmp_path / "cache")}
+    schema_dict = _parse_header(job)
+    stale = dict(schema_dict, version=SCHEMA_VERSION - 1)
+    generation_cache(job["cache_dir"]).store(get_cache_key("schema", job), [header], stale)
+
+    assert _parse_header(job)["version"] == SCHEMA_VERSION
+    assert header_schema.from_dict(_parse_header(job)).to_dict() == header_schema.from_dict(schema_dict).to_dict()
+
+
+def test_parsed_target_layout(clang_args):
+    import struct
+
+    from clang_util import parse_target_layout
+
+    pointer = struct.calcsize("P")
+    assert parse_target_layout(clang_args)["pointer"] == (pointer, pointer)
+    ilp32 = parse_target_layout(clang_args + ["--target=i686-linux-gnu"])
+    assert ilp32 == {"pointer": (4, 4), "size_t": (4, 4), "unsigned long long": (8, 4)}
+
+
+def test_padding_report_of_target_layout(tmp_path):
+    from h5type_generator import hdf5_generator
+
+    fields = [
+        field_info("integer", FIELD_BUILTIN, "int", size=4, align=4),
+        field_info("series", FIELD_STD_VECTOR, "std::vector<float>", element_type="float", template_args=("float",)),
+        field_info("name", FIELD_STD_STRING, "std::string"),
+    ]
+    ilp32 = {"pointer": (4, 4), "size_t": (4, 4), "unsigned long long": (8, 4)}
+    rows = []
+    for size, align, target_layout in ((64, 8, None), (40, 4, ilp32)):
+        record = record_info("Record", "N::Record", fields, size=size, align=align)
+        schema = header_schema("input.h", [record], target_layout=target_layout)
+        g = hdf5_generator("input.h", str(tmp_path / "input_hdf5.h"), "N", schema=schema)
+        rows.append(g.padding_report()[0])
+    # sizeof + hvl_t + const char*
+    assert (rows[0]["memory"], rows[0]["packed"]) == (64 + 16 + 8, 4 + 16 + 8)
+    assert (rows[1]["memory"], rows[1]["packed"]) == (40 + 8 + 4, 4 + 8 + 4)
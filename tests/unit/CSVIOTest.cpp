@@ -0,0 +1,153 @@
+#include "gtest/gtest.h"
+
+#include <cstdio>
+#include <cstdlib>
+#include <limits>
+#include <sstream>
+
+#include "CSVIO.h"
+
+namespace
+{
+    struct Sample
+    {
+        int id;
+        double xy[2];
+        std::string note;
+        bool valid;
+    };
+} // namespace
+
+/// the same specialization as emitted by the generated `*_csv.h` header
+namespace CSV
+{
+    template <>
+    struct codec<Sample>
+    {
+        static const std::vector<std::string> &columns()
+        {
+            static const std::vector<std::string> names = {"id", "xy_0", "xy_1", "note", "valid"};
+            return names;
+        }
+        static void write_row(row_writer &w, const Sample &obj)
+        {
+            w.write(obj.id);
+            w.write(obj.xy[0]);
+            w.write(obj.xy[1]);
+            w.write(obj.note);
+            w.write(obj.valid);
+            w.end_row();
+        }
+        static void read_row(csv::CSVRow &row, const int *index, Sample &obj)
+        {
+            CSV::read_field(row, index[0], obj.id);
+            CSV::read_field(row, index[1], obj.xy[0]);
+            CSV::read_field(row, index[2], obj.xy[1]);
+            CSV::read_field(row, index[3], obj.note);
+            CSV::read_field(row, index[4], obj.valid);
+        }
+    };
+} // namespace CSV
+
+static std::string format_row(const std::vector<std::string> &fields, char delimiter = ',')
+{
+    std::ostringstream os;
+    {
+        CSV::row_writer w(os, delimiter);
+        for (const auto &f : fields)
+            w.write(f);
+        w.end_row();
+    }
+    return os.str();
+}
+
+TEST(CSVCodecTest, FieldIsQuotedOnlyIfNeeded)
+{
+    EXPECT_EQ(format_row({"plain", "with space", ""}), "plain,with space,\n");
+    EXPECT_EQ(format_row({"a,b", "say \"hi\"", "two\nlines", "cr\r"}),
+              "\"a,b\",\"say \"\"hi\"\"\",\"two\nlines\",\"cr\r\"\n");
+    // the delimiter decides, not a comma
+    EXPECT_EQ(format_row({"a,b", "a;b"}, ';'), "a,b;\"a;b\"\n");
+}
+
+TEST(CSVCodecTest, NumbersWithoutIostream)
+{
+    std::ostringstream os;
+    {
+        CSV::row_writer w(os);
+        w.write(0);
+        w.write(-42);
+        w.write(std::numeric_limits<std::int64_t>::min());
+        w.write(std::numeric_limits<std::uint64_t>::max());
+        w.write(true);
+        w.write(static_cast<const char *>(nullptr));
+        w.end_row();
+    }
+    EXPECT_EQ(os.str(), "0,-42,-9223372036854775808,18446744073709551615,1,\n");
+
+    // floating point values are parsed back into the same value
+    for (double v : {0.1, 1.0 / 3.0, -1e-300, 6.02214076e23})
+    {
+        std::ostringstream s;
+        {
+            CSV::row_writer w(s);
+            w.write(v);
+        }
+        EXPECT_EQ(std::strtod(s.str().c_str(), nullptr), v) << s.str();
+    }
+}
+
+TEST(CSVCodecTest, BufferIsWrittenWhenFull)
+{
+    std::vector<std::size_t> blocks;
+    {
+        CSV::row_writer w([&blocks](const char *, std::size_t n) { blocks.push_back(n); }, ',', 8);
+        w.write(std::string("12345"));
+        w.end_row(); // 6 bytes, kept
+        EXPECT_TRUE(blocks.empty());
+        w.write(std::string("678"));
+        w.end_row(); // 10 bytes, written
+        EXPECT_EQ(blocks, std::vector<std::size_t>{10});
+        w.write(1);
+        w.end_row();
+    } // the rest is flushed on destruction
+    EXPECT_EQ(blocks, (std::vector<std::size_t>{10, 2}));
+}
+
+TEST(CSVCodecTest, RecordRoundTrip)
+{
+    const std::string file_name = "CSVCodecTest_RecordRoundTrip.csv";
+    std::vector<Sample> samples = {{1, {0.5, -2.0}, "plain", true},
+                                   {2, {1e-10, 3.25}, "comma, \"quote\"", false}};
+    CSV::write_csv(file_name, samples);
+
+    auto read = CSV::read_csv<Sample>(file_name);
+    std::remove(file_name.c_str());
+    ASSERT_EQ(read.size(), samples.size());
+    for (size_t i = 0; i < samples.size(); i++)
+    {
+        // the number parser of csv.hpp is not exact in the last bit
+        EXPECT_EQ(read[i].id, samples[i].id);
+        EXPECT_DOUBLE_EQ(read[i].xy[0], samples[i].xy[0]);
+        EXPECT_DOUBLE_EQ(read[i].xy[1], samples[i].xy[1]);
+        EXPECT_EQ(read[i].note, samples[i].note);
+        EXPECT_EQ(read[i].valid, samples[i].valid);
+    }
+}
+
+TEST(CSVCodecTest, MissingColumnIsSkipped)
+{
+    const std::string file_name = "CSVCodecTest_MissingColumnIsSkipped.csv";
+    {
+        std::FILE *file = std::fopen(file_name.c_str(), "wb");
+        ASSERT_TRUE(file);
+        std::fputs("note;id\nfirst;7\n", file);
+        std::fclose(file);
+    }
+    auto read = CSV::read_csv<Sample>(file_name, ';');
+    std::remove(file_name.c_str());
+    ASSERT_EQ(read.size(), 1u);
+    EXPECT_EQ(read[0].id, 7);
+    EXPECT_EQ(read[0].note, "first");
+    EXPECT_EQ(read[0].xy[0], 0.0); // value initialized
+}
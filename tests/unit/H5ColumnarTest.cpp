@@ -0,0 +1,93 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5ColumnarTypes_hdf5.h"
+
+#include <memory>
+#include <string>
+#include <vector>
+
+typedef H5FileTest H5ColumnarTest;
+
+static std::vector<gen_columnar::Track> make_tracks(int n)
+{
+    std::vector<gen_columnar::Track> records(n);
+    for (int i = 0; i < n; i++)
+    {
+        gen_columnar::Track &r = records[i];
+        r.id = i;
+        for (int k = 0; k < 3; k++)
+            r.position[k] = i + k * 0.5f;
+        r.flags = {{static_cast<short>(i % 2), static_cast<short>(-i)}};
+        r.origin = {i * 0.25, -i * 0.25};
+        r.samples = std::vector<float>(i % 5, i * 2.0f);
+        r.name = std::string(i % 3, 'a' + i % 26);
+    }
+    return records;
+}
+
+static void expect_equal(const gen_columnar::Track &a, const gen_columnar::Track &b)
+{
+    EXPECT_EQ(a.id, b.id);
+    for (int k = 0; k < 3; k++)
+        EXPECT_EQ(a.position[k], b.position[k]);
+    EXPECT_EQ(a.flags, b.flags);
+    EXPECT_EQ(a.origin.x, b.origin.x);
+    EXPECT_EQ(a.origin.y, b.origin.y);
+    EXPECT_EQ(a.samples, b.samples);
+    EXPECT_EQ(a.name, b.name);
+}
+
+TEST_F(H5ColumnarTest, RoundTrip)
+{
+    auto records = make_tracks(100);
+    data::IO::WriteColumns<gen_columnar::Track>(records, file, "tracks");
+    reopen();
+
+    auto read = data::IO::ReadColumns<gen_columnar::Track>(file, "tracks");
+    ASSERT_EQ(read.size(), records.size());
+    for (size_t i = 0; i < records.size(); i++)
+        expect_equal(read[i], records[i]);
+
+    auto range = data::IO::ReadColumns<gen_columnar::Track>(file, "tracks", 30, 10);
+    ASSERT_EQ(range.size(), 10u);
+    for (size_t i = 0; i < range.size(); i++)
+        expect_equal(range[i], records[30 + i]);
+    EXPECT_EQ(data::IO::ReadColumns<gen_columnar::Track>(file, "tracks", 95, 100).size(), 5u);
+}
+
+TEST_F(H5ColumnarTest, OneDatasetPerMember)
+{
+    auto records = make_tracks(20);
+    data::IO::WriteColumns<gen_columnar::Track>(records, file, "tracks");
+    reopen();
+
+    auto group = std::make_shared<H5::Group>(file->openGroup("tracks"));
+    DataSet position = group->openDataSet("position");
+    hsize_t dims[2];
+    ASSERT_EQ(position.getSpace().getSimpleExtentNdims(), 2);
+    position.getSpace().getSimpleExtentDims(dims);
+    EXPECT_EQ(dims[0], 20u);
+    EXPECT_EQ(dims[1], 3u);
+    EXPECT_EQ(position.getDataType().getClass(), H5T_FLOAT);
+    position.close();
+
+    // a scan reads the dataset of the member only
+    auto x = data::IO::ReadColumn<double>(group, "origin.x");
+    ASSERT_EQ(x.size(), records.size());
+    for (size_t i = 0; i < records.size(); i++)
+        EXPECT_EQ(x[i], records[i].origin.x);
+    auto rows = data::IO::ReadColumn<float>(group, "position", 10, 2);
+    EXPECT_EQ(rows, (std::vector<float>{10, 10.5f, 11, 11, 11.5f, 12}));
+
+    auto samples = data::IO::ReadRagged<float>(group, "samples", 3, 2);
+    ASSERT_EQ(samples.rows(), 2u);
+    EXPECT_EQ(samples[0].to_vector(), records[3].samples);
+    EXPECT_EQ(samples[1].to_vector(), records[4].samples);
+    group->close();
+}
+
+TEST_F(H5ColumnarTest, EmptyRecords)
+{
+    data::IO::WriteColumns<gen_columnar::Track>(std::vector<gen_columnar::Track>(), file, "tracks");
+    EXPECT_TRUE(data::IO::ReadColumns<gen_columnar::Track>(file, "tracks").empty());
+}
@@ -0,0 +1,24 @@
+#pragma once
+#include <array>
+#include <string>
+#include <vector>
+
+/// input of the generator with `--columnar`, see CMakeLists.txt
+namespace gen_columnar
+{
+    struct Point
+    {
+        double x;
+        double y;
+    };
+
+    struct Track
+    {
+        int id;
+        float position[3];
+        std::array<short, 2> flags;
+        Point origin;
+        std::vector<float> samples;
+        std::string name;
+    };
+} // namespace gen_columnar
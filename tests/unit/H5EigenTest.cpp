@@ -0,0 +1,130 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5EigenTypes_hdf5.h"
+
+#include <string>
+#include <vector>
+
+typedef H5FileTest H5EigenTest;
+
+typedef Eigen::Matrix<double, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> RowMatrixXd;
+
+static std::string read_storage_order(const DataSet &dataset)
+{
+    Attribute attrib = dataset.openAttribute("storage_order");
+    std::string order;
+    attrib.read(attrib.getStrType(), order);
+    return order.c_str(); // without the trailing null of a fixed-size string
+}
+
+static std::vector<hsize_t> get_dims(const DataSet &dataset)
+{
+    DataSpace space = dataset.getSpace();
+    std::vector<hsize_t> dims(space.getSimpleExtentNdims());
+    space.getSimpleExtentDims(dims.data());
+    return dims;
+}
+
+TEST_F(H5EigenTest, StorageOrderAttribute)
+{
+    Eigen::MatrixXd column_major(3, 2);
+    column_major << 1, 2, 3, 4, 5, 6;
+    RowMatrixXd row_major = column_major;
+    data::IO::WriteEigen(column_major, file, "column_major");
+    data::IO::WriteEigen(row_major, file, "row_major");
+    reopen();
+
+    // dims are in the storage order, written straight from `.data()`
+    DataSet dataset = file->openDataSet("column_major");
+    EXPECT_EQ(read_storage_order(dataset), "column_major");
+    EXPECT_EQ(get_dims(dataset), (std::vector<hsize_t>{2, 3}));
+    dataset = file->openDataSet("row_major");
+    EXPECT_EQ(read_storage_order(dataset), "row_major");
+    EXPECT_EQ(get_dims(dataset), (std::vector<hsize_t>{3, 2}));
+    dataset.close();
+
+    // transposed on read only if the storage order of the type differs
+    for (const char *name : {"column_major", "row_major"})
+    {
+        EXPECT_EQ(data::IO::ReadEigen<Eigen::MatrixXd>(file, name), column_major) << name;
+        EXPECT_EQ(data::IO::ReadEigen<RowMatrixXd>(file, name), row_major) << name;
+        EXPECT_EQ((data::IO::ReadEigen<Eigen::Matrix<double, 3, 2>>(file, name)), column_major) << name;
+    }
+    EXPECT_THROW(data::IO::ReadEigen<Eigen::Matrix2d>(file, "column_major"), std::runtime_error);
+}
+
+TEST_F(H5EigenTest, DatasetWithoutAttributeIsRowMajor)
+{
+    const std::vector<double> values = {0, 1, 2, 3, 4, 5};
+    hsize_t dims[2] = {2, 3};
+    DataSet dataset = file->createDataSet("matrix", PredType::NATIVE_DOUBLE, DataSpace(2, dims));
+    dataset.write(values.data(), PredType::NATIVE_DOUBLE);
+    dataset.close();
+
+    Eigen::MatrixXd mat = data::IO::ReadEigen<Eigen::MatrixXd>(file, "matrix");
+    ASSERT_EQ(mat.rows(), 2);
+    ASSERT_EQ(mat.cols(), 3);
+    EXPECT_EQ(mat(1, 0), 3.0);
+    EXPECT_EQ(mat(0, 2), 2.0);
+}
+
+TEST_F(H5EigenTest, VectorAndExpression)
+{
+    Eigen::VectorXf vec = Eigen::VectorXf::LinSpaced(5, 0, 4);
+    data::IO::WriteEigen(vec, file, "vector");
+    Eigen::MatrixXd mat = Eigen::MatrixXd::Random(4, 4);
+    data::IO::WriteEigen(mat.block(1, 1, 2, 3), file, "block");
+
+    EXPECT_EQ(data::IO::ReadEigen<Eigen::VectorXf>(file, "vector"), vec);
+    EXPECT_EQ(data::IO::ReadEigen<Eigen::RowVectorXf>(file, "vector"), vec.transpose());
+    EXPECT_EQ(data::IO::ReadEigen<Eigen::MatrixXd>(file, "block"), mat.block(1, 1, 2, 3));
+}
+
+static std::vector<gen_eigen::Frame> make_frames(int n)
+{
+    std::vector<gen_eigen::Frame> frames(n);
+    for (int i = 0; i < n; i++)
+    {
+        gen_eigen::Frame &f = frames[i];
+        f.id = i;
+        f.pose << i, 1, 2, 3, 4, 5;
+        f.gain << 1, 2, 3, static_cast<float>(i);
+        f.offset = Eigen::Vector3f(i, -i, 0.5f);
+        f.image = Eigen::MatrixXd::Constant(i % 3 + 1, i % 2 + 2, i * 0.5);
+        f.image(0, f.image.cols() - 1) = -i;
+    }
+    return frames;
+}
+
+TEST_F(H5EigenTest, GeneratedMembersRoundTrip)
+{
+    auto frames = make_frames(20);
+    data::IO::WriteVector<gen_eigen::Frame>(frames, file, "frames");
+    reopen();
+
+    // fixed-size members are arrays in the record, in the storage order of the member type
+    DataSet dataset = file->openDataSet("frames");
+    H5::CompType type = dataset.getCompType();
+    hsize_t dims[2];
+    type.getMemberArrayType(type.getMemberIndex("pose")).getArrayDims(dims);
+    EXPECT_EQ(dims[0], 3u);
+    EXPECT_EQ(dims[1], 2u);
+    type.getMemberArrayType(type.getMemberIndex("gain")).getArrayDims(dims);
+    EXPECT_EQ(dims[0], 2u);
+    EXPECT_EQ(type.getMemberArrayType(type.getMemberIndex("offset")).getArrayNDims(), 1);
+    dataset.close();
+
+    auto read = data::IO::ReadVector<gen_eigen::Frame>(file, "frames");
+    ASSERT_EQ(read.size(), frames.size());
+    for (size_t i = 0; i < frames.size(); i++)
+    {
+        EXPECT_EQ(read[i].id, frames[i].id);
+        EXPECT_EQ(read[i].pose, frames[i].pose);
+        EXPECT_EQ(read[i].gain, frames[i].gain);
+        EXPECT_EQ(read[i].offset, frames[i].offset);
+        EXPECT_EQ(read[i].image, frames[i].image) << i;
+    }
+    auto range = data::IO::ReadVector<gen_eigen::Frame>(file, "frames", 7, 2);
+    ASSERT_EQ(range.size(), 2u);
+    EXPECT_EQ(range[1].image, frames[8].image);
+}
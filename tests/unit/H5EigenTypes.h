@@ -0,0 +1,15 @@
+#pragma once
+#include <Eigen/Dense>
+
+/// input of the generator with the include dir of Eigen, see CMakeLists.txt
+namespace gen_eigen
+{
+    struct Frame
+    {
+        int id;
+        Eigen::Matrix<double, 2, 3> pose;                   // column-major, seen transposed in file
+        Eigen::Matrix<float, 2, 2, Eigen::RowMajor> gain;
+        Eigen::Vector3f offset;
+        Eigen::MatrixXd image;                              // runtime size, values in the store `<dataset>.image`
+    };
+} // namespace gen_eigen
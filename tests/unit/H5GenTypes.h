@@ -0,0 +1,14 @@
+#pragma once
+#include <string>
+#include <vector>
+
+/// input of the generator, `H5GenTypes_hdf5.h` is generated at build time, see CMakeLists.txt
+namespace gen
+{
+    struct Tagged
+    {
+        int id;
+        std::string name;
+        std::vector<double> values;
+    };
+} // namespace gen
@@ -0,0 +1,118 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5GenTypes_hdf5.h"
+
+#include <algorithm>
+#include <string>
+#include <vector>
+
+/// built as a separate target with `DATA_H5_INSTRUMENT=1`, see CMakeLists.txt
+static_assert(DATA_H5_INSTRUMENT, "compile with -DDATA_H5_INSTRUMENT=1");
+
+using HDF5::instrument::event;
+using HDF5::instrument::registry;
+
+class H5InstrumentTest : public H5FileTest
+{
+protected:
+    void SetUp() override
+    {
+        H5FileTest::SetUp();
+        registry::instance().reset();
+    }
+
+    void TearDown() override
+    {
+        registry::instance().set_callback(nullptr);
+        H5FileTest::TearDown();
+    }
+
+    /// statistics of `operation` on `dataset`, calls == 0 if not recorded
+    static HDF5::instrument::stats find(const std::string &operation, const std::string &dataset)
+    {
+        for (const event &e : registry::instance().snapshot())
+            if (e.operation == operation && e.dataset == dataset)
+                return e.value;
+        return HDF5::instrument::stats();
+    }
+};
+
+static std::vector<gen::Tagged> make_tagged(int n)
+{
+    std::vector<gen::Tagged> records(n);
+    for (int i = 0; i < n; i++)
+        records[i] = {i, "record_" + std::to_string(i), std::vector<double>(i % 3, i * 0.5)};
+    return records;
+}
+
+TEST_F(H5InstrumentTest, OperationsAreRecorded)
+{
+    std::vector<double> values = {1, 2, 3, 4};
+    data::IO::WriteVector<double>(values, file, "values");
+    data::IO::ReadVector<double>(file, "values");
+    data::IO::ReadVector<double>(file, "values", 1, 2);
+
+    auto write = find("WriteVector", "/values");
+    EXPECT_EQ(write.calls, 1u);
+    EXPECT_EQ(write.records, 4u);
+    EXPECT_EQ(write.bytes, 4 * sizeof(double));
+    EXPECT_GT(write.h5_seconds, 0.0);
+    EXPECT_GE(write.convert_seconds, 0.0);
+
+    auto read = find("ReadVector", "/values");
+    EXPECT_EQ(read.calls, 2u); // aggregated per operation and dataset
+    EXPECT_EQ(read.records, 6u);
+
+    registry::instance().reset();
+    EXPECT_TRUE(registry::instance().snapshot().empty());
+}
+
+TEST_F(H5InstrumentTest, GeneratedSerializersAreRecorded)
+{
+    auto records = make_tagged(10);
+    data::IO::WriteVector<gen::Tagged>(records, file, "records");
+    EXPECT_EQ(data::IO::ReadVector<gen::Tagged>(file, "records").size(), records.size());
+
+    auto write = find("WriteVector", "/records");
+    auto batch = find("Tagged_serialize_batch", "/records");
+    EXPECT_EQ(write.records, 10u);
+    EXPECT_EQ(batch.calls, 1u);
+    EXPECT_EQ(batch.records, 10u);
+    EXPECT_EQ(batch.bytes, 10 * sizeof(gen::Tagged_hvl));
+    // the HDF5 time of the nested probe is counted in the enclosing one too
+    EXPECT_GE(write.h5_seconds, batch.h5_seconds);
+    EXPECT_EQ(find("Tagged_deserialize_batch", "/records").records, 10u);
+
+    for (const event &e : registry::instance().snapshot())
+        if (e.dataset == "/records")
+            EXPECT_EQ(e.type, "gen::Tagged") << e.operation;
+}
+
+TEST_F(H5InstrumentTest, CallbackReceivesEachOperation)
+{
+    std::vector<std::string> operations;
+    registry::instance().set_callback([&](const event &e) { operations.push_back(e.operation); });
+    data::IO::WriteVector<int>(std::vector<int>{1, 2}, file, "first");
+    data::IO::WriteVector<int>(std::vector<int>{3}, file, "second");
+    EXPECT_EQ(operations, (std::vector<std::string>{"WriteVector", "WriteVector"}));
+}
+
+TEST_F(H5InstrumentTest, JsonDump)
+{
+    data::IO::WriteVector<double>(std::vector<double>{1, 2, 3}, file, "values");
+    registry::instance().add({"Custom", "a\"b\\c\n", "T", {2, 3, 4, 0, 0}});
+
+    const std::string json = registry::instance().to_json();
+    EXPECT_EQ(json.front(), '[');
+    EXPECT_EQ(json.substr(json.size() - 2), "]\n");
+    EXPECT_NE(json.find("{\"operation\": \"WriteVector\", \"dataset\": \"/values\", \"type\": \"double\", "
+                        "\"calls\": 1, \"records\": 3, \"bytes\": 24, "),
+              std::string::npos)
+        << json;
+    EXPECT_NE(json.find("\"dataset\": \"a\\\"b\\\\c\\u000a\""), std::string::npos) << json;
+    EXPECT_NE(json.find("\"calls\": 2, \"records\": 3, \"bytes\": 4"), std::string::npos) << json;
+    EXPECT_EQ(std::count(json.begin(), json.end(), '{'), 2);
+
+    registry::instance().reset();
+    EXPECT_EQ(registry::instance().to_json(), "[\n]\n");
+}
@@ -0,0 +1,89 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5TestRecord.h"
+
+#include <array>
+#include <cstddef>
+#include <vector>
+
+typedef H5FileTest H5MemberReadTest;
+
+TEST_F(H5MemberReadTest, MemberEqualToReadVector)
+{
+    std::vector<unit::Sample> records;
+    for (int i = 0; i < 50; i++)
+        records.push_back(unit::make_sample(i));
+    data::IO::WriteVector<unit::Sample>(records, file, "records");
+    reopen();
+
+    auto full = data::IO::ReadVector<unit::Sample>(file, "records");
+    auto values = data::IO::ReadMember<double, unit::Sample>(file, "records", "value");
+    auto ids = data::IO::ReadMember<std::array<int, 2>, unit::Sample>(file, "records", "id");
+    ASSERT_EQ(values.size(), full.size());
+    ASSERT_EQ(ids.size(), full.size());
+    for (size_t i = 0; i < full.size(); i++)
+    {
+        EXPECT_EQ(values[i], full[i].value);
+        EXPECT_EQ(ids[i][0], full[i].id[0]);
+        EXPECT_EQ(ids[i][1], full[i].id[1]);
+    }
+    EXPECT_THROW((data::IO::ReadMember<double, unit::Sample>(file, "records", "missing")), H5::Exception);
+}
+
+/// members of `unit::Sample` in another order and without padding
+struct SampleProjection
+{
+    double value;
+    char flag;
+};
+
+TEST_F(H5MemberReadTest, ProjectionEqualToReadVector)
+{
+    std::vector<unit::Sample> records;
+    for (int i = 0; i < 50; i++)
+        records.push_back(unit::make_sample(i));
+    data::IO::WriteVector<unit::Sample>(records, file, "records");
+
+    auto ptype = HDF5::projection_type(unit::Sample_h5type(), sizeof(SampleProjection),
+                                       {{"value", offsetof(SampleProjection, value)},
+                                        {"flag", offsetof(SampleProjection, flag)}});
+    auto projected = data::IO::ReadProjection<SampleProjection>(file, "records", ptype);
+    auto full = data::IO::ReadVector<unit::Sample>(file, "records");
+    ASSERT_EQ(projected.size(), full.size());
+    for (size_t i = 0; i < full.size(); i++)
+    {
+        EXPECT_EQ(projected[i].value, full[i].value);
+        EXPECT_EQ(projected[i].flag, full[i].flag);
+    }
+}
+
+/// the layout of a record with a vlen member in memory, as `<class>_hvl` of the generator
+struct VlenRecord
+{
+    double scalar;
+    hvl_t series;
+};
+
+TEST_F(H5MemberReadTest, VlenMemberIsNotRead)
+{
+    H5::CompType type(sizeof(VlenRecord));
+    type.insertMember("scalar", HOFFSET(VlenRecord, scalar), H5::PredType::NATIVE_DOUBLE);
+    type.insertMember("series", HOFFSET(VlenRecord, series), H5::VarLenType(&H5::PredType::NATIVE_INT));
+    std::vector<int> series = {1, 2, 3};
+    std::vector<VlenRecord> records(3);
+    for (size_t i = 0; i < records.size(); i++)
+    {
+        records[i].scalar = i * 1.5;
+        records[i].series.p = series.data();
+        records[i].series.len = i + 1;
+    }
+    hsize_t dims[1] = {records.size()};
+    DataSet dataset = file->createDataSet("records", type, DataSpace(1, dims));
+    dataset.write(records.data(), type);
+    dataset.close();
+
+    // no vlen memory is allocated for a member out of the projection, nothing to reclaim
+    auto ptype = HDF5::projection_type(type, sizeof(double), {{"scalar", 0}});
+    auto scalars = data::IO::ReadProjection<double>(file, "records", ptype);
+    EXPECT_EQ(scalars, (std::vector<double>{0.0, 1.5, 3.0}));
+}
@@ -0,0 +1,88 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5TestRecord.h"
+#include "HDF5_Mmap.h"
+
+#include <algorithm>
+#include <utility>
+#include <vector>
+
+typedef H5FileTest H5MmapTest;
+
+static std::vector<unit::Sample> make_samples(int n)
+{
+    std::vector<unit::Sample> records;
+    for (int i = 0; i < n; i++)
+        records.push_back(unit::make_sample(i));
+    return records;
+}
+
+TEST_F(H5MmapTest, ContiguousDatasetIsMapped)
+{
+    auto records = make_samples(1000);
+    data::IO::WriteVector<unit::Sample>(records, file, "records", HDF5::StoragePolicy::contiguous());
+    reopen();
+
+    HDF5::MappedVector<unit::Sample> mapped(file, "records");
+#if DATA_H5_HAS_MMAP
+    EXPECT_TRUE(mapped.is_mapped());
+#endif
+    ASSERT_EQ(mapped.size(), records.size());
+    EXPECT_TRUE(std::equal(mapped.begin(), mapped.end(), records.begin()));
+    EXPECT_EQ(mapped.view().to_vector(), data::IO::ReadVector<unit::Sample>(file, "records"));
+}
+
+TEST_F(H5MmapTest, WrittenDataIsFlushedBeforeMapping)
+{
+    std::vector<double> values = {1, 2, 3};
+    data::IO::WriteVector<double>(values, file, "values");
+
+    HDF5::MappedVector<double> mapped(file, "values"); // the file is still open to write
+    ASSERT_EQ(mapped.size(), 3u);
+    EXPECT_EQ(mapped[2], 3.0);
+}
+
+TEST_F(H5MmapTest, FallbackToRead)
+{
+    auto records = make_samples(100);
+    data::IO::WriteVector<unit::Sample>(records, file, "chunked", HDF5::StoragePolicy::chunked(sizeof(unit::Sample)));
+    std::vector<unit::PackedSample> packed_records(records.size());
+    for (size_t i = 0; i < records.size(); i++)
+        static_cast<unit::Sample &>(packed_records[i]) = records[i];
+    data::IO::WriteVector<unit::PackedSample>(packed_records, file, "packed", HDF5::StoragePolicy::contiguous());
+    reopen();
+
+    HDF5::MappedVector<unit::Sample> chunked(file, "chunked");
+    EXPECT_FALSE(chunked.is_mapped());
+    EXPECT_EQ(chunked.view().to_vector(), records);
+
+    HDF5::MappedVector<unit::Sample> packed(file, "packed"); // the file type differs from the memory type
+    EXPECT_FALSE(packed.is_mapped());
+    EXPECT_EQ(packed.view().to_vector(), records);
+}
+
+TEST_F(H5MmapTest, EmptyDataset)
+{
+    data::IO::WriteVector<int>(std::vector<int>(), file, "empty", HDF5::StoragePolicy::contiguous());
+    HDF5::MappedVector<int> mapped(file, "empty");
+    EXPECT_TRUE(mapped.empty());
+    EXPECT_EQ(mapped.begin(), mapped.end());
+}
+
+TEST_F(H5MmapTest, MoveKeepsRecords)
+{
+    std::vector<int> values = {4, 5, 6};
+    data::IO::WriteVector<int>(values, file, "contiguous", HDF5::StoragePolicy::contiguous());
+    data::IO::WriteVector<int>(values, file, "chunked", HDF5::StoragePolicy::chunked(sizeof(int)));
+    reopen();
+
+    for (const char *name : {"contiguous", "chunked"})
+    {
+        HDF5::MappedVector<int> first(file, name);
+        const bool mapped = first.is_mapped();
+        HDF5::MappedVector<int> second(std::move(first));
+        EXPECT_TRUE(first.empty());
+        EXPECT_EQ(second.is_mapped(), mapped);
+        EXPECT_EQ(std::vector<int>(second.begin(), second.end()), values) << name;
+    }
+}
@@ -0,0 +1,92 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5PackedTypes_hdf5.h"
+
+#include <string>
+#include <vector>
+
+typedef H5FileTest H5PackedTest;
+
+static std::vector<gen_packed::Padded> make_padded(int n)
+{
+    std::vector<gen_packed::Padded> records(n);
+    for (int i = 0; i < n; i++)
+    {
+        records[i].flag = static_cast<char>('a' + i % 26);
+        records[i].value = i * 1.5;
+        records[i].id[0] = i;
+        records[i].id[1] = -i;
+        records[i].series = std::vector<short>(i % 4, static_cast<short>(i));
+        records[i].name = "padded_" + std::to_string(i);
+    }
+    return records;
+}
+
+static void expect_equal(const gen_packed::Padded &a, const gen_packed::Padded &b)
+{
+    EXPECT_EQ(a.flag, b.flag);
+    EXPECT_EQ(a.value, b.value);
+    EXPECT_EQ(a.id[0], b.id[0]);
+    EXPECT_EQ(a.id[1], b.id[1]);
+    EXPECT_EQ(a.series, b.series);
+    EXPECT_EQ(a.name, b.name);
+}
+
+TEST_F(H5PackedTest, FileTypeWithoutPadding)
+{
+    const H5::DataType &memory_type = *HDF5::to_h5type<gen_packed::Plain>::get();
+    const H5::DataType &file_type = *HDF5::to_h5filetype<gen_packed::Plain>::get();
+    EXPECT_EQ(memory_type.getSize(), sizeof(gen_packed::Plain));
+    EXPECT_EQ(file_type.getSize(), sizeof(char) + sizeof(double) + sizeof(short));
+
+    // vlen members are written as their handles, hvl_t and char*
+    const H5::DataType &hvl_type = *HDF5::to_h5type<gen_packed::Padded>::get();
+    const H5::DataType &packed_type = *HDF5::to_h5filetype<gen_packed::Padded>::get();
+    EXPECT_EQ(hvl_type.getSize(), sizeof(gen_packed::Padded_hvl));
+    EXPECT_EQ(packed_type.getSize(), sizeof(char) + sizeof(double) + 2 * sizeof(int) + sizeof(hvl_t) + sizeof(char *));
+}
+
+TEST_F(H5PackedTest, PlainRoundTrip)
+{
+    std::vector<gen_packed::Plain> records(100);
+    for (int i = 0; i < 100; i++)
+        records[i] = {static_cast<char>(i), i * 0.25, static_cast<short>(-i)};
+    data::IO::WriteVector<gen_packed::Plain>(records, file, "plain");
+    reopen();
+
+    DataSet dataset = file->openDataSet("plain");
+    EXPECT_TRUE(dataset.getDataType() == *HDF5::to_h5filetype<gen_packed::Plain>::get());
+    EXPECT_EQ(dataset.getStorageSize(), records.size() * 11);
+    dataset.close();
+
+    // HDF5 inserts the padding of the memory type back on read
+    auto read = data::IO::ReadVector<gen_packed::Plain>(file, "plain");
+    ASSERT_EQ(read.size(), records.size());
+    for (size_t i = 0; i < records.size(); i++)
+    {
+        EXPECT_EQ(read[i].flag, records[i].flag);
+        EXPECT_EQ(read[i].value, records[i].value);
+        EXPECT_EQ(read[i].code, records[i].code);
+    }
+}
+
+TEST_F(H5PackedTest, VlenRoundTrip)
+{
+    auto records = make_padded(50);
+    data::IO::WriteVector<gen_packed::Padded>(records, file, "padded");
+    reopen();
+
+    DataSet dataset = file->openDataSet("padded");
+    EXPECT_TRUE(dataset.getDataType() == *HDF5::to_h5filetype<gen_packed::Padded>::get());
+    dataset.close();
+
+    auto read = data::IO::ReadVector<gen_packed::Padded>(file, "padded");
+    ASSERT_EQ(read.size(), records.size());
+    for (size_t i = 0; i < records.size(); i++)
+        expect_equal(read[i], records[i]);
+
+    auto range = data::IO::ReadVector<gen_packed::Padded>(file, "padded", 20, 5);
+    ASSERT_EQ(range.size(), 5u);
+    expect_equal(range[4], records[24]);
+    EXPECT_EQ((data::IO::ReadMember<double, gen_packed::Padded>(file, "padded", "value"))[49], records[49].value);
+}
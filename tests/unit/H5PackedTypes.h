@@ -0,0 +1,23 @@
+#pragma once
+#include <string>
+#include <vector>
+
+/// input of the generator with `--packed`, see CMakeLists.txt
+namespace gen_packed
+{
+    struct Padded
+    {
+        char flag;
+        double value;
+        int id[2];
+        std::vector<short> series;
+        std::string name;
+    };
+
+    struct Plain
+    {
+        char flag;
+        double value;
+        short code;
+    };
+} // namespace gen_packed
@@ -0,0 +1,86 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5TestRecord.h"
+#include "HDF5_Pipeline.h"
+
+#include <vector>
+
+typedef H5FileTest H5PipelineTest;
+
+TEST_F(H5PipelineTest, BlocksAreWrittenInOrder)
+{
+    std::vector<double> values(1000);
+    for (size_t i = 0; i < values.size(); i++)
+        values[i] = i * 0.5;
+    {
+        // small blocks and few slots, so that append() waits for the I/O thread
+        HDF5::PipelinedWriter<double> writer(file, "values", 3, 7, 2);
+        for (size_t i = 0; i < 500; i++)
+            writer.append(values[i]);
+        writer.append(std::vector<double>(values.begin() + 500, values.end()));
+        EXPECT_EQ(writer.size(), values.size());
+        writer.flush();
+        EXPECT_EQ(data::IO::ReadVector<double>(file, "values").size(), values.size());
+        writer.close();
+        EXPECT_FALSE(writer.is_open());
+    }
+    EXPECT_EQ(data::IO::ReadVector<double>(file, "values"), values);
+}
+
+TEST_F(H5PipelineTest, ExtendsExistingDataset)
+{
+    {
+        HDF5::PipelinedWriter<int> writer(file, "values", 1, 4);
+        for (int i = 0; i < 5; i++)
+            writer.append(i);
+    } // closed on destruction
+    {
+        HDF5::PipelinedWriter<int> writer(file, "values", 2, 4);
+        EXPECT_EQ(writer.size(), 5u);
+        writer.append(std::vector<int>{5, 6});
+    }
+    std::vector<int> expected = {0, 1, 2, 3, 4, 5, 6};
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "values"), expected);
+}
+
+TEST_F(H5PipelineTest, RecordsEqualToWriteVector)
+{
+    std::vector<unit::Sample> records;
+    for (int i = 0; i < 300; i++)
+        records.push_back(unit::make_sample(i));
+    data::IO::WriteVector<unit::Sample>(records, file, "direct");
+    {
+        HDF5::PipelinedWriter<unit::Sample> writer(file, "pipelined", 2, 64);
+        for (const auto &r : records)
+            writer.append(r);
+    }
+    EXPECT_EQ(data::IO::ReadVector<unit::Sample>(file, "pipelined"), records);
+    EXPECT_EQ(data::IO::ReadVector<unit::Sample>(file, "pipelined", 100, 3),
+              data::IO::ReadVector<unit::Sample>(file, "direct", 100, 3));
+}
+
+TEST_F(H5PipelineTest, PaddingRemovedByWorkers)
+{
+    std::vector<unit::PackedSample> records(100);
+    for (int i = 0; i < 100; i++)
+        static_cast<unit::Sample &>(records[i]) = unit::make_sample(i);
+    {
+        HDF5::PipelinedWriter<unit::PackedSample> writer(file, "packed", 2, 16);
+        writer.append(std::move(records));
+    }
+    DataSet dataset = file->openDataSet("packed");
+    EXPECT_EQ(dataset.getDataType().getSize(), sizeof(char) + sizeof(double) + 2 * sizeof(int));
+
+    // HDF5 inserts the padding back on read
+    auto read = data::IO::ReadVector<unit::Sample>(file, "packed");
+    ASSERT_EQ(read.size(), 100u);
+    for (int i = 0; i < 100; i++)
+        EXPECT_EQ(read[i], unit::make_sample(i));
+}
+
+TEST_F(H5PipelineTest, FixedSizeDatasetIsRejected)
+{
+    data::IO::WriteVector<int>(std::vector<int>{1, 2, 3}, file, "fixed");
+    EXPECT_THROW(HDF5::PipelinedWriter<int>(file, "fixed", 1, 4), std::runtime_error);
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "fixed"), (std::vector<int>{1, 2, 3}));
+}
@@ -0,0 +1,79 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "HDF5_Ragged.h"
+
+#include <vector>
+
+typedef std::vector<std::vector<int>> nested_t;
+
+TEST(RaggedArrayTest, FromNested)
+{
+    nested_t rows = {{1, 2, 3}, {}, {4}};
+    auto r = data::RaggedArray<int>::from_nested(rows);
+    ASSERT_EQ(r.rows(), 3u);
+    EXPECT_EQ(r.offsets(), (std::vector<unsigned long long>{0, 3, 3, 4}));
+    EXPECT_EQ(r.values(), (std::vector<int>{1, 2, 3, 4}));
+    EXPECT_EQ(r.row_size(1), 0u);
+    EXPECT_EQ(r[2][0], 4);
+    EXPECT_EQ(r.to_nested(), rows);
+    EXPECT_TRUE(data::RaggedArray<int>().empty());
+}
+
+TEST(RaggedArrayTest, OffsetsAreRebased)
+{
+    data::RaggedArray<int> r({10, 12, 13}, {1, 2, 3});
+    EXPECT_EQ(r.offsets(), (std::vector<unsigned long long>{0, 2, 3}));
+    EXPECT_EQ(r.to_nested(), (nested_t{{1, 2}, {3}}));
+    EXPECT_THROW(data::RaggedArray<int>({0, 2}, {1}), std::invalid_argument);
+}
+
+TEST(RaggedArrayTest, ViewWithoutCopy)
+{
+    auto r = data::RaggedArray<int>::from_nested({{1}, {2, 3}, {4, 5, 6}});
+    auto v = r.view(1, 2);
+    ASSERT_EQ(v.rows(), 2u);
+    EXPECT_EQ(v.size(), 5u);
+    EXPECT_EQ(v.row(0).data(), r.values().data() + 1);
+    EXPECT_EQ(v.to_nested(), (nested_t{{2, 3}, {4, 5, 6}}));
+    EXPECT_TRUE(r.view(3, 0).empty());
+}
+
+typedef H5FileTest H5RaggedTest;
+
+TEST_F(H5RaggedTest, WriteAndReadRange)
+{
+    nested_t rows = {{1, 2}, {3}, {}, {4, 5, 6}};
+    data::IO::WriteRagged<int>(data::RaggedArray<int>::from_nested(rows), file, "ragged");
+    EXPECT_EQ(data::IO::ReadRagged<int>(file, "ragged").to_nested(), rows);
+    EXPECT_EQ(data::IO::ReadRagged<int>(file, "ragged", 1, 2).to_nested(), (nested_t{{3}, {}}));
+    EXPECT_EQ(data::IO::ReadRagged<int>(file, "ragged", 3, 10).to_nested(), (nested_t{{4, 5, 6}}));
+}
+
+TEST_F(H5RaggedTest, StoreAppendsRows)
+{
+    DataSet dataset = file->createDataSet("records", PredType::NATIVE_INT, DataSpace(H5S_SCALAR));
+    EXPECT_THROW(HDF5::RaggedStore<double>(dataset, "series"), std::runtime_error);
+    {
+        HDF5::RaggedStore<double> store(dataset, "series", true);
+        EXPECT_EQ(store.rows(), 0u);
+        EXPECT_EQ(store.append(data::RaggedArray<double>::from_nested({{1, 2}, {3}})), 0u);
+        const double row[3] = {4, 5, 6};
+        EXPECT_EQ(store.append_row(row, 3), 2u);
+        EXPECT_EQ(store.append_row(nullptr, 0), 3u);
+        EXPECT_EQ(store.append(data::RaggedArray<double>::from_nested({{7}})), 4u);
+    }
+    EXPECT_TRUE(file->nameExists("records.series"));
+
+    HDF5::RaggedStore<double> store(dataset, "series"); // opened, not created
+    ASSERT_EQ(store.rows(), 5u);
+    auto loaded = store.read(1, 3);
+    EXPECT_EQ(loaded.first_row, 1u);
+    EXPECT_EQ(loaded.rows.to_nested(), (std::vector<std::vector<double>>{{3}, {4, 5, 6}, {}}));
+    EXPECT_EQ(loaded.view(2, 1).to_nested(), (std::vector<std::vector<double>>{{4, 5, 6}}));
+    EXPECT_TRUE(loaded.view(0, 0).empty());
+    EXPECT_THROW(loaded.view(0, 1), std::out_of_range);
+
+    // the same layout as WriteRagged()
+    EXPECT_EQ(data::IO::ReadRagged<double>(file, "records.series", 4).to_nested(),
+              (std::vector<std::vector<double>>{{7}}));
+}
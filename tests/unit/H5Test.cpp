@@ -1,2 +1,269 @@
 #include "gtest/gtest.h"
-//#include "H5Cpp.h"
+#include "H5TestFile.h"
+
+#include <vector>
+
+typedef H5FileTest H5MatrixTest;
+
+TEST_F(H5MatrixTest, FlatMatrixRoundTrip)
+{
+    data::Matrix<double> mat(3, 4);
+    for (size_t i = 0; i < mat.rows(); i++)
+        for (size_t j = 0; j < mat.cols(); j++)
+            mat(i, j) = i * 10.0 + j;
+    data::IO::WriteMatrix<double>(mat, file, "matrix");
+
+    auto m = data::IO::ReadFlatMatrix<double>(file, "matrix");
+    ASSERT_EQ(m.rows(), 3u);
+    ASSERT_EQ(m.cols(), 4u);
+    EXPECT_EQ(m.to_nested(), mat.to_nested());
+
+    auto rows = data::IO::ReadFlatMatrix<double>(file, "matrix", 1, 2);
+    ASSERT_EQ(rows.rows(), 2u);
+    EXPECT_EQ(rows(0, 0), 10.0);
+    EXPECT_EQ(rows(1, 3), 23.0);
+}
+
+TEST_F(H5MatrixTest, StridedViewWritesBlock)
+{
+    data::Matrix<int> mat(3, 4);
+    for (size_t i = 0; i < mat.size(); i++)
+        mat.data()[i] = static_cast<int>(i);
+    data::MatrixView<const int> block(mat.data() + 1, 3, 2, mat.cols()); // columns 1, 2
+    data::IO::WriteMatrix<int>(block, file, "block");
+
+    auto m = data::IO::ReadFlatMatrix<int>(file, "block");
+    std::vector<std::vector<int>> expected = {{1, 2}, {5, 6}, {9, 10}};
+    EXPECT_EQ(m.to_nested(), expected);
+
+    // read into a strided view of a larger buffer
+    data::Matrix<int> out(3, 4, -1);
+    data::IO::ReadMatrix<int>(file, "block", data::MatrixView<int>(out.data() + 2, 3, 2, out.cols()));
+    EXPECT_EQ(out(1, 1), -1);
+    EXPECT_EQ(out(1, 2), 5);
+    EXPECT_EQ(out(2, 3), 10);
+}
+
+TEST_F(H5MatrixTest, NestedVectorRoundTrip)
+{
+    std::vector<std::vector<float>> mat = {{1, 2, 3}, {4, 5, 6}};
+    data::IO::WriteMatrix<float>(mat, file, "nested");
+    EXPECT_EQ(data::IO::ReadMatrix<float>(file, "nested"), mat);
+}
+
+TEST_F(H5MatrixTest, ShapeMismatchThrows)
+{
+    data::IO::WriteMatrix<int>(data::Matrix<int>(2, 3), file, "matrix");
+    data::Matrix<int> wrong(2, 2);
+    EXPECT_THROW(data::IO::ReadMatrix<int>(file, "matrix", wrong.view()), std::invalid_argument);
+}
+
+TEST(H5StoragePolicyTest, DefaultIsContiguous)
+{
+    HDF5::StoragePolicy p;
+    EXPECT_FALSE(p.is_chunked());
+    hsize_t dims[1] = {100};
+    EXPECT_EQ(p.create_plist(PredType::NATIVE_DOUBLE, 1, dims).getLayout(), H5D_CONTIGUOUS);
+}
+
+TEST(H5StoragePolicyTest, ChunkSizeFromElementSize)
+{
+    auto p = HDF5::StoragePolicy::chunked(sizeof(double), 1024);
+    EXPECT_EQ(p.chunk_elements, 128u);
+    EXPECT_EQ(HDF5::StoragePolicy::chunked(4096, 1024).chunk_elements, 1u);
+
+    hsize_t chunk[1];
+    hsize_t dims[1] = {1000};
+    hsize_t maxdims[1] = {H5S_UNLIMITED};
+    auto plist = p.create_plist(PredType::NATIVE_DOUBLE, 1, dims, maxdims);
+    ASSERT_EQ(plist.getLayout(), H5D_CHUNKED);
+    plist.getChunk(1, chunk);
+    EXPECT_EQ(chunk[0], 128u);
+
+    // the chunk is not larger than a fixed-size dim
+    hsize_t small[1] = {10};
+    p.create_plist(PredType::NATIVE_DOUBLE, 1, small).getChunk(1, chunk);
+    EXPECT_EQ(chunk[0], 10u);
+}
+
+TEST(H5StoragePolicyTest, ChunkHoldsWholeRows)
+{
+    HDF5::StoragePolicy p;
+    p.chunk_elements = 64;
+    hsize_t dims[2] = {1000, 16};
+    hsize_t chunk[2];
+    p.create_plist(PredType::NATIVE_INT, 2, dims).getChunk(2, chunk);
+    EXPECT_EQ(chunk[0], 4u);
+    EXPECT_EQ(chunk[1], 16u);
+}
+
+TEST(H5StoragePolicyTest, EmptyFixedSizeDatasetStaysContiguous)
+{
+    auto p = HDF5::StoragePolicy::chunked(sizeof(int)).set_deflate(4);
+    hsize_t dims[1] = {0};
+    EXPECT_EQ(p.create_plist(PredType::NATIVE_INT, 1, dims).getLayout(), H5D_CONTIGUOUS);
+}
+
+TEST(H5StoragePolicyTest, FilterPipelineOrder)
+{
+    HDF5::StoragePolicy p;
+    p.set_deflate(6).set_shuffle().set_fletcher32();
+    EXPECT_TRUE(p.is_chunked()); // a filter needs chunked layout, the chunk size is computed
+    hsize_t dims[1] = {1 << 20};
+    auto plist = p.create_plist(PredType::NATIVE_DOUBLE, 1, dims);
+    ASSERT_EQ(plist.getLayout(), H5D_CHUNKED);
+    ASSERT_EQ(plist.getNfilters(), 3);
+    unsigned int flags, config;
+    size_t nelmts = 1;
+    unsigned int level[1];
+    char name[32];
+    EXPECT_EQ(plist.getFilter(0, flags, nelmts, level, sizeof(name), name, config), H5Z_FILTER_SHUFFLE);
+    nelmts = 1;
+    EXPECT_EQ(plist.getFilter(1, flags, nelmts, level, sizeof(name), name, config), H5Z_FILTER_DEFLATE);
+    EXPECT_EQ(level[0], 6u);
+    nelmts = 1;
+    EXPECT_EQ(plist.getFilter(2, flags, nelmts, level, sizeof(name), name, config), H5Z_FILTER_FLETCHER32);
+}
+
+typedef H5FileTest H5StorageTest;
+
+TEST_F(H5StorageTest, CompressedVectorRoundTrip)
+{
+    std::vector<double> values(10000);
+    for (size_t i = 0; i < values.size(); i++)
+        values[i] = i % 7;
+    auto policy = HDF5::StoragePolicy::chunked(sizeof(double), 4096).set_shuffle().set_deflate(4);
+    data::IO::WriteVector<double>(values, file, "compressed", policy);
+    {
+        DataSet dataset = file->openDataSet("compressed");
+        auto plist = dataset.getCreatePlist();
+        EXPECT_EQ(plist.getLayout(), H5D_CHUNKED);
+        EXPECT_EQ(plist.getNfilters(), 2);
+        EXPECT_LT(dataset.getStorageSize(), values.size() * sizeof(double));
+    }
+    EXPECT_EQ(data::IO::ReadVector<double>(file, "compressed"), values);
+}
+
+typedef H5FileTest H5AppenderTest;
+
+static hsize_t dataset_length(std::shared_ptr<H5File> file, const std::string &name)
+{
+    hsize_t dims[1];
+    file->openDataSet(name).getSpace().getSimpleExtentDims(dims);
+    return dims[0];
+}
+
+TEST_F(H5AppenderTest, WritesFullBuffersAndFlushesOnClose)
+{
+    data::IO::Appender<double> appender(file, "series", 3);
+    for (int step = 0; step < 8; step++)
+    {
+        appender.append(step * 0.5);
+        EXPECT_EQ(appender.size(), step + 1u);
+        EXPECT_EQ(dataset_length(file, "series"), (step + 1u) / 3 * 3); // only full buffers are written
+    }
+    appender.close();
+    EXPECT_FALSE(appender.is_open());
+
+    auto values = data::IO::ReadVector<double>(file, "series");
+    ASSERT_EQ(values.size(), 8u);
+    EXPECT_EQ(values[7], 3.5);
+}
+
+TEST_F(H5AppenderTest, ExtendsExistingDataset)
+{
+    {
+        data::IO::Appender<int> appender(file, "series", 4);
+        for (int i = 0; i < 5; i++)
+            appender.append(i);
+    } // flushed on destruction
+    {
+        data::IO::Appender<int> appender(file, "series", 4);
+        EXPECT_EQ(appender.size(), 5u);
+        for (int i = 5; i < 7; i++)
+            appender.append(i);
+        appender.flush();
+        EXPECT_EQ(dataset_length(file, "series"), 7u);
+    }
+    std::vector<int> expected = {0, 1, 2, 3, 4, 5, 6};
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "series"), expected);
+
+    DataSet dataset = file->openDataSet("series");
+    hsize_t maxdims[1];
+    dataset.getSpace().getSimpleExtentDims(nullptr, maxdims);
+    EXPECT_EQ(maxdims[0], H5S_UNLIMITED);
+    EXPECT_EQ(dataset.getCreatePlist().getLayout(), H5D_CHUNKED);
+}
+
+TEST_F(H5AppenderTest, FixedSizeDatasetIsRejected)
+{
+    std::vector<int> values = {1, 2, 3};
+    data::IO::WriteVector<int>(values, file, "contiguous", HDF5::StoragePolicy::contiguous());
+    data::IO::WriteVector<int>(values, file, "chunked", HDF5::StoragePolicy::chunked(sizeof(int)));
+    data::IO::WriteMatrix<int>(std::vector<std::vector<int>>{{1, 2}, {3, 4}}, file, "matrix");
+    for (const char *name : {"contiguous", "chunked", "matrix"})
+        EXPECT_THROW(data::IO::Appender<int>(file, name), std::runtime_error) << name;
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "chunked"), values); // not changed
+}
+
+typedef H5FileTest H5RangeReadTest;
+
+TEST_F(H5RangeReadTest, ReadVectorRangeIsClipped)
+{
+    std::vector<int> values(20);
+    for (size_t i = 0; i < values.size(); i++)
+        values[i] = static_cast<int>(i);
+    data::IO::WriteVector<int>(values, file, "values");
+
+    std::vector<int> expected = {4, 5, 6};
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "values", 4, 3), expected);
+    EXPECT_EQ(data::IO::ReadVector<int>(file, "values", 18, 10).size(), 2u);
+    EXPECT_TRUE(data::IO::ReadVector<int>(file, "values", 25, 3).empty());
+}
+
+TEST_F(H5RangeReadTest, BlockReaderVisitsRangeInBlocks)
+{
+    std::vector<double> values(10);
+    for (size_t i = 0; i < values.size(); i++)
+        values[i] = static_cast<double>(i);
+    data::IO::WriteVector<double>(values, file, "values");
+
+    data::IO::BlockReader<double> reader(file, "values", 4, 1, 8);
+    EXPECT_EQ(reader.size(), 8u);
+    std::vector<hsize_t> starts;
+    std::vector<size_t> sizes;
+    while (reader.next())
+    {
+        starts.push_back(reader.block_start());
+        sizes.push_back(reader.block().size());
+    }
+    EXPECT_EQ(starts, (std::vector<hsize_t>{1, 5}));
+    EXPECT_EQ(sizes, (std::vector<size_t>{4, 4}));
+    EXPECT_FALSE(reader.next());
+}
+
+TEST_F(H5RangeReadTest, BlockReaderIteratesAllRecords)
+{
+    data::IO::WriteVector<int>(std::vector<int>(), file, "empty");
+    data::IO::BlockReader<int> empty(file, "empty", 4);
+    EXPECT_TRUE(empty.begin() == empty.end());
+
+    std::vector<int> values(11);
+    for (size_t i = 0; i < values.size(); i++)
+        values[i] = static_cast<int>(i * i);
+    data::IO::WriteVector<int>(values, file, "values");
+    data::IO::BlockReader<int> reader(file, "values", 3);
+    std::vector<int> read;
+    for (const int &v : reader)
+        read.push_back(v);
+    EXPECT_EQ(read, values);
+}
+
+TEST_F(H5RangeReadTest, BlockSizeDefaultsToChunk)
+{
+    std::vector<int> values(100, 1);
+    data::IO::WriteVector<int>(values, file, "chunked", HDF5::StoragePolicy::chunked(sizeof(int), 32 * sizeof(int)));
+    data::IO::BlockReader<int> reader(file, "chunked");
+    ASSERT_TRUE(reader.next());
+    EXPECT_EQ(reader.block().size(), 32u);
+}
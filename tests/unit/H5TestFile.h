@@ -0,0 +1,37 @@
+#pragma once
+#include <cstdio>
+#include <memory>
+#include <string>
+
+#include "gtest/gtest.h"
+#include "HDF5IO.h"
+
+/// a new HDF5 file per test in the working dir, named by the test, removed after the test
+class H5FileTest : public ::testing::Test
+{
+protected:
+    void SetUp() override
+    {
+        const ::testing::TestInfo *info = ::testing::UnitTest::GetInstance()->current_test_info();
+        m_file_name = std::string(info->test_suite_name()) + "_" + info->name() + ".h5";
+        file = std::make_shared<H5File>(m_file_name, H5F_ACC_TRUNC);
+    }
+
+    void TearDown() override
+    {
+        file->close();
+        std::remove(m_file_name.c_str());
+    }
+
+    /// close and open the file again, e.g. read-only to check what is on disk
+    void reopen(unsigned flags = H5F_ACC_RDONLY)
+    {
+        file->close();
+        file = std::make_shared<H5File>(m_file_name, flags);
+    }
+
+    std::shared_ptr<H5File> file;
+
+private:
+    std::string m_file_name;
+};
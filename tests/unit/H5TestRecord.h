@@ -0,0 +1,96 @@
+#pragma once
+#include <atomic>
+#include <mutex>
+
+#include "HDF5IO.h"
+
+/// POD records with padding, the CompType and traits are written as the generated `*_hdf5.h` header does
+namespace unit
+{
+    struct Sample
+    {
+        char flag;
+        double value;
+        int id[2];
+
+        bool operator==(const Sample &o) const
+        {
+            return flag == o.flag && value == o.value && id[0] == o.id[0] && id[1] == o.id[1];
+        }
+    };
+
+    /// the same members, the file type is packed like the generator `--packed` mode
+    struct PackedSample : public Sample
+    {
+    };
+
+    inline Sample make_sample(int i)
+    {
+        Sample s = {static_cast<char>('a' + i % 26), i * 0.25, {i, -i}};
+        return s;
+    }
+
+    inline const H5::CompType &Sample_h5type()
+    {
+        static std::atomic<const H5::CompType *> built(nullptr);
+        if (const H5::CompType *p = built.load(std::memory_order_acquire))
+            return *p;
+        std::lock_guard<std::recursive_mutex> lock(HDF5::library_mutex());
+        static const H5::CompType type = []() {
+            H5::CompType h5type(sizeof(Sample));
+            h5type.insertMember("flag", HOFFSET(Sample, flag), *HDF5::to_h5type<char>::get());
+            h5type.insertMember("value", HOFFSET(Sample, value), *HDF5::to_h5type<double>::get());
+            hsize_t id_dims[] = {2};
+            h5type.insertMember("id", HOFFSET(Sample, id), H5::ArrayType(*HDF5::to_h5type<int>::get(), 1, id_dims));
+            return h5type;
+        }();
+        built.store(&type, std::memory_order_release);
+        return type;
+    }
+
+    inline const H5::CompType &PackedSample_h5filetype()
+    {
+        static std::atomic<const H5::CompType *> built(nullptr);
+        if (const H5::CompType *p = built.load(std::memory_order_acquire))
+            return *p;
+        std::lock_guard<std::recursive_mutex> lock(HDF5::library_mutex());
+        static const H5::CompType type = []() {
+            H5::CompType h5type; // the copy ctor shares the id, `pack()` is applied to a copy
+            h5type.copy(Sample_h5type());
+            h5type.pack();
+            return h5type;
+        }();
+        built.store(&type, std::memory_order_release);
+        return type;
+    }
+} // namespace unit
+
+namespace HDF5
+{
+    template <>
+    struct to_h5type<unit::Sample>
+    {
+        static inline const H5::DataType *get(void)
+        {
+            return &unit::Sample_h5type();
+        }
+    };
+
+    template <>
+    struct to_h5type<unit::PackedSample>
+    {
+        static inline const H5::DataType *get(void)
+        {
+            return &unit::Sample_h5type();
+        }
+    };
+
+    template <>
+    struct to_h5filetype<unit::PackedSample>
+    {
+        static inline const H5::DataType *get(void)
+        {
+            return &unit::PackedSample_h5filetype();
+        }
+    };
+} // namespace HDF5
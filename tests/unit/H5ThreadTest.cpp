@@ -0,0 +1,117 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5TestRecord.h"
+
+#include <atomic>
+#include <complex>
+#include <thread>
+#include <vector>
+
+namespace unit
+{
+    /// a record with a nested record member, its CompType is built from the nested one
+    struct Pair
+    {
+        Sample first;
+        double weight;
+    };
+
+    inline const H5::CompType &Pair_h5type()
+    {
+        static std::atomic<const H5::CompType *> built(nullptr);
+        if (const H5::CompType *p = built.load(std::memory_order_acquire))
+            return *p;
+        std::lock_guard<std::recursive_mutex> lock(HDF5::library_mutex());
+        static const H5::CompType type = []() {
+            H5::CompType h5type(sizeof(Pair));
+            h5type.insertMember("first", HOFFSET(Pair, first), *HDF5::to_h5type<Sample>::get());
+            h5type.insertMember("weight", HOFFSET(Pair, weight), *HDF5::to_h5type<double>::get());
+            return h5type;
+        }();
+        built.store(&type, std::memory_order_release);
+        return type;
+    }
+} // namespace unit
+
+namespace HDF5
+{
+    template <>
+    struct to_h5type<unit::Pair>
+    {
+        static inline const H5::DataType *get(void)
+        {
+            return &unit::Pair_h5type();
+        }
+    };
+} // namespace HDF5
+
+/// call `get()` from `n` threads released at once, return the type of each thread
+template <class F>
+static std::vector<const H5::DataType *> get_concurrently(size_t n, F get)
+{
+    std::vector<const H5::DataType *> types(n, nullptr);
+    std::atomic<bool> go(false);
+    std::vector<std::thread> threads;
+    for (size_t i = 0; i < n; i++)
+        threads.emplace_back([&, i]() {
+            while (!go.load())
+                std::this_thread::yield();
+            types[i] = get();
+        });
+    go.store(true);
+    for (auto &t : threads)
+        t.join();
+    return types;
+}
+
+static void expect_same(const std::vector<const H5::DataType *> &types)
+{
+    ASSERT_NE(types[0], nullptr);
+    for (const H5::DataType *t : types)
+        EXPECT_EQ(t, types[0]);
+}
+
+TEST(H5ThreadTest, NestedTypeIsBuiltOnce)
+{
+    auto types = get_concurrently(8, []() { return HDF5::to_h5type<unit::Pair>::get(); });
+    expect_same(types);
+    const H5::CompType &pair = static_cast<const H5::CompType &>(*types[0]);
+    EXPECT_EQ(pair.getSize(), sizeof(unit::Pair));
+    EXPECT_EQ(pair.getMemberClass(0), H5T_COMPOUND);
+    EXPECT_TRUE(pair.getMemberCompType(0) == unit::Sample_h5type());
+}
+
+TEST(H5ThreadTest, LibraryTypesAreBuiltOnce)
+{
+    expect_same(get_concurrently(8, []() { return HDF5::to_h5filetype<unit::PackedSample>::get(); }));
+    expect_same(get_concurrently(8, []() { return HDF5::to_h5type<std::complex<float>>::get(); }));
+    expect_same(get_concurrently(8, []() { return HDF5::to_h5type<const char *>::get(); }));
+    expect_same(get_concurrently(8, []() { return HDF5::to_h5type<char[16]>::get(); }));
+    EXPECT_EQ(HDF5::to_h5type<std::complex<float>>::get()->getSize(), sizeof(std::complex<float>));
+    EXPECT_EQ(HDF5::to_h5type<char[16]>::get()->getSize(), 16u);
+}
+
+typedef H5FileTest H5ThreadWriteTest;
+
+TEST_F(H5ThreadWriteTest, WritersHoldingTheLock)
+{
+    // HDF5 may not be thread-safe, the writer threads hold the lock of the library for each call
+    std::vector<std::thread> threads;
+    for (int t = 0; t < 4; t++)
+        threads.emplace_back([this, t]() {
+            std::vector<unit::Pair> records(10);
+            for (int i = 0; i < 10; i++)
+                records[i] = {unit::make_sample(t * 10 + i), t + i * 0.5};
+            std::lock_guard<std::recursive_mutex> lock(HDF5::library_mutex());
+            data::IO::WriteVector<unit::Pair>(records, file, "records" + std::to_string(t));
+        });
+    for (auto &t : threads)
+        t.join();
+    for (int t = 0; t < 4; t++)
+    {
+        auto records = data::IO::ReadVector<unit::Pair>(file, "records" + std::to_string(t));
+        ASSERT_EQ(records.size(), 10u);
+        EXPECT_EQ(records[9].first, unit::make_sample(t * 10 + 9));
+        EXPECT_EQ(records[9].weight, t + 4.5);
+    }
+}
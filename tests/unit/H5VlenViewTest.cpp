@@ -0,0 +1,102 @@
+#include "gtest/gtest.h"
+#include "H5TestFile.h"
+#include "H5GenTypes_hdf5.h"
+
+#include <cstring>
+#include <string>
+#include <vector>
+
+typedef H5FileTest H5VlenViewTest;
+
+static std::vector<gen::Tagged> make_tagged(int n)
+{
+    std::vector<gen::Tagged> records(n);
+    for (int i = 0; i < n; i++)
+    {
+        records[i].id = i;
+        records[i].name = "record_" + std::to_string(i);
+        for (int j = 0; j < i % 7; j++)
+            records[i].values.push_back(i + j * 0.25);
+    }
+    return records;
+}
+
+static void expect_views(const std::vector<gen::Tagged_hvl> &views, const std::vector<gen::Tagged> &records,
+                         size_t start)
+{
+    ASSERT_LE(start + views.size(), records.size());
+    for (size_t i = 0; i < views.size(); i++)
+    {
+        const gen::Tagged &r = records[start + i];
+        EXPECT_EQ(views[i].id, r.id);
+        EXPECT_STREQ(views[i].name_cstr, r.name.c_str());
+        auto values = views[i].values_view();
+        EXPECT_EQ(std::vector<double>(values.begin(), values.end()), r.values);
+    }
+}
+
+TEST_F(H5VlenViewTest, ViewsPointIntoArena)
+{
+    auto records = make_tagged(100);
+    data::IO::WriteVector<gen::Tagged>(records, file, "records");
+    reopen();
+
+    HDF5::VlenArena arena(256); // small blocks, the vlen data of the read spans several blocks
+    DataSet dataset = file->openDataSet("records");
+    auto views = gen::Tagged_read_views(dataset, arena);
+    dataset.close();
+    ASSERT_EQ(views.size(), records.size());
+    expect_views(views, records, 0);
+
+    size_t bytes = 0;
+    for (const auto &r : records)
+        bytes += r.name.size() + 1 + r.values.size() * sizeof(double);
+    EXPECT_GE(arena.used(), bytes);
+    for (const auto &v : views)
+    {
+        EXPECT_TRUE(arena.contains(v.name_cstr));
+        if (v.values_hvl.len > 0)
+            EXPECT_TRUE(arena.contains(v.values_hvl.p));
+    }
+}
+
+TEST_F(H5VlenViewTest, ViewsStayValidUntilClear)
+{
+    auto records = make_tagged(50);
+    data::IO::WriteVector<gen::Tagged>(records, file, "records");
+
+    HDF5::VlenArena arena(512);
+    DataSet dataset = file->openDataSet("records");
+    auto first = gen::Tagged_read_views(dataset, arena, 10, 20);
+    std::vector<const char *> names;
+    for (const auto &v : first)
+        names.push_back(v.name_cstr);
+
+    // more reads into the same arena add blocks, the views of the first read are not moved
+    auto second = gen::Tagged_read_views(dataset, arena);
+    for (int k = 0; k < 100; k++)
+        std::memset(arena.allocate(64), 0xff, 64);
+    dataset.close();
+    file->close();
+
+    ASSERT_EQ(first.size(), 20u);
+    ASSERT_EQ(second.size(), records.size());
+    for (size_t i = 0; i < first.size(); i++)
+        EXPECT_EQ(first[i].name_cstr, names[i]);
+    expect_views(first, records, 10);
+    expect_views(second, records, 0);
+
+    const void *name = first[0].name_cstr;
+    arena.clear();
+    EXPECT_EQ(arena.used(), 0u);
+    EXPECT_FALSE(arena.contains(name));
+}
+
+TEST_F(H5VlenViewTest, EmptyRange)
+{
+    data::IO::WriteVector<gen::Tagged>(make_tagged(5), file, "records");
+    HDF5::VlenArena arena;
+    DataSet dataset = file->openDataSet("records");
+    EXPECT_TRUE(gen::Tagged_read_views(dataset, arena, 5).empty());
+    EXPECT_EQ(arena.used(), 0u);
+}
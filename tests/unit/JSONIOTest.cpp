@@ -0,0 +1,211 @@
+#include "gtest/gtest.h"
+
+#include <limits>
+#include <sstream>
+
+#include "JSONIO.h"
+
+namespace
+{
+    enum class Color : int
+    {
+        red = -1,
+        green = 2
+    };
+
+    struct Point
+    {
+        int id;
+        double xyz[3];
+        std::string label;
+        std::vector<float> series;
+        Color color;
+    };
+} // namespace
+
+/// the same specialization as emitted by the generated `*_json.h` header
+namespace JSON
+{
+    template <>
+    struct codec<Point>
+    {
+        template <class Writer>
+        static void encode(Writer &w, const Point &obj)
+        {
+            w.begin_map(5);
+            w.key("id");
+            JSON::encode(w, obj.id);
+            w.key("xyz");
+            JSON::encode(w, obj.xyz);
+            w.key("label");
+            JSON::encode(w, obj.label);
+            w.key("series");
+            JSON::encode(w, obj.series);
+            w.key("color");
+            JSON::encode(w, obj.color);
+        }
+        class sink : public JSON::sink
+        {
+        public:
+            void bind(Point *p)
+            {
+                id_sink.bind(&p->id);
+                xyz_sink.bind(&p->xyz);
+                label_sink.bind(&p->label);
+                series_sink.bind(&p->series);
+                color_sink.bind(&p->color);
+            }
+            bool on_start_object(std::size_t) override
+            {
+                return true;
+            }
+            JSON::sink *on_key(const std::string &k) override
+            {
+                if (k == "id") return &id_sink;
+                if (k == "xyz") return &xyz_sink;
+                if (k == "label") return &label_sink;
+                if (k == "series") return &series_sink;
+                if (k == "color") return &color_sink;
+                return nullptr;
+            }
+
+        private:
+            codec<decltype(Point::id)>::sink id_sink;
+            codec<decltype(Point::xyz)>::sink xyz_sink;
+            codec<decltype(Point::label)>::sink label_sink;
+            codec<decltype(Point::series)>::sink series_sink;
+            codec<decltype(Point::color)>::sink color_sink;
+        };
+    };
+} // namespace JSON
+
+static Point make_point()
+{
+    Point p = {-7, {0.5, -1e300, 3.0}, "a \"label\"", {1.5f, -2.25f}, Color::red};
+    return p;
+}
+
+static void expect_equal(const Point &a, const Point &b)
+{
+    EXPECT_EQ(a.id, b.id);
+    for (int i = 0; i < 3; i++)
+        EXPECT_EQ(a.xyz[i], b.xyz[i]);
+    EXPECT_EQ(a.label, b.label);
+    EXPECT_EQ(a.series, b.series);
+    EXPECT_EQ(a.color, b.color);
+}
+
+TEST(JSONCodecTest, ScalarRoundTrip)
+{
+    // values at the boundaries of the compact integer encodings
+    for (std::int64_t v : {0LL, 23LL, 24LL, -24LL, -25LL, 255LL, -129LL, 65536LL, -2147483649LL, 1LL << 40})
+    {
+        std::int64_t cbor = 0, msgpack = 0;
+        JSON::from_cbor(JSON::to_cbor(v), cbor);
+        JSON::from_msgpack(JSON::to_msgpack(v), msgpack);
+        EXPECT_EQ(cbor, v);
+        EXPECT_EQ(msgpack, v);
+    }
+    std::uint64_t u = 0;
+    JSON::from_cbor(JSON::to_cbor(std::numeric_limits<std::uint64_t>::max()), u);
+    EXPECT_EQ(u, std::numeric_limits<std::uint64_t>::max());
+
+    float f = 0;
+    JSON::from_msgpack(JSON::to_msgpack(0.1f), f);
+    EXPECT_EQ(f, 0.1f);
+    bool b = false;
+    JSON::from_cbor(JSON::to_cbor(true), b);
+    EXPECT_TRUE(b);
+}
+
+TEST(JSONCodecTest, ContainerRoundTrip)
+{
+    std::vector<std::string> strings = {"", "short", std::string(300, 'x')};
+    std::vector<std::string> s;
+    JSON::from_msgpack(JSON::to_msgpack(strings), s);
+    EXPECT_EQ(s, strings);
+
+    std::array<double, 4> arr = {{1, 2, 3, 4}};
+    std::array<double, 4> a = {{0, 0, 0, 0}};
+    JSON::from_cbor(JSON::to_cbor(arr), a);
+    EXPECT_EQ(a, arr);
+
+    std::vector<std::vector<int>> nested = {{1, 2}, {}, {3}};
+    std::vector<std::vector<int>> n;
+    JSON::from_cbor(JSON::to_cbor(nested), n);
+    EXPECT_EQ(n, nested);
+
+    std::vector<bool> flags = {true, false, false, true, true};
+    std::vector<bool> cbor_flags, msgpack_flags = {false};
+    JSON::from_cbor(JSON::to_cbor(flags), cbor_flags);
+    JSON::from_msgpack(JSON::to_msgpack(flags), msgpack_flags);
+    EXPECT_EQ(cbor_flags, flags);
+    EXPECT_EQ(msgpack_flags, flags);
+    EXPECT_TRUE(nlohmann::json::from_cbor(JSON::to_cbor(flags)).at(3).is_boolean());
+}
+
+TEST(JSONCodecTest, RecordRoundTrip)
+{
+    const Point p = make_point();
+    Point cbor = {}, msgpack = {};
+    JSON::from_cbor(JSON::to_cbor(p), cbor);
+    JSON::from_msgpack(JSON::to_msgpack(p), msgpack);
+    expect_equal(cbor, p);
+    expect_equal(msgpack, p);
+}
+
+TEST(JSONCodecTest, ReadableByJsonLibrary)
+{
+    const Point p = make_point();
+    for (const auto &j : {nlohmann::json::from_cbor(JSON::to_cbor(p)),
+                          nlohmann::json::from_msgpack(JSON::to_msgpack(p))})
+    {
+        EXPECT_EQ(j.at("id").get<int>(), -7);
+        EXPECT_EQ(j.at("xyz").at(1).get<double>(), -1e300);
+        EXPECT_EQ(j.at("label").get<std::string>(), p.label);
+        EXPECT_EQ(j.at("series").size(), 2u);
+        EXPECT_EQ(j.at("color").get<int>(), -1);
+    }
+
+    // and the library output is decoded, unknown keys are skipped
+    nlohmann::json j = {{"id", 3}, {"unknown", {1, 2}}, {"xyz", {1, 2, 3}},
+                        {"label", "x"}, {"series", nlohmann::json::array()}, {"color", 2}};
+    Point q = make_point();
+    JSON::from_cbor(nlohmann::json::to_cbor(j), q);
+    EXPECT_EQ(q.id, 3);
+    EXPECT_EQ(q.xyz[2], 3.0);
+    EXPECT_EQ(q.label, "x");
+    EXPECT_TRUE(q.series.empty());
+    EXPECT_EQ(q.color, Color::green);
+}
+
+TEST(JSONCodecTest, StreamOfRecords)
+{
+    std::stringstream ss;
+    {
+        JSON::cbor_writer w(ss);
+        for (int i = 0; i < 3; i++)
+        {
+            Point p = make_point();
+            p.id = i;
+            JSON::encode(w, p);
+        }
+    }
+    Point p = {};
+    std::vector<int> ids;
+    while (JSON::decode_next(ss, p, JSON::input_format_t::cbor))
+        ids.push_back(p.id);
+    EXPECT_EQ(ids, (std::vector<int>{0, 1, 2}));
+}
+
+TEST(JSONCodecTest, WrongTypeThrows)
+{
+    std::vector<int> v;
+    EXPECT_THROW(JSON::from_cbor(JSON::to_cbor(std::string("text")), v), std::runtime_error);
+    EXPECT_THROW(JSON::from_msgpack(std::vector<std::uint8_t>{0xC1}, v), std::runtime_error); // reserved byte
+
+    // extra elements of a fixed-size array are skipped
+    std::array<int, 2> a = {{0, 0}};
+    JSON::from_msgpack(JSON::to_msgpack(std::vector<int>{1, 2, 3}), a);
+    EXPECT_EQ(a, (std::array<int, 2>{{1, 2}}));
+}